@@ -1,55 +1,227 @@
 """
-AWS S3 and Lambda Service Integrations
+AWS S3, Lambda, DynamoDB, ELB, CloudFront and Route 53 Service Integrations
 """
 
 import streamlit as st
-from typing import List, Dict, Optional
+from typing import Any, Callable, List, Dict, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import boto3
+import sqlite3
 from botocore.exceptions import ClientError
 
+METRIC_QUERIES_PER_CALL = 500  # GetMetricData limit
+METRICS_WINDOW = timedelta(days=30)  # Window of the *_month usage metrics
+
+
+def get_metric_data_batched(cloudwatch, queries: List[Tuple[Any, Dict, str]], start: datetime,
+                            end: datetime, period: int) -> Dict[Any, List[float]]:
+    """
+    Run many metric queries in as few GetMetricData calls as possible
+    
+    Args:
+        cloudwatch: CloudWatch client for the region of the metrics
+        queries: (key, metric {Namespace, MetricName, Dimensions}, statistic) per query; keys must be unique
+        start: Window start
+        end: Window end
+        period: Seconds per datapoint
+    
+    Returns:
+        Dict of key -> datapoint values, newest first (keys without data are absent)
+    """
+    values: Dict[Any, List[float]] = {}
+    paginator = cloudwatch.get_paginator('get_metric_data')
+    for i in range(0, len(queries), METRIC_QUERIES_PER_CALL):
+        chunk = queries[i:i + METRIC_QUERIES_PER_CALL]
+        for page in paginator.paginate(
+            MetricDataQueries=[
+                {
+                    'Id': f'q{j}',
+                    'MetricStat': {'Metric': metric, 'Period': period, 'Stat': stat},
+                    'ReturnData': True
+                }
+                for j, (_, metric, stat) in enumerate(chunk)
+            ],
+            StartTime=start,
+            EndTime=end,
+            ScanBy='TimestampDescending'
+        ):
+            # A series can continue on the next page
+            for result in page['MetricDataResults']:
+                if result['Values']:
+                    values.setdefault(chunk[int(result['Id'][1:])][0], []).extend(result['Values'])
+    return values
+
+
+def _window_sums(cloudwatch, namespace: str, dimension: str, names: List[str],
+                 metrics: Dict[str, str]) -> Dict[str, Dict[str, float]]:
+    """
+    Totals over METRICS_WINDOW of several metrics for many resources, in one batched query
+    
+    Args:
+        cloudwatch: Regional CloudWatch client
+        namespace: e.g. AWS/Lambda
+        dimension: Dimension holding the resource name, e.g. FunctionName
+        names: Resource names
+        metrics: Result field -> metric name (summed)
+    
+    Returns:
+        Dict of resource name -> {field: total}
+    """
+    end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    queries = [
+        ((name, field), {'Namespace': namespace, 'MetricName': metric_name,
+                         'Dimensions': [{'Name': dimension, 'Value': name}]}, 'Sum')
+        for name in names
+        for field, metric_name in metrics.items()
+    ]
+    values = get_metric_data_batched(
+        cloudwatch, queries, end - METRICS_WINDOW, end, int(METRICS_WINDOW.total_seconds())
+    )
+    return {
+        name: {field: sum(values.get((name, field), [])) for field in metrics}
+        for name in names
+    }
+
+
+def run_concurrently(fn: Callable[[Any], Any], items: List[Any], max_workers: int) -> Tuple[List, List[Dict]]:
+    """
+    Map fn over items on a bounded thread pool, keeping failures
+    
+    Returns:
+        (results of the items that succeeded, [{'item', 'error'}] for the rest)
+    """
+    results, failures = [], []
+    
+    def call(item):
+        try:
+            return item, fn(item), None
+        except ClientError as e:
+            return item, None, f"{e.response['Error']['Code']}: {e.response['Error'].get('Message', '')}"
+        except Exception as e:
+            return item, None, f"{type(e).__name__}: {e}"
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for item, result, error in executor.map(call, items):
+            if error:
+                failures.append({'item': item, 'error': error})
+            else:
+                results.append(result)
+    return results, failures
+
+
+class S3BucketRegionCache:
+    """
+    Persistent bucket -> region map
+    
+    A bucket's region is fixed for its lifetime, so entries are keyed by name
+    and creation date (a deleted and recreated bucket gets a new entry) and
+    never expire.
+    """
+    
+    def __init__(self, db_path: str = None):
+        """
+        Initialize cache
+        
+        Args:
+            db_path: SQLite path (default ~/.cloudidp/s3_bucket_regions.db)
+        """
+        if db_path is None:
+            db_dir = Path.home() / '.cloudidp'
+            db_dir.mkdir(exist_ok=True)
+            db_path = str(db_dir / 's3_bucket_regions.db')
+        self.db_path = db_path
+        
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS bucket_regions (
+                    bucket_name TEXT NOT NULL,
+                    creation_date TEXT NOT NULL,
+                    region TEXT NOT NULL,
+                    resolved_at TIMESTAMP,
+                    PRIMARY KEY (bucket_name, creation_date)
+                )
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+    
+    def get_many(self, buckets: List[Tuple[str, str]]) -> Dict[str, str]:
+        """
+        Cached regions of (bucket name, creation date) pairs
+        
+        Returns:
+            Dict of bucket name -> region for the pairs that are cached
+        """
+        conn = self._connect()
+        try:
+            found = {}
+            for i in range(0, len(buckets), 400):
+                chunk = buckets[i:i + 400]
+                clause = ' OR '.join(['(bucket_name = ? AND creation_date = ?)'] * len(chunk))
+                params = [value for pair in chunk for value in pair]
+                for name, region in conn.execute(
+                    f'SELECT bucket_name, region FROM bucket_regions WHERE {clause}', params
+                ):
+                    found[name] = region
+            return found
+        finally:
+            conn.close()
+    
+    def put_many(self, entries: List[Tuple[str, str, str]]):
+        """Store (bucket name, creation date, region) entries"""
+        if not entries:
+            return
+        conn = self._connect()
+        try:
+            resolved_at = datetime.now().isoformat()
+            conn.executemany(
+                'INSERT OR REPLACE INTO bucket_regions VALUES (?, ?, ?, ?)',
+                [(name, created, region, resolved_at) for name, created, region in entries]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+
 class S3Service:
     """S3 operations"""
     
-    def __init__(self, session: boto3.Session):
+    # S3 storage metrics are published once a day
+    METRICS_LOOKBACK = timedelta(days=3)
+    
+    def __init__(self, session: boto3.Session, region_cache: Optional[S3BucketRegionCache] = None):
         """Initialize S3 service"""
         self.session = session
         self.client = session.client('s3')
+        self.region_cache = region_cache or S3BucketRegionCache()
     
-    def list_buckets(_self) -> Dict:
-        """List all S3 buckets"""
+    def list_buckets(_self, include_details: bool = True, max_workers: Optional[int] = None) -> Dict:
+        """
+        List all S3 buckets
+        
+        Regions come from ListBuckets when S3 reports them, else from the
+        region cache, else from concurrent GetBucketLocation calls. With
+        details, encryption/versioning/public-access lookups run concurrently
+        and sizes/object counts come from CloudWatch in batched GetMetricData
+        calls per region.
+        
+        Args:
+            include_details: Also fetch configuration and storage metrics
+            max_workers: Concurrent bucket lookups (default AppConfig.S3_ENRICHMENT_WORKERS)
+        """
+        from config_settings import AppConfig
+        max_workers = max_workers or AppConfig.S3_ENRICHMENT_WORKERS
+        
         try:
             response = _self.client.list_buckets()
-            
-            buckets = []
-            for bucket in response.get('Buckets', []):
-                bucket_name = bucket['Name']
-                
-                # Get bucket region
-                try:
-                    location = _self.client.get_bucket_location(Bucket=bucket_name)
-                    # LocationConstraint is None for us-east-1
-                    region = location.get('LocationConstraint') or 'us-east-1'
-                except ClientError as e:
-                    error_code = e.response['Error']['Code']
-                    if error_code == 'AccessDenied':
-                        region = 'Access Denied'
-                    else:
-                        region = f'Error: {error_code}'
-                except Exception as e:
-                    region = 'unknown'
-                
-                # Get bucket size (simplified - would need CloudWatch in production)
-                buckets.append({
-                    'bucket_name': bucket_name,
-                    'creation_date': bucket['CreationDate'],
-                    'region': region
-                })
-            
-            return {
-                'success': True,
-                'count': len(buckets),
-                'buckets': buckets
-            }
         except ClientError as e:
             return {
                 'success': False,
@@ -57,6 +229,130 @@ class S3Service:
                 'count': 0,
                 'buckets': []
             }
+        
+        buckets = [
+            {
+                'bucket_name': bucket['Name'],
+                'creation_date': bucket['CreationDate'],
+                'region': bucket.get('BucketRegion')
+            }
+            for bucket in response.get('Buckets', [])
+        ]
+        _self._resolve_regions(buckets, max_workers)
+        
+        if include_details:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                details = executor.map(_self._bucket_details, buckets)
+                for bucket, detail in zip(buckets, details):
+                    bucket.update(detail)
+            
+            by_region: Dict[str, List[Dict]] = {}
+            for bucket in buckets:
+                if bucket['region'] != 'unknown':
+                    by_region.setdefault(bucket['region'], []).append(bucket)
+            for region, regional in by_region.items():
+                _self._storage_metrics(region, regional)
+        
+        return {
+            'success': True,
+            'count': len(buckets),
+            'buckets': buckets
+        }
+    
+    def _resolve_regions(_self, buckets: List[Dict], max_workers: int):
+        """Fill in missing regions from the cache, then GetBucketLocation"""
+        def cache_key(bucket: Dict) -> Tuple[str, str]:
+            return bucket['bucket_name'], str(bucket['creation_date'])
+        
+        known = [b for b in buckets if b['region']]
+        cached = _self.region_cache.get_many([cache_key(b) for b in buckets if not b['region']])
+        for bucket in buckets:
+            if not bucket['region'] and bucket['bucket_name'] in cached:
+                bucket['region'] = cached[bucket['bucket_name']]
+        
+        def locate(bucket: Dict) -> Optional[str]:
+            try:
+                location = _self.client.get_bucket_location(Bucket=bucket['bucket_name'])
+                # LocationConstraint is None for us-east-1 (and 'EU' for legacy eu-west-1 buckets)
+                constraint = location.get('LocationConstraint') or 'us-east-1'
+                return 'eu-west-1' if constraint == 'EU' else constraint
+            except Exception:
+                return None
+        
+        missing = [b for b in buckets if not b['region']]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for bucket, region in zip(missing, executor.map(locate, missing)):
+                bucket['region'] = region or 'unknown'
+        
+        _self.region_cache.put_many([
+            (*cache_key(b), b['region']) for b in known + missing if b['region'] != 'unknown'
+        ])
+    
+    def _bucket_details(_self, bucket: Dict) -> Dict:
+        """Encryption, versioning and public access block of one bucket (None where unreadable)"""
+        details = {'encryption': None, 'versioning': None, 'public_access_blocked': None}
+        if bucket['region'] == 'unknown':
+            return details
+        client = _self.session.client('s3', region_name=bucket['region'])
+        name = bucket['bucket_name']
+        
+        try:
+            rules = client.get_bucket_encryption(Bucket=name)['ServerSideEncryptionConfiguration']['Rules']
+            details['encryption'] = rules[0]['ApplyServerSideEncryptionByDefault']['SSEAlgorithm'] if rules else False
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ServerSideEncryptionConfigurationNotFoundError':
+                details['encryption'] = False
+        except Exception:
+            pass
+        
+        try:
+            details['versioning'] = client.get_bucket_versioning(Bucket=name).get('Status') == 'Enabled'
+        except Exception:
+            pass
+        
+        try:
+            config = client.get_public_access_block(Bucket=name)['PublicAccessBlockConfiguration']
+            details['public_access_blocked'] = all(config.values())
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'NoSuchPublicAccessBlockConfiguration':
+                details['public_access_blocked'] = False
+        except Exception:
+            pass
+        
+        return details
+    
+    def _storage_metrics(_self, region: str, buckets: List[Dict]):
+        """
+        Size and object count of a region's buckets from CloudWatch
+        
+        ListMetrics tells which (bucket, storage class) size series exist, so
+        GetMetricData only asks for those, batched per region.
+        """
+        cloudwatch = _self.session.client('cloudwatch', region_name=region)
+        wanted = {b['bucket_name']: b for b in buckets}
+        for bucket in buckets:
+            bucket['size_bytes'] = None
+            bucket['object_count'] = None
+        
+        queries = []
+        try:
+            for metric_name, field in (('BucketSizeBytes', 'size_bytes'), ('NumberOfObjects', 'object_count')):
+                paginator = cloudwatch.get_paginator('list_metrics')
+                for page in paginator.paginate(Namespace='AWS/S3', MetricName=metric_name):
+                    for metric in page['Metrics']:
+                        dimensions = {d['Name']: d['Value'] for d in metric['Dimensions']}
+                        if dimensions.get('BucketName') in wanted:
+                            key = (dimensions['BucketName'], field, dimensions.get('StorageType'))
+                            queries.append((key, metric, 'Average'))
+            
+            end = datetime.now(timezone.utc)
+            values = get_metric_data_batched(cloudwatch, queries, end - _self.METRICS_LOOKBACK, end, 86400)
+            for (bucket_name, field, _), series in values.items():
+                # Size is reported per storage class; the latest value of each adds up
+                wanted[bucket_name][field] = (wanted[bucket_name][field] or 0) + int(series[0])
+        except Exception:
+            # Metrics are best-effort; the bucket list stands on its own
+            pass
 
 
 class LambdaService:
@@ -68,8 +364,21 @@ class LambdaService:
         self.region = region
         self.client = session.client('lambda', region_name=region)
     
-    def list_functions(_self) -> Dict:
-        """List all Lambda functions"""
+    def list_functions(_self, include_details: bool = True, max_workers: Optional[int] = None) -> Dict:
+        """
+        List all Lambda functions
+        
+        With details, tags are fetched concurrently and 30-day invocation,
+        error and throttle totals come from one batched CloudWatch query.
+        Functions whose tags cannot be read are kept and listed in 'failures'.
+        
+        Args:
+            include_details: Also fetch tags and usage metrics
+            max_workers: Concurrent tag lookups (default AppConfig.AWS_DESCRIBE_WORKERS)
+        """
+        from config_settings import AppConfig
+        max_workers = max_workers or AppConfig.AWS_DESCRIBE_WORKERS
+        
         try:
             functions = []
             paginator = _self.client.get_paginator('list_functions')
@@ -78,21 +387,20 @@ class LambdaService:
                 for func in page['Functions']:
                     functions.append({
                         'function_name': func['FunctionName'],
+                        'function_arn': func['FunctionArn'],
                         'runtime': func.get('Runtime', 'N/A'),
                         'handler': func.get('Handler', 'N/A'),
                         'memory_size': func.get('MemorySize', 0),
                         'timeout': func.get('Timeout', 0),
                         'last_modified': func.get('LastModified', 'N/A'),
                         'code_size': func.get('CodeSize', 0),
-                        'description': func.get('Description', '')
+                        'description': func.get('Description', ''),
+                        'role': func.get('Role'),
+                        'vpc_id': func.get('VpcConfig', {}).get('VpcId') or None,
+                        'subnet_ids': func.get('VpcConfig', {}).get('SubnetIds', []),
+                        'security_groups': func.get('VpcConfig', {}).get('SecurityGroupIds', []),
+                        'tags': {}
                     })
-            
-            return {
-                'success': True,
-                'count': len(functions),
-                'functions': functions,
-                'region': _self.region
-            }
         except ClientError as e:
             return {
                 'success': False,
@@ -100,6 +408,37 @@ class LambdaService:
                 'count': 0,
                 'functions': []
             }
+        
+        failures = []
+        if include_details and functions:
+            def tags(func: Dict):
+                return func, _self.client.list_tags(Resource=func['function_arn']).get('Tags', {})
+            
+            tagged, tag_failures = run_concurrently(tags, functions, max_workers)
+            for func, func_tags in tagged:
+                func['tags'] = func_tags
+            failures.extend(
+                {'name': f['item']['function_name'], 'stage': 'tags', 'error': f['error']} for f in tag_failures
+            )
+            
+            try:
+                usage = _window_sums(
+                    _self.session.client('cloudwatch', region_name=_self.region),
+                    'AWS/Lambda', 'FunctionName', [f['function_name'] for f in functions],
+                    {'invocations_month': 'Invocations', 'errors_month': 'Errors', 'throttles_month': 'Throttles'}
+                )
+                for func in functions:
+                    func.update({field: int(total) for field, total in usage[func['function_name']].items()})
+            except Exception as e:
+                failures.append({'name': None, 'stage': 'metrics', 'error': f"{type(e).__name__}: {e}"})
+        
+        return {
+            'success': True,
+            'count': len(functions),
+            'functions': functions,
+            'failures': failures,
+            'region': _self.region
+        }
 
 
 class DynamoDBService:
@@ -111,34 +450,126 @@ class DynamoDBService:
         self.region = region
         self.client = session.client('dynamodb', region_name=region)
     
-    def list_tables(_self) -> Dict:
-        """List all DynamoDB tables"""
+    def list_tables(_self, include_details: bool = True, max_workers: Optional[int] = None) -> Dict:
+        """
+        List all DynamoDB tables
+        
+        Tables are described (and their tags read) concurrently; tables that
+        cannot be described are listed in 'failures' instead of being dropped
+        silently. With details, 30-day consumed capacity and throttle totals
+        come from one batched CloudWatch query.
+        
+        Args:
+            include_details: Also fetch tags and usage metrics
+            max_workers: Concurrent describes (default AppConfig.AWS_DESCRIBE_WORKERS)
+        """
+        from config_settings import AppConfig
+        max_workers = max_workers or AppConfig.AWS_DESCRIBE_WORKERS
+        
         try:
-            tables = []
+            table_names = []
             paginator = _self.client.get_paginator('list_tables')
+            for page in paginator.paginate():
+                table_names.extend(page['TableNames'])
+        except ClientError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'count': 0,
+                'tables': []
+            }
+
+        def describe(table_name: str) -> Dict:
+            table = _self.client.describe_table(TableName=table_name)['Table']
+            tags = {}
+            if include_details:
+                response = _self.client.list_tags_of_resource(ResourceArn=table['TableArn'])
+                tags = {t['Key']: t['Value'] for t in response.get('Tags', [])}
+            return {
+                'table_name': table['TableName'],
+                'table_arn': table['TableArn'],
+                'status': table['TableStatus'],
+                'item_count': table.get('ItemCount', 0),
+                'size_bytes': table.get('TableSizeBytes', 0),
+                'creation_date': table.get('CreationDateTime'),
+                'billing_mode': table.get('BillingModeSummary', {}).get('BillingMode', 'PROVISIONED'),
+                'tags': tags
+            }
+        
+        tables, describe_failures = run_concurrently(describe, table_names, max_workers)
+        failures = [{'name': f['item'], 'stage': 'describe', 'error': f['error']} for f in describe_failures]
+        
+        if include_details and tables:
+            try:
+                usage = _window_sums(
+                    _self.session.client('cloudwatch', region_name=_self.region),
+                    'AWS/DynamoDB', 'TableName', [t['table_name'] for t in tables],
+                    {
+                        'consumed_read_units_month': 'ConsumedReadCapacityUnits',
+                        'consumed_write_units_month': 'ConsumedWriteCapacityUnits',
+                        'read_throttles_month': 'ReadThrottleEvents',
+                        'write_throttles_month': 'WriteThrottleEvents'
+                    }
+                )
+                for table in tables:
+                    table.update({field: int(total) for field, total in usage[table['table_name']].items()})
+            except Exception as e:
+                failures.append({'name': None, 'stage': 'metrics', 'error': f"{type(e).__name__}: {e}"})
+        
+        return {
+            'success': True,
+            'count': len(tables),
+            'tables': tables,
+            'failures': failures,
+            'region': _self.region
+        }
+
+
+class ELBService:
+    """Elastic Load Balancing (v2) operations"""
+    
+    def __init__(self, session: boto3.Session, region: str = 'us-east-1'):
+        """Initialize ELB service"""
+        self.session = session
+        self.region = region
+        self.client = session.client('elbv2', region_name=region)
+    
+    def list_load_balancers(_self) -> Dict:
+        """List all application, network and gateway load balancers"""
+        try:
+            load_balancers = []
+            paginator = _self.client.get_paginator('describe_load_balancers')
             
             for page in paginator.paginate():
-                for table_name in page['TableNames']:
-                    # Get table details
-                    try:
-                        table_info = _self.client.describe_table(TableName=table_name)
-                        table = table_info['Table']
-                        
-                        tables.append({
-                            'table_name': table['TableName'],
-                            'status': table['TableStatus'],
-                            'item_count': table.get('ItemCount', 0),
-                            'size_bytes': table.get('TableSizeBytes', 0),
-                            'creation_date': table.get('CreationDateTime'),
-                            'billing_mode': table.get('BillingModeSummary', {}).get('BillingMode', 'PROVISIONED')
-                        })
-                    except:
-                        pass
+                for lb in page['LoadBalancers']:
+                    load_balancers.append({
+                        'load_balancer_arn': lb['LoadBalancerArn'],
+                        'name': lb['LoadBalancerName'],
+                        'type': lb.get('Type', 'application'),
+                        'scheme': lb.get('Scheme', 'N/A'),
+                        'state': lb.get('State', {}).get('Code', 'unknown'),
+                        'dns_name': lb.get('DNSName', 'N/A'),
+                        'vpc_id': lb.get('VpcId', 'N/A'),
+                        'security_groups': lb.get('SecurityGroups', []),
+                        'availability_zones': [az['ZoneName'] for az in lb.get('AvailabilityZones', [])],
+                        'created_time': lb.get('CreatedTime'),
+                        'tags': {}
+                    })
+            
+            # Tags are fetched 20 ARNs per call instead of once per load balancer
+            by_arn = {lb['load_balancer_arn']: lb for lb in load_balancers}
+            arns = list(by_arn)
+            for i in range(0, len(arns), 20):
+                response = _self.client.describe_tags(ResourceArns=arns[i:i + 20])
+                for description in response.get('TagDescriptions', []):
+                    by_arn[description['ResourceArn']]['tags'] = {
+                        tag['Key']: tag['Value'] for tag in description.get('Tags', [])
+                    }
             
             return {
                 'success': True,
-                'count': len(tables),
-                'tables': tables,
+                'count': len(load_balancers),
+                'load_balancers': load_balancers,
                 'region': _self.region
             }
         except ClientError as e:
@@ -146,5 +577,153 @@ class DynamoDBService:
                 'success': False,
                 'error': str(e),
                 'count': 0,
-                'tables': []
+                'load_balancers': []
+            }
+    
+    def list_target_groups(_self, include_targets: bool = True, max_workers: Optional[int] = None) -> Dict:
+        """
+        List target groups with the load balancers in front of them and their registered targets
+        
+        DescribeTargetHealth takes one target group per call, so target
+        lookups run concurrently; groups whose targets cannot be read are
+        kept (with no targets) and listed in 'failures'.
+        
+        Args:
+            include_targets: Also fetch registered targets
+            max_workers: Concurrent target lookups (default AppConfig.AWS_DESCRIBE_WORKERS)
+        """
+        from config_settings import AppConfig
+        max_workers = max_workers or AppConfig.AWS_DESCRIBE_WORKERS
+        
+        try:
+            target_groups = []
+            paginator = _self.client.get_paginator('describe_target_groups')
+            
+            for page in paginator.paginate():
+                for tg in page['TargetGroups']:
+                    target_groups.append({
+                        'target_group_arn': tg['TargetGroupArn'],
+                        'name': tg['TargetGroupName'],
+                        'target_type': tg.get('TargetType', 'instance'),
+                        'protocol': tg.get('Protocol'),
+                        'port': tg.get('Port'),
+                        'vpc_id': tg.get('VpcId'),
+                        'load_balancer_arns': tg.get('LoadBalancerArns', []),
+                        'targets': []
+                    })
+        except ClientError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'count': 0,
+                'target_groups': []
+            }
+        
+        failures = []
+        if include_targets and target_groups:
+            def targets(tg: Dict):
+                response = _self.client.describe_target_health(TargetGroupArn=tg['target_group_arn'])
+                return tg, [
+                    {
+                        'id': d['Target']['Id'],
+                        'port': d['Target'].get('Port'),
+                        'health': d.get('TargetHealth', {}).get('State', 'unknown')
+                    }
+                    for d in response.get('TargetHealthDescriptions', [])
+                ]
+            
+            described, target_failures = run_concurrently(targets, target_groups, max_workers)
+            for tg, tg_targets in described:
+                tg['targets'] = tg_targets
+            failures.extend(
+                {'name': f['item']['name'], 'stage': 'targets', 'error': f['error']} for f in target_failures
+            )
+        
+        return {
+            'success': True,
+            'count': len(target_groups),
+            'target_groups': target_groups,
+            'failures': failures,
+            'region': _self.region
+        }
+
+
+class CloudFrontService:
+    """CloudFront operations (global service)"""
+    
+    def __init__(self, session: boto3.Session):
+        """Initialize CloudFront service"""
+        self.session = session
+        self.client = session.client('cloudfront', region_name='us-east-1')
+    
+    def list_distributions(_self) -> Dict:
+        """List all CloudFront distributions"""
+        try:
+            distributions = []
+            paginator = _self.client.get_paginator('list_distributions')
+            
+            for page in paginator.paginate():
+                for dist in page.get('DistributionList', {}).get('Items', []):
+                    distributions.append({
+                        'distribution_id': dist['Id'],
+                        'arn': dist['ARN'],
+                        'domain_name': dist['DomainName'],
+                        'status': dist['Status'],
+                        'enabled': dist.get('Enabled', False),
+                        'aliases': dist.get('Aliases', {}).get('Items', []),
+                        'origins': [o['DomainName'] for o in dist.get('Origins', {}).get('Items', [])],
+                        'price_class': dist.get('PriceClass', 'N/A'),
+                        'viewer_protocol_https': dist.get('DefaultCacheBehavior', {}).get('ViewerProtocolPolicy') != 'allow-all',
+                        'last_modified': dist.get('LastModifiedTime')
+                    })
+            
+            return {
+                'success': True,
+                'count': len(distributions),
+                'distributions': distributions
+            }
+        except ClientError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'count': 0,
+                'distributions': []
+            }
+
+
+class Route53Service:
+    """Route 53 operations (global service)"""
+    
+    def __init__(self, session: boto3.Session):
+        """Initialize Route 53 service"""
+        self.session = session
+        self.client = session.client('route53', region_name='us-east-1')
+    
+    def list_hosted_zones(_self) -> Dict:
+        """List all hosted zones"""
+        try:
+            zones = []
+            paginator = _self.client.get_paginator('list_hosted_zones')
+            
+            for page in paginator.paginate():
+                for zone in page['HostedZones']:
+                    zones.append({
+                        'zone_id': zone['Id'].split('/')[-1],
+                        'name': zone['Name'].rstrip('.'),
+                        'private': zone.get('Config', {}).get('PrivateZone', False),
+                        'record_count': zone.get('ResourceRecordSetCount', 0),
+                        'comment': zone.get('Config', {}).get('Comment', '')
+                    })
+            
+            return {
+                'success': True,
+                'count': len(zones),
+                'zones': zones
+            }
+        except ClientError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'count': 0,
+                'zones': []
             }
@@ -1,44 +1,502 @@
 """
 AWS Cost Explorer Service Integration
+Settled days are cached on disk and overlapping queries share one daily-by-service request
 """
 
 import streamlit as st
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
 import boto3
 from botocore.exceptions import ClientError
+from config_settings import AppConfig
+import threading
+import time
+
+
+def utc_today() -> date:
+    """Current UTC day - Cost Explorer dates and the daily request budget both count in UTC"""
+    return datetime.now(timezone.utc).date()
+
+
+# Cost Explorer request priority classes (see CostExplorerGovernor)
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_BACKGROUND = 'background'
+
+
+@dataclass
+class CostQueryStats:
+    """Paid Cost Explorer requests made and avoided (one instance per page load)"""
+    requests: int = 0
+    saved: int = 0
+    denied: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    
+    def record(self, made: int, baseline: int = 1):
+        """Count a query that made `made` paid requests where an uncached call would have made `baseline`"""
+        with self._lock:
+            self.requests += made
+            self.saved += max(baseline - made, 0)
+    
+    def record_denied(self):
+        """Count a request the daily budget refused (answered from the cache instead)"""
+        with self._lock:
+            self.denied += 1
+    
+    def caption(self) -> str:
+        denied = f", {self.denied} refused by the daily budget" if self.denied else ""
+        return (f"💲 Cost Explorer: {self.requests} paid request(s) this page load, "
+                f"{self.saved} saved by the cache (${self.saved * 0.01:.2f}){denied}")
+
+
+class CostBudgetExhausted(ClientError):
+    """Raised instead of calling Cost Explorer once the daily request budget is spent"""
+
+
+class CostExplorerGovernor:
+    """
+    Daily budget for paid Cost Explorer requests, shared by every user and worker
+    
+    Usage is counted per UTC day and priority class in SQLite, so it survives
+    restarts and is shared between app processes. Background refreshes stop
+    COST_EXPLORER_INTERACTIVE_RESERVE requests short of the budget, keeping
+    those for people looking at a page.
+    """
+    
+    def __init__(self, db_path: str = None, daily_budget: Optional[int] = None,
+                 interactive_reserve: Optional[int] = None):
+        """
+        Initialize Cost Explorer governor
+        
+        Args:
+            db_path: Path to SQLite database file (default: the Cost Explorer cache database)
+            daily_budget: Paid requests per UTC day (default AppConfig.COST_EXPLORER_DAILY_BUDGET)
+            interactive_reserve: Requests background refreshes may not use
+                (default AppConfig.COST_EXPLORER_INTERACTIVE_RESERVE)
+        """
+        if db_path is None:
+            db_dir = Path.home() / '.cloudidp'
+            db_dir.mkdir(exist_ok=True)
+            db_path = str(db_dir / 'cost_explorer_cache.db')
+        
+        self.db_path = db_path
+        self.daily_budget = AppConfig.COST_EXPLORER_DAILY_BUDGET if daily_budget is None else daily_budget
+        self.interactive_reserve = (AppConfig.COST_EXPLORER_INTERACTIVE_RESERVE
+                                    if interactive_reserve is None else interactive_reserve)
+        self._lock = threading.Lock()
+        
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS ce_usage (
+                    day TEXT NOT NULL,
+                    priority TEXT NOT NULL,
+                    requests INTEGER NOT NULL DEFAULT 0,
+                    denied INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, priority)
+                )
+            ''')
+        finally:
+            conn.close()
+    
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit, so acquire() can take the write lock itself with BEGIN IMMEDIATE
+        return sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+    
+    @staticmethod
+    def _today() -> str:
+        return utc_today().isoformat()
+    
+    def limit(self, priority: str) -> int:
+        """Total requests today (all classes) after which a priority class is refused"""
+        if priority == PRIORITY_BACKGROUND:
+            return max(self.daily_budget - self.interactive_reserve, 0)
+        return self.daily_budget
+    
+    def acquire(self, priority: str, operation: str):
+        """
+        Take one paid request from today's budget
+        
+        Args:
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+            operation: Cost Explorer operation about to be called (for the error)
+        
+        Raises:
+            CostBudgetExhausted: The priority class has no budget left today
+        """
+        day = self._today()
+        with self._lock:
+            conn = self._connect()
+            try:
+                # Take the write lock before reading, so two processes cannot both spend the last request
+                conn.execute('BEGIN IMMEDIATE')
+                used = conn.execute('SELECT COALESCE(SUM(requests), 0) FROM ce_usage WHERE day = ?',
+                                    (day,)).fetchone()[0]
+                allowed = used < self.limit(priority)
+                conn.execute(
+                    'INSERT INTO ce_usage (day, priority, requests, denied) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT(day, priority) DO UPDATE SET '
+                    'requests = requests + excluded.requests, denied = denied + excluded.denied',
+                    (day, priority, int(allowed), int(not allowed))
+                )
+                conn.execute('COMMIT')
+            except sqlite3.Error:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                raise
+            finally:
+                conn.close()
+        
+        if not allowed:
+            raise CostBudgetExhausted({
+                'Error': {
+                    'Code': 'CostExplorerBudgetExhausted',
+                    'Message': (f"Daily Cost Explorer budget for {priority} requests is spent "
+                                f"({self.limit(priority)} of {self.daily_budget}); it resets at 00:00 UTC")
+                }
+            }, operation)
+    
+    def available(self, priority: str = PRIORITY_INTERACTIVE) -> int:
+        """Requests a priority class can still make today"""
+        return max(self.limit(priority) - self.today()['used'], 0)
+    
+    def today(self) -> Dict:
+        """
+        Today's usage
+        
+        Returns:
+            used, budget, remaining, denied and per-priority requests/denied
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT priority, requests, denied FROM ce_usage WHERE day = ?',
+                                (self._today(),)).fetchall()
+        finally:
+            conn.close()
+        
+        used = sum(requests for _, requests, _ in rows)
+        return {
+            'used': used,
+            'budget': self.daily_budget,
+            'remaining': max(self.daily_budget - used, 0),
+            'denied': sum(denied for _, _, denied in rows),
+            'by_priority': {priority: {'requests': requests, 'denied': denied}
+                            for priority, requests, denied in rows}
+        }
+    
+    def usage(self, days: int = 14) -> List[Tuple[str, str, int, int]]:
+        """(day, priority, requests, denied) for the last `days` UTC days, most recent first"""
+        since = (utc_today() - timedelta(days=days - 1)).isoformat()
+        conn = self._connect()
+        try:
+            return conn.execute(
+                'SELECT day, priority, requests, denied FROM ce_usage WHERE day >= ? ORDER BY day DESC, priority',
+                (since,)
+            ).fetchall()
+        finally:
+            conn.close()
+
+
+class CostExplorerCache:
+    """
+    On-disk cache of daily cost by service, per account scope
+    
+    A day older than COST_UNSETTLED_DAYS is settled and kept indefinitely;
+    newer days are re-fetched once they are older than CACHE_TTL_COSTS.
+    Forecasts are used for the UTC day they were made; the latest one per
+    horizon is kept as the fallback when the daily budget is spent.
+    """
+    
+    def __init__(self, db_path: str = None):
+        """
+        Initialize Cost Explorer cache
+        
+        Args:
+            db_path: Path to SQLite database file
+        """
+        if db_path is None:
+            db_dir = Path.home() / '.cloudidp'
+            db_dir.mkdir(exist_ok=True)
+            db_path = str(db_dir / 'cost_explorer_cache.db')
+        
+        self.db_path = db_path
+        self._scope_locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+        self._initialize_database()
+    
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+    
+    # Version 1: scopes hold the account's own (LINKED_ACCOUNT) cost, not a payer's whole organization
+    SCHEMA_VERSION = 1
+    
+    def _initialize_database(self):
+        conn = self._connect()
+        try:
+            if conn.execute('PRAGMA user_version').fetchone()[0] < self.SCHEMA_VERSION:
+                # Older caches may hold organization-wide cost under a payer's scope; it is all re-fetchable
+                for table in ('ce_daily_service', 'ce_days', 'ce_forecasts'):
+                    conn.execute(f'DROP TABLE IF EXISTS {table}')
+                conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS ce_daily_service (
+                    scope TEXT NOT NULL,
+                    cost_date TEXT NOT NULL,
+                    service TEXT NOT NULL,
+                    amount REAL NOT NULL,
+                    PRIMARY KEY (scope, cost_date, service)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS ce_days (
+                    scope TEXT NOT NULL,
+                    cost_date TEXT NOT NULL,
+                    settled INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (scope, cost_date)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS ce_forecasts (
+                    scope TEXT NOT NULL,
+                    as_of TEXT NOT NULL,
+                    days INTEGER NOT NULL,
+                    amount REAL NOT NULL,
+                    PRIMARY KEY (scope, as_of, days)
+                )
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def scope_lock(self, scope: str) -> threading.Lock:
+        """Lock serializing fetches for one scope, so concurrent callers share a single request"""
+        with self._guard:
+            return self._scope_locks.setdefault(scope, threading.Lock())
+    
+    def missing_days(self, scope: str, start: date, end: date) -> List[date]:
+        """Days in [start, end) that are not cached or whose unsettled copy has expired"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                'SELECT cost_date, settled, fetched_at FROM ce_days WHERE scope = ? AND cost_date >= ? AND cost_date < ?',
+                (scope, start.isoformat(), end.isoformat())
+            ).fetchall()
+        finally:
+            conn.close()
+        
+        cutoff = time.time() - AppConfig.CACHE_TTL_COSTS
+        fresh = {day for day, settled, fetched_at in rows if settled or fetched_at >= cutoff}
+        days = (start + timedelta(days=offset) for offset in range((end - start).days))
+        return [day for day in days if day.isoformat() not in fresh]
+    
+    def store(self, scope: str, start: date, end: date, rows: List[Tuple[str, str, float]], settled_before: date):
+        """
+        Replace the cached days [start, end) of a scope
+        
+        Args:
+            scope: Account scope
+            start / end: Fetched day range (end exclusive) - days without rows are cached as zero cost
+            rows: (day, service, amount)
+            settled_before: Days before this are settled
+        """
+        now = time.time()
+        days = [(start + timedelta(days=offset)) for offset in range((end - start).days)]
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM ce_daily_service WHERE scope = ? AND cost_date >= ? AND cost_date < ?',
+                         (scope, start.isoformat(), end.isoformat()))
+            conn.executemany('INSERT OR REPLACE INTO ce_daily_service VALUES (?, ?, ?, ?)',
+                             [(scope, day, service, amount) for day, service, amount in rows])
+            conn.executemany('INSERT OR REPLACE INTO ce_days VALUES (?, ?, ?, ?)',
+                             [(scope, day.isoformat(), int(day < settled_before), now) for day in days])
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def has_days(self, scope: str, start: date, end: date) -> bool:
+        """Whether any day in [start, end) was ever cached, expired or not"""
+        conn = self._connect()
+        try:
+            return conn.execute(
+                'SELECT 1 FROM ce_days WHERE scope = ? AND cost_date >= ? AND cost_date < ? LIMIT 1',
+                (scope, start.isoformat(), end.isoformat())
+            ).fetchone() is not None
+        finally:
+            conn.close()
+    
+    def read(self, scope: str, start: date, end: date) -> List[Tuple[str, str, float]]:
+        """Cached (day, service, amount) rows in [start, end)"""
+        conn = self._connect()
+        try:
+            return conn.execute(
+                'SELECT cost_date, service, amount FROM ce_daily_service WHERE scope = ? AND cost_date >= ? AND cost_date < ?',
+                (scope, start.isoformat(), end.isoformat())
+            ).fetchall()
+        finally:
+            conn.close()
+    
+    def get_forecast(self, scope: str, as_of: date, days: int) -> Optional[float]:
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT amount FROM ce_forecasts WHERE scope = ? AND as_of = ? AND days = ?',
+                               (scope, as_of.isoformat(), days)).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+    
+    def latest_forecast(self, scope: str, days: int) -> Optional[float]:
+        """Most recent cached forecast for a horizon, however old"""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                'SELECT amount FROM ce_forecasts WHERE scope = ? AND days = ? ORDER BY as_of DESC LIMIT 1',
+                (scope, days)
+            ).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+    
+    def put_forecast(self, scope: str, as_of: date, days: int, amount: float):
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM ce_forecasts WHERE scope = ? AND days = ? AND as_of < ?',
+                         (scope, days, as_of.isoformat()))
+            conn.execute('INSERT OR REPLACE INTO ce_forecasts VALUES (?, ?, ?, ?)', (scope, as_of.isoformat(), days, amount))
+            conn.commit()
+        finally:
+            conn.close()
+
 
 class CostExplorerService:
-    """Cost Explorer operations"""
+    """
+    Cost Explorer operations
+    
+    get_monthly_cost, get_cost_by_service and get_cost_trend are all derived
+    from one cached daily-by-service dataset: each call fetches only the days
+    the cache lacks, in a single GroupBy SERVICE request spanning them. Call
+    prefetch() with a page's widest window first and every later call is
+    answered from the cache.
+    
+    Every paid request is taken from the CostExplorerGovernor daily budget.
+    When it is spent, calls answer from whatever is cached (expired or
+    partial, including the complete days of an interrupted paginated fetch)
+    and set `stale`; with nothing cached for the range they fail instead.
+    """
     
-    def __init__(self, session: boto3.Session):
-        """Initialize Cost Explorer service"""
+    def __init__(self, session: boto3.Session, account_id: Optional[str] = None,
+                 cache: Optional[CostExplorerCache] = None, stats: Optional[CostQueryStats] = None,
+                 governor: Optional[CostExplorerGovernor] = None, priority: str = PRIORITY_INTERACTIVE):
+        """
+        Initialize Cost Explorer service
+        
+        Args:
+            session: boto3 session of the account to query
+            account_id: Cache scope (default: looked up with STS when first needed)
+            cache: Cost Explorer cache (default: get_cost_explorer_cache(); pass it in from worker threads)
+            stats: Page-load request counters (default: a private instance)
+            governor: Daily request budget (default: get_cost_explorer_governor(); pass it in from worker threads)
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+        """
         self.session = session
         # Cost Explorer is always in us-east-1
         self.client = session.client('ce', region_name='us-east-1')
+        self.account_id = account_id
+        self.cache = cache
+        self.stats = stats or CostQueryStats()
+        self.governor = governor
+        self.priority = priority
+        # Set once any answer came from the cache because the budget was spent
+        self.stale = False
+    
+    def _scope(self) -> str:
+        if not self.account_id:
+            # GetCallerIdentity is free, unlike every Cost Explorer call
+            self.account_id = self.session.client('sts').get_caller_identity()['Account']
+        return self.account_id
+    
+    def _cache(self) -> CostExplorerCache:
+        if self.cache is None:
+            self.cache = get_cost_explorer_cache()
+        return self.cache
+    
+    def _call(self, operation: str, **kwargs) -> Dict:
+        """Make one paid Cost Explorer request if the daily budget allows it"""
+        if self.governor is None:
+            self.governor = get_cost_explorer_governor()
+        self.governor.acquire(self.priority, operation)
+        return getattr(self.client, operation)(**kwargs)
+    
+    def _daily_by_service(self, start: date, end: date, baseline: int = 1) -> List[Tuple[str, str, float]]:
+        """
+        Daily cost by service in [start, end), fetching only the days the cache lacks
+        
+        Args:
+            start / end: Day range (end exclusive)
+            baseline: Requests the uncached call would have made (for stats)
+        """
+        cache, scope = self._cache(), self._scope()
+        made = 0
+        with cache.scope_lock(scope):
+            missing = cache.missing_days(scope, start, end)
+            if missing:
+                fetch_start, fetch_end = missing[0], missing[-1] + timedelta(days=1)
+                try:
+                    # Scoped to the account, so a payer session does not cache its whole organization
+                    groups, made = self.get_daily_cost_groups(
+                        fetch_start, fetch_end, [{'Type': 'DIMENSION', 'Key': 'SERVICE'}], account_id=scope, record=False
+                    )
+                except CostBudgetExhausted as e:
+                    # Keep the days the pages already paid for fully covered
+                    made = e.requests
+                    if e.complete_before and e.complete_before > fetch_start:
+                        settled_before = utc_today() - timedelta(days=AppConfig.COST_UNSETTLED_DAYS)
+                        cache.store(scope, fetch_start, e.complete_before, [
+                            (day, keys[0], amount) for day, keys, amount in e.rows
+                            if day < e.complete_before.isoformat()
+                        ], settled_before)
+                    self.stats.record_denied()
+                    self.stats.record(made, 0)
+                    if not cache.has_days(scope, start, end):
+                        # Nothing to fall back to: unavailable, not $0
+                        raise
+                    # Serve whatever is cached (expired or partial); a refusal is not a cache saving
+                    self.stale = True
+                    return cache.read(scope, start, end)
+                else:
+                    settled_before = utc_today() - timedelta(days=AppConfig.COST_UNSETTLED_DAYS)
+                    cache.store(scope, fetch_start, fetch_end,
+                                [(day, keys[0], amount) for day, keys, amount in groups], settled_before)
+        self.stats.record(made, baseline)
+        return cache.read(scope, start, end)
+    
+    def prefetch(self, days: int) -> Dict:
+        """Load the last `days` days into the cache in (at most) one request"""
+        try:
+            end_date = utc_today()
+            self._daily_by_service(end_date - timedelta(days=days), end_date, baseline=0)
+            return {'success': True, 'stale': self.stale}
+        
+        except ClientError as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
     
     def get_monthly_cost(_self, months: int = 1) -> Dict:
         """Get monthly cost"""
         try:
-            end_date = datetime.now().date()
+            end_date = utc_today()
             start_date = end_date - timedelta(days=30 * months)
             
-            response = _self.client.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_date.isoformat(),
-                    'End': end_date.isoformat()
-                },
-                Granularity='MONTHLY',
-                Metrics=['UnblendedCost']
-            )
-            
-            total_cost = 0
-            for result in response['ResultsByTime']:
-                amount = float(result['Total']['UnblendedCost']['Amount'])
-                total_cost += amount
+            rows = _self._daily_by_service(start_date, end_date)
+            total_cost = sum(amount for _, _, amount in rows)
             
             return {
                 'success': True,
+                'stale': _self.stale,
                 'total_cost': total_cost,
                 'currency': 'USD',
                 'period': f"Last {months} month(s)"
@@ -54,33 +512,19 @@ class CostExplorerService:
     def get_cost_by_service(_self, days: int = 30) -> Dict:
         """Get cost breakdown by service"""
         try:
-            end_date = datetime.now().date()
+            end_date = utc_today()
             start_date = end_date - timedelta(days=days)
             
-            response = _self.client.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_date.isoformat(),
-                    'End': end_date.isoformat()
-                },
-                Granularity='MONTHLY',
-                Metrics=['UnblendedCost'],
-                GroupBy=[
-                    {'Type': 'DIMENSION', 'Key': 'SERVICE'}
-                ]
-            )
-            
             costs_by_service = {}
-            for result in response['ResultsByTime']:
-                for group in result['Groups']:
-                    service = group['Keys'][0]
-                    amount = float(group['Metrics']['UnblendedCost']['Amount'])
-                    costs_by_service[service] = costs_by_service.get(service, 0) + amount
+            for _, service, amount in _self._daily_by_service(start_date, end_date):
+                costs_by_service[service] = costs_by_service.get(service, 0) + amount
             
             # Sort by cost descending
             sorted_costs = dict(sorted(costs_by_service.items(), key=lambda x: x[1], reverse=True))
             
             return {
                 'success': True,
+                'stale': _self.stale,
                 'costs': sorted_costs,
                 'total': sum(sorted_costs.values())
             }
@@ -95,27 +539,18 @@ class CostExplorerService:
     def get_cost_trend(_self, days: int = 30) -> Dict:
         """Get daily cost trend"""
         try:
-            end_date = datetime.now().date()
+            end_date = utc_today()
             start_date = end_date - timedelta(days=days)
             
-            response = _self.client.get_cost_and_usage(
-                TimePeriod={
-                    'Start': start_date.isoformat(),
-                    'End': end_date.isoformat()
-                },
-                Granularity='DAILY',
-                Metrics=['UnblendedCost']
-            )
+            by_day = {(start_date + timedelta(days=offset)).isoformat(): 0.0 for offset in range(days)}
+            for day, _, amount in _self._daily_by_service(start_date, end_date):
+                by_day[day] += amount
             
-            daily_costs = []
-            for result in response['ResultsByTime']:
-                daily_costs.append({
-                    'date': result['TimePeriod']['Start'],
-                    'cost': float(result['Total']['UnblendedCost']['Amount'])
-                })
+            daily_costs = [{'date': day, 'cost': cost} for day, cost in by_day.items()]
             
             return {
                 'success': True,
+                'stale': _self.stale,
                 'daily_costs': daily_costs
             }
             
@@ -127,24 +562,41 @@ class CostExplorerService:
             }
     
     def get_cost_forecast(_self, days: int = 30) -> Dict:
-        """Get cost forecast"""
+        """Get cost forecast (cached for the rest of the UTC day)"""
         try:
-            start_date = datetime.now().date()
+            start_date = as_of = utc_today()
             end_date = start_date + timedelta(days=days)
             
-            response = _self.client.get_cost_forecast(
-                TimePeriod={
-                    'Start': start_date.isoformat(),
-                    'End': end_date.isoformat()
-                },
-                Metric='UNBLENDED_COST',
-                Granularity='MONTHLY'
-            )
-            
-            forecast = float(response['Total']['Amount'])
+            cache, scope = _self._cache(), _self._scope()
+            forecast = cache.get_forecast(scope, as_of, days)
+            if forecast is None:
+                try:
+                    response = _self._call(
+                        'get_cost_forecast',
+                        TimePeriod={
+                            'Start': start_date.isoformat(),
+                            'End': end_date.isoformat()
+                        },
+                        Metric='UNBLENDED_COST',
+                        Granularity='MONTHLY',
+                        Filter={'Dimensions': {'Key': 'LINKED_ACCOUNT', 'Values': [scope]}}
+                    )
+                except CostBudgetExhausted:
+                    forecast = cache.latest_forecast(scope, days)
+                    if forecast is None:
+                        raise
+                    _self.stale = True
+                    _self.stats.record_denied()
+                else:
+                    forecast = float(response['Total']['Amount'])
+                    cache.put_forecast(scope, as_of, days, forecast)
+                    _self.stats.record(1)
+            else:
+                _self.stats.record(0)
             
             return {
                 'success': True,
+                'stale': _self.stale,
                 'forecast': forecast,
                 'currency': 'USD'
             }
@@ -155,3 +607,71 @@ class CostExplorerService:
                 'error': str(e),
                 'forecast': 0
             }
+
+    def get_daily_cost_groups(self, start_date, end_date, group_by: List[Dict],
+                              account_id: Optional[str] = None,
+                              record: bool = True) -> Tuple[List[Tuple[str, List[str], float]], int]:
+        """
+        Daily unblended cost grouped by up to two dimensions/tags, all pages
+        
+        Args:
+            start_date: First day (inclusive)
+            end_date: Last day (exclusive)
+            group_by: Cost Explorer GroupBy definitions
+            account_id: Restrict to one linked account (a payer account otherwise returns every member)
+            record: Count the requests in stats
+        
+        Returns:
+            ([(day, group keys, amount)], paid requests made); zero-cost groups are dropped
+        
+        Raises:
+            ClientError: Cost Explorer errors (including CostBudgetExhausted) are left to the caller.
+                A CostBudgetExhausted raised after the first page carries what was fetched: rows,
+                requests, and complete_before (the days before it were fully returned) or None
+        """
+        kwargs = {
+            'TimePeriod': {'Start': start_date.isoformat(), 'End': end_date.isoformat()},
+            'Granularity': 'DAILY',
+            'Metrics': ['UnblendedCost'],
+            'GroupBy': group_by
+        }
+        if account_id:
+            kwargs['Filter'] = {'Dimensions': {'Key': 'LINKED_ACCOUNT', 'Values': [account_id]}}
+        
+        rows = []
+        requests = 0
+        last_day = None
+        while True:
+            try:
+                response = self._call('get_cost_and_usage', **kwargs)
+            except CostBudgetExhausted as e:
+                # A day can continue on the next page, so only the days before the last one seen are complete
+                e.rows, e.requests = rows, requests
+                e.complete_before = date.fromisoformat(last_day) if last_day else None
+                raise
+            requests += 1
+            for result in response['ResultsByTime']:
+                day = last_day = result['TimePeriod']['Start']
+                for group in result.get('Groups', []):
+                    amount = float(group['Metrics']['UnblendedCost']['Amount'])
+                    if amount:
+                        rows.append((day, group['Keys'], amount))
+            
+            token = response.get('NextPageToken')
+            if not token:
+                if record:
+                    self.stats.record(requests, baseline=requests)
+                return rows, requests
+            kwargs['NextPageToken'] = token
+
+
+@st.cache_resource
+def get_cost_explorer_cache() -> CostExplorerCache:
+    """Get cached Cost Explorer cache instance"""
+    return CostExplorerCache()
+
+
+@st.cache_resource
+def get_cost_explorer_governor() -> CostExplorerGovernor:
+    """Get the shared Cost Explorer request governor"""
+    return CostExplorerGovernor()
@@ -3,10 +3,46 @@ AWS EC2 Service Integration
 """
 
 import streamlit as st
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from datetime import datetime
+import time
 import boto3
-from botocore.exceptions import ClientError
+from botocore.exceptions import ClientError, WaiterError
+
+from config_settings import AppConfig
+from aws_additional_services import run_concurrently
+
+# Instance IDs per API call
+DESCRIBE_BATCH_SIZE = 1000  # DescribeInstances InstanceIds
+ACTION_BATCH_SIZE = 100     # Start/Stop/RebootInstances
+TAG_BATCH_SIZE = 500        # CreateTags Resources
+
+# Errors caused by individual IDs in a batch; the batch is split until the offending IDs are isolated
+ITEM_ERROR_CODES = {
+    'InvalidInstanceID.NotFound',
+    'InvalidInstanceID.Malformed',
+    'IncorrectInstanceState',
+    'IncorrectState',
+    'UnsupportedOperation',
+    'UnsupportedInstanceAttribute',
+    'OperationNotPermitted',
+    'UnsupportedHibernationConfiguration'
+}
+
+# Waiter, target state and the states that make its waiter fail, per action
+ACTION_WAITERS = {
+    'start': ('instance_running', 'running', ('shutting-down', 'terminated', 'stopping')),
+    'stop': ('instance_stopped', 'stopped', ('pending', 'terminated'))
+}
+
+
+def _chunks(items: List[str], size: int) -> List[List[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _error_text(e: ClientError) -> str:
+    return f"{e.response['Error']['Code']}: {e.response['Error'].get('Message', '')}"
+
 
 class EC2Service:
     """EC2 operations across accounts and regions"""
@@ -48,7 +84,12 @@ class EC2Service:
                             'tags': {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])},
                             'platform': instance.get('Platform', 'Linux'),
                             'monitoring': instance['Monitoring']['State'],
-                            'key_name': instance.get('KeyName', 'N/A')
+                            'key_name': instance.get('KeyName', 'N/A'),
+                            'security_groups': [sg['GroupId'] for sg in instance.get('SecurityGroups', [])],
+                            'volume_ids': [
+                                bdm['Ebs']['VolumeId'] for bdm in instance.get('BlockDeviceMappings', []) if 'Ebs' in bdm
+                            ],
+                            'iam_profile': instance.get('IamInstanceProfile', {}).get('Arn')
                         })
             
             return {
@@ -66,71 +107,380 @@ class EC2Service:
                 'instances': []
             }
     
+    @staticmethod
+    def _instance_details(instance: Dict) -> Dict:
+        return {
+            'instance_id': instance['InstanceId'],
+            'instance_type': instance['InstanceType'],
+            'state': instance['State']['Name'],
+            'launch_time': instance['LaunchTime'],
+            'availability_zone': instance['Placement']['AvailabilityZone'],
+            'private_ip': instance.get('PrivateIpAddress'),
+            'public_ip': instance.get('PublicIpAddress'),
+            'vpc_id': instance.get('VpcId'),
+            'subnet_id': instance.get('SubnetId'),
+            'security_groups': [sg['GroupId'] for sg in instance.get('SecurityGroups', [])],
+            'iam_profile': instance.get('IamInstanceProfile', {}).get('Arn'),
+            'tags': {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])},
+            'monitoring': instance['Monitoring']['State'],
+            'platform': instance.get('Platform', 'Linux'),
+            'root_device_type': instance.get('RootDeviceType'),
+            'virtualization_type': instance.get('VirtualizationType')
+        }
+    
+    def _isolate(self, call: Callable[[List[str]], Dict[str, Dict]], batch: List[str]) -> Dict[str, Dict]:
+        """
+        Run one batch call, splitting the batch whenever AWS rejects it because of some of its IDs
+        
+        EC2 validates a whole request before acting on any instance, so
+        re-issuing the halves of a rejected batch never repeats an action.
+        Other errors (throttling, permissions) fail every ID of the batch.
+        """
+        try:
+            return call(batch)
+        except ClientError as e:
+            if e.response['Error']['Code'] in ITEM_ERROR_CODES and len(batch) > 1:
+                middle = len(batch) // 2
+                return {**self._isolate(call, batch[:middle]), **self._isolate(call, batch[middle:])}
+            return {instance_id: {'error': _error_text(e)} for instance_id in batch}
+    
+    def _run_batches(self, call: Callable[[List[str]], Dict[str, Dict]], instance_ids: List[str],
+                     batch_size: int, max_workers: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        Run a batch call over instance IDs in concurrent chunks
+        
+        Args:
+            call: Takes a list of IDs, returns {instance_id: outcome} (raises ClientError on rejection)
+            instance_ids: IDs to process (duplicates ignored)
+            batch_size: IDs per API call
+            max_workers: Concurrent calls (default AppConfig.EC2_BULK_WORKERS)
+        
+        Returns:
+            {instance_id: outcome}; failed IDs carry an 'error' entry
+        """
+        batches = _chunks(list(dict.fromkeys(instance_ids)), batch_size)
+        results, failures = run_concurrently(
+            lambda batch: self._isolate(call, batch), batches, max_workers or AppConfig.EC2_BULK_WORKERS
+        )
+        
+        outcomes = {}
+        for result in results:
+            outcomes.update(result)
+        for failure in failures:
+            outcomes.update({instance_id: {'error': failure['error']} for instance_id in failure['item']})
+        return outcomes
+    
+    def _report(self, instance_ids: List[str], outcomes: Dict[str, Dict], started: float) -> Dict:
+        """Per-instance result rows and totals of a bulk call"""
+        results = []
+        for instance_id in dict.fromkeys(instance_ids):
+            outcome = outcomes.get(instance_id, {'error': 'No response'})
+            results.append({
+                'instance_id': instance_id,
+                'success': not outcome.get('error'),
+                'previous_state': outcome.get('previous_state'),
+                'current_state': outcome.get('current_state'),
+                'error': outcome.get('error')
+            })
+        
+        succeeded = sum(1 for r in results if r['success'])
+        return {
+            'success': succeeded == len(results),
+            'requested': len(results),
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'results': results,
+            'region': self.region,
+            'elapsed_seconds': time.monotonic() - started
+        }
+    
+    def _describe_batch(self, batch: List[str]) -> Dict[str, Dict]:
+        found = {}
+        for page in self.client.get_paginator('describe_instances').paginate(InstanceIds=batch):
+            for reservation in page['Reservations']:
+                for instance in reservation['Instances']:
+                    details = self._instance_details(instance)
+                    found[details['instance_id']] = {'details': details, 'current_state': details['state']}
+        return {
+            instance_id: found.get(instance_id, {'error': 'InvalidInstanceID.NotFound'})
+            for instance_id in batch
+        }
+    
+    def get_instances_details(self, instance_ids: List[str], max_workers: Optional[int] = None) -> Dict:
+        """
+        Get detailed information about many instances
+        
+        Args:
+            instance_ids: Instance IDs (any number; described DESCRIBE_BATCH_SIZE per call)
+            max_workers: Concurrent calls (default AppConfig.EC2_BULK_WORKERS)
+        
+        Returns:
+            Dict with instances ({instance_id: details}) and failures ([{'instance_id', 'error'}])
+        """
+        outcomes = self._run_batches(self._describe_batch, instance_ids, DESCRIBE_BATCH_SIZE, max_workers)
+        return {
+            'success': all('details' in o for o in outcomes.values()),
+            'instances': {i: o['details'] for i, o in outcomes.items() if 'details' in o},
+            'failures': [{'instance_id': i, 'error': o['error']} for i, o in outcomes.items() if 'details' not in o],
+            'region': self.region
+        }
+    
     def get_instance_details(self, instance_id: str) -> Optional[Dict]:
         """Get detailed information about an instance"""
-        try:
-            response = self.client.describe_instances(InstanceIds=[instance_id])
-            
-            if response['Reservations']:
-                instance = response['Reservations'][0]['Instances'][0]
-                return {
-                    'instance_id': instance['InstanceId'],
-                    'instance_type': instance['InstanceType'],
-                    'state': instance['State']['Name'],
-                    'launch_time': instance['LaunchTime'],
-                    'availability_zone': instance['Placement']['AvailabilityZone'],
-                    'private_ip': instance.get('PrivateIpAddress'),
-                    'public_ip': instance.get('PublicIpAddress'),
-                    'vpc_id': instance.get('VpcId'),
-                    'subnet_id': instance.get('SubnetId'),
-                    'security_groups': [sg['GroupId'] for sg in instance.get('SecurityGroups', [])],
-                    'iam_profile': instance.get('IamInstanceProfile', {}).get('Arn'),
-                    'tags': {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])},
-                    'monitoring': instance['Monitoring']['State'],
-                    'platform': instance.get('Platform', 'Linux'),
-                    'root_device_type': instance.get('RootDeviceType'),
-                    'virtualization_type': instance.get('VirtualizationType')
-                }
-            return None
-            
-        except ClientError:
-            return None
+        return self.get_instances_details([instance_id])['instances'].get(instance_id)
+    
+    @staticmethod
+    def _state_changes(changes: List[Dict]) -> Dict[str, Dict]:
+        return {
+            change['InstanceId']: {
+                'previous_state': change['PreviousState']['Name'],
+                'current_state': change['CurrentState']['Name']
+            }
+            for change in changes
+        }
+    
+    def _wait_for_state(self, outcomes: Dict[str, Dict], action: str, timeout: Optional[float],
+                        max_workers: Optional[int]):
+        """
+        Wait until the instances an action succeeded on reach its target state
+        
+        One shared waiter polls each DESCRIBE_BATCH_SIZE chunk (one
+        DescribeInstances per poll for the whole chunk). An instance entering
+        a failure state stops the waiter, so the rest of the chunk is waited
+        on again for the remaining time. Final states are written into
+        outcomes and IDs that never converge are marked failed.
+        """
+        waiter_name, target_state, failure_states = ACTION_WAITERS[action]
+        pending = [i for i, o in outcomes.items() if not o.get('error') and o.get('current_state') != target_state]
+        if not pending:
+            return
+        
+        timeout = timeout or AppConfig.EC2_WAIT_TIMEOUT
+        delay = AppConfig.EC2_WAITER_DELAY
+        
+        def wait(batch):
+            deadline = time.monotonic() + timeout
+            final = {}
+            waiting = batch
+            while waiting:
+                attempts = int((deadline - time.monotonic()) // delay)
+                if attempts >= 1:
+                    try:
+                        self.client.get_waiter(waiter_name).wait(
+                            InstanceIds=waiting,
+                            WaiterConfig={'Delay': delay, 'MaxAttempts': attempts}
+                        )
+                    except WaiterError:
+                        pass  # Timeout or an instance in a failure state; states are read below
+                described = self._describe_batch(waiting)
+                final.update(described)
+                if attempts < 1:
+                    break
+                waiting = [
+                    i for i in waiting
+                    if 'error' not in described[i] and described[i]['current_state'] not in (target_state,) + failure_states
+                ]
+            return final
+        
+        results, failures = run_concurrently(wait, _chunks(pending, DESCRIBE_BATCH_SIZE), max_workers or AppConfig.EC2_BULK_WORKERS)
+        final = {}
+        for result in results:
+            final.update(result)
+        for failure in failures:
+            final.update({instance_id: {'error': failure['error']} for instance_id in failure['item']})
+        
+        for instance_id in pending:
+            state = final.get(instance_id, {}).get('current_state')
+            outcomes[instance_id]['current_state'] = state
+            if state in failure_states:
+                outcomes[instance_id]['error'] = f"Entered '{state}' while waiting for '{target_state}'"
+            elif state != target_state:
+                outcomes[instance_id]['error'] = (
+                    final.get(instance_id, {}).get('error')
+                    or f"Still '{state}' after waiting {timeout:.0f}s for '{target_state}'"
+                )
+    
+    def start_instances(self, instance_ids: List[str], wait: bool = False, wait_timeout: Optional[float] = None,
+                        max_workers: Optional[int] = None) -> Dict:
+        """
+        Start many instances
+        
+        Args:
+            instance_ids: Instance IDs (any number; ACTION_BATCH_SIZE per call)
+            wait: Wait until the started instances are running
+            wait_timeout: Seconds to wait (default AppConfig.EC2_WAIT_TIMEOUT)
+            max_workers: Concurrent calls (default AppConfig.EC2_BULK_WORKERS)
+        
+        Returns:
+            Dict with success, requested/succeeded/failed counts and per-instance results
+            (instance_id, success, previous_state, current_state, error)
+        """
+        started = time.monotonic()
+        outcomes = self._run_batches(
+            lambda batch: self._state_changes(self.client.start_instances(InstanceIds=batch)['StartingInstances']),
+            instance_ids, ACTION_BATCH_SIZE, max_workers
+        )
+        if wait:
+            self._wait_for_state(outcomes, 'start', wait_timeout, max_workers)
+        return self._report(instance_ids, outcomes, started)
+    
+    def stop_instances(self, instance_ids: List[str], force: bool = False, hibernate: bool = False,
+                       wait: bool = False, wait_timeout: Optional[float] = None,
+                       max_workers: Optional[int] = None) -> Dict:
+        """
+        Stop many instances
+        
+        Args:
+            instance_ids: Instance IDs (any number; ACTION_BATCH_SIZE per call)
+            force: Force stop (no OS shutdown)
+            hibernate: Hibernate instances enabled for hibernation
+            wait: Wait until the stopped instances are stopped
+            wait_timeout: Seconds to wait (default AppConfig.EC2_WAIT_TIMEOUT)
+            max_workers: Concurrent calls (default AppConfig.EC2_BULK_WORKERS)
+        
+        Returns:
+            Same shape as start_instances
+        """
+        started = time.monotonic()
+        params = {'Force': True} if force else {}
+        if hibernate:
+            params['Hibernate'] = True
+        
+        outcomes = self._run_batches(
+            lambda batch: self._state_changes(self.client.stop_instances(InstanceIds=batch, **params)['StoppingInstances']),
+            instance_ids, ACTION_BATCH_SIZE, max_workers
+        )
+        if wait:
+            self._wait_for_state(outcomes, 'stop', wait_timeout, max_workers)
+        return self._report(instance_ids, outcomes, started)
+    
+    def reboot_instances(self, instance_ids: List[str], max_workers: Optional[int] = None) -> Dict:
+        """
+        Reboot many instances
+        
+        Returns:
+            Same shape as start_instances (states are not reported by RebootInstances)
+        """
+        started = time.monotonic()
+        
+        def reboot(batch):
+            self.client.reboot_instances(InstanceIds=batch)
+            return {instance_id: {} for instance_id in batch}
+        
+        outcomes = self._run_batches(reboot, instance_ids, ACTION_BATCH_SIZE, max_workers)
+        return self._report(instance_ids, outcomes, started)
+    
+    def tag_instances(self, instance_ids: List[str], tags: Dict[str, str], max_workers: Optional[int] = None) -> Dict:
+        """
+        Add tags to many instances
+        
+        Returns:
+            Same shape as start_instances
+        """
+        started = time.monotonic()
+        tag_list = [{'Key': k, 'Value': v} for k, v in tags.items()]
+        
+        def create_tags(batch):
+            self.client.create_tags(Resources=batch, Tags=tag_list)
+            return {instance_id: {} for instance_id in batch}
+        
+        outcomes = self._run_batches(create_tags, instance_ids, TAG_BATCH_SIZE, max_workers)
+        return self._report(instance_ids, outcomes, started)
     
     def start_instance(self, instance_id: str) -> bool:
         """Start an EC2 instance"""
-        try:
-            self.client.start_instances(InstanceIds=[instance_id])
-            return True
-        except ClientError:
-            return False
+        return self.start_instances([instance_id])['success']
     
     def stop_instance(self, instance_id: str) -> bool:
         """Stop an EC2 instance"""
-        try:
-            self.client.stop_instances(InstanceIds=[instance_id])
-            return True
-        except ClientError:
-            return False
+        return self.stop_instances([instance_id])['success']
     
     def reboot_instance(self, instance_id: str) -> bool:
         """Reboot an EC2 instance"""
-        try:
-            self.client.reboot_instances(InstanceIds=[instance_id])
-            return True
-        except ClientError:
-            return False
+        return self.reboot_instances([instance_id])['success']
     
     def add_tags(self, instance_id: str, tags: Dict[str, str]) -> bool:
         """Add tags to an instance"""
+        return self.tag_instances([instance_id], tags)['success']
+    
+    def list_volumes(_self) -> Dict:
+        """
+        List all EBS volumes
+        
+        Returns:
+            Dict with volumes list and metadata
+        """
         try:
-            tag_list = [{'Key': k, 'Value': v} for k, v in tags.items()]
-            self.client.create_tags(
-                Resources=[instance_id],
-                Tags=tag_list
-            )
-            return True
-        except ClientError:
-            return False
+            volumes = []
+            paginator = _self.client.get_paginator('describe_volumes')
+            
+            for page in paginator.paginate():
+                for volume in page['Volumes']:
+                    attachments = volume.get('Attachments', [])
+                    volumes.append({
+                        'volume_id': volume['VolumeId'],
+                        'volume_type': volume['VolumeType'],
+                        'size_gb': volume['Size'],
+                        'iops': volume.get('Iops', 0),
+                        'state': volume['State'],
+                        'encrypted': volume.get('Encrypted', False),
+                        'availability_zone': volume['AvailabilityZone'],
+                        'create_time': volume.get('CreateTime'),
+                        'attached_to': attachments[0]['InstanceId'] if attachments else None,
+                        'tags': {tag['Key']: tag['Value'] for tag in volume.get('Tags', [])}
+                    })
+            
+            return {
+                'success': True,
+                'count': len(volumes),
+                'volumes': volumes,
+                'region': _self.region
+            }
+        
+        except ClientError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'count': 0,
+                'volumes': []
+            }
+    
+    def list_addresses(_self) -> Dict:
+        """
+        List all Elastic IP addresses
+        
+        Returns:
+            Dict with addresses list and metadata
+        """
+        try:
+            response = _self.client.describe_addresses()
+            
+            addresses = []
+            for address in response.get('Addresses', []):
+                addresses.append({
+                    'public_ip': address['PublicIp'],
+                    'allocation_id': address.get('AllocationId'),
+                    'association_id': address.get('AssociationId'),
+                    'instance_id': address.get('InstanceId'),
+                    'network_interface_id': address.get('NetworkInterfaceId'),
+                    'domain': address.get('Domain', 'vpc'),
+                    'tags': {tag['Key']: tag['Value'] for tag in address.get('Tags', [])}
+                })
+            
+            return {
+                'success': True,
+                'count': len(addresses),
+                'addresses': addresses,
+                'region': _self.region
+            }
+        
+        except ClientError as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'count': 0,
+                'addresses': []
+            }
     
     def get_instance_types(_self) -> List[str]:
         """Get list of available instance types"""
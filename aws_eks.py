@@ -8,59 +8,335 @@ from typing import List, Dict, Optional, Tuple
 import boto3
 from botocore.exceptions import ClientError
 from datetime import datetime
+import threading
+import time
 import json
 
+from config_settings import AppConfig
+from aws_additional_services import run_concurrently
+
+# EKS control plane: $0.10/hour
+CONTROL_PLANE_MONTHLY_COST = 73.0
+HOURS_PER_MONTH = 730
+
+# Simplified on-demand pricing for node cost estimates (USD/hour)
+INSTANCE_HOURLY_PRICING = {
+    't3.small': 0.0208,
+    't3.medium': 0.0416,
+    't3.large': 0.0832,
+    't3.xlarge': 0.1664,
+    'm5.large': 0.096,
+    'm5.xlarge': 0.192,
+    'm5.2xlarge': 0.384,
+    'c5.large': 0.085,
+    'c5.xlarge': 0.17,
+    'r5.large': 0.126,
+    'r5.xlarge': 0.252
+}
+DEFAULT_INSTANCE_HOURLY = 0.10
+
+# Statuses that make a cluster, nodegroup or addon count as unhealthy
+FAILED_STATUSES = ('FAILED', 'CREATE_FAILED', 'DELETE_FAILED', 'DEGRADED')
+
+# Cluster children reused from EKSClusterCache; nodegroups scale and upgrade without
+# changing the cluster, so they are described on every refresh
+CACHED_CHILD_KINDS = ('addons', 'fargate_profiles')
+
+
+def _cluster_revision(cluster: Dict) -> str:
+    """
+    Change marker of a DescribeCluster response
+    
+    Uses updatedAt when the API returns it; otherwise the fields every
+    cluster update moves (status, Kubernetes and platform version).
+    """
+    updated = cluster.get('updatedAt')
+    if updated:
+        return str(updated)
+    return f"{cluster.get('status')}|{cluster.get('version')}|{cluster.get('platformVersion')}"
+
+
+def _health_issues(item: Dict) -> List[str]:
+    """Messages of the health.issues list EKS returns on clusters, nodegroups and addons"""
+    return [
+        f"{issue.get('code', 'Issue')}: {issue.get('message', '')}".strip()
+        for issue in (item.get('health') or {}).get('issues', [])
+    ]
+
+
+def _version_tuple(version: str) -> Tuple[int, ...]:
+    try:
+        return tuple(int(part) for part in str(version).split('.'))
+    except ValueError:
+        return ()
+
+
+def assess_cluster_health(cluster: Dict, supported_versions: Optional[List[str]] = None) -> Dict:
+    """
+    Health of a cluster record returned by EKSService.list_clusters
+    
+    Args:
+        cluster: Cluster record (with nodegroups and addons when details were loaded)
+        supported_versions: Kubernetes versions in standard support (default AppConfig.EKS_STANDARD_SUPPORT_VERSIONS)
+    
+    Returns:
+        Dict with status label, score (0-100), critical/warning counts and issue messages
+    """
+    critical, warnings = [], []
+    
+    if cluster['status'] in FAILED_STATUSES:
+        critical.append(f"Cluster {cluster['status']}")
+    elif cluster['status'] != 'ACTIVE':
+        warnings.append(f"Cluster {cluster['status']}")
+    critical.extend(cluster.get('health_issues', []))
+    
+    for ng in cluster.get('nodegroups', []):
+        if ng['status'] in FAILED_STATUSES:
+            critical.append(f"Nodegroup {ng['nodegroup_name']} {ng['status']}")
+        warnings.extend(f"Nodegroup {ng['nodegroup_name']}: {issue}" for issue in ng['health_issues'])
+    
+    for addon in cluster.get('addons', []):
+        if addon['status'] in FAILED_STATUSES:
+            warnings.append(f"Addon {addon['addon_name']} {addon['status']}")
+        warnings.extend(f"Addon {addon['addon_name']}: {issue}" for issue in addon['health_issues'])
+    
+    supported_versions = supported_versions or AppConfig.EKS_STANDARD_SUPPORT_VERSIONS
+    if _version_tuple(cluster['version']) < min(_version_tuple(v) for v in supported_versions):
+        warnings.append(f"Kubernetes {cluster['version']} is outside standard support")
+    if not cluster.get('details_complete', True):
+        warnings.append("Some nodegroup, addon or Fargate profile details unavailable")
+    
+    if critical:
+        status = '🔴 Critical'
+    elif warnings:
+        status = '⚠️ Warning'
+    else:
+        status = '✅ Healthy'
+    
+    return {
+        'status': status,
+        'score': max(0, 100 - 30 * len(critical) - 10 * len(warnings)),
+        'critical': len(critical),
+        'warnings': len(warnings),
+        'issues': critical + warnings
+    }
+
+
+class EKSClusterCache:
+    """
+    Process-wide TTL cache of cluster enrichment (addons, Fargate profiles)
+    
+    Entries are keyed by cluster ARN and reused only while the cluster's
+    revision (updatedAt) is unchanged and the TTL has not expired, so a
+    refresh skips the describe per addon and profile. Nodegroups are not
+    cached: scaling and AMI updates leave the cluster revision unchanged.
+    Safe to share across worker threads.
+    """
+    
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        """
+        Initialize cache
+        
+        Args:
+            ttl_seconds: Maximum age of an entry (default AppConfig.EKS_CLUSTER_CACHE_TTL)
+        """
+        self.ttl_seconds = ttl_seconds or AppConfig.EKS_CLUSTER_CACHE_TTL
+        self._entries: Dict[str, Tuple[str, float, Dict]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, arn: str, revision: str) -> Optional[Dict]:
+        """Cached enrichment of a cluster, or None if missing, stale or expired"""
+        with self._lock:
+            entry = self._entries.get(arn)
+            if not entry:
+                return None
+            cached_revision, expires_at, value = entry
+            if cached_revision != revision or time.monotonic() > expires_at:
+                del self._entries[arn]
+                return None
+            return value
+    
+    def put(self, arn: str, revision: str, value: Dict):
+        with self._lock:
+            self._entries[arn] = (revision, time.monotonic() + self.ttl_seconds, value)
+    
+    def invalidate(self, arn: Optional[str] = None):
+        """Drop one cluster's entry, or every entry"""
+        with self._lock:
+            if arn is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(arn, None)
+
+
+@st.cache_resource
+def get_eks_cluster_cache() -> EKSClusterCache:
+    """Get the shared EKS cluster cache (call from the script thread, pass to workers)"""
+    return EKSClusterCache()
+
+
 class EKSService:
     """EKS operations across accounts and regions"""
     
-    def __init__(self, session: boto3.Session, region: str = 'us-east-1'):
-        """Initialize EKS service"""
+    def __init__(self, session: boto3.Session, region: str = 'us-east-1',
+                 cluster_cache: Optional[EKSClusterCache] = None):
+        """
+        Initialize EKS service
+        
+        Args:
+            session: boto3 session
+            region: AWS region
+            cluster_cache: Shared enrichment cache (None = always describe)
+        """
         self.session = session
         self.region = region
+        self.cluster_cache = cluster_cache
         self.eks_client = session.client('eks', region_name=region)
         self.ec2_client = session.client('ec2', region_name=region)
         self.iam_client = session.client('iam')
     
-    def list_clusters(_self) -> Dict:
-        """List all EKS clusters"""
+    def _paginate(self, operation: str, result_key: str, **params) -> List[str]:
+        """All names returned by a paginated list_* call"""
+        names = []
+        for page in self.eks_client.get_paginator(operation).paginate(**params):
+            names.extend(page.get(result_key, []))
+        return names
+    
+    @staticmethod
+    def _nodegroup_record(ng: Dict) -> Dict:
+        scaling = ng.get('scalingConfig', {})
+        return {
+            'nodegroup_name': ng['nodegroupName'],
+            'nodegroup_arn': ng.get('nodegroupArn'),
+            'status': ng['status'],
+            'capacity_type': ng.get('capacityType', 'ON_DEMAND'),
+            'instance_types': ng.get('instanceTypes', []),
+            'desired_size': scaling.get('desiredSize', 0),
+            'min_size': scaling.get('minSize', 0),
+            'max_size': scaling.get('maxSize', 0),
+            'ami_type': ng.get('amiType', 'N/A'),
+            'disk_size': ng.get('diskSize', 0),
+            'version': ng.get('version'),
+            'created_at': ng.get('createdAt'),
+            'modified_at': ng.get('modifiedAt'),
+            'health_issues': _health_issues(ng)
+        }
+    
+    @staticmethod
+    def _addon_record(addon: Dict) -> Dict:
+        return {
+            'addon_name': addon['addonName'],
+            'addon_version': addon['addonVersion'],
+            'status': addon['status'],
+            'created_at': addon.get('createdAt'),
+            'modified_at': addon.get('modifiedAt'),
+            'health_issues': _health_issues(addon)
+        }
+    
+    @staticmethod
+    def _fargate_record(profile: Dict) -> Dict:
+        return {
+            'profile_name': profile['fargateProfileName'],
+            'status': profile.get('status'),
+            'namespaces': sorted({s.get('namespace') for s in profile.get('selectors', []) if s.get('namespace')}),
+            'subnets': profile.get('subnets', []),
+            'created_at': profile.get('createdAt')
+        }
+    
+    def _describe_children(self, cluster_kinds: Dict[str, Tuple[str, ...]],
+                           max_workers: int) -> Tuple[Dict[str, Dict], List[Dict]]:
+        """
+        Nodegroups, addons and/or Fargate profiles of several clusters
+        
+        Runs in two flat phases on one bounded pool each - every list call,
+        then every describe call - so no pool ever waits on another.
+        
+        Args:
+            cluster_kinds: Cluster name -> child kinds to describe ('nodegroups', 'addons', 'fargate_profiles')
+            max_workers: Concurrent calls
+        
+        Returns:
+            ({cluster: {kind: records}}, [{'item', 'error'}] failures)
+        """
+        kinds = {
+            'nodegroups': ('list_nodegroups', 'nodegroups', 'describe_nodegroup', 'nodegroupName', 'nodegroup', self._nodegroup_record),
+            'addons': ('list_addons', 'addons', 'describe_addon', 'addonName', 'addon', self._addon_record),
+            'fargate_profiles': ('list_fargate_profiles', 'fargateProfileNames', 'describe_fargate_profile',
+                                 'fargateProfileName', 'fargateProfile', self._fargate_record)
+        }
+        
+        def list_children(item):
+            cluster, kind = item
+            operation, result_key = kinds[kind][:2]
+            return cluster, kind, self._paginate(operation, result_key, clusterName=cluster)
+        
+        listed, failures = run_concurrently(
+            list_children, [(c, k) for c, wanted in cluster_kinds.items() for k in wanted], max_workers
+        )
+        
+        def describe_child(item):
+            cluster, kind, name = item
+            _, _, operation, name_param, response_key, to_record = kinds[kind]
+            response = getattr(self.eks_client, operation)(clusterName=cluster, **{name_param: name})
+            return cluster, kind, to_record(response[response_key])
+        
+        described, describe_failures = run_concurrently(
+            describe_child,
+            [(cluster, kind, name) for cluster, kind, names in listed for name in names],
+            max_workers
+        )
+        failures.extend(describe_failures)
+        
+        children = {c: {kind: [] for kind in wanted} for c, wanted in cluster_kinds.items()}
+        for cluster, kind, record in described:
+            children[cluster][kind].append(record)
+        sort_keys = {'nodegroups': 'nodegroup_name', 'addons': 'addon_name', 'fargate_profiles': 'profile_name'}
+        for records in children.values():
+            for kind, items in records.items():
+                items.sort(key=lambda r: r[sort_keys[kind]])
+        return children, failures
+    
+    def get_available_kubernetes_versions(self) -> List[str]:
+        """
+        Kubernetes versions in EKS standard support, oldest first
+        
+        Read from DescribeClusterVersions; falls back to
+        AppConfig.EKS_STANDARD_SUPPORT_VERSIONS when the call is denied or
+        the installed botocore predates it.
+        """
         try:
-            clusters = []
-            paginator = _self.eks_client.get_paginator('list_clusters')
-            
-            for page in paginator.paginate():
-                for cluster_name in page['clusters']:
-                    try:
-                        # Get cluster details
-                        cluster_info = _self.eks_client.describe_cluster(name=cluster_name)
-                        cluster = cluster_info['cluster']
-                        
-                        # Get node groups
-                        nodegroups = _self.list_nodegroups(cluster_name)
-                        
-                        clusters.append({
-                            'cluster_name': cluster['name'],
-                            'status': cluster['status'],
-                            'version': cluster['version'],
-                            'endpoint': cluster.get('endpoint', 'N/A'),
-                            'created_at': cluster.get('createdAt'),
-                            'role_arn': cluster['roleArn'],
-                            'vpc_id': cluster['resourcesVpcConfig']['vpcId'],
-                            'subnet_ids': cluster['resourcesVpcConfig']['subnetIds'],
-                            'security_group_ids': cluster['resourcesVpcConfig'].get('securityGroupIds', []),
-                            'nodegroup_count': len(nodegroups),
-                            'platform_version': cluster.get('platformVersion', 'N/A'),
-                            'tags': cluster.get('tags', {})
-                        })
-                    except ClientError:
-                        pass
-            
-            return {
-                'success': True,
-                'count': len(clusters),
-                'clusters': clusters,
-                'region': _self.region
-            }
-            
+            versions, params = [], {}
+            while True:
+                page = self.eks_client.describe_cluster_versions(**params)
+                versions.extend(
+                    v['clusterVersion'] for v in page.get('clusterVersions', [])
+                    if (v.get('versionStatus') or v.get('status')) == 'STANDARD_SUPPORT'
+                )
+                if not page.get('nextToken'):
+                    break
+                params['nextToken'] = page['nextToken']
+        except (ClientError, AttributeError):
+            versions = []
+        return sorted(set(versions), key=_version_tuple) or list(AppConfig.EKS_STANDARD_SUPPORT_VERSIONS)
+    
+    def list_clusters(_self, include_details: bool = True, max_workers: Optional[int] = None) -> Dict:
+        """
+        List all EKS clusters with their nodegroups, addons and Fargate profiles
+        
+        Cluster, nodegroup, addon and profile describes run concurrently;
+        addons and profiles of clusters whose revision is unchanged come from
+        the cluster cache.
+        
+        Args:
+            include_details: Describe nodegroups, addons and Fargate profiles
+            max_workers: Concurrent describes (default AppConfig.AWS_DESCRIBE_WORKERS)
+        
+        Returns:
+            Dict with success, count, clusters, region and per-call failures
+        """
+        max_workers = max_workers or AppConfig.AWS_DESCRIBE_WORKERS
+        try:
+            names = _self._paginate('list_clusters', 'clusters')
         except ClientError as e:
             return {
                 'success': False,
@@ -68,116 +344,149 @@ class EKSService:
                 'count': 0,
                 'clusters': []
             }
+        
+        described, failures = run_concurrently(
+            lambda name: _self.eks_client.describe_cluster(name=name)['cluster'], names, max_workers
+        )
+        
+        enrichment = {}
+        pending = {}
+        failed_clusters = set()
+        for cluster in described:
+            cached = _self.cluster_cache.get(cluster['arn'], _cluster_revision(cluster)) if _self.cluster_cache else None
+            if cached is not None:
+                enrichment[cluster['name']] = dict(cached)
+            if include_details:
+                pending[cluster['name']] = ('nodegroups',) + (CACHED_CHILD_KINDS if cached is None else ())
+        
+        if pending:
+            children, child_failures = _self._describe_children(pending, max_workers)
+            failures.extend(child_failures)
+            failed_clusters = {f['item'][0] for f in child_failures}
+            failed_cached = {f['item'][0] for f in child_failures if f['item'][1] in CACHED_CHILD_KINDS}
+            for cluster in described:
+                name = cluster['name']
+                if name not in children:
+                    continue
+                enrichment.setdefault(name, {}).update(children[name])
+                # Partially described clusters are not cached, so the next refresh retries them
+                if _self.cluster_cache and name not in failed_cached and 'addons' in children[name]:
+                    _self.cluster_cache.put(cluster['arn'], _cluster_revision(cluster),
+                                            {kind: children[name][kind] for kind in CACHED_CHILD_KINDS})
+        
+        clusters = []
+        for cluster in described:
+            vpc = cluster.get('resourcesVpcConfig', {})
+            children = enrichment.get(cluster['name'], {})
+            nodegroups = children.get('nodegroups', [])
+            clusters.append({
+                'cluster_name': cluster['name'],
+                'arn': cluster['arn'],
+                'status': cluster['status'],
+                'version': cluster['version'],
+                'endpoint': cluster.get('endpoint', 'N/A'),
+                'created_at': cluster.get('createdAt'),
+                'role_arn': cluster['roleArn'],
+                'vpc_id': vpc.get('vpcId'),
+                'subnet_ids': vpc.get('subnetIds', []),
+                'security_group_ids': vpc.get('securityGroupIds', []),
+                'endpoint_public_access': vpc.get('endpointPublicAccess', False),
+                'nodegroup_count': len(nodegroups),
+                'nodegroups': nodegroups,
+                'addons': children.get('addons', []),
+                'fargate_profiles': children.get('fargate_profiles', []),
+                'details_complete': 'nodegroups' in children and cluster['name'] not in failed_clusters,
+                'health_issues': _health_issues(cluster),
+                'platform_version': cluster.get('platformVersion', 'N/A'),
+                'tags': cluster.get('tags', {})
+            })
+        
+        return {
+            'success': True,
+            'count': len(clusters),
+            'clusters': clusters,
+            'region': _self.region,
+            'failures': [
+                {'item': '/'.join(map(str, f['item'])) if isinstance(f['item'], tuple) else f['item'], 'error': f['error']}
+                for f in failures
+            ]
+        }
     
     def list_nodegroups(self, cluster_name: str) -> List[Dict]:
         """List node groups for a cluster"""
         try:
-            nodegroups = []
-            response = self.eks_client.list_nodegroups(clusterName=cluster_name)
-            
-            for ng_name in response.get('nodegroups', []):
-                try:
-                    ng_info = self.eks_client.describe_nodegroup(
-                        clusterName=cluster_name,
-                        nodegroupName=ng_name
-                    )
-                    ng = ng_info['nodegroup']
-                    
-                    nodegroups.append({
-                        'nodegroup_name': ng['nodegroupName'],
-                        'status': ng['status'],
-                        'instance_types': ng.get('instanceTypes', []),
-                        'desired_size': ng['scalingConfig']['desiredSize'],
-                        'min_size': ng['scalingConfig']['minSize'],
-                        'max_size': ng['scalingConfig']['maxSize'],
-                        'ami_type': ng.get('amiType', 'N/A'),
-                        'disk_size': ng.get('diskSize', 0),
-                        'created_at': ng.get('createdAt')
-                    })
-                except ClientError:
-                    pass
-            
-            return nodegroups
-            
+            names = self._paginate('list_nodegroups', 'nodegroups', clusterName=cluster_name)
         except ClientError:
             return []
+        
+        nodegroups, _ = run_concurrently(
+            lambda name: self._nodegroup_record(
+                self.eks_client.describe_nodegroup(clusterName=cluster_name, nodegroupName=name)['nodegroup']
+            ),
+            names, AppConfig.AWS_DESCRIBE_WORKERS
+        )
+        return nodegroups
     
     def get_cluster_details(self, cluster_name: str) -> Optional[Dict]:
         """Get detailed information about a cluster"""
         try:
             response = self.eks_client.describe_cluster(name=cluster_name)
             cluster = response['cluster']
-            
-            # Get addons
-            addons = self.list_addons(cluster_name)
-            
-            # Get node groups
-            nodegroups = self.list_nodegroups(cluster_name)
-            
-            # Get Fargate profiles
-            fargate_profiles = self.list_fargate_profiles(cluster_name)
-            
-            return {
-                'cluster_name': cluster['name'],
-                'arn': cluster['arn'],
-                'status': cluster['status'],
-                'version': cluster['version'],
-                'endpoint': cluster.get('endpoint'),
-                'created_at': cluster.get('createdAt'),
-                'role_arn': cluster['roleArn'],
-                'vpc_config': {
-                    'vpc_id': cluster['resourcesVpcConfig']['vpcId'],
-                    'subnet_ids': cluster['resourcesVpcConfig']['subnetIds'],
-                    'security_group_ids': cluster['resourcesVpcConfig'].get('securityGroupIds', []),
-                    'endpoint_public_access': cluster['resourcesVpcConfig'].get('endpointPublicAccess', False),
-                    'endpoint_private_access': cluster['resourcesVpcConfig'].get('endpointPrivateAccess', False)
-                },
-                'logging': cluster.get('logging', {}),
-                'identity': cluster.get('identity', {}),
-                'platform_version': cluster.get('platformVersion'),
-                'tags': cluster.get('tags', {}),
-                'addons': addons,
-                'nodegroups': nodegroups,
-                'fargate_profiles': fargate_profiles,
-                'encryption_config': cluster.get('encryptionConfig', [])
-            }
-            
         except ClientError:
             return None
+        
+        cached = self.cluster_cache.get(cluster['arn'], _cluster_revision(cluster)) if self.cluster_cache else None
+        kinds = ('nodegroups',) + (CACHED_CHILD_KINDS if cached is None else ())
+        described, failures = self._describe_children({cluster_name: kinds}, AppConfig.AWS_DESCRIBE_WORKERS)
+        children = {**(cached or {}), **described[cluster_name]}
+        if self.cluster_cache and cached is None and not any(f['item'][1] in CACHED_CHILD_KINDS for f in failures):
+            self.cluster_cache.put(cluster['arn'], _cluster_revision(cluster),
+                                   {kind: children[kind] for kind in CACHED_CHILD_KINDS})
+        
+        return {
+            'cluster_name': cluster['name'],
+            'arn': cluster['arn'],
+            'status': cluster['status'],
+            'version': cluster['version'],
+            'endpoint': cluster.get('endpoint'),
+            'created_at': cluster.get('createdAt'),
+            'role_arn': cluster['roleArn'],
+            'vpc_config': {
+                'vpc_id': cluster['resourcesVpcConfig']['vpcId'],
+                'subnet_ids': cluster['resourcesVpcConfig']['subnetIds'],
+                'security_group_ids': cluster['resourcesVpcConfig'].get('securityGroupIds', []),
+                'endpoint_public_access': cluster['resourcesVpcConfig'].get('endpointPublicAccess', False),
+                'endpoint_private_access': cluster['resourcesVpcConfig'].get('endpointPrivateAccess', False)
+            },
+            'logging': cluster.get('logging', {}),
+            'identity': cluster.get('identity', {}),
+            'platform_version': cluster.get('platformVersion'),
+            'tags': cluster.get('tags', {}),
+            'addons': children['addons'],
+            'nodegroups': children['nodegroups'],
+            'fargate_profiles': [p['profile_name'] for p in children['fargate_profiles']],
+            'encryption_config': cluster.get('encryptionConfig', [])
+        }
     
     def list_addons(self, cluster_name: str) -> List[Dict]:
         """List EKS addons for a cluster"""
         try:
-            addons = []
-            response = self.eks_client.list_addons(clusterName=cluster_name)
-            
-            for addon_name in response.get('addons', []):
-                try:
-                    addon_info = self.eks_client.describe_addon(
-                        clusterName=cluster_name,
-                        addonName=addon_name
-                    )
-                    addon = addon_info['addon']
-                    
-                    addons.append({
-                        'addon_name': addon['addonName'],
-                        'addon_version': addon['addonVersion'],
-                        'status': addon['status'],
-                        'created_at': addon.get('createdAt')
-                    })
-                except ClientError:
-                    pass
-            
-            return addons
-            
+            names = self._paginate('list_addons', 'addons', clusterName=cluster_name)
         except ClientError:
             return []
+        
+        addons, _ = run_concurrently(
+            lambda name: self._addon_record(
+                self.eks_client.describe_addon(clusterName=cluster_name, addonName=name)['addon']
+            ),
+            names, AppConfig.AWS_DESCRIBE_WORKERS
+        )
+        return addons
     
     def list_fargate_profiles(self, cluster_name: str) -> List[str]:
         """List Fargate profiles for a cluster"""
         try:
-            response = self.eks_client.list_fargate_profiles(clusterName=cluster_name)
-            return response.get('fargateProfileNames', [])
+            return self._paginate('list_fargate_profiles', 'fargateProfileNames', clusterName=cluster_name)
         except ClientError:
             return []
     
@@ -298,51 +607,38 @@ class EKSService:
         except ClientError as e:
             return False, str(e)
     
+    @staticmethod
+    def estimate_monthly_cost(nodegroups: List[Dict]) -> Dict:
+        """
+        Estimate monthly cost of a cluster from its described nodegroups
+        
+        Args:
+            nodegroups: Nodegroup records as returned by list_nodegroups
+        
+        Returns:
+            Dict with total_monthly_cost, control_plane_cost, nodegroup_cost, total_nodes
+        """
+        nodegroup_cost = 0
+        total_nodes = 0
+        
+        for ng in nodegroups:
+            desired_size = ng['desired_size']
+            instance_type = ng['instance_types'][0] if ng['instance_types'] else 't3.medium'
+            hourly_rate = INSTANCE_HOURLY_PRICING.get(instance_type, DEFAULT_INSTANCE_HOURLY)
+            nodegroup_cost += hourly_rate * HOURS_PER_MONTH * desired_size
+            total_nodes += desired_size
+        
+        return {
+            'total_monthly_cost': CONTROL_PLANE_MONTHLY_COST + nodegroup_cost,
+            'control_plane_cost': CONTROL_PLANE_MONTHLY_COST,
+            'nodegroup_cost': nodegroup_cost,
+            'total_nodes': total_nodes
+        }
+    
     def get_cluster_cost_estimate(self, cluster_name: str) -> Dict:
         """Estimate monthly cost for EKS cluster"""
         try:
-            # EKS Control Plane: $0.10/hour = $73/month
-            control_plane_cost = 73.0
-            
-            # Get node groups
-            nodegroups = self.list_nodegroups(cluster_name)
-            
-            nodegroup_cost = 0
-            total_nodes = 0
-            
-            for ng in nodegroups:
-                desired_size = ng['desired_size']
-                instance_type = ng['instance_types'][0] if ng['instance_types'] else 't3.medium'
-                
-                # Simplified instance pricing
-                instance_pricing = {
-                    't3.small': 0.0208,
-                    't3.medium': 0.0416,
-                    't3.large': 0.0832,
-                    't3.xlarge': 0.1664,
-                    'm5.large': 0.096,
-                    'm5.xlarge': 0.192,
-                    'm5.2xlarge': 0.384,
-                    'c5.large': 0.085,
-                    'c5.xlarge': 0.17,
-                    'r5.large': 0.126,
-                    'r5.xlarge': 0.252
-                }
-                
-                hourly_rate = instance_pricing.get(instance_type, 0.10)
-                ng_cost = hourly_rate * 730 * desired_size  # 730 hours/month
-                nodegroup_cost += ng_cost
-                total_nodes += desired_size
-            
-            total_cost = control_plane_cost + nodegroup_cost
-            
-            return {
-                'success': True,
-                'total_monthly_cost': total_cost,
-                'control_plane_cost': control_plane_cost,
-                'nodegroup_cost': nodegroup_cost,
-                'total_nodes': total_nodes
-            }
+            return {'success': True, **self.estimate_monthly_cost(self.list_nodegroups(cluster_name))}
             
         except Exception as e:
             return {
@@ -351,11 +647,6 @@ class EKSService:
                 'total_monthly_cost': 0
             }
     
-    def get_available_kubernetes_versions(self) -> List[str]:
-        """Get available Kubernetes versions"""
-        # Current EKS versions (as of 2024)
-        return ['1.28', '1.29', '1.30']
-    
     def get_recommended_instance_types(self) -> Dict[str, List[str]]:
         """Get recommended instance types by use case"""
         return {
@@ -38,6 +38,10 @@ class RDSService:
                         'allocated_storage': db.get('AllocatedStorage', 0),
                         'backup_retention': db.get('BackupRetentionPeriod', 0),
                         'created_time': db.get('InstanceCreateTime'),
+                        'db_subnet_group': db.get('DBSubnetGroup', {}).get('DBSubnetGroupName'),
+                        'vpc_id': db.get('DBSubnetGroup', {}).get('VpcId'),
+                        'subnet_ids': [s['SubnetIdentifier'] for s in db.get('DBSubnetGroup', {}).get('Subnets', [])],
+                        'security_groups': [sg['VpcSecurityGroupId'] for sg in db.get('VpcSecurityGroups', [])],
                         'tags': {tag['Key']: tag['Value'] for tag in db.get('TagList', [])}
                     })
             
@@ -4,10 +4,13 @@ Supports AWS, Azure, and GCP
 """
 
 import streamlit as st
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
+from pathlib import Path
 import json
+import os
+import threading
 
 class CloudProvider(Enum):
     """Supported cloud providers"""
@@ -55,6 +58,116 @@ class GCPProjectConfig:
     owner_email: Optional[str] = None
     status: str = "active"
 
+class ConfigRegistry:
+    """
+    Parsed account/subscription/project configs with O(1) lookup indexes
+    
+    Built once per secrets file version by AppConfig; unique indexes (name, id)
+    map to a single config, grouping indexes (environment, cost center) map
+    to lists.
+    """
+    
+    def __init__(
+        self,
+        items: List[Any],
+        name_field: str,
+        id_field: str
+    ):
+        self.items = items
+        self._by_name = {getattr(item, name_field): item for item in items}
+        self._by_id = {getattr(item, id_field): item for item in items}
+        self._by_environment: Dict[str, List[Any]] = {}
+        self._by_cost_center: Dict[str, List[Any]] = {}
+        
+        for item in items:
+            self._by_environment.setdefault((item.environment or '').lower(), []).append(item)
+            if item.cost_center:
+                self._by_cost_center.setdefault(item.cost_center, []).append(item)
+    
+    def __len__(self) -> int:
+        return len(self.items)
+    
+    def all(self) -> List[Any]:
+        """All configs (a copy - safe to filter or sort)"""
+        return list(self.items)
+    
+    def active(self) -> List[Any]:
+        """Configs with status 'active'"""
+        return [item for item in self.items if item.status == 'active']
+    
+    def by_name(self, name: str) -> Optional[Any]:
+        return self._by_name.get(name)
+    
+    def by_id(self, item_id: str) -> Optional[Any]:
+        return self._by_id.get(item_id)
+    
+    def by_environment(self, environment: str) -> List[Any]:
+        return list(self._by_environment.get((environment or '').lower(), []))
+    
+    def by_cost_center(self, cost_center: str) -> List[Any]:
+        return list(self._by_cost_center.get(cost_center, []))
+    
+    def environments(self) -> List[str]:
+        return sorted(self._by_environment)
+    
+    def cost_centers(self) -> List[str]:
+        return sorted(self._by_cost_center)
+
+
+# Registries are rebuilt only when a secrets file changes (keyed by cloud)
+_REGISTRY_CACHE: Dict[str, Tuple[Tuple, ConfigRegistry]] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def _secrets_signature() -> Tuple:
+    """(path, mtime, size) of every secrets file Streamlit may read"""
+    paths = [
+        Path.home() / '.streamlit' / 'secrets.toml',
+        Path.cwd() / '.streamlit' / 'secrets.toml'
+    ]
+    try:
+        from streamlit import config as st_config
+        configured = st_config.get_option('secrets.files')
+        if configured:
+            paths = [Path(p) for p in configured]
+    except Exception:
+        pass
+    
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append((str(path), None, None))
+    return tuple(signature)
+
+
+def _cached_registry(
+    cloud: str,
+    loader: Callable[[], Tuple[List[Any], bool]],
+    name_field: str,
+    id_field: str
+) -> ConfigRegistry:
+    """Return the cached registry for a cloud, reloading it if the secrets files changed"""
+    signature = _secrets_signature()
+    
+    with _REGISTRY_LOCK:
+        cached = _REGISTRY_CACHE.get(cloud)
+        if cached and cached[0] == signature:
+            return cached[1]
+    
+    items, cacheable = loader()
+    registry = ConfigRegistry(items, name_field, id_field)
+    
+    # Don't pin a failed parse - retry on the next call
+    if cacheable:
+        with _REGISTRY_LOCK:
+            _REGISTRY_CACHE[cloud] = (signature, registry)
+    
+    return registry
+
+
 class AppConfig:
     """Global application configuration"""
     
@@ -111,6 +224,95 @@ class AppConfig:
     CACHE_TTL_COSTS = 3600    # 1 hour
     CACHE_TTL_SECURITY = 300  # 5 minutes
     
+    # Multi-account fan-out
+    FANOUT_MAX_WORKERS = 16     # Concurrent (account, region) calls
+    FANOUT_CALL_TIMEOUT = 30    # Seconds per (account, region) call
+    
+    # Shared AWS client pool
+    CLIENT_POOL_MAX_CONNECTIONS = 50  # HTTPS connections per pooled client
+    AWS_MAX_ATTEMPTS = 8              # botocore attempts per call (standard retry mode)
+    
+    # AWS API throttling governor
+    THROTTLE_RETRY_BUDGET = 100             # Throttle retries available at once, process-wide
+    THROTTLE_RETRY_REFILL_PER_SECOND = 2.0  # Retry budget refill rate
+    
+    # Resource inventory snapshots
+    INVENTORY_CALL_TIMEOUT = 300      # Seconds to collect every resource type in one (account, region)
+    INVENTORY_TYPE_WORKERS = 4        # Resource types collected concurrently per (account, region)
+    INVENTORY_SNAPSHOTS_KEPT = 10     # Completed snapshots retained on disk
+    INVENTORY_CHANGE_RETENTION_DAYS = 30  # Change feed history kept
+    S3_ENRICHMENT_WORKERS = 16        # Concurrent per-bucket S3 lookups
+    AWS_DESCRIBE_WORKERS = 8          # Concurrent per-resource describes (DynamoDB tables, Lambda tags, EKS)
+    EC2_BULK_WORKERS = 8              # Concurrent batched EC2 describe/action calls per region
+    EC2_WAIT_TIMEOUT = 600            # Seconds bulk start/stop waits for target states
+    EC2_WAITER_DELAY = 5              # Seconds between waiter polls
+    EKS_CLUSTER_CACHE_TTL = 900       # Seconds EKS addon/Fargate details are reused per cluster revision
+    EKS_STANDARD_SUPPORT_VERSIONS = ['1.33', '1.34', '1.35']  # Used when DescribeClusterVersions is unavailable
+    INVENTORY_REQUIRED_TAGS = ['Environment', 'Owner', 'CostCenter', 'Project', 'Team']
+    
+    # Tag policy: every required tag must be present; these rules add value constraints and
+    # per-environment overrides (keys as in tag_policy_engine.TagRule)
+    INVENTORY_ENVIRONMENT_TAG = 'Environment'  # Tag that selects per-environment overrides
+    INVENTORY_TEAM_TAG = 'Team'                # Tag that groups the per-team compliance matrix
+    INVENTORY_TAG_RULES = [
+        {'key': 'Environment',
+         'allowed_values': ['production', 'prod', 'staging', 'development', 'dev', 'test', 'qa', 'sandbox']},
+        {'key': 'CostCenter', 'pattern': r'^[A-Za-z]*-?\d+$', 'environments': ['production', 'prod']},
+        {'key': 'CostCenter', 'required': False, 'environments': ['development', 'dev', 'sandbox']},
+    ]
+    
+    # Resource dependency graph
+    DEPENDENCY_APPLICATION_TAG = 'Application'  # Tag grouping resources into applications
+    
+    # Streaming exports
+    EXPORT_CHUNK_ROWS = 50000         # Rows serialized per chunk
+    EXPORT_RETENTION_HOURS = 6        # Export files older than this are removed from the temp directory
+    
+    # Local cost warehouse (daily Cost Explorer ingestion)
+    COST_BACKFILL_DAYS = 90           # Days of history loaded the first time an account is ingested
+    COST_UNSETTLED_DAYS = 3           # Trailing days re-fetched on every run (Cost Explorer restates recent days)
+    COST_SYNC_INTERVAL_HOURS = 12     # FinOps pages queue an ingestion when the last one is older than this
+    COST_INGEST_CALL_TIMEOUT = 300    # Seconds to ingest one account
+    COST_JOB_TIMEOUT_HOURS = 2        # A background cost job still marked running after this long was abandoned (e.g. the app restarted)
+    COST_TAG_KEYS = ['Environment', 'Team', 'CostCenter', 'Project']  # Activated cost allocation tags to ingest
+    
+    # Cost and Usage Report ingestion (CUR files synced locally, e.g. aws s3 sync s3://<bucket>/<prefix> ~/.cloudidp/cur)
+    CUR_DIRECTORY = str(Path.home() / '.cloudidp' / 'cur')
+    CUR_CHUNK_ROWS = 200000           # Line items read per chunk (Parquet batches never span row groups)
+    CUR_COMPACT_ROWS = 2000000        # Partial aggregate rows held per file before they are re-aggregated
+    
+    # Cost anomaly detection (scored over the local cost warehouse)
+    ANOMALY_HISTORY_DAYS = 90         # Days loaded per series; seasonality is learned from the days before the scored ones
+    ANOMALY_SCORING_DAYS = 14         # Trailing days scored
+    ANOMALY_WINDOW_DAYS = 28          # Rolling baseline (median/MAD) window
+    ANOMALY_Z_THRESHOLD = 3.5         # Robust z-score over the baseline that flags a day
+    ANOMALY_MIN_IMPACT = 10.0         # Dollars over the expected cost below which a day is never flagged
+    ANOMALY_MIN_RELATIVE = 0.2        # Fraction over the expected cost below which a day is never flagged
+    
+    # Cost forecasting (fitted over the local cost warehouse, no Cost Explorer calls)
+    FORECAST_HISTORY_DAYS = 180       # Days of history a full fit reads
+    FORECAST_REFIT_DAYS = 7           # Smoothing parameters are re-chosen this often; new days are folded in every run
+    FORECAST_MIN_SEASONAL_DAYS = 28   # Shorter series are forecast with a linear trend instead of Holt-Winters
+    FORECAST_DAMPING = 0.98           # Trend damping, so long horizons do not extrapolate a trend indefinitely
+    FORECAST_HORIZON_DAYS = 30        # Days ahead shown in cost trends
+    
+    # Cost allocation (tag-based showback, materialized in the local cost warehouse)
+    ALLOCATION_TAG_KEYS = ['Team', 'CostCenter']  # Tags cost is allocated by, one showback per key
+    ALLOCATION_DAYS = 62              # Trailing days recomputed on every allocation run
+    ALLOCATION_STALE_HOURS = 12       # Tag-based costs recompute when the last run is older than this
+    ALLOCATION_CHUNK_ROWS = 500000    # Cost lines allocated per chunk
+    ALLOCATION_ACCOUNT_TAGS = {}      # account_id -> {tag key: value} inherited by untagged resources (the registry's cost_center is inherited as CostCenter)
+    ALLOCATION_SHARED_SERVICE_PATTERN = r'^(?:AWS ?Support|Tax$)'  # Services split across the tagged cost of the account
+    ALLOCATION_SHARED_RESOURCE_PATTERN = r'natgateway/|nat-[0-9a-f]{8}|transit-gateway/|tgw-[0-9a-f]{8}|vpc-endpoint/|vpce-[0-9a-f]{8}'  # Shared networking resources
+    ALLOCATION_SPLIT_UNTAGGED = True  # Split untagged cost like shared cost instead of reporting it as unallocated
+    
+    # Natural-language cost queries (translated by the LLM once per question, answered by the local warehouse)
+    COST_QUERY_MODEL = "claude-sonnet-4-20250514"  # Model that translates questions into query specs
+    
+    # Cost Explorer request budget ($0.01 per paid request)
+    COST_EXPLORER_DAILY_BUDGET = 200          # Paid requests per UTC day, all users and workers
+    COST_EXPLORER_INTERACTIVE_RESERVE = 50    # Share of the budget background refreshes may not use
+    
     # Pagination
     DEFAULT_PAGE_SIZE = 50
     MAX_PAGE_SIZE = 500
@@ -122,6 +324,23 @@ class AppConfig:
     @staticmethod
     def load_aws_accounts() -> List[AWSAccountConfig]:
         """Load AWS account configurations from Streamlit secrets"""
+        return AppConfig.get_aws_account_registry().all()
+    
+    @staticmethod
+    def get_aws_account_registry() -> ConfigRegistry:
+        """Indexed AWS account registry (re-parsed only when secrets change)"""
+        return _cached_registry(
+            'aws', AppConfig._parse_aws_accounts, 'account_name', 'account_id'
+        )
+    
+    @staticmethod
+    def get_aws_account(account_name: str) -> Optional[AWSAccountConfig]:
+        """Look up an AWS account config by name"""
+        return AppConfig.get_aws_account_registry().by_name(account_name)
+    
+    @staticmethod
+    def _parse_aws_accounts() -> Tuple[List[AWSAccountConfig], bool]:
+        """Parse AWS accounts from st.secrets; returns (accounts, parsed_ok)"""
         accounts = []
         
         try:
@@ -140,8 +359,9 @@ class AppConfig:
                     ))
         except Exception as e:
             st.error(f"Error loading AWS account configuration: {e}")
+            return accounts, False
         
-        return accounts
+        return accounts, True
     
     @staticmethod
     def get_management_credentials() -> Optional[Dict[str, str]]:
@@ -166,6 +386,21 @@ class AppConfig:
     @staticmethod
     def load_azure_subscriptions() -> List[AzureSubscriptionConfig]:
         """Load Azure subscription configurations from Streamlit secrets or demo data"""
+        return AppConfig.get_azure_subscription_registry().all()
+    
+    @staticmethod
+    def get_azure_subscription_registry() -> ConfigRegistry:
+        """Indexed Azure subscription registry (re-parsed only when secrets change)"""
+        return _cached_registry(
+            'azure',
+            lambda: (AppConfig._parse_azure_subscriptions(), True),
+            'subscription_name',
+            'subscription_id'
+        )
+    
+    @staticmethod
+    def _parse_azure_subscriptions() -> List[AzureSubscriptionConfig]:
+        """Parse Azure subscriptions from st.secrets, falling back to demo data"""
         subscriptions = []
         
         try:
@@ -217,6 +452,21 @@ class AppConfig:
     @staticmethod
     def load_gcp_projects() -> List[GCPProjectConfig]:
         """Load GCP project configurations from Streamlit secrets or demo data"""
+        return AppConfig.get_gcp_project_registry().all()
+    
+    @staticmethod
+    def get_gcp_project_registry() -> ConfigRegistry:
+        """Indexed GCP project registry (re-parsed only when secrets change)"""
+        return _cached_registry(
+            'gcp',
+            lambda: (AppConfig._parse_gcp_projects(), True),
+            'project_name',
+            'project_id'
+        )
+    
+    @staticmethod
+    def _parse_gcp_projects() -> List[GCPProjectConfig]:
+        """Parse GCP projects from st.secrets, falling back to demo data"""
         projects = []
         
         try:
@@ -5,10 +5,14 @@ AWS Account Manager - Multi-Account Management with IAM Role Assumption
 import boto3
 from botocore.exceptions import ClientError, BotoCoreError
 import streamlit as st
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from core_client_pool import get_client_pool
 import json
+import threading
+import time
 
 @dataclass
 class AssumedRoleSession:
@@ -19,24 +23,233 @@ class AssumedRoleSession:
     expiration: datetime
     session: boto3.Session
 
-class AWSAccountManager:
-    """Manages multi-account AWS access via IAM role assumption"""
+class CredentialBroker:
+    """
+    Process-wide cache of assumed-role credentials
     
-    def __init__(self, management_credentials: Dict[str, str]):
+    Lives outside the 5-minute AWSAccountManager cache so credentials survive
+    manager rebuilds. Concurrent requests for the same account_id:role_arn
+    share a single in-flight sts:AssumeRole call, and a background thread
+    refreshes credentials that are still in use before they reach the
+    5-minute expiry buffer - so each role costs one STS call per session
+    duration, not one per user per rerun.
+    """
+    
+    EXPIRY_BUFFER = timedelta(minutes=5)     # Never hand out credentials closer to expiry than this
+    REFRESH_MARGIN = timedelta(minutes=15)   # Background refresh starts this long before expiry
+    IDLE_TIMEOUT = timedelta(hours=1)        # Stop refreshing roles nobody has asked for
+    
+    def __init__(self, management_credentials: Dict[str, str], refresh_interval: int = 60):
         """
-        Initialize account manager
+        Initialize credential broker
         
         Args:
             management_credentials: Dict with access_key_id, secret_access_key, region
+            refresh_interval: Seconds between background refresh sweeps
         """
-        self.management_credentials = management_credentials
-        self._session_cache = {}
         self._sts_client = boto3.client(
             'sts',
             aws_access_key_id=management_credentials['access_key_id'],
             aws_secret_access_key=management_credentials['secret_access_key'],
             region_name=management_credentials.get('region', 'us-east-1')
         )
+        self._sessions: Dict[str, AssumedRoleSession] = {}
+        self._requests: Dict[str, Dict] = {}      # cache_key -> assume_role arguments
+        self._last_used: Dict[str, datetime] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'sts_calls': 0,
+            'cache_hits': 0,
+            'coalesced_waits': 0,
+            'background_refreshes': 0,
+            'refresh_failures': 0
+        }
+        
+        self._refresh_interval = refresh_interval
+        self._stop = threading.Event()
+        self._refresher = threading.Thread(
+            target=self._refresh_loop, name='cloudidp-credential-refresh', daemon=True
+        )
+        self._refresher.start()
+    
+    @staticmethod
+    def cache_key(account_id: str, role_arn: str) -> str:
+        return f"{account_id}:{role_arn}"
+    
+    def _is_fresh(self, role_session: Optional[AssumedRoleSession]) -> bool:
+        return (
+            role_session is not None
+            and role_session.expiration > datetime.now(timezone.utc) + self.EXPIRY_BUFFER
+        )
+    
+    def get(
+        self,
+        account_id: str,
+        account_name: str,
+        role_arn: str,
+        session_name: Optional[str] = None,
+        duration: int = 3600
+    ) -> AssumedRoleSession:
+        """
+        Get credentials for a role, assuming it only if no fresh copy exists
+        
+        Raises:
+            ClientError / BotoCoreError on STS failures
+        """
+        key = self.cache_key(account_id, role_arn)
+        
+        with self._lock:
+            self._last_used[key] = datetime.now(timezone.utc)
+            self._requests[key] = {
+                'account_id': account_id,
+                'account_name': account_name,
+                'role_arn': role_arn,
+                'duration': duration
+            }
+            cached = self._sessions.get(key)
+            if self._is_fresh(cached):
+                self._stats['cache_hits'] += 1
+                return cached
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        
+        # Single flight: only one thread per role talks to STS
+        with key_lock:
+            with self._lock:
+                cached = self._sessions.get(key)
+                if self._is_fresh(cached):
+                    self._stats['coalesced_waits'] += 1
+                    return cached
+            
+            return self._assume(key, account_id, account_name, role_arn, session_name, duration)
+    
+    def _assume(
+        self,
+        key: str,
+        account_id: str,
+        account_name: str,
+        role_arn: str,
+        session_name: Optional[str],
+        duration: int
+    ) -> AssumedRoleSession:
+        """Call sts:AssumeRole and store the result (caller holds the key lock)"""
+        if not session_name:
+            session_name = f"CloudIDP-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}"
+        
+        response = self._sts_client.assume_role(
+            RoleArn=role_arn,
+            RoleSessionName=session_name,
+            DurationSeconds=duration
+        )
+        
+        credentials = response['Credentials']
+        
+        # Pooled session: clients are shared process-wide and rebuilt when these credentials rotate
+        assumed_session = get_client_pool().session_for(
+            identity=account_id,
+            access_key_id=credentials['AccessKeyId'],
+            secret_access_key=credentials['SecretAccessKey'],
+            session_token=credentials['SessionToken'],
+            principal=role_arn
+        )
+        
+        role_session = AssumedRoleSession(
+            account_id=account_id,
+            account_name=account_name,
+            credentials={
+                'AccessKeyId': credentials['AccessKeyId'],
+                'SecretAccessKey': credentials['SecretAccessKey'],
+                'SessionToken': credentials['SessionToken']
+            },
+            expiration=credentials['Expiration'],
+            session=assumed_session
+        )
+        
+        with self._lock:
+            self._sessions[key] = role_session
+            self._stats['sts_calls'] += 1
+        
+        return role_session
+    
+    def _refresh_loop(self):
+        """Background thread: refresh in-use credentials before they expire"""
+        while not self._stop.wait(self._refresh_interval):
+            self.refresh_expiring()
+    
+    def refresh_expiring(self):
+        """Refresh every recently-used role whose credentials are inside the refresh margin"""
+        now = datetime.now(timezone.utc)
+        
+        with self._lock:
+            due = [
+                (key, dict(self._requests[key]), self._key_locks.setdefault(key, threading.Lock()))
+                for key, role_session in self._sessions.items()
+                if role_session.expiration <= now + self.REFRESH_MARGIN
+                and now - self._last_used.get(key, now) <= self.IDLE_TIMEOUT
+            ]
+            # Forget roles that went idle and have expired
+            for key in [
+                k for k, sess in self._sessions.items()
+                if sess.expiration <= now and now - self._last_used.get(k, now) > self.IDLE_TIMEOUT
+            ]:
+                self._sessions.pop(key, None)
+        
+        for key, request, key_lock in due:
+            # Skip if a foreground request is already assuming this role
+            if not key_lock.acquire(blocking=False):
+                continue
+            try:
+                self._assume(key, request['account_id'], request['account_name'],
+                             request['role_arn'], None, request['duration'])
+                with self._lock:
+                    self._stats['background_refreshes'] += 1
+            except Exception:
+                # Foreground requests will retry (and surface the error) once expired
+                with self._lock:
+                    self._stats['refresh_failures'] += 1
+            finally:
+                key_lock.release()
+    
+    def invalidate(self, account_id: Optional[str] = None, role_arn: Optional[str] = None):
+        """Drop cached credentials (all, or for one role)"""
+        with self._lock:
+            if account_id is None:
+                self._sessions.clear()
+            else:
+                self._sessions.pop(self.cache_key(account_id, role_arn or ''), None)
+    
+    def session_count(self) -> int:
+        """Number of roles with cached credentials"""
+        with self._lock:
+            return len(self._sessions)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """STS call / cache hit counters since process start"""
+        with self._lock:
+            return dict(self._stats, cached_roles=len(self._sessions))
+    
+    def stop(self):
+        """Stop the background refresh thread"""
+        self._stop.set()
+
+
+class AWSAccountManager:
+    """Manages multi-account AWS access via IAM role assumption"""
+    
+    def __init__(self, management_credentials: Dict[str, str]):
+        """
+        Initialize account manager
+        
+        Args:
+            management_credentials: Dict with access_key_id, secret_access_key, region
+        """
+        self.management_credentials = management_credentials
+        # Credentials are held by the process-wide broker so they outlive this manager
+        self._broker = get_credential_broker(
+            management_credentials['access_key_id'],
+            management_credentials['secret_access_key'],
+            management_credentials.get('region', 'us-east-1')
+        )
     
     def assume_role(
         self, 
@@ -63,53 +276,10 @@ class AWSAccountManager:
         if not role_arn or role_arn.strip() == "":
             return self._create_direct_session(account_id, account_name)
         
-        # Check cache first
-        cache_key = f"{account_id}:{role_arn}"
-        if cache_key in self._session_cache:
-            cached_session = self._session_cache[cache_key]
-            # Check if session is still valid (with 5 min buffer)
-            if cached_session.expiration > datetime.now(timezone.utc) + timedelta(minutes=5):
-                return cached_session
-        
         try:
-            # Generate session name
-            if not session_name:
-                session_name = f"CloudIDP-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}"
-            
-            # Assume role
-            response = self._sts_client.assume_role(
-                RoleArn=role_arn,
-                RoleSessionName=session_name,
-                DurationSeconds=duration
+            return self.assume_role_or_raise(
+                account_id, account_name, role_arn, session_name, duration
             )
-            
-            credentials = response['Credentials']
-            
-            # Create boto3 session with assumed role credentials
-            assumed_session = boto3.Session(
-                aws_access_key_id=credentials['AccessKeyId'],
-                aws_secret_access_key=credentials['SecretAccessKey'],
-                aws_session_token=credentials['SessionToken']
-            )
-            
-            # Create session object
-            role_session = AssumedRoleSession(
-                account_id=account_id,
-                account_name=account_name,
-                credentials={
-                    'AccessKeyId': credentials['AccessKeyId'],
-                    'SecretAccessKey': credentials['SecretAccessKey'],
-                    'SessionToken': credentials['SessionToken']
-                },
-                expiration=credentials['Expiration'],
-                session=assumed_session
-            )
-            
-            # Cache the session
-            self._session_cache[cache_key] = role_session
-            
-            return role_session
-            
         except ClientError as e:
             error_code = e.response['Error']['Code']
             error_msg = e.response['Error']['Message']
@@ -119,6 +289,39 @@ class AWSAccountManager:
             st.error(f"❌ Unexpected error assuming role in {account_name}: {str(e)}")
             return None
     
+    def assume_role_or_raise(
+        self,
+        account_id: str,
+        account_name: str,
+        role_arn: str,
+        session_name: Optional[str] = None,
+        duration: int = 3600
+    ) -> AssumedRoleSession:
+        """
+        Assume role without rendering anything - errors are raised to the caller
+        
+        Safe to call from worker threads (no Streamlit calls). Used by the
+        fan-out executor, which collects errors into a per-target report.
+        
+        Args:
+            account_id: Target AWS account ID
+            account_name: Friendly name for the account
+            role_arn: ARN of role to assume (empty string = use management credentials directly)
+            session_name: Optional session name
+            duration: Session duration in seconds (default: 1 hour)
+        
+        Returns:
+            AssumedRoleSession
+        
+        Raises:
+            ClientError / BotoCoreError on STS failures
+        """
+        if not role_arn or role_arn.strip() == "":
+            role_session, _ = self._build_direct_session(account_id, account_name)
+            return role_session
+        
+        return self._broker.get(account_id, account_name, role_arn, session_name, duration)
+    
     def _create_direct_session(self, account_id: str, account_name: str) -> Optional[AssumedRoleSession]:
         """
         Create a session using management credentials directly (no role assumption)
@@ -131,29 +334,7 @@ class AWSAccountManager:
             AssumedRoleSession using management credentials
         """
         try:
-            # Create session with management credentials
-            direct_session = boto3.Session(
-                aws_access_key_id=self.management_credentials['access_key_id'],
-                aws_secret_access_key=self.management_credentials['secret_access_key'],
-                region_name=self.management_credentials.get('region', 'us-east-1')
-            )
-            
-            # Verify credentials work by getting caller identity
-            sts = direct_session.client('sts')
-            identity = sts.get_caller_identity()
-            
-            # Create a pseudo session object (long-lived, no expiration for direct creds)
-            role_session = AssumedRoleSession(
-                account_id=account_id,
-                account_name=account_name,
-                credentials={
-                    'AccessKeyId': self.management_credentials['access_key_id'],
-                    'SecretAccessKey': self.management_credentials['secret_access_key'],
-                    'SessionToken': None  # No session token for direct credentials
-                },
-                expiration=datetime.now(timezone.utc) + timedelta(hours=24),  # Set far future expiration
-                session=direct_session
-            )
+            role_session, identity = self._build_direct_session(account_id, account_name)
             
             st.success(f"✅ Connected to {account_name} using direct credentials (User: {identity['Arn'].split('/')[-1]})")
             
@@ -168,6 +349,41 @@ class AWSAccountManager:
             st.error(f"❌ Unexpected error connecting to {account_name}: {str(e)}")
             return None
     
+    def _build_direct_session(self, account_id: str, account_name: str) -> Tuple[AssumedRoleSession, Dict]:
+        """
+        Build a direct-credentials session and verify it, raising on failure
+        
+        Returns:
+            Tuple of (AssumedRoleSession, caller identity)
+        """
+        # Create session with management credentials
+        direct_session = get_client_pool().session_for(
+            identity=account_id,
+            access_key_id=self.management_credentials['access_key_id'],
+            secret_access_key=self.management_credentials['secret_access_key'],
+            region=self.management_credentials.get('region', 'us-east-1'),
+            principal='direct'
+        )
+        
+        # Verify credentials work by getting caller identity
+        sts = direct_session.client('sts')
+        identity = sts.get_caller_identity()
+        
+        # Create a pseudo session object (long-lived, no expiration for direct creds)
+        role_session = AssumedRoleSession(
+            account_id=account_id,
+            account_name=account_name,
+            credentials={
+                'AccessKeyId': self.management_credentials['access_key_id'],
+                'SecretAccessKey': self.management_credentials['secret_access_key'],
+                'SessionToken': None  # No session token for direct credentials
+            },
+            expiration=datetime.now(timezone.utc) + timedelta(hours=24),  # Set far future expiration
+            session=direct_session
+        )
+        
+        return role_session, identity
+    
     def get_account_identity(self, session: AssumedRoleSession) -> Optional[Dict]:
         """
         Get account identity information
@@ -261,11 +477,11 @@ class AWSAccountManager:
     
     def clear_session_cache(self):
         """Clear all cached sessions (useful for debugging or force refresh)"""
-        self._session_cache = {}
+        self._broker.invalidate()
     
     def get_cached_session_count(self) -> int:
         """Get number of cached sessions"""
-        return len(self._session_cache)
+        return self._broker.session_count()
     
     @staticmethod
     def get_configured_account_names() -> List[str]:
@@ -285,17 +501,16 @@ class AWSAccountManager:
             boto3.Session or None
         """
         from config_settings import AppConfig
-        accounts = AppConfig.load_aws_accounts()
+        account = AppConfig.get_aws_account(account_name)
         
-        for account in accounts:
-            if account.account_name == account_name:
-                assumed_session = self.assume_role(
-                    account_id=account.account_id,
-                    account_name=account.account_name,
-                    role_arn=account.role_arn
-                )
-                if assumed_session:
-                    return assumed_session.session
+        if account:
+            assumed_session = self.assume_role(
+                account_id=account.account_id,
+                account_name=account.account_name,
+                role_arn=account.role_arn
+            )
+            if assumed_session:
+                return assumed_session.session
         
         return None
     
@@ -311,26 +526,40 @@ class AWSAccountManager:
             boto3.Session configured for the specified region, or None
         """
         from config_settings import AppConfig
-        accounts = AppConfig.load_aws_accounts()
+        account = AppConfig.get_aws_account(account_name)
         
-        for account in accounts:
-            if account.account_name == account_name:
-                assumed_session = self.assume_role(
-                    account_id=account.account_id,
-                    account_name=account.account_name,
-                    role_arn=account.role_arn
+        if account:
+            assumed_session = self.assume_role(
+                account_id=account.account_id,
+                account_name=account.account_name,
+                role_arn=account.role_arn
+            )
+            if assumed_session:
+                # Region-scoped pooled session (cached, shares clients with other callers)
+                return get_client_pool().session_for(
+                    identity=account.account_id,
+                    access_key_id=assumed_session.credentials['AccessKeyId'],
+                    secret_access_key=assumed_session.credentials['SecretAccessKey'],
+                    session_token=assumed_session.credentials['SessionToken'],
+                    region=region,
+                    principal=(account.role_arn or '').strip() or 'direct'
                 )
-                if assumed_session:
-                    # Create a new session with the specified region
-                    return boto3.Session(
-                        aws_access_key_id=assumed_session.credentials['AccessKeyId'],
-                        aws_secret_access_key=assumed_session.credentials['SecretAccessKey'],
-                        aws_session_token=assumed_session.credentials['SessionToken'],
-                        region_name=region
-                    )
         
         return None
 
+@st.cache_resource
+def get_credential_broker(access_key_id: str, secret_access_key: str, region: str = 'us-east-1') -> CredentialBroker:
+    """
+    Get the process-wide credential broker for a set of management credentials
+    
+    Not TTL-bound: cached role credentials survive get_account_manager() rebuilds.
+    """
+    return CredentialBroker({
+        'access_key_id': access_key_id,
+        'secret_access_key': secret_access_key,
+        'region': region
+    })
+
 @st.cache_resource(ttl=300)
 def get_account_manager() -> Optional[AWSAccountManager]:
     """
@@ -356,4 +585,268 @@ def get_account_names() -> List[str]:
     """
     from config_settings import AppConfig
     accounts = AppConfig.load_aws_accounts()
-    return [acc.account_name for acc in accounts]
\ No newline at end of file
+    return [acc.account_name for acc in accounts]
+
+@dataclass
+class FanOutTarget:
+    """A single (account, region) pair a fan-out call runs against"""
+    account_id: str
+    account_name: str
+    role_arn: str
+    region: str
+    environment: str = "production"
+
+
+@dataclass
+class FanOutResult:
+    """Outcome of one fan-out call"""
+    target: FanOutTarget
+    success: bool
+    result: Any = None
+    stage: Optional[str] = None  # assume_role, call, timeout
+    error_code: Optional[str] = None
+    error: Optional[str] = None
+    duration_seconds: float = 0.0
+
+
+@dataclass
+class FanOutReport:
+    """Aggregated results of a fan-out run"""
+    results: List[FanOutResult] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+    
+    @property
+    def succeeded(self) -> List[FanOutResult]:
+        return [r for r in self.results if r.success]
+    
+    @property
+    def failed(self) -> List[FanOutResult]:
+        return [r for r in self.results if not r.success]
+    
+    def values(self) -> List[Any]:
+        """Results of all successful calls, in completion order"""
+        return [r.result for r in self.results if r.success]
+    
+    def error_rows(self) -> List[Dict]:
+        """Per-target error report, ready for st.dataframe"""
+        return [
+            {
+                'Account': r.target.account_name,
+                'Account ID': r.target.account_id,
+                'Region': r.target.region,
+                'Stage': r.stage,
+                'Error Code': r.error_code,
+                'Message': r.error,
+                'Duration (s)': round(r.duration_seconds, 2)
+            }
+            for r in self.failed
+        ]
+
+
+class AccountFanOutExecutor:
+    """
+    Runs a (session, target) -> result callable across accounts and regions
+    on a bounded thread pool.
+    
+    Worker threads never touch Streamlit; role assumption and call errors are
+    captured per target so the caller can render a structured report.
+    Results are yielded as they complete so the UI can show partial data.
+    """
+    
+    def __init__(
+        self,
+        account_mgr: AWSAccountManager,
+        max_workers: Optional[int] = None,
+        call_timeout: Optional[float] = None
+    ):
+        """
+        Initialize fan-out executor
+        
+        Args:
+            account_mgr: Account manager used for role assumption
+            max_workers: Thread pool size (default: AppConfig.FANOUT_MAX_WORKERS)
+            call_timeout: Seconds allowed per (account, region) call (default: AppConfig.FANOUT_CALL_TIMEOUT)
+        """
+        from config_settings import AppConfig
+        
+        self.account_mgr = account_mgr
+        self.max_workers = max_workers or AppConfig.FANOUT_MAX_WORKERS
+        self.call_timeout = call_timeout or AppConfig.FANOUT_CALL_TIMEOUT
+    
+    @staticmethod
+    def build_targets(
+        accounts: Optional[List] = None,
+        regions: Optional[List[str]] = None,
+        primary_region_only: bool = False
+    ) -> List[FanOutTarget]:
+        """
+        Expand account configs into (account, region) targets
+        
+        Args:
+            accounts: AWSAccountConfig list (default: all active configured accounts)
+            regions: Regions to use for every account (default: each account's own regions)
+            primary_region_only: Only use the first region of each account
+        
+        Returns:
+            List of FanOutTarget
+        """
+        if accounts is None:
+            from config_settings import AppConfig
+            accounts = [acc for acc in AppConfig.load_aws_accounts() if acc.status == 'active']
+        
+        targets = []
+        for account in accounts:
+            account_regions = regions or account.regions or ['us-east-1']
+            if primary_region_only:
+                account_regions = account_regions[:1]
+            
+            for region in account_regions:
+                targets.append(FanOutTarget(
+                    account_id=account.account_id,
+                    account_name=account.account_name,
+                    role_arn=account.role_arn,
+                    region=region,
+                    environment=account.environment
+                ))
+        
+        return targets
+    
+    def _execute(self, fn: Callable, target: FanOutTarget, started: Dict[int, float]) -> FanOutResult:
+        """Assume role and run fn for a single target (worker thread)"""
+        started[id(target)] = time.monotonic()
+        start = started[id(target)]
+        
+        try:
+            assumed = self.account_mgr.assume_role_or_raise(
+                target.account_id,
+                target.account_name,
+                target.role_arn
+            )
+        except ClientError as e:
+            return FanOutResult(
+                target=target, success=False, stage='assume_role',
+                error_code=e.response['Error']['Code'],
+                error=e.response['Error']['Message'],
+                duration_seconds=time.monotonic() - start
+            )
+        except Exception as e:
+            return FanOutResult(
+                target=target, success=False, stage='assume_role',
+                error_code=type(e).__name__, error=str(e),
+                duration_seconds=time.monotonic() - start
+            )
+        
+        try:
+            result = fn(assumed.session, target)
+            return FanOutResult(
+                target=target, success=True, result=result,
+                duration_seconds=time.monotonic() - start
+            )
+        except ClientError as e:
+            return FanOutResult(
+                target=target, success=False, stage='call',
+                error_code=e.response['Error']['Code'],
+                error=e.response['Error']['Message'],
+                duration_seconds=time.monotonic() - start
+            )
+        except Exception as e:
+            return FanOutResult(
+                target=target, success=False, stage='call',
+                error_code=type(e).__name__, error=str(e),
+                duration_seconds=time.monotonic() - start
+            )
+    
+    def iter_results(self, fn: Callable, targets: List[FanOutTarget]) -> Iterator[FanOutResult]:
+        """
+        Run fn across targets, yielding each result as soon as it completes
+        
+        Calls that run longer than call_timeout are reported as timed out and
+        abandoned; their threads finish in the background.
+        
+        Args:
+            fn: Callable taking (boto3.Session, FanOutTarget)
+            targets: Targets to run against
+        
+        Yields:
+            FanOutResult per target
+        """
+        if not targets:
+            return
+        
+        started: Dict[int, float] = {}
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(targets)),
+            thread_name_prefix='cloudidp-fanout'
+        )
+        
+        try:
+            pending = {
+                executor.submit(self._execute, fn, target, started): target
+                for target in targets
+            }
+            
+            while pending:
+                done, _ = wait(pending, timeout=1.0, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    pending.pop(future)
+                    yield future.result()
+                
+                # Expire calls that have been running longer than the per-call timeout
+                now = time.monotonic()
+                for future, target in list(pending.items()):
+                    start = started.get(id(target))
+                    if start is not None and now - start > self.call_timeout:
+                        pending.pop(future)
+                        future.cancel()
+                        yield FanOutResult(
+                            target=target, success=False, stage='timeout',
+                            error_code='Timeout',
+                            error=f"No response within {self.call_timeout:.0f}s",
+                            duration_seconds=now - start
+                        )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def run(
+        self,
+        fn: Callable,
+        accounts: Optional[List] = None,
+        regions: Optional[List[str]] = None,
+        primary_region_only: bool = False,
+        on_result: Optional[Callable[[FanOutResult, int, int], None]] = None
+    ) -> FanOutReport:
+        """
+        Run fn across accounts/regions and collect a report
+        
+        Args:
+            fn: Callable taking (boto3.Session, FanOutTarget)
+            accounts: AWSAccountConfig list (default: all active configured accounts)
+            regions: Regions to use for every account (default: each account's own regions)
+            primary_region_only: Only use the first region of each account
+            on_result: Optional callback(result, completed, total) invoked on the
+                calling thread as each result arrives - use it to stream into the UI
+        
+        Returns:
+            FanOutReport
+        """
+        targets = self.build_targets(accounts, regions, primary_region_only)
+        report = FanOutReport()
+        start = time.monotonic()
+        
+        for result in self.iter_results(fn, targets):
+            report.results.append(result)
+            if on_result:
+                on_result(result, len(report.results), len(targets))
+        
+        report.elapsed_seconds = time.monotonic() - start
+        return report
+
+
+def render_fanout_errors(report: FanOutReport, label: str = "account/region calls failed"):
+    """Render the per-target error report of a fan-out run, if any"""
+    if not report.failed:
+        return
+    
+    with st.expander(f"⚠️ {len(report.failed)} of {len(report.results)} {label}"):
+        st.dataframe(report.error_rows(), use_container_width=True, hide_index=True)
@@ -0,0 +1,238 @@
+"""
+Client Pool - Shared, Thread-Safe botocore Clients
+Reuses AWS service clients across reruns, sessions and threads
+"""
+
+import boto3
+import botocore.session
+from botocore.config import Config
+import streamlit as st
+from core_throttle_governor import get_throttle_governor
+from typing import Dict, Optional, Tuple
+from dataclasses import dataclass
+import hashlib
+import threading
+
+
+@dataclass
+class PooledClient:
+    """A cached client and the credentials it was built with"""
+    client: object
+    fingerprint: str
+
+
+def credentials_fingerprint(access_key_id: Optional[str], session_token: Optional[str]) -> str:
+    """Stable identifier for a set of credentials (changes whenever they rotate)"""
+    raw = f"{access_key_id or ''}:{session_token or ''}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+class PooledSession(boto3.Session):
+    """
+    boto3.Session whose client() calls are served from the shared ClientPool
+    
+    Service wrappers keep calling session.client('ec2', region_name=...) as
+    before; they just get a cached client instead of building a new one.
+    """
+    
+    def __init__(self, pool: 'ClientPool', identity: str, principal: str = '', **session_kwargs):
+        super().__init__(**session_kwargs)
+        self._pool = pool
+        self._identity = identity
+        self._principal = principal
+        credentials = self.get_credentials()
+        self._fingerprint = credentials_fingerprint(
+            credentials.access_key if credentials else None,
+            credentials.token if credentials else None
+        )
+    
+    @property
+    def identity(self) -> str:
+        return self._identity
+    
+    @property
+    def principal(self) -> str:
+        return self._principal
+    
+    @property
+    def slot(self) -> Tuple[str, str]:
+        """(identity, principal) whose credentials rotate together"""
+        return (self._identity, self._principal)
+    
+    @property
+    def fingerprint(self) -> str:
+        return self._fingerprint
+    
+    def client(self, service_name: str, region_name: Optional[str] = None, *args, **kwargs):
+        # Anything beyond region/config (endpoint overrides, explicit keys...) bypasses the pool
+        if args or set(kwargs) - {'config'}:
+            return super().client(service_name, region_name, *args, **kwargs)
+        
+        return self._pool.get_client(
+            self,
+            service_name,
+            region_name or self.region_name or 'us-east-1',
+            config=kwargs.get('config')
+        )
+
+
+class ClientPool:
+    """
+    Process-wide pool of botocore clients keyed by (identity, principal, region, service)
+    
+    Clients are created from one shared botocore session, so service models
+    are loaded once per process, and each client keeps its HTTPS connection
+    pool alive between calls. Entries are rebuilt when the credentials of an
+    (identity, principal) slot rotate; different roles or direct credentials
+    for the same account are separate slots and never evict each other.
+    """
+    
+    def __init__(self, max_pool_connections: int = 50):
+        """
+        Initialize client pool
+        
+        Args:
+            max_pool_connections: HTTPS connections kept per client
+        """
+        self.max_pool_connections = max_pool_connections
+        self._botocore_session = botocore.session.get_session()
+        self._clients: Dict[Tuple[str, str, str, str], PooledClient] = {}
+        self._sessions: Dict[Tuple[str, str, str, str], PooledSession] = {}
+        self._current: Dict[Tuple[str, str], str] = {}  # (identity, principal) -> latest credentials fingerprint
+        self._lock = threading.Lock()
+        self._create_lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'rotations': 0}
+    
+    def _base_config(self) -> Config:
+        from config_settings import AppConfig
+        return Config(
+            max_pool_connections=self.max_pool_connections,
+            retries={'mode': 'standard', 'max_attempts': AppConfig.AWS_MAX_ATTEMPTS}
+        )
+    
+    def session_for(
+        self,
+        identity: str,
+        access_key_id: str,
+        secret_access_key: str,
+        session_token: Optional[str] = None,
+        region: Optional[str] = None,
+        principal: str = ''
+    ) -> PooledSession:
+        """
+        Get a (cached) pooled session for a set of credentials
+        
+        Args:
+            identity: Stable owner of the credentials (e.g. account ID)
+            access_key_id / secret_access_key / session_token: Credentials
+            region: Default region for the session
+            principal: What the credentials act as within the identity (role ARN, 'direct'...)
+        
+        Returns:
+            PooledSession
+        """
+        fingerprint = credentials_fingerprint(access_key_id, session_token)
+        slot = (identity, principal)
+        session_key = (identity, principal, fingerprint, region or '')
+        
+        with self._lock:
+            session = self._sessions.get(session_key)
+            if session is not None:
+                return session
+            
+            if self._current.get(slot) not in (None, fingerprint):
+                self._rotate(slot)
+            self._current[slot] = fingerprint
+        
+        session = PooledSession(
+            self,
+            identity,
+            principal,
+            aws_access_key_id=access_key_id,
+            aws_secret_access_key=secret_access_key,
+            aws_session_token=session_token,
+            region_name=region
+        )
+        
+        with self._lock:
+            return self._sessions.setdefault(session_key, session)
+    
+    def _rotate(self, slot: Tuple[str, str]):
+        """Drop clients and sessions built with a slot's old credentials (lock held)"""
+        self._stats['rotations'] += 1
+        for key in [k for k in self._clients if k[:2] == slot]:
+            del self._clients[key]
+        for key in [k for k in self._sessions if k[:2] == slot]:
+            del self._sessions[key]
+    
+    def get_client(self, session: PooledSession, service_name: str, region: str, config: Optional[Config] = None):
+        """
+        Get a client for (session identity and principal, region, service)
+        
+        Args:
+            session: PooledSession holding the credentials
+            service_name: AWS service (e.g. 'ec2')
+            region: AWS region
+            config: Optional botocore Config merged over the pool defaults
+        
+        Returns:
+            botocore client
+        """
+        key = session.slot + (region, service_name)
+        
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None and entry.fingerprint == session.fingerprint and config is None:
+                self._stats['hits'] += 1
+                return entry.client
+            self._stats['misses'] += 1
+            # Sessions holding superseded credentials get a private client
+            stale = self._current.get(session.slot, session.fingerprint) != session.fingerprint
+        
+        credentials = session.get_credentials()
+        client_config = self._base_config().merge(config) if config else self._base_config()
+        
+        # botocore sessions are not thread-safe; creation is fast once models are cached
+        with self._create_lock:
+            client = self._botocore_session.create_client(
+                service_name,
+                region_name=region,
+                aws_access_key_id=credentials.access_key,
+                aws_secret_access_key=credentials.secret_key,
+                aws_session_token=credentials.token,
+                config=client_config
+            )
+        
+        # Every pooled client is paced by the shared throttle governor
+        get_throttle_governor().attach(client, session.identity, region)
+        
+        if config is None and not stale:
+            with self._lock:
+                self._clients[key] = PooledClient(client=client, fingerprint=session.fingerprint)
+        
+        return client
+    
+    def invalidate(self, identity: Optional[str] = None):
+        """Drop cached clients (all, or for one identity)"""
+        with self._lock:
+            if identity is None:
+                self._clients.clear()
+                self._sessions.clear()
+                self._current.clear()
+            else:
+                for slot in {k[:2] for k in self._current} | {k[:2] for k in self._sessions}:
+                    if slot[0] == identity:
+                        self._rotate(slot)
+                        self._current.pop(slot, None)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Hit/miss/rotation counters and pool size"""
+        with self._lock:
+            return dict(self._stats, clients=len(self._clients), sessions=len(self._sessions))
+
+
+@st.cache_resource
+def get_client_pool() -> ClientPool:
+    """Get the process-wide client pool"""
+    from config_settings import AppConfig
+    return ClientPool(max_pool_connections=AppConfig.CLIENT_POOL_MAX_CONNECTIONS)
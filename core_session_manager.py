@@ -62,8 +62,7 @@ class SessionManager:
         """Get list of selected account IDs"""
         if st.session_state.selected_accounts == 'all':
             from config_settings import AppConfig
-            accounts = AppConfig.load_aws_accounts()
-            return [acc.account_id for acc in accounts if acc.status == 'active']
+            return [acc.account_id for acc in AppConfig.get_aws_account_registry().active()]
         else:
             return [st.session_state.selected_accounts]
     
@@ -80,8 +79,7 @@ class SessionManager:
     def get_active_account_count() -> int:
         """Get count of active connected accounts"""
         from config_settings import AppConfig
-        accounts = AppConfig.load_aws_accounts()
-        return len([acc for acc in accounts if acc.status == 'active'])
+        return len(AppConfig.get_aws_account_registry().active())
     
     @staticmethod
     def trigger_refresh():
@@ -0,0 +1,247 @@
+"""
+Throttle Governor - Adaptive Rate Limiting for AWS API Calls
+Per-(account, region, API) token buckets, throttle-driven backoff and a global retry budget
+"""
+
+import streamlit as st
+from typing import Dict, List, Optional, Tuple
+from botocore.exceptions import ClientError
+import threading
+import time
+
+
+# Error codes AWS uses to signal request-rate throttling
+THROTTLE_ERROR_CODES = {
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestLimitExceeded',
+    'RequestThrottled',
+    'RequestThrottledException',
+    'TooManyRequestsException',
+    'ProvisionedThroughputExceededException',
+    'TransactionInProgressException',
+    'SlowDown',
+    'LimitExceededException',
+    'BandwidthLimitExceeded',
+    'EC2ThrottledException',
+    'PriorRequestNotComplete'
+}
+
+
+class RetryBudgetExhausted(ClientError):
+    """Raised instead of retrying a throttled call once the global retry budget is spent"""
+
+
+class TokenBucket:
+    """Token bucket whose refill rate adapts to throttle responses (AIMD)"""
+    
+    def __init__(self, rate: float, burst: float, min_rate: float):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+        
+        # Metrics
+        self.calls = 0
+        self.throttles = 0
+        self.wait_seconds = 0.0
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def reserve(self) -> float:
+        """Take a token, returning how long the caller must wait for it"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            self.calls += 1
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            self.wait_seconds += wait
+            return wait
+    
+    def try_take(self) -> bool:
+        """Take a token only if one is available right now"""
+        with self.lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+    
+    def on_throttle(self):
+        """Multiplicative decrease: halve the rate and drain the bucket"""
+        with self.lock:
+            self.throttles += 1
+            self.rate = max(self.min_rate, self.rate * 0.5)
+            self.tokens = min(self.tokens, 0)
+    
+    def on_success(self):
+        """Additive increase back towards the configured rate"""
+        with self.lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class ThrottleGovernor:
+    """
+    Central rate governor attached to every pooled AWS client
+    
+    Each attempt (including botocore's own retries) first takes a token from
+    the bucket for its (account, region, service, operation). Throttle
+    responses halve that bucket's rate; successes grow it back. Retries of
+    throttled calls also draw from one process-wide retry budget so a
+    throttling storm slows down instead of multiplying itself.
+    """
+    
+    # Sustained requests/second per (account, region, API), keyed by (service, operation);
+    # '*' matches every operation of a service
+    DEFAULT_RATE = 10.0
+    RATE_OVERRIDES = {
+        ('ec2', 'DescribeInstances'): 5.0,
+        ('organizations', '*'): 2.0,
+        ('cost-explorer', '*'): 1.0,
+        ('sts', 'AssumeRole'): 5.0,
+        ('cloudtrail', 'LookupEvents'): 2.0,
+        ('resource-groups-tagging-api', '*'): 5.0,
+        ('config-service', '*'): 5.0
+    }
+    
+    def __init__(self, retry_budget: int = 100, retry_refill_per_second: float = 2.0):
+        """
+        Initialize governor
+        
+        Args:
+            retry_budget: Maximum throttle retries available at once, process-wide
+            retry_refill_per_second: Rate at which spent retries are returned to the budget
+        """
+        self._buckets: Dict[Tuple[str, str, str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._retry_budget = TokenBucket(retry_refill_per_second, retry_budget, retry_refill_per_second)
+        self._retries = 0
+        self._budget_denials = 0
+    
+    @classmethod
+    def rate_for(cls, service: str, operation: str) -> float:
+        return cls.RATE_OVERRIDES.get(
+            (service, operation),
+            cls.RATE_OVERRIDES.get((service, '*'), cls.DEFAULT_RATE)
+        )
+    
+    def _bucket(self, key: Tuple[str, str, str, str]) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                rate = self.rate_for(key[2], key[3])
+                bucket = TokenBucket(rate=rate, burst=max(1.0, rate * 2), min_rate=max(0.1, rate / 20))
+                self._buckets[key] = bucket
+            return bucket
+    
+    def attach(self, client, account: str, region: str):
+        """
+        Register governor hooks on a botocore client
+        
+        Args:
+            client: botocore client
+            account: Account/credentials identity the client belongs to
+            region: Region the client calls
+        """
+        def parse_event(event_name: str) -> Tuple[str, str]:
+            # e.g. before-send.ec2.DescribeInstances
+            parts = event_name.split('.')
+            return (parts[1] if len(parts) > 1 else '*', parts[2] if len(parts) > 2 else '*')
+        
+        # botocore normalizes the retry config to total attempts, first call included
+        retries = getattr(client.meta.config, 'retries', None) or {}
+        max_attempts = retries.get('total_max_attempts') or retries.get('max_attempts', 0) + 1
+        
+        def before_send(event_name=None, **kwargs):
+            service, operation = parse_event(event_name or '')
+            wait = self._bucket((account, region, service, operation)).reserve()
+            if wait > 0:
+                time.sleep(wait)
+            return None
+        
+        def needs_retry(event_name=None, response=None, caught_exception=None, operation=None, attempts=1, **kwargs):
+            service, operation_name = parse_event(event_name or '')
+            bucket = self._bucket((account, region, service, operation_name))
+            
+            if response is None:
+                return None
+            
+            http_response, parsed = response
+            error_code = (parsed or {}).get('Error', {}).get('Code')
+            
+            if error_code in THROTTLE_ERROR_CODES or http_response.status_code == 429:
+                bucket.on_throttle()
+                if attempts >= max_attempts:
+                    # botocore gives up after this attempt anyway; nothing to spend budget on
+                    return None
+                
+                # Spend from the global retry budget; give up if it is empty
+                allowed = self._retry_budget.try_take()
+                with self._lock:
+                    if allowed:
+                        self._retries += 1
+                    else:
+                        self._budget_denials += 1
+                if not allowed:
+                    raise RetryBudgetExhausted(parsed, operation_name)
+            elif http_response.status_code < 400:
+                bucket.on_success()
+            
+            return None
+        
+        client.meta.events.register('before-send', before_send)
+        client.meta.events.register_first('needs-retry', needs_retry)
+    
+    def get_metrics(self) -> Dict:
+        """Totals across all buckets"""
+        with self._lock:
+            buckets = list(self._buckets.values())
+            return {
+                'calls': sum(b.calls for b in buckets),
+                'throttles': sum(b.throttles for b in buckets),
+                'wait_seconds': round(sum(b.wait_seconds for b in buckets), 2),
+                'retries': self._retries,
+                'budget_denials': self._budget_denials,
+                'retry_budget_remaining': int(max(0, self._retry_budget.tokens)),
+                'buckets': len(buckets)
+            }
+    
+    def get_bucket_rows(self, limit: Optional[int] = 50) -> List[Dict]:
+        """Per-(account, region, API) metrics, most-waited first"""
+        with self._lock:
+            items = list(self._buckets.items())
+        
+        rows = [
+            {
+                'Account': key[0],
+                'Region': key[1],
+                'Service': key[2],
+                'Operation': key[3],
+                'Calls': bucket.calls,
+                'Throttles': bucket.throttles,
+                'Wait (s)': round(bucket.wait_seconds, 2),
+                'Rate (req/s)': round(bucket.rate, 2),
+                'Max Rate (req/s)': bucket.max_rate
+            }
+            for key, bucket in items
+        ]
+        rows.sort(key=lambda r: (r['Wait (s)'], r['Throttles']), reverse=True)
+        return rows[:limit] if limit else rows
+
+
+@st.cache_resource
+def get_throttle_governor() -> ThrottleGovernor:
+    """Get the process-wide throttle governor"""
+    from config_settings import AppConfig
+    return ThrottleGovernor(
+        retry_budget=AppConfig.THROTTLE_RETRY_BUDGET,
+        retry_refill_per_second=AppConfig.THROTTLE_RETRY_REFILL_PER_SECOND
+    )
@@ -0,0 +1,382 @@
+"""
+Cost Allocation - Tag-Based Showback with Shared-Cost Splitting
+Joins daily cost lines with inventory tags, applies allocation rules chunk by chunk and materializes showback tables
+"""
+
+import numpy as np
+import pandas as pd
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+from config_settings import AppConfig
+from cost_warehouse import CostWarehouse, get_cost_warehouse, submit_cost_job, utc_today
+
+
+# How each allocated dollar reached its value, in order of precedence
+RULE_SHARED = 'shared'              # Configured shared cost (support, NAT gateways...), split proportionally
+RULE_DIRECT = 'direct'              # The resource's own tag
+RULE_ACCOUNT = 'account'            # Inherited from the account's tag
+RULE_UNTAGGED = 'untagged'          # Neither; split proportionally when ALLOCATION_SPLIT_UNTAGGED is set
+RULE_UNALLOCATED = 'unallocated'    # Nothing in the account or organization that day to split against
+RULE_LABELS = {
+    RULE_DIRECT: 'Resource tag',
+    RULE_ACCOUNT: 'Account tag',
+    RULE_SHARED: 'Shared cost split',
+    RULE_UNTAGGED: 'Untagged cost split',
+    RULE_UNALLOCATED: 'Unallocated'
+}
+UNALLOCATED_VALUE = '(unallocated)'
+RULES = [RULE_SHARED, RULE_DIRECT, RULE_ACCOUNT, RULE_UNTAGGED, RULE_UNALLOCATED]
+
+LINE_COLUMNS = ['usage_date', 'account_id', 'service', 'resource_id', 'cost_amount']
+SHOWBACK_COLUMNS = ['dimension', 'usage_date', 'account_id', 'service', 'value', 'rule', 'cost_amount']
+GROUP_COLUMNS = ['usage_date', 'account_id', 'service', 'rule', 'value']
+
+
+def resource_tag_frame(table, tag_keys: List[str]) -> pd.DataFrame:
+    """
+    Long-form tags of an InventoryTable, keyed by both resource ID and ARN
+    
+    Cost and Usage Report resource IDs are instance IDs, volume IDs, bucket
+    names or full ARNs depending on the service, so each tag is reachable by
+    either identifier.
+    
+    Returns:
+        DataFrame with resource_id, tag_key, tag_value
+    """
+    from inventory_table import TAG_PAIR_SEPARATOR
+    
+    tag_rows, keys, pairs = table.tag_entries()
+    wanted = np.asarray(keys.isin(tag_keys))
+    rows = tag_rows[wanted]
+    split = pd.Series(np.asarray(pairs[wanted], dtype=object)).str.split(TAG_PAIR_SEPARATOR, n=1, expand=True)
+    if split.empty:
+        return pd.DataFrame(columns=['resource_id', 'tag_key', 'tag_value'])
+    
+    tags = pd.concat([
+        pd.DataFrame({'resource_id': table.frame[column].to_numpy(dtype=object)[rows], 'tag_key': split[0], 'tag_value': split[1]})
+        for column in ('resource_id', 'arn')
+    ], ignore_index=True)
+    tags = tags[tags['resource_id'].notna() & (tags['resource_id'] != '') & tags['tag_value'].notna() & (tags['tag_value'] != '')]
+    return tags.drop_duplicates(['resource_id', 'tag_key'], ignore_index=True)
+
+
+def registry_account_tags() -> Dict[str, Dict[str, str]]:
+    """
+    Tags every account passes down to its untagged resources
+    
+    The account registry's cost_center is inherited as CostCenter and its
+    environment as Environment; AppConfig.ALLOCATION_ACCOUNT_TAGS adds or
+    overrides per-account tags (e.g. the owning Team).
+    """
+    tags = {}
+    for account in AppConfig.get_aws_account_registry().all():
+        inherited = {'Environment': account.environment}
+        if account.cost_center:
+            inherited['CostCenter'] = account.cost_center
+        tags[account.account_id] = inherited
+    for account_id, overrides in AppConfig.ALLOCATION_ACCOUNT_TAGS.items():
+        tags.setdefault(account_id, {}).update(overrides)
+    return tags
+
+
+class _Labels:
+    """
+    String labels coded consistently across chunks
+    
+    Only each chunk's distinct labels are looked up, and `describe` computes
+    the properties of a label (an int array row) once, when it is first seen.
+    """
+    
+    def __init__(self, describe: Optional[Callable[[pd.Index], np.ndarray]] = None, width: int = 0):
+        self.index = pd.Index([], dtype=object)
+        self.describe = describe
+        self.properties = np.zeros((0, width), dtype=np.int64)
+    
+    def encode(self, values: pd.Series) -> np.ndarray:
+        codes, uniques = pd.factorize(values)
+        positions = self.index.get_indexer(uniques)
+        new = positions < 0
+        if new.any():
+            added = pd.Index(uniques[new], dtype=object)
+            positions[new] = len(self.index) + np.arange(len(added))
+            self.index = self.index.append(added)
+            if self.describe:
+                self.properties = np.concatenate([self.properties, self.describe(added)])
+        return positions[codes]
+
+
+def _lookup(values: Optional[pd.Series], labels: pd.Index) -> np.ndarray:
+    """Value code per label (-1 when untagged)"""
+    if values is None:
+        return np.full(len(labels), -1, dtype=np.int64)
+    positions = values.index.get_indexer(labels)
+    return np.where(positions >= 0, values.to_numpy()[positions], -1)
+
+
+def _reduce(rows: np.ndarray, radices: List[int]) -> np.ndarray:
+    """
+    Sum the cost of rows sharing the same codes
+    
+    Args:
+        rows: (n, 6) array of day, account, service, rule and value codes, then cost
+        radices: Size of each code column
+    
+    Returns:
+        Array of the same layout with one row per distinct code combination
+    """
+    codes = rows[:, :5].astype(np.int64)
+    keys = np.ravel_multi_index(tuple(codes.T), radices)
+    uniques, inverse = np.unique(keys, return_inverse=True)
+    reduced = np.empty((len(uniques), 6))
+    reduced[:, :5] = np.column_stack(np.unravel_index(uniques, radices))
+    reduced[:, 5] = np.bincount(inverse, weights=rows[:, 5], minlength=len(uniques))
+    return reduced
+
+
+class CostAllocator:
+    """
+    Allocates daily cost lines to the values of each allocation tag
+    
+    Every line takes, per tag key, the first rule that applies: shared cost
+    (service or resource ID matching the shared patterns), the resource's
+    own tag, or the account's tag; anything else is untagged. Lines are
+    processed a chunk at a time - resource IDs are factorized so each
+    distinct ID is looked up once - and reduced to (day, account, service,
+    rule, value) sums. Shared (and, if enabled, untagged) sums are then
+    split across the values the account's directly and account-tagged cost
+    went to that day, or the organization's if the account had none.
+    """
+    
+    def __init__(self, resource_tags: pd.DataFrame, account_tags: Dict[str, Dict[str, str]],
+                 tag_keys: Optional[List[str]] = None, shared_service_pattern: Optional[str] = None,
+                 shared_resource_pattern: Optional[str] = None, split_untagged: Optional[bool] = None):
+        """
+        Initialize allocator (defaults from the AppConfig ALLOCATION_* settings)
+        
+        Args:
+            resource_tags: resource_id, tag_key, tag_value (see resource_tag_frame)
+            account_tags: account_id -> {tag key: value} inherited by untagged resources
+            tag_keys: Tags to allocate by (one showback per key)
+            shared_service_pattern: Regex of services whose cost is shared
+            shared_resource_pattern: Regex of resource IDs whose cost is shared
+            split_untagged: Split untagged cost like shared cost instead of reporting it as unallocated
+        """
+        self.tag_keys = tag_keys or AppConfig.ALLOCATION_TAG_KEYS
+        self.shared_service_pattern = shared_service_pattern or AppConfig.ALLOCATION_SHARED_SERVICE_PATTERN
+        self.shared_resource_pattern = shared_resource_pattern or AppConfig.ALLOCATION_SHARED_RESOURCE_PATTERN
+        self.split_untagged = AppConfig.ALLOCATION_SPLIT_UNTAGGED if split_untagged is None else split_untagged
+        
+        # Values are coded once: per tag key, the value code of every tagged resource and account
+        resource_tags = resource_tags[resource_tags['tag_key'].isin(self.tag_keys)].drop_duplicates(['resource_id', 'tag_key'])
+        inherited = pd.DataFrame(
+            [(account_id, key, value) for account_id, tags in account_tags.items() for key, value in tags.items() if value],
+            columns=['account_id', 'tag_key', 'tag_value']
+        )
+        self._values = pd.Index(pd.unique(np.concatenate([
+            [''], resource_tags['tag_value'].to_numpy(dtype=object), inherited['tag_value'].to_numpy(dtype=object)
+        ])))
+        self._resource_values = {
+            key: pd.Series(self._values.get_indexer(group['tag_value']), index=pd.Index(group['resource_id']))
+            for key, group in resource_tags.groupby('tag_key')
+        }
+        self._account_values = {
+            key: pd.Series(self._values.get_indexer(group['tag_value']), index=pd.Index(group['account_id']))
+            for key, group in inherited.groupby('tag_key')
+        }
+    
+    def allocate(self, chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Allocate a stream of cost lines
+        
+        Args:
+            chunks: DataFrames with LINE_COLUMNS (resource_id '' for cost without a resource)
+        
+        Returns:
+            Showback rows with SHOWBACK_COLUMNS; per dimension they add up to the input cost
+        """
+        labels = self._labels()
+        parts = {key: [] for key in self.tag_keys}
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            for key, grouped in self._tag_chunk(chunk, labels).items():
+                parts[key].append(grouped)
+        
+        showback = []
+        for key in self.tag_keys:
+            if not parts[key]:
+                continue
+            reduced = _reduce(np.concatenate(parts[key]), self._radices(labels))
+            codes = reduced[:, :5].astype(np.int64)
+            grouped = pd.DataFrame({
+                'usage_date': labels['usage_date'].index.take(codes[:, 0]),
+                'account_id': labels['account_id'].index.take(codes[:, 1]),
+                'service': labels['service'].index.take(codes[:, 2]),
+                'rule': np.asarray(RULES, dtype=object)[codes[:, 3]],
+                'value': self._values.take(codes[:, 4]),
+                'cost_amount': reduced[:, 5]
+            })
+            showback.append(self._split(grouped).assign(dimension=key))
+        if not showback:
+            return pd.DataFrame(columns=SHOWBACK_COLUMNS)
+        return pd.concat(showback, ignore_index=True)[SHOWBACK_COLUMNS]
+    
+    def _radices(self, labels: Dict[str, _Labels]) -> List[int]:
+        """Sizes of the (day, account, service, rule, value) code columns"""
+        return [max(len(labels[column].index), 1) for column in ('usage_date', 'account_id', 'service')] + [len(RULES), len(self._values)]
+    
+    def _labels(self) -> Dict[str, _Labels]:
+        """
+        Label codes for one allocation run
+        
+        Services and resource IDs carry whether they match the shared
+        patterns, resource IDs and accounts their value code per tag key.
+        """
+        def matches(pattern: str) -> Callable[[pd.Index], np.ndarray]:
+            return lambda labels: np.asarray(labels.str.contains(pattern, case=False, regex=True), dtype=np.int64)[:, None]
+        
+        def values(lookups: Dict[str, pd.Series]) -> Callable[[pd.Index], np.ndarray]:
+            return lambda labels: np.column_stack([_lookup(lookups.get(key), labels) for key in self.tag_keys])
+        
+        def resources(labels: pd.Index) -> np.ndarray:
+            return np.column_stack([matches(self.shared_resource_pattern)(labels), values(self._resource_values)(labels)])
+        
+        width = len(self.tag_keys)
+        return {
+            'usage_date': _Labels(),
+            'account_id': _Labels(values(self._account_values), width),
+            'service': _Labels(matches(self.shared_service_pattern), 1),
+            'resource_id': _Labels(resources, width + 1)
+        }
+    
+    def _tag_chunk(self, chunk: pd.DataFrame, labels: Dict[str, _Labels]) -> Dict[str, np.ndarray]:
+        """Rule and value of every line of one chunk, reduced to (day, account, service, rule, value, cost) rows per tag key"""
+        date_codes = labels['usage_date'].encode(chunk['usage_date'])
+        account_codes = labels['account_id'].encode(chunk['account_id'])
+        service_codes = labels['service'].encode(chunk['service'])
+        resource_codes = labels['resource_id'].encode(chunk['resource_id'])
+        resources = labels['resource_id'].properties[resource_codes]
+        shared = (labels['service'].properties[service_codes, 0] | resources[:, 0]).astype(bool)
+        inherited = labels['account_id'].properties[account_codes]
+        costs = chunk['cost_amount'].to_numpy(dtype=float)
+        radices = self._radices(labels)
+        
+        grouped = {}
+        for position, key in enumerate(self.tag_keys):
+            direct = resources[:, position + 1]
+            account = inherited[:, position]
+            rule = np.select(
+                [shared, direct >= 0, account >= 0],
+                [RULES.index(RULE_SHARED), RULES.index(RULE_DIRECT), RULES.index(RULE_ACCOUNT)],
+                default=RULES.index(RULE_UNTAGGED)
+            )
+            value = np.where(shared, 0, np.where(direct >= 0, direct, np.maximum(account, 0)))
+            grouped[key] = _reduce(np.column_stack([date_codes, account_codes, service_codes, rule, value, costs]), radices)
+        return grouped
+    
+    def _split(self, grouped: pd.DataFrame) -> pd.DataFrame:
+        """Replace shared (and untagged) sums by their proportional split over the allocated values"""
+        allocated = grouped[grouped['rule'].isin([RULE_DIRECT, RULE_ACCOUNT])]
+        pooled_rules = [RULE_SHARED, RULE_UNTAGGED] if self.split_untagged else [RULE_SHARED]
+        pool = grouped[grouped['rule'].isin(pooled_rules)].drop(columns='value')
+        kept = grouped[grouped['rule'] == RULE_UNTAGGED] if not self.split_untagged else grouped.iloc[0:0]
+        
+        # Split within the account that day, else across the organization that day
+        remaining = pool
+        splits = []
+        for scope in (['usage_date', 'account_id'], ['usage_date']):
+            weights = allocated.groupby(scope + ['value'], as_index=False, sort=False)['cost_amount'].sum()
+            weights = weights[weights['cost_amount'] > 0]
+            weights = weights.assign(share=weights['cost_amount'] / weights.groupby(scope)['cost_amount'].transform('sum'))
+            matched = remaining.merge(weights[scope + ['value', 'share']], on=scope)
+            splits.append(matched.assign(cost_amount=matched['cost_amount'] * matched['share']).drop(columns='share'))
+            covered = weights[scope].drop_duplicates()
+            remaining = remaining.merge(covered, on=scope, how='left', indicator=True)
+            remaining = remaining[remaining['_merge'] == 'left_only'].drop(columns='_merge')
+        
+        unallocated = pd.concat([remaining, kept.drop(columns='value')], ignore_index=True).assign(
+            rule=RULE_UNALLOCATED, value=UNALLOCATED_VALUE
+        )
+        result = pd.concat([allocated] + splits + [unallocated], ignore_index=True)
+        return result.groupby(GROUP_COLUMNS, as_index=False, sort=False)['cost_amount'].sum()
+    
+    def run(self, warehouse: CostWarehouse, start: date, end: date, snapshot_id: Optional[str] = None) -> Dict:
+        """
+        Allocate [start, end) from the warehouse and replace its showback rows for that range
+        
+        Each day and account covered by Cost and Usage Report files is
+        allocated from its CUR lines (per resource); the rest from the Cost
+        Explorer daily rollup, which carries no resource, so only account tags
+        and splits apply there.
+        
+        Returns:
+            Dict with source ('cur', 'cost_explorer' or 'cur+cost_explorer'), lines, cost,
+            unallocated (per tag key), rows and seconds
+        """
+        started = time.perf_counter()
+        totals = {'lines': 0, 'cost': 0.0, 'sources': set()}
+        run = {
+            'run_at': datetime.now(timezone.utc).isoformat(),
+            'start_date': start.isoformat(),
+            'end_date': end.isoformat(),
+            'snapshot_id': snapshot_id
+        }
+        
+        def counted(chunks: Iterable[Tuple[str, pd.DataFrame]]) -> Iterable[pd.DataFrame]:
+            for source, chunk in chunks:
+                totals['lines'] += len(chunk)
+                totals['cost'] += float(chunk['cost_amount'].sum())
+                totals['sources'].add(source)
+                yield chunk
+        
+        def finished(**fields) -> Dict:
+            source = '+'.join(sorted(totals['sources'])) or 'cost_explorer'
+            return dict(run, source=source, lines=totals['lines'], seconds=time.perf_counter() - started, **fields)
+        
+        try:
+            showback = self.allocate(counted(warehouse.iter_allocation_lines(start, end, AppConfig.ALLOCATION_CHUNK_ROWS)))
+            run = finished()
+            warehouse.replace_allocation(start, end, showback, run)
+        except Exception as e:
+            warehouse.record_allocation_failure(finished(error=str(e)))
+            raise
+        unallocated = showback[showback['rule'] == RULE_UNALLOCATED].groupby('dimension')['cost_amount'].sum()
+        return {
+            'source': run['source'],
+            'lines': totals['lines'],
+            'cost': totals['cost'],
+            'unallocated': {key: float(unallocated.get(key, 0.0)) for key in self.tag_keys},
+            'rows': len(showback),
+            'seconds': run['seconds']
+        }
+
+
+def submit_cost_allocation() -> Optional[str]:
+    """
+    Queue a background allocation run over the last ALLOCATION_DAYS, unless one is already running
+    
+    The latest inventory snapshot's tags and the account tags are resolved
+    here, on the calling Streamlit thread, and handed to the worker.
+    
+    Returns:
+        Task ID of the new or the running allocation (see submit_cost_job)
+    """
+    from inventory_service import get_inventory_store
+    from inventory_table import get_inventory_table
+    
+    snapshot = get_inventory_store().latest_snapshot()
+    resource_tags = pd.DataFrame(columns=['resource_id', 'tag_key', 'tag_value'])
+    if snapshot:
+        table = get_inventory_table(snapshot['snapshot_id'], snapshot['revision'] or 0)
+        resource_tags = resource_tag_frame(table, AppConfig.ALLOCATION_TAG_KEYS)
+    
+    allocator = CostAllocator(resource_tags, registry_account_tags())
+    warehouse = get_cost_warehouse()
+    end = utc_today()
+    return submit_cost_job(warehouse, 'allocation', 'Allocate cost by tag', allocator.run, {
+        'warehouse': warehouse,
+        'start': end - timedelta(days=AppConfig.ALLOCATION_DAYS),
+        'end': end,
+        'snapshot_id': snapshot['snapshot_id'] if snapshot else None
+    })
@@ -0,0 +1,422 @@
+"""
+Cost Anomaly Detection - Vectorized Scoring of Every Daily Cost Series
+Robust rolling baselines with day-of-week seasonality over account, service, region and tag series
+"""
+
+import streamlit as st
+import numpy as np
+import pandas as pd
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import date, timedelta
+from numpy.lib.stride_tricks import sliding_window_view
+from config_settings import AppConfig
+
+
+# Series levels, coarsest first, and the key columns identifying a series of each
+LEVEL_ACCOUNT = 'account'
+LEVEL_SERVICE = 'service'
+LEVEL_REGION = 'region'
+LEVEL_TAG = 'tag'
+LEVEL_KEYS = {
+    LEVEL_ACCOUNT: ['account_id'],
+    LEVEL_SERVICE: ['account_id', 'service'],
+    LEVEL_REGION: ['account_id', 'service', 'region'],
+    LEVEL_TAG: ['account_id', 'service', 'tag_key', 'tag_value']
+}
+# A series' parent is the series one level up with the same keys
+PARENT_LEVEL = {LEVEL_SERVICE: LEVEL_ACCOUNT, LEVEL_REGION: LEVEL_SERVICE, LEVEL_TAG: LEVEL_SERVICE}
+KEY_COLUMNS = ['account_id', 'service', 'region', 'tag_key', 'tag_value']
+
+MAD_SCALE = 1.4826                  # MAD -> standard deviation for normally distributed noise
+MIN_WINDOW_DAYS = 7                 # Shortest baseline window scored at all
+SEASONAL_SHRINK_WEEKS = 2           # Weekday factors are shrunk toward 1 as if this many flat weeks were added
+SEASONAL_FACTOR_RANGE = (0.2, 5.0)
+CHUNK_SERIES = 8192                 # Series per median pass (bounds the windowed copy to ~50 MB)
+MAX_DRIVERS = 5
+
+# Severity by multiple of the series' threshold margin, highest first; any flagged day is at least Medium
+SEVERITY_BANDS = ((4.0, 'Critical'), (2.0, 'High'))
+
+
+class CostSeries:
+    """
+    Dense (series x day) cost matrix with the keys and parent of every series
+    
+    Rows cover every account, account/service, account/service/region and
+    account/service/tag value seen in the facts; columns are consecutive days.
+    """
+    
+    def __init__(self, keys: pd.DataFrame, days: pd.DatetimeIndex, values: np.ndarray):
+        self.keys = keys        # level, account_id, account_name, service, region, tag_key, tag_value, parent
+        self.days = days
+        self.values = values
+        self.parent = keys['parent'].to_numpy()
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    @classmethod
+    def from_facts(cls, cost_facts: pd.DataFrame, tag_facts: pd.DataFrame, end: date, days: int) -> 'CostSeries':
+        """
+        Build every series from warehouse leaf facts
+        
+        Args:
+            cost_facts: account_id, account_name, cost_date (ISO), service, region, cost_amount
+            tag_facts: account_id, cost_date (ISO), tag_key, tag_value, service, cost_amount
+            end: Day after the last column
+            days: Number of columns
+        """
+        from cost_warehouse import GLOBAL_REGION
+        
+        day_range = pd.date_range(end - timedelta(days=days), periods=days, freq='D')
+        day_labels = pd.Index(day_range.strftime('%Y-%m-%d'))
+        
+        # cost_data rows written before regions were ingested have no region
+        costs = cost_facts.fillna({'region': GLOBAL_REGION, 'service': '', 'account_name': ''})
+        
+        # Leaf series are built from the facts; services and accounts are summed from their children
+        region_codes, region_keys = _factorize_keys(costs, LEVEL_KEYS[LEVEL_REGION], carry=['account_name'])
+        region_values = _accumulate(costs, region_codes, len(region_keys), day_labels)
+        service_codes, service_keys = _factorize_keys(region_keys, LEVEL_KEYS[LEVEL_SERVICE], carry=['account_name'])
+        service_values = _rollup(region_values, service_codes, len(service_keys))
+        account_codes, account_keys = _factorize_keys(service_keys, LEVEL_KEYS[LEVEL_ACCOUNT], carry=['account_name'])
+        account_values = _rollup(service_values, account_codes, len(account_keys))
+        tag_codes, tag_keys = _factorize_keys(tag_facts, LEVEL_KEYS[LEVEL_TAG])
+        tag_values = _accumulate(tag_facts, tag_codes, len(tag_keys), day_labels)
+        
+        service_offset = len(account_keys)
+        region_offset = service_offset + len(service_keys)
+        account_keys['parent'] = -1
+        service_keys['parent'] = account_codes
+        region_keys['parent'] = service_offset + service_codes
+        # Tag facts come from separate Cost Explorer queries, so their service may have no cost_data series
+        positions = service_keys[LEVEL_KEYS[LEVEL_SERVICE]].assign(position=np.arange(service_offset, region_offset))
+        tag_keys['parent'] = tag_keys.merge(positions, how='left', on=LEVEL_KEYS[LEVEL_SERVICE])['position'].fillna(-1).to_numpy(dtype=np.int64)
+        tag_keys['account_name'] = tag_keys['account_id'].map(account_keys.set_index('account_id')['account_name'])
+        
+        keys = pd.concat([
+            frame.assign(level=level)
+            for level, frame in ((LEVEL_ACCOUNT, account_keys), (LEVEL_SERVICE, service_keys),
+                                 (LEVEL_REGION, region_keys), (LEVEL_TAG, tag_keys))
+        ], ignore_index=True)
+        for column in KEY_COLUMNS + ['account_name']:
+            keys[column] = keys[column].fillna('') if column in keys else ''
+        keys = keys[['level', 'account_id', 'account_name', 'service', 'region', 'tag_key', 'tag_value', 'parent']]
+        return cls(keys, day_range, np.vstack([account_values, service_values, region_values, tag_values]))
+    
+    def value(self, index: int) -> str:
+        """The series' own value of its dimension"""
+        row = self.keys.iloc[index]
+        if row['level'] == LEVEL_TAG:
+            return row['tag_value'] or '(untagged)'
+        if row['level'] == LEVEL_ACCOUNT:
+            return row['account_name'] or row['account_id']
+        return row[row['level']]
+    
+    def label(self, index: int) -> str:
+        """Human readable path, e.g. 'Production / AmazonEC2 / us-east-1'"""
+        row = self.keys.iloc[index]
+        parts = [row['account_name'] or row['account_id']]
+        if row['level'] != LEVEL_ACCOUNT:
+            parts.append(row['service'])
+        if row['level'] == LEVEL_REGION:
+            parts.append(row['region'])
+        elif row['level'] == LEVEL_TAG:
+            parts.append(f"{row['tag_key']}={row['tag_value'] or '(untagged)'}")
+        return ' / '.join(parts)
+
+
+def _factorize_keys(frame: pd.DataFrame, columns: List[str], carry: List[str] = ()) -> Tuple[np.ndarray, pd.DataFrame]:
+    """
+    Integer code of every row's key combination, and the combinations
+    
+    Each column is factorized once and the codes combined arithmetically,
+    which is much faster than grouping on several string columns.
+    
+    Returns:
+        (code per row, DataFrame of columns + carry for each code, from its first row)
+    """
+    combined = np.zeros(len(frame), dtype=np.int64)
+    for column in columns:
+        codes, uniques = pd.factorize(frame[column], use_na_sentinel=False)
+        combined = combined * len(uniques) + codes
+    codes, _ = pd.factorize(combined)
+    _, first_rows = np.unique(codes, return_index=True)
+    keys = frame[list(columns) + list(carry)].iloc[first_rows].reset_index(drop=True)
+    return codes.astype(np.int64), keys
+
+
+def _accumulate(frame: pd.DataFrame, codes: np.ndarray, count: int, day_labels: pd.Index) -> np.ndarray:
+    """(series, day) matrix of cost_amount, dropping facts outside the days"""
+    date_codes, dates = pd.factorize(frame['cost_date'])
+    positions = day_labels.get_indexer(dates)[date_codes]
+    inside = positions >= 0
+    days = len(day_labels)
+    return np.bincount(
+        codes[inside] * days + positions[inside],
+        weights=frame['cost_amount'].to_numpy(dtype=float)[inside],
+        minlength=count * days
+    ).reshape(count, days)
+
+
+def _rollup(values: np.ndarray, codes: np.ndarray, count: int) -> np.ndarray:
+    """Sum the rows of `values` into `count` parent rows"""
+    if not count:
+        return np.zeros((0, values.shape[1]))
+    order = np.argsort(codes, kind='stable')
+    starts = np.searchsorted(codes[order], np.arange(count))
+    return np.add.reduceat(values[order], starts, axis=0)
+
+
+class AnomalyResult:
+    """Scores of the trailing days of every series, and the days flagged as anomalies"""
+    
+    def __init__(self, series: CostSeries, scored_from: int, expected: np.ndarray, threshold: np.ndarray,
+                 anomalies: pd.DataFrame, seconds: float):
+        self.series = series
+        self.scored_from = scored_from    # First scored day column
+        self.expected = expected          # (series, scored days)
+        self.threshold = threshold        # (series, scored days); cost above this is anomalous
+        self.anomalies = anomalies
+        self.seconds = seconds
+    
+    def frame(self, roots_only: bool = True, levels: Optional[Iterable[str]] = None,
+              severities: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        Anomalies, largest excess first
+        
+        Args:
+            roots_only: Drop anomalies whose parent series is anomalous the same day
+                (they appear as that anomaly's drivers)
+            levels: Keep only these series levels
+            severities: Keep only these severities
+        """
+        frame = self.anomalies
+        if roots_only:
+            frame = frame[frame['root']]
+        if levels is not None:
+            frame = frame[frame['level'].isin(list(levels))]
+        if severities is not None:
+            frame = frame[frame['severity'].isin(list(severities))]
+        return frame
+    
+    def history(self, index: int) -> pd.DataFrame:
+        """Daily cost of one series with its expected cost and threshold over the scored days"""
+        frame = pd.DataFrame({'date': self.series.days, 'actual': self.series.values[index]})
+        frame['expected'] = np.nan
+        frame['threshold'] = np.nan
+        frame.loc[self.scored_from:, 'expected'] = self.expected[index]
+        frame.loc[self.scored_from:, 'threshold'] = self.threshold[index]
+        return frame
+    
+    def summary(self) -> Dict:
+        roots = self.anomalies[self.anomalies['root']]
+        return {
+            'series': len(self.series),
+            'days_scored': self.expected.shape[1],
+            'anomalies': len(roots),
+            'flagged_series_days': len(self.anomalies),
+            'critical': int((roots['severity'] == 'Critical').sum()),
+            'excess': float(roots['excess'].sum()),
+            'seconds': self.seconds
+        }
+
+
+class CostAnomalyDetector:
+    """
+    Flags cost spikes in every series of a CostSeries at once
+    
+    Each scored day is compared with the median of the previous window_days
+    of the same series after dividing out its day-of-week profile (learned
+    from the days before the scored ones). The spread is the MAD of that
+    window, so the threshold adapts per series: a day is anomalous when it
+    exceeds the expected cost by z_threshold robust deviations and by at
+    least min_relative of the expected cost and min_impact dollars.
+    """
+    
+    def __init__(self, window_days: Optional[int] = None, scoring_days: Optional[int] = None,
+                 z_threshold: Optional[float] = None, min_impact: Optional[float] = None,
+                 min_relative: Optional[float] = None):
+        """
+        Initialize detector (defaults from the AppConfig ANOMALY_* settings)
+        
+        Args:
+            window_days: Rolling baseline window
+            scoring_days: Trailing days scored
+            z_threshold: Robust z-score that flags a day
+            min_impact: Dollars over the expected cost below which nothing is flagged
+            min_relative: Fraction over the expected cost below which nothing is flagged
+        """
+        self.window_days = window_days or AppConfig.ANOMALY_WINDOW_DAYS
+        self.scoring_days = scoring_days or AppConfig.ANOMALY_SCORING_DAYS
+        self.z_threshold = z_threshold or AppConfig.ANOMALY_Z_THRESHOLD
+        self.min_impact = AppConfig.ANOMALY_MIN_IMPACT if min_impact is None else min_impact
+        self.min_relative = AppConfig.ANOMALY_MIN_RELATIVE if min_relative is None else min_relative
+    
+    @staticmethod
+    def seasonal_factors(history: np.ndarray, weekdays: np.ndarray) -> np.ndarray:
+        """
+        Day-of-week factors per series: weekday median / overall median
+        
+        Args:
+            history: (series, days) cost
+            weekdays: Weekday (0 = Monday) of each day column
+        
+        Returns:
+            (series, 7) multiplicative factors; 1 for series without enough history
+        """
+        factors = np.ones((len(history), 7))
+        if history.shape[1] < 14:
+            return factors
+        
+        overall = np.median(history, axis=1)
+        active = overall > 0
+        active_history = history[active]
+        for weekday in range(7):
+            columns = weekdays == weekday
+            weeks = int(columns.sum())
+            ratio = np.median(active_history[:, columns], axis=1) / overall[active]
+            factors[active, weekday] = 1 + (ratio - 1) * weeks / (weeks + SEASONAL_SHRINK_WEEKS)
+        return np.clip(factors, *SEASONAL_FACTOR_RANGE)
+    
+    def score(self, series: CostSeries) -> AnomalyResult:
+        """Score the trailing days of every series"""
+        started = time.perf_counter()
+        values = series.values
+        count, days = values.shape
+        scoring_days = min(self.scoring_days, max(days - MIN_WINDOW_DAYS, 0))
+        window = min(self.window_days, days - scoring_days)
+        scored_from = days - scoring_days
+        if not count or not scoring_days:
+            empty = np.zeros((count, 0))
+            return AnomalyResult(series, days, empty, empty, _anomaly_frame(series, [], [], {}), time.perf_counter() - started)
+        
+        weekdays = series.days.dayofweek.to_numpy()
+        season = self.seasonal_factors(values[:, :scored_from], weekdays[:scored_from])[:, weekdays]
+        adjusted = values / season
+        
+        # Window k covers the `window` days before scored day k
+        windows = sliding_window_view(adjusted, window, axis=1)[:, scored_from - window:days - window]
+        level = np.empty((count, scoring_days))
+        spread = np.empty((count, scoring_days))
+        for start in range(0, count, CHUNK_SERIES):
+            chunk = windows[start:start + CHUNK_SERIES]
+            median = np.median(chunk, axis=2)
+            level[start:start + CHUNK_SERIES] = median
+            spread[start:start + CHUNK_SERIES] = np.median(np.abs(chunk - median[..., None]), axis=2) * MAD_SCALE
+        
+        scored_season = season[:, scored_from:]
+        expected = level * scored_season
+        margin = np.maximum(
+            np.maximum(self.z_threshold * spread * scored_season, self.min_relative * expected),
+            max(self.min_impact, 1e-9)
+        )
+        actual = values[:, scored_from:]
+        excess = actual - expected
+        # Excess in units of the margin, scaled so the threshold sits at z_threshold
+        multiple = excess / margin
+        flagged = multiple >= 1
+        
+        rows, columns = np.nonzero(flagged)
+        parent = series.parent[rows]
+        root = np.ones(len(rows), dtype=bool)
+        has_parent = parent >= 0
+        root[has_parent] = ~flagged[parent[has_parent], columns[has_parent]]
+        
+        arrays = {
+            'actual': actual[rows, columns],
+            'expected': expected[rows, columns],
+            'excess': excess[rows, columns],
+            'score': self.z_threshold * multiple[rows, columns],
+            'multiple': multiple[rows, columns],
+            'root': root,
+            'date': series.days[scored_from + columns].strftime('%Y-%m-%d')
+        }
+        drivers = self._drivers(series, excess, expected, actual, rows, columns)
+        anomalies = _anomaly_frame(series, rows, drivers, arrays)
+        return AnomalyResult(series, scored_from, expected, expected + margin, anomalies, time.perf_counter() - started)
+    
+    @staticmethod
+    def _drivers(series: CostSeries, excess: np.ndarray, expected: np.ndarray, actual: np.ndarray,
+                 rows: np.ndarray, columns: np.ndarray) -> List[List[Dict]]:
+        """
+        The descendants contributing most to each anomaly, one per dimension
+        
+        An account anomaly is explained by its top service and, below that
+        service, its top region and top value of each tag key; a service
+        anomaly by its top region and tag values.
+        """
+        order = np.argsort(series.parent, kind='stable')
+        sorted_parent = series.parent[order]
+        levels = series.keys['level'].to_numpy()
+        dimensions = np.where(levels == LEVEL_TAG, series.keys['tag_key'].to_numpy(), levels)
+        
+        drivers = []
+        for row, column in zip(rows, columns):
+            found = {}
+            pending = [row]
+            while pending:
+                node = pending.pop(0)
+                children = order[np.searchsorted(sorted_parent, node, side='left'):np.searchsorted(sorted_parent, node, side='right')]
+                children = children[excess[children, column] > 0]
+                for child in children[np.argsort(-excess[children, column], kind='stable')]:
+                    if dimensions[child] not in found:
+                        found[dimensions[child]] = child
+                        if levels[child] == LEVEL_SERVICE:
+                            pending.append(child)
+            drivers.append([
+                {
+                    'dimension': dimension,
+                    'value': series.value(child),
+                    'actual': float(actual[child, column]),
+                    'expected': float(expected[child, column]),
+                    'excess': float(excess[child, column]),
+                    'share': float(excess[child, column] / excess[row, column])
+                }
+                for dimension, child in list(found.items())[:MAX_DRIVERS]
+            ])
+        return drivers
+
+
+def _anomaly_frame(series: CostSeries, rows, drivers: List[List[Dict]], arrays: Dict) -> pd.DataFrame:
+    """One row per flagged (series, day), with the series keys and drill-down drivers"""
+    keys = series.keys.iloc[np.asarray(rows, dtype=np.int64)].drop(columns='parent')
+    frame = keys.assign(series=np.asarray(rows, dtype=np.int64), **arrays).reset_index(drop=True)
+    if frame.empty:
+        return frame.assign(deviation_pct=[], severity=[], label=[], drivers=[])
+    
+    # New spend (nothing expected) has no percentage
+    frame['deviation_pct'] = frame['excess'] / frame['expected'].where(frame['expected'] > 0) * 100
+    frame['severity'] = np.select(
+        [frame['multiple'] >= bound for bound, _ in SEVERITY_BANDS],
+        [severity for _, severity in SEVERITY_BANDS],
+        default='Medium'
+    )
+    frame['label'] = [series.label(index) for index in frame['series']]
+    frame['drivers'] = drivers
+    return frame.sort_values('excess', ascending=False, ignore_index=True)
+
+
+def format_drivers(drivers: List[Dict]) -> str:
+    """'region us-east-1 +$812 (95%); Team payments +$640 (75%)'"""
+    return '; '.join(
+        f"{driver['dimension']} {driver['value']} +${driver['excess']:,.0f} ({driver['share']:.0%})"
+        for driver in drivers
+    )
+
+
+@st.cache_resource(max_entries=2, show_spinner="Scoring cost anomalies...")
+def get_cost_anomalies(last_run: str, end: date) -> AnomalyResult:
+    """
+    Get anomalies over the cost warehouse
+    
+    Args:
+        last_run: Warehouse's last ingestion (part of the cache key only)
+        end: Day after the last scored day; today is excluded as it is still accruing
+    """
+    from cost_warehouse import get_cost_warehouse
+    
+    days = AppConfig.ANOMALY_HISTORY_DAYS
+    cost_facts, tag_facts = get_cost_warehouse().daily_facts(end - timedelta(days=days), end)
+    return CostAnomalyDetector().score(CostSeries.from_facts(cost_facts, tag_facts, end, days))
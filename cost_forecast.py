@@ -0,0 +1,481 @@
+"""
+Cost Forecasting - Batched Exponential Smoothing of Every Account/Service Cost Series
+Damped-trend Holt-Winters with weekly seasonality, fitted in one vectorized pass and refitted incrementally
+"""
+
+import streamlit as st
+import numpy as np
+import pandas as pd
+import time
+from typing import Dict, List, Optional, Tuple
+from datetime import date, timedelta
+from config_settings import AppConfig
+from cost_anomaly import _accumulate
+
+
+MODEL_HOLT_WINTERS = 'holt_winters'
+MODEL_LINEAR = 'linear'
+
+SEASON_DAYS = 7
+SEASON_COLUMNS = [f'season_{weekday}' for weekday in range(SEASON_DAYS)]   # Additive weekday effects, Monday first
+KEY_COLUMNS = ['account_id', 'service']
+PARAMETER_COLUMNS = ['alpha', 'beta', 'gamma', 'phi']
+MODEL_COLUMNS = ['model'] + PARAMETER_COLUMNS + ['level', 'trend'] + SEASON_COLUMNS + ['scale', 'sse', 'observations']
+STATE_COLUMNS = KEY_COLUMNS + ['account_name'] + MODEL_COLUMNS + ['state_date', 'fitted_on']
+
+# Smoothing parameters tried for every series: (alpha, beta as a fraction of alpha, gamma)
+PARAMETER_GRID = [
+    (alpha, beta, gamma)
+    for alpha in (0.1, 0.3, 0.6)
+    for beta in (0.0, 0.1, 0.3)
+    for gamma in (0.05, 0.2)
+]
+ERROR_CLIP = 3.0                    # One-step errors beyond this many error scales are outliers and clipped
+SCALE_SMOOTHING = 0.1               # Weight of each day's clipped absolute error in the running error scale
+SCALE_FLOOR = 0.01                  # Error scale never drops below this fraction of the level (or a cent)
+INTERVAL_Z = 1.2816                 # 80% prediction interval
+
+
+class CostForecast:
+    """Fitted state of every series at the forecast origin, and forecasts from it"""
+    
+    def __init__(self, states: pd.DataFrame, origin: date, seconds: float, refitted: int = 0, advanced: int = 0):
+        self.states = states.reset_index(drop=True)    # STATE_COLUMNS (state_date/fitted_on optional)
+        self.origin = origin                            # Last day folded into the states
+        self.seconds = seconds
+        self.refitted = refitted                        # Series fitted from scratch this run
+        self.advanced = advanced                        # Series whose stored fit was carried forward
+    
+    def __len__(self) -> int:
+        return len(self.states)
+    
+    def daily(self, horizon: int) -> Tuple[pd.DatetimeIndex, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Daily forecast of every series for the `horizon` days after the origin
+        
+        Returns:
+            (days, expected, lower, upper) with (series, day) arrays; lower/upper bound the 80% interval
+        """
+        days = pd.date_range(self.origin + timedelta(days=1), periods=horizon, freq='D')
+        steps = np.arange(1, horizon + 1)
+        state = {column: self.states[column].to_numpy(dtype=float) for column in MODEL_COLUMNS[1:]}
+        
+        # phi + phi^2 + ... + phi^h, the damped trend multiplier for h steps ahead
+        damped = np.cumsum(state['phi'][:, None] ** steps[None, :], axis=1)
+        season = self.states[SEASON_COLUMNS].to_numpy(dtype=float)[:, days.dayofweek.to_numpy()]
+        expected = state['level'][:, None] + damped * state['trend'][:, None] + season
+        
+        # ETS(A,Ad,A) forecast variance: sigma^2 * (1 + sum over j < h of c_j^2), sigma from the clipped errors
+        sigma = np.sqrt(state['sse'] / np.maximum(state['observations'], 1))
+        effect = (state['alpha'][:, None] + state['beta'][:, None] * damped
+                  + state['gamma'][:, None] * (steps % SEASON_DAYS == 0)[None, :])
+        accumulated = np.cumsum(effect ** 2, axis=1) - effect ** 2
+        half_width = INTERVAL_Z * sigma[:, None] * np.sqrt(1 + accumulated)
+        
+        return days, expected.clip(min=0), (expected - half_width).clip(min=0), (expected + half_width).clip(min=0)
+    
+    def totals(self, horizon: int, account_ids: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Forecast total cost per day (date, forecast, lower, upper)
+        
+        The interval adds up the series' intervals, so it is conservative.
+        """
+        days, expected, lower, upper = self.daily(horizon)
+        rows = np.ones(len(self), dtype=bool) if account_ids is None else self.states['account_id'].isin(account_ids).to_numpy()
+        return pd.DataFrame({
+            'date': days,
+            'forecast': expected[rows].sum(axis=0),
+            'lower': lower[rows].sum(axis=0),
+            'upper': upper[rows].sum(axis=0)
+        })
+    
+    def by_account(self, through: date) -> pd.DataFrame:
+        """Forecast cost per account from the day after the origin through `through` (account_id, account_name, forecast, lower, upper)"""
+        horizon = max((through - self.origin).days, 0)
+        _, expected, lower, upper = self.daily(horizon)
+        frame = self.states[['account_id', 'account_name']].assign(
+            forecast=expected.sum(axis=1), lower=lower.sum(axis=1), upper=upper.sum(axis=1)
+        )
+        return frame.groupby('account_id', as_index=False).agg(
+            account_name=('account_name', 'first'), forecast=('forecast', 'sum'),
+            lower=('lower', 'sum'), upper=('upper', 'sum')
+        )
+    
+    def series_frame(self, horizon: int) -> pd.DataFrame:
+        """One row per series with its model, forecast over the horizon and daily trend, highest forecast first"""
+        _, expected, lower, upper = self.daily(horizon)
+        frame = self.states[['account_id', 'account_name', 'service', 'model']].assign(
+            forecast=expected.sum(axis=1), lower=lower.sum(axis=1), upper=upper.sum(axis=1),
+            trend_per_day=self.states['trend'].to_numpy()
+        )
+        return frame.sort_values('forecast', ascending=False, ignore_index=True)
+    
+    def summary(self) -> Dict:
+        return {
+            'series': len(self),
+            'holt_winters': int((self.states['model'] == MODEL_HOLT_WINTERS).sum()),
+            'linear': int((self.states['model'] == MODEL_LINEAR).sum()),
+            'refitted': self.refitted,
+            'advanced': self.advanced,
+            'origin': self.origin,
+            'seconds': self.seconds
+        }
+
+
+class CostForecaster:
+    """
+    Forecasts every account/service daily cost series at once
+    
+    Series with at least min_seasonal_days of history get an additive
+    damped-trend Holt-Winters model with weekly seasonality, its smoothing
+    parameters chosen per series from PARAMETER_GRID by one-step-ahead
+    error; shorter series get a least-squares linear trend. All series and
+    all grid points run through the recursions together, one day at a time.
+    
+    Against the warehouse, fitted states are stored at the settled watermark
+    and later runs only replay the days that landed since, with the stored
+    parameters; everything is refitted every refit_days.
+    """
+    
+    def __init__(self, history_days: Optional[int] = None, refit_days: Optional[int] = None,
+                 min_seasonal_days: Optional[int] = None, damping: Optional[float] = None):
+        """
+        Initialize forecaster (defaults from the AppConfig FORECAST_* settings)
+        
+        Args:
+            history_days: Days of history a full fit reads
+            refit_days: Days after which stored parameters are refitted
+            min_seasonal_days: Shortest history fitted with Holt-Winters (shorter gets a linear trend)
+            damping: Trend damping factor phi for Holt-Winters series
+        """
+        self.history_days = history_days or AppConfig.FORECAST_HISTORY_DAYS
+        self.refit_days = refit_days or AppConfig.FORECAST_REFIT_DAYS
+        self.min_seasonal_days = max(min_seasonal_days or AppConfig.FORECAST_MIN_SEASONAL_DAYS, 2 * SEASON_DAYS)
+        self.damping = damping or AppConfig.FORECAST_DAMPING
+    
+    def fit(self, values: np.ndarray, first_day: date, end: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Fit every row of a (series x day) cost matrix
+        
+        Args:
+            values: (series, days) cost; every row must have some cost before its end
+            first_day: Day of the first column
+            end: Column after the last one each row observed (default: all columns)
+        
+        Returns:
+            MODEL_COLUMNS per row, the state after its last observed column
+        """
+        count, days = values.shape
+        if not count:
+            return pd.DataFrame(columns=MODEL_COLUMNS)
+        end = np.full(count, days, dtype=np.int64) if end is None else end
+        weekdays = _weekdays(first_day, days)
+        first = np.argmax(values != 0, axis=1)
+        seasonal = end - first >= self.min_seasonal_days
+        
+        holt_winters = self._fit_holt_winters(values[seasonal], first[seasonal], end[seasonal], weekdays)
+        linear = _fit_linear(values[~seasonal], first[~seasonal], end[~seasonal])
+        return pd.concat([
+            holt_winters.set_axis(np.flatnonzero(seasonal)),
+            linear.set_axis(np.flatnonzero(~seasonal))
+        ]).sort_index()
+    
+    def _fit_holt_winters(self, values: np.ndarray, first: np.ndarray, end: np.ndarray, weekdays: np.ndarray) -> pd.DataFrame:
+        """Grid search the smoothing parameters of every series in one pass"""
+        count, days = values.shape
+        
+        # Initial level/trend from the first two weeks after a series starts, weekday effects from the first
+        window = np.take_along_axis(values, first[:, None] + np.arange(2 * SEASON_DAYS), axis=1)
+        level = window[:, :SEASON_DAYS].mean(axis=1)
+        trend = (window[:, SEASON_DAYS:].mean(axis=1) - level) / SEASON_DAYS
+        season = np.zeros((count, SEASON_DAYS))
+        np.put_along_axis(season, weekdays[first[:, None] + np.arange(SEASON_DAYS)],
+                          window[:, :SEASON_DAYS] - level[:, None], axis=1)
+        # Initial error scale: how far the second week strays from what the first predicts
+        second_week = weekdays[first[:, None] + np.arange(SEASON_DAYS, 2 * SEASON_DAYS)]
+        scale = np.abs(window[:, SEASON_DAYS:] - level[:, None] - np.take_along_axis(season, second_week, axis=1)).mean(axis=1)
+        
+        grid = np.array(PARAMETER_GRID)
+        rows = np.repeat(np.arange(count), len(grid))
+        alpha = np.tile(grid[:, 0], count)
+        parameters = {
+            'alpha': alpha,
+            'beta': alpha * np.tile(grid[:, 1], count),
+            'gamma': np.tile(grid[:, 2], count),
+            'phi': np.full(len(rows), self.damping)
+        }
+        state = {'level': level[rows], 'trend': trend[rows], 'season': season[rows], 'scale': scale[rows]}
+        # The first week only settles the initial state, so it is not scored
+        state = _smooth(values, weekdays, parameters, state, start=first[rows], score_from=first[rows] + SEASON_DAYS,
+                        rows=rows, end=end[rows])
+        
+        best = np.arange(count) * len(grid) + np.argmin(state['sse'].reshape(count, len(grid)), axis=1)
+        frame = pd.DataFrame({column: parameters[column][best] for column in PARAMETER_COLUMNS})
+        frame[SEASON_COLUMNS] = state['season'][best]
+        return frame.assign(
+            model=MODEL_HOLT_WINTERS, level=state['level'][best], trend=state['trend'][best],
+            scale=state['scale'][best], sse=state['sse'][best], observations=state['observations'][best]
+        )[MODEL_COLUMNS]
+    
+    @staticmethod
+    def advance(states: pd.DataFrame, values: np.ndarray, first_day: date, start: np.ndarray,
+                end: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Carry fitted states forward over new days with their stored parameters
+        
+        Args:
+            states: MODEL_COLUMNS per row
+            values: (series, days) cost of the days to fold in
+            first_day: Day of the first column
+            start: First column each row folds in (earlier columns are already in its state)
+            end: Column after the last one each row folds in (default: all columns)
+        
+        Returns:
+            states with level, trend, season, sse and observations updated
+        """
+        if not len(states) or not values.shape[1]:
+            return states.copy()
+        parameters = {column: states[column].to_numpy(dtype=float) for column in PARAMETER_COLUMNS}
+        state = {column: states[column].to_numpy(dtype=float) for column in ('level', 'trend', 'scale')}
+        state['season'] = states[SEASON_COLUMNS].to_numpy(dtype=float)
+        state = _smooth(values, _weekdays(first_day, values.shape[1]), parameters, state, start=start, score_from=start,
+                        end=end)
+        
+        advanced = states.copy()
+        for column in ('level', 'trend', 'scale'):
+            advanced[column] = state[column]
+        advanced[SEASON_COLUMNS] = state['season']
+        advanced['sse'] = states['sse'].to_numpy(dtype=float) + state['sse']
+        advanced['observations'] = states['observations'].to_numpy(dtype=np.int64) + state['observations']
+        return advanced
+    
+    @staticmethod
+    def project(states: pd.DataFrame, steps: np.ndarray) -> pd.DataFrame:
+        """
+        Move states forward over days with no cost data yet, as their forecast
+        
+        Args:
+            states: MODEL_COLUMNS per row
+            steps: Unobserved days each row moves forward
+        """
+        if not len(states) or not steps.any():
+            return states.copy()
+        phi, trend = states['phi'].to_numpy(dtype=float), states['trend'].to_numpy(dtype=float)
+        # phi + phi^2 + ... + phi^steps (phi = 1 for linear series)
+        damped = np.where(phi == 1, steps, phi * (1 - phi ** steps) / np.where(phi == 1, 1, 1 - phi))
+        return states.assign(level=states['level'].to_numpy(dtype=float) + damped * trend, trend=trend * phi ** steps)
+    
+    def forecast_facts(self, facts: pd.DataFrame, end: date) -> CostForecast:
+        """
+        Fit every series of daily facts from scratch, without storing anything
+        
+        Args:
+            facts: cost_date (ISO), account_id, account_name, service, cost_amount
+            end: Day after the last day fitted
+        """
+        started = time.perf_counter()
+        first_day = end - timedelta(days=self.history_days)
+        keys = _series_keys(facts)
+        values = _series_matrix(facts, keys, first_day, end)
+        observed = (values != 0).any(axis=1)
+        keys = keys[observed].reset_index(drop=True)
+        states = pd.concat([keys, self.fit(values[observed], first_day)], axis=1)
+        return CostForecast(states, end - timedelta(days=1), time.perf_counter() - started, refitted=len(states))
+    
+    def update(self, warehouse, today: date) -> CostForecast:
+        """
+        Bring the stored fits up to date with the warehouse and forecast from yesterday
+        
+        Stored states sit at the settled watermark (Cost Explorer restates the
+        last COST_UNSETTLED_DAYS), so each run replays only settled days that
+        landed since the last run, stores the result, and then folds in the
+        unsettled days without storing them. Series without a stored fit, and
+        all series once the fits are refit_days old, are fitted from scratch.
+        
+        An account whose ingestion is behind (refused budget, failed sync) is
+        stored at its own settled_through and only folds in the days it has;
+        the days it lacks are projected rather than read as zero cost.
+        """
+        started = time.perf_counter()
+        settled = today - timedelta(days=AppConfig.COST_UNSETTLED_DAYS + 1)
+        history_start = today - timedelta(days=self.history_days)
+        stored = warehouse.forecast_state()
+        # Refit everything when the fits are due, too old to catch up, or ahead of the watermark (it moved back)
+        if not stored.empty and (stored['fitted_on'].min() <= (today - timedelta(days=self.refit_days)).isoformat()
+                                 or stored['state_date'].min() < history_start.isoformat()
+                                 or stored['state_date'].max() > settled.isoformat()):
+            stored = stored.iloc[0:0]
+        
+        if stored.empty:
+            first_day = history_start
+            facts = warehouse.rollup_facts(first_day, today)
+        else:
+            first_day = min(date.fromisoformat(stored['state_date'].min()) + timedelta(days=1), settled + timedelta(days=1))
+            facts = warehouse.rollup_facts(first_day, today)
+            # Series that appeared since the last run (e.g. a newly backfilled account) need their full history
+            new_keys = _series_keys(facts).merge(stored[KEY_COLUMNS], how='left', on=KEY_COLUMNS, indicator=True)
+            new_keys = new_keys[new_keys['_merge'] == 'left_only'][KEY_COLUMNS]
+            if not new_keys.empty:
+                history = warehouse.rollup_facts(history_start, first_day, new_keys['account_id'].unique().tolist())
+                facts = pd.concat([facts, history.merge(new_keys, on=KEY_COLUMNS)], ignore_index=True)
+                first_day = history_start
+        
+        keys = pd.concat([stored[KEY_COLUMNS + ['account_name']], _series_keys(facts)], ignore_index=True)
+        keys = keys.drop_duplicates(KEY_COLUMNS, ignore_index=True)
+        values = _series_matrix(facts, keys, first_day, today)
+        settled_columns = max((settled - first_day).days + 1, 0)
+        
+        # Per series: settled days end at its account's ingestion watermark, and the unsettled days ingested
+        # with it run up to COST_UNSETTLED_DAYS later (accounts without ingestion state are taken as current)
+        watermarks = warehouse.settled_watermarks()
+        settled_through = keys['account_id'].map(
+            lambda account_id: min(watermarks.get(account_id, settled), settled)
+        )
+        settled_end = np.array([(day - first_day).days + 1 for day in settled_through], dtype=np.int64).clip(0)
+        observed_end = (settled_end + AppConfig.COST_UNSETTLED_DAYS).clip(max=values.shape[1])
+        
+        # Settled part: carry stored fits forward, fit new series from scratch, store both
+        position = keys.merge(stored.assign(stored_row=np.arange(len(stored))), how='left', on=KEY_COLUMNS)['stored_row']
+        known = position.notna().to_numpy()
+        previous = stored.iloc[position[known].astype(int)].reset_index(drop=True)
+        start = (pd.to_datetime(previous['state_date']) - pd.Timestamp(first_day)).dt.days.to_numpy(dtype=np.int64) + 1
+        carried = self.advance(previous[MODEL_COLUMNS], values[known, :settled_columns], first_day, start,
+                               end=settled_end[known])
+        carried = pd.concat([keys[known].reset_index(drop=True), carried], axis=1).assign(
+            fitted_on=previous['fitted_on'],
+            state_date=[day.isoformat() for day in settled_through[known]]
+        )
+        # A stored state ahead of a watermark that moved back keeps its own date
+        carried['state_date'] = np.maximum(carried['state_date'].to_numpy(dtype=object),
+                                           previous['state_date'].to_numpy(dtype=object))
+        
+        settled_mask = np.arange(settled_columns)[None, :] < settled_end[:, None]
+        new_rows = np.flatnonzero(~known & ((values[:, :settled_columns] != 0) & settled_mask).any(axis=1))
+        fitted = pd.concat([keys.iloc[new_rows].reset_index(drop=True),
+                            self.fit(values[new_rows, :settled_columns], first_day, end=settled_end[new_rows])], axis=1)
+        fitted['fitted_on'] = today.isoformat()
+        fitted['state_date'] = [day.isoformat() for day in settled_through.iloc[new_rows]]
+        
+        states = pd.concat([carried, fitted], ignore_index=True)[STATE_COLUMNS]
+        warehouse.save_forecast_state(states)
+        
+        # Unsettled part: fold the recent days each account has into every stored state, then project the days
+        # it lacks up to yesterday; series seen only in the recent days get a fresh fit
+        rows = states[KEY_COLUMNS].merge(keys.reset_index(), how='left', on=KEY_COLUMNS)['index'].to_numpy()
+        start = (pd.to_datetime(states['state_date']) - pd.Timestamp(first_day)).dt.days.to_numpy(dtype=np.int64) + 1
+        current = self.advance(states, values[rows], first_day, start, end=observed_end[rows])
+        current = self.project(current, values.shape[1] - np.maximum(observed_end[rows], start))
+        
+        observed_mask = np.arange(values.shape[1])[None, :] < observed_end[:, None]
+        recent = np.flatnonzero(~np.isin(np.arange(len(keys)), rows) & ((values != 0) & observed_mask).any(axis=1))
+        if len(recent):
+            fresh = self.fit(values[recent], first_day, end=observed_end[recent])
+            fresh = self.project(fresh, values.shape[1] - observed_end[recent])
+            current = pd.concat([current, pd.concat([keys.iloc[recent].reset_index(drop=True), fresh], axis=1)],
+                                ignore_index=True)
+        
+        return CostForecast(current, today - timedelta(days=1), time.perf_counter() - started,
+                            refitted=len(fitted) + len(recent), advanced=len(carried))
+
+
+def _weekdays(first_day: date, days: int) -> np.ndarray:
+    """Weekday (0 = Monday) of each of `days` columns starting at first_day"""
+    return (np.arange(days) + first_day.weekday()) % SEASON_DAYS
+
+
+def _series_keys(facts: pd.DataFrame) -> pd.DataFrame:
+    """Distinct account/service series in the facts, with the account name"""
+    return facts.drop_duplicates(KEY_COLUMNS)[KEY_COLUMNS + ['account_name']].fillna({'account_name': ''}).reset_index(drop=True)
+
+
+def _series_matrix(facts: pd.DataFrame, keys: pd.DataFrame, first_day: date, end: date) -> np.ndarray:
+    """(series, day) cost over [first_day, end) with rows in the order of keys"""
+    day_labels = pd.Index(pd.date_range(first_day, end - timedelta(days=1), freq='D').strftime('%Y-%m-%d'))
+    codes = facts[KEY_COLUMNS].merge(keys[KEY_COLUMNS].assign(row=np.arange(len(keys))), how='left', on=KEY_COLUMNS)['row']
+    return _accumulate(facts, codes.to_numpy(dtype=np.int64), len(keys), day_labels)
+
+
+def _smooth(values: np.ndarray, weekdays: np.ndarray, parameters: Dict[str, np.ndarray], state: Dict[str, np.ndarray],
+            start: np.ndarray, score_from: np.ndarray, rows: Optional[np.ndarray] = None,
+            end: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Run the additive damped Holt-Winters recursions (error correction form) over the columns of values
+    
+    One-step errors are clipped to ERROR_CLIP times a running error scale
+    before they update the state, so a one-day spike (an anomaly, a one-off
+    purchase) nudges the level instead of setting the trend.
+    
+    Args:
+        values: (series, days) cost
+        weekdays: Weekday of each column
+        parameters: alpha, beta, gamma and phi per state row
+        state: level, trend, scale and season ((rows, 7)) per state row before the first column
+        start: First column each state row folds in
+        score_from: First column whose one-step error counts toward sse
+        rows: Row of values each state row reads (default: the same row), e.g. for a parameter grid
+        end: Column after the last one each state row folds in (default: all columns)
+    
+    Returns:
+        level, trend, season and scale after the last column, with the sse and observations scored on the way
+    """
+    alpha, beta, gamma, phi = (parameters[column] for column in PARAMETER_COLUMNS)
+    level, trend, scale = state['level'], state['trend'], state['scale']
+    season = state['season'].copy()
+    sse = np.zeros(len(level))
+    observations = np.zeros(len(level), dtype=np.int64)
+    for column in range(values.shape[1]):
+        actual = values[:, column] if rows is None else values[rows, column]
+        weekday = weekdays[column]
+        active = (start <= column) if end is None else (start <= column) & (column < end)
+        scale = np.maximum(scale, np.maximum(SCALE_FLOOR * np.abs(level), SCALE_FLOOR))
+        error = np.where(active, actual - (level + phi * trend + season[:, weekday]), 0.0)
+        error = np.clip(error, -ERROR_CLIP * scale, ERROR_CLIP * scale)
+        level, trend = (np.where(active, level + phi * trend + alpha * error, level),
+                        np.where(active, phi * trend + beta * error, trend))
+        season[:, weekday] += gamma * error
+        scale = np.where(active, (1 - SCALE_SMOOTHING) * scale + SCALE_SMOOTHING * np.abs(error), scale)
+        scored = active & (score_from <= column)
+        sse += np.where(scored, error ** 2, 0.0)
+        observations += scored
+    return {'level': level, 'trend': trend, 'season': season, 'scale': scale, 'sse': sse, 'observations': observations}
+
+
+def _fit_linear(values: np.ndarray, first: np.ndarray, end: np.ndarray) -> pd.DataFrame:
+    """
+    Least-squares line through each row from its first cost to its end column, as a state with no smoothing
+    
+    With alpha = beta = gamma = 0 and phi = 1 the recursions just extend the
+    line, so linear series are carried forward like any other state.
+    """
+    count, days = values.shape
+    columns = np.arange(days)
+    observed = (columns[None, :] >= first[:, None]) & (columns[None, :] < end[:, None])
+    observations = observed.sum(axis=1)
+    mean_x = np.where(observed, columns, 0).sum(axis=1) / observations
+    mean_y = np.where(observed, values, 0).sum(axis=1) / observations
+    dx = np.where(observed, columns[None, :] - mean_x[:, None], 0.0)
+    variance = (dx ** 2).sum(axis=1)
+    slope = np.divide((dx * (values - mean_y[:, None])).sum(axis=1), variance, out=np.zeros(count), where=variance > 0)
+    residual = np.where(observed, values - mean_y[:, None] - slope[:, None] * (columns[None, :] - mean_x[:, None]), 0.0)
+    
+    frame = pd.DataFrame({
+        'model': MODEL_LINEAR, 'alpha': 0.0, 'beta': 0.0, 'gamma': 0.0, 'phi': 1.0,
+        'level': mean_y + slope * (end - 1 - mean_x), 'trend': slope
+    }, index=range(count))
+    frame[SEASON_COLUMNS] = 0.0
+    sse = (residual ** 2).sum(axis=1)
+    return frame.assign(scale=np.sqrt(sse / observations), sse=sse, observations=observations)[MODEL_COLUMNS]
+
+
+@st.cache_resource(max_entries=2, show_spinner="Forecasting cost...")
+def get_cost_forecast(last_run: str, today: date) -> CostForecast:
+    """
+    Get forecasts over the cost warehouse
+    
+    Args:
+        last_run: Warehouse's last ingestion (part of the cache key only)
+        today: Forecasts start today; today's partial cost is not fitted
+    """
+    from cost_warehouse import get_cost_warehouse
+    
+    return CostForecaster().update(get_cost_warehouse(), today)
@@ -0,0 +1,451 @@
+"""
+Cost Queries - Natural-Language Cost Questions Compiled to Local Warehouse Queries
+The LLM only translates a question into a constrained query spec; the spec is validated, compiled to SQL and run locally
+"""
+
+import json
+import re
+import time
+import unicodedata
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+from datetime import date, timedelta
+from config_settings import AppConfig
+from cost_warehouse import CostWarehouse
+
+
+METRIC_TOTAL = 'total'
+METRIC_DAILY_AVERAGE = 'daily_average'
+METRICS = [METRIC_TOTAL, METRIC_DAILY_AVERAGE]
+
+FILTER_OPERATORS = ['eq', 'ne', 'in', 'contains']
+TIME_FIELDS = ['date', 'week', 'month']
+MAX_GROUP_BY = 3
+MAX_FILTER_VALUES = 50
+MAX_LIMIT = 500
+MAX_PERIOD_DAYS = 3 * 366
+
+
+def _time_fields(column: str) -> Dict[str, str]:
+    return {
+        'date': column,
+        'week': f"strftime('%Y-W%W', {column})",
+        'month': f"substr({column}, 1, 7)"
+    }
+
+
+# What a query may read: per dataset, its table, date column and the fields it can group and filter by.
+# `required` fields must be filtered to one value, since the table repeats the same cost under each of them.
+DATASETS = {
+    'cost': {
+        'description': 'Daily cost per account and service (Cost Explorer); add region to break down by region',
+        'table': 'cost_rollup_daily',
+        'date': 'cost_date',
+        'fields': dict(_time_fields('cost_date'), account_id='account_id', account_name='account_name', service='service'),
+        'region_table': 'cost_data',
+        'required': []
+    },
+    'tag_cost': {
+        'description': 'Daily cost per activated cost allocation tag value (Cost Explorer); filter tag_key to one key',
+        'table': 'cost_tag_data',
+        'date': 'cost_date',
+        'fields': dict(_time_fields('cost_date'), account_id='account_id', tag_key='tag_key', tag_value='tag_value',
+                       service='service'),
+        'required': ['tag_key']
+    },
+    'resource_cost': {
+        'description': 'Daily cost per resource ID (Cost and Usage Report files, when loaded)',
+        'table': 'cur_cost_resource',
+        'date': 'usage_date',
+        'fields': dict(_time_fields('usage_date'), account_id='account_id', service='service', region='region',
+                       resource_id='resource_id'),
+        'required': []
+    },
+    'allocation': {
+        'description': 'Showback: daily cost allocated per tag value, including split shared/untagged cost; filter dimension to one tag key',
+        'table': 'cost_allocation_daily',
+        'date': 'usage_date',
+        'fields': dict(_time_fields('usage_date'), account_id='account_id', service='service', dimension='dimension',
+                       value='value', rule='rule'),
+        'required': ['dimension']
+    }
+}
+
+
+class CostQueryError(ValueError):
+    """A query spec that does not fit the warehouse schema"""
+
+
+def normalize_question(question: str) -> str:
+    """Cache key of a question: case, spacing, quotes and trailing punctuation do not matter"""
+    text = unicodedata.normalize('NFKC', question).lower()
+    text = re.sub(r'[‘’“”"`]', "'", text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text.strip(" '?!.")
+
+
+class CostQuery:
+    """
+    A validated query over one warehouse dataset
+    
+    The period is kept relative ('last 30 days', 'last month'...) and only
+    resolved to dates when compiled, so a cached translation stays correct
+    on later days.
+    """
+    
+    def __init__(self, spec: Dict):
+        """
+        Validate a query spec
+        
+        Args:
+            spec: dataset, metric, group_by, filters, period, compare_previous, order, limit
+                  (see QUERY_SPEC_PROMPT for the format)
+        
+        Raises:
+            CostQueryError: The spec names an unknown dataset, field, operator or period
+        """
+        if not isinstance(spec, dict):
+            raise CostQueryError("Query spec must be a JSON object")
+        self.spec = spec
+        self.dataset = spec.get('dataset', 'cost')
+        if self.dataset not in DATASETS:
+            raise CostQueryError(f"Unknown dataset '{self.dataset}' (expected one of {', '.join(DATASETS)})")
+        fields = DATASETS[self.dataset]['fields']
+        allowed_fields = list(fields) + (['region'] if 'region_table' in DATASETS[self.dataset] else [])
+        
+        self.metric = spec.get('metric', METRIC_TOTAL)
+        if self.metric not in METRICS:
+            raise CostQueryError(f"Unknown metric '{self.metric}' (expected one of {', '.join(METRICS)})")
+        
+        self.group_by = spec.get('group_by') or []
+        if not isinstance(self.group_by, list) or not all(isinstance(field, str) for field in self.group_by):
+            raise CostQueryError("group_by must be a list of field names")
+        unknown = [field for field in self.group_by if field not in allowed_fields]
+        if unknown:
+            raise CostQueryError(f"Cannot group {self.dataset} by {', '.join(map(str, unknown))}")
+        if len(self.group_by) > MAX_GROUP_BY or len(set(self.group_by)) != len(self.group_by):
+            raise CostQueryError(f"Group by at most {MAX_GROUP_BY} distinct fields")
+        
+        self.filters = []
+        for item in spec.get('filters') or []:
+            if not isinstance(item, dict):
+                raise CostQueryError("Each filter must be an object with field, op and value")
+            field, operator, value = item.get('field'), item.get('op', 'eq'), item.get('value')
+            if field not in allowed_fields:
+                raise CostQueryError(f"Cannot filter {self.dataset} by '{field}'")
+            if operator not in FILTER_OPERATORS:
+                raise CostQueryError(f"Unknown filter operator '{operator}'")
+            values = value if isinstance(value, list) else [value]
+            if not values or len(values) > MAX_FILTER_VALUES or not all(isinstance(v, (str, int, float)) for v in values):
+                raise CostQueryError(f"Filter on '{field}' needs 1-{MAX_FILTER_VALUES} text values")
+            if operator != 'in' and len(values) != 1:
+                raise CostQueryError(f"Filter operator '{operator}' takes a single value")
+            self.filters.append((field, operator, [str(v) for v in values]))
+        
+        for field in DATASETS[self.dataset]['required']:
+            if not any(f == field and operator == 'eq' for f, operator, _ in self.filters):
+                raise CostQueryError(f"Queries over {self.dataset} must filter {field} to one value")
+        
+        self.period = spec.get('period') or {'type': 'last_days', 'days': 30}
+        if not isinstance(self.period, dict):
+            raise CostQueryError("period must be an object with a type")
+        self.period_bounds(date.today())    # Validates the period
+        
+        self.compare_previous = bool(spec.get('compare_previous'))
+        if self.compare_previous and any(field in TIME_FIELDS for field in self.group_by):
+            raise CostQueryError("Comparing with the previous period cannot be combined with a date, week or month breakdown")
+        
+        self.order = 'ASC' if str(spec.get('order', 'desc')).lower() == 'asc' else 'DESC'
+        try:
+            self.limit = max(1, min(int(spec.get('limit') or 20), MAX_LIMIT))
+        except (TypeError, ValueError):
+            raise CostQueryError("limit must be a number")
+    
+    def period_bounds(self, today: date) -> Tuple[date, date]:
+        """[start, end) of the period, as of `today` (today itself is still accruing and excluded)"""
+        kind = self.period.get('type')
+        if kind == 'last_days':
+            days = self.period.get('days')
+            # bool is an int subclass, so `"days": true` would otherwise read as 1
+            if isinstance(days, bool) or not isinstance(days, int) or not 1 <= days <= MAX_PERIOD_DAYS:
+                raise CostQueryError(f"last_days needs 1-{MAX_PERIOD_DAYS} days")
+            return today - timedelta(days=days), today
+        if kind == 'month_to_date':
+            return today.replace(day=1), today
+        if kind == 'last_month':
+            end = today.replace(day=1)
+            return (end - timedelta(days=1)).replace(day=1), end
+        if kind == 'year_to_date':
+            return today.replace(month=1, day=1), today
+        if kind == 'between':
+            try:
+                start = date.fromisoformat(str(self.period.get('start')))
+                end = date.fromisoformat(str(self.period.get('end'))) + timedelta(days=1)
+            except ValueError:
+                raise CostQueryError("between needs start and end dates as YYYY-MM-DD")
+            if not start < end or (end - start).days > MAX_PERIOD_DAYS:
+                raise CostQueryError(f"between needs start <= end, at most {MAX_PERIOD_DAYS} days apart")
+            return start, end
+        raise CostQueryError(f"Unknown period type '{kind}'")
+    
+    def compile(self, today: date) -> Tuple[str, List, Dict]:
+        """
+        SQL and parameters of the query as of `today`
+        
+        Every field is a fixed expression from DATASETS and every value a
+        bound parameter, so nothing from the spec reaches the SQL text.
+        
+        Returns:
+            (sql, params, bounds with start, end and days)
+        """
+        dataset = DATASETS[self.dataset]
+        fields = dict(dataset['fields'])
+        table = dataset['table']
+        if 'region' in self.group_by or any(field == 'region' for field, _, _ in self.filters):
+            table = dataset.get('region_table', table)
+            fields['region'] = "COALESCE(region, 'global')"
+        date_column = dataset['date']
+        
+        start, end = self.period_bounds(today)
+        days = (end - start).days
+        scan_start = start - timedelta(days=days) if self.compare_previous else start
+        
+        where, params = [f'{date_column} >= ?', f'{date_column} < ?'], [scan_start.isoformat(), end.isoformat()]
+        for field, operator, values in self.filters:
+            expression = fields[field]
+            if operator == 'eq':
+                where.append(f'{expression} = ?')
+            elif operator == 'ne':
+                where.append(f'{expression} != ?')
+            elif operator == 'in':
+                where.append(f"{expression} IN ({', '.join('?' * len(values))})")
+            else:
+                where.append(f"{expression} LIKE ? ESCAPE '\\'")
+                values = ['%' + re.sub(r'([%_\\])', r'\\\1', values[0]) + '%']
+            params.extend(values)
+        
+        sql, divisor = '', ''
+        time_fields = [field for field in self.group_by if field in TIME_FIELDS]
+        if self.metric == METRIC_DAILY_AVERAGE and time_fields:
+            # Each date, week or month bucket is averaged over its own days in the period
+            sql = ("WITH RECURSIVE period_days(day) AS (SELECT ? UNION ALL "
+                   "SELECT date(day, '+1 day') FROM period_days WHERE day < ?) ")
+            params = [start.isoformat(), (end - timedelta(days=1)).isoformat()] + params
+            day_fields = _time_fields('day')
+            divisor = (' * 1.0 / (SELECT COUNT(*) FROM period_days WHERE '
+                       + ' AND '.join(f'{day_fields[field]} = {fields[field]}' for field in time_fields) + ')')
+        elif self.metric == METRIC_DAILY_AVERAGE:
+            divisor = f' / {days}.0'
+        select = [f'{fields[field]} AS {field}' for field in self.group_by]
+        if self.compare_previous:
+            select.append(f'SUM(CASE WHEN {date_column} >= ? THEN cost_amount ELSE 0 END){divisor} AS cost')
+            select.append(f'SUM(CASE WHEN {date_column} < ? THEN cost_amount ELSE 0 END){divisor} AS previous_cost')
+            params = [start.isoformat(), start.isoformat()] + params
+        else:
+            select.append(f'SUM(cost_amount){divisor} AS cost')
+        
+        sql += f"SELECT {', '.join(select)} FROM {table} WHERE {' AND '.join(where)}"
+        if self.group_by:
+            # Time breakdowns read chronologically, everything else by cost
+            order = (', '.join(self.group_by) if any(field in TIME_FIELDS for field in self.group_by)
+                     else f'cost {self.order}')
+            sql += f" GROUP BY {', '.join(self.group_by)} ORDER BY {order} LIMIT ?"
+            params.append(self.limit if not any(field in TIME_FIELDS for field in self.group_by) else MAX_PERIOD_DAYS)
+        return sql, params, {'start': start, 'end': end, 'days': days}
+    
+    def describe(self, bounds: Dict) -> str:
+        """What the query computes, in words"""
+        metric = 'Average daily cost' if self.metric == METRIC_DAILY_AVERAGE else 'Cost'
+        text = metric + {'cost': '', 'tag_cost': ' (tag cost)', 'resource_cost': ' (per resource)',
+                         'allocation': ' (showback)'}[self.dataset]
+        if self.group_by:
+            text += f" by {', '.join(self.group_by)}"
+        text += f", {bounds['start']} → {bounds['end'] - timedelta(days=1)}"
+        if self.filters:
+            text += ' where ' + ' and '.join(
+                f"{field} {({'eq': '=', 'ne': '≠', 'in': 'in', 'contains': 'contains'})[operator]} "
+                f"{', '.join(values) if operator == 'in' else values[0]}"
+                for field, operator, values in self.filters
+            )
+        if self.compare_previous:
+            text += ', vs the previous period'
+        return text
+
+
+QUERY_SPEC_PROMPT = """You translate questions about cloud cost into a JSON query over a local cost warehouse.
+You never see the data; answer ONLY with one JSON object, no prose.
+
+Datasets (field names you may group and filter by; date/week/month exist on every dataset):
+{datasets}
+
+Known values:
+{context}
+
+Query format:
+{{
+  "dataset": "cost" | "tag_cost" | "resource_cost" | "allocation",
+  "metric": "total" | "daily_average",
+  "group_by": [up to 3 field names],
+  "filters": [{{"field": "<field>", "op": "eq" | "ne" | "in" | "contains", "value": "<text>" or ["<text>", ...] for in}}],
+  "period": {{"type": "last_days", "days": <n>}} | {{"type": "month_to_date"}} | {{"type": "last_month"}}
+            | {{"type": "year_to_date"}} | {{"type": "between", "start": "YYYY-MM-DD", "end": "YYYY-MM-DD"}} (end inclusive),
+  "compare_previous": true to add the cost of the equally long period just before,
+  "order": "desc" | "asc",
+  "limit": <rows, default 20>
+}}
+
+Rules:
+- Prefer relative periods; use "between" only for explicit dates. Today is {today}; today's cost is not final.
+- Service names vary ("Amazon Elastic Compute Cloud - Compute"), so filter services with "contains" (e.g. "EC2" -> "Elastic Compute Cloud").
+- tag_cost must filter tag_key with "eq"; allocation must filter dimension with "eq".
+- "Top N" questions: group_by the field, order desc, limit N. Trends: group_by date, week or month.
+- If the question cannot be answered from these datasets (e.g. advice, recommendations), answer {{"unsupported": "<short reason>"}}."""
+
+
+def build_prompt(context: Dict, today: date) -> str:
+    """System prompt describing the datasets and the values the warehouse holds (names only, no cost)"""
+    datasets = '\n'.join(
+        f"- {name}: {dataset['description']}. Fields: "
+        f"{', '.join(field for field in list(dataset['fields']) + (['region'] if 'region_table' in dataset else []) if field not in TIME_FIELDS)}"
+        for name, dataset in DATASETS.items()
+    )
+    lines = [f"- {name}: {', '.join(map(str, values))}" for name, values in context.items() if values]
+    return QUERY_SPEC_PROMPT.format(datasets=datasets, context='\n'.join(lines) or '- (none)', today=today.isoformat())
+
+
+def parse_spec(text: str) -> Dict:
+    """The JSON object in an LLM response"""
+    try:
+        return json.loads(text)
+    except ValueError:
+        match = re.search(r'\{.*\}', text, re.DOTALL)
+        if not match:
+            raise CostQueryError("The translation was not a JSON query")
+        try:
+            return json.loads(match.group())
+        except ValueError:
+            raise CostQueryError("The translation was not a JSON query")
+
+
+class CostQuestionAnswerer:
+    """
+    Answers cost questions with exact figures from the local warehouse
+    
+    A question is translated once by the LLM, which sees only the schema and
+    the names of accounts, services and tags - never cost figures. The spec
+    is cached under the normalized question, so repeated questions cost no
+    LLM call, and every answer is a local SQL query.
+    """
+    
+    def __init__(self, warehouse: CostWarehouse, client=None, model: Optional[str] = None,
+                 cache: Optional[CostWarehouse] = None):
+        """
+        Initialize answerer
+        
+        Args:
+            warehouse: Warehouse queried
+            client: Anthropic client, needed only for questions not yet translated
+            model: Model that translates (default AppConfig.COST_QUERY_MODEL)
+            cache: Warehouse holding the translation cache (default: the queried one)
+        """
+        self.warehouse = warehouse
+        self.client = client
+        self.model = model or AppConfig.COST_QUERY_MODEL
+        self.cache = cache or warehouse
+    
+    def translate(self, question: str, today: date, refresh: bool = False) -> Tuple[Dict, bool]:
+        """
+        Query spec of a question
+        
+        Args:
+            question: Question in plain language
+            today: Day relative dates are described against
+            refresh: Ignore a cached translation
+        
+        Returns:
+            (spec, whether it came from the cache)
+        
+        Raises:
+            CostQueryError: No cached translation and no client, or an unusable response
+        """
+        key = normalize_question(question)
+        cached = None if refresh else self.cache.query_translation(key)
+        if cached:
+            return json.loads(cached['spec']), True
+        if self.client is None:
+            raise CostQueryError("This question has not been translated yet and AI is not configured")
+        
+        message = self.client.messages.create(
+            model=self.model,
+            max_tokens=600,
+            temperature=0,
+            system=build_prompt(self.warehouse.query_context(today), today),
+            messages=[{"role": "user", "content": question}]
+        )
+        spec = parse_spec(message.content[0].text)
+        if 'unsupported' not in spec:
+            CostQuery(spec)    # Only valid specs are cached
+        self.cache.save_query_translation(key, question, json.dumps(spec), self.model)
+        return spec, False
+    
+    def answer(self, question: str, today: date, refresh: bool = False) -> Dict:
+        """
+        Translate (or reuse the translation of) a question and run it locally
+        
+        Returns:
+            Dict with question, spec, cached, unsupported (reason, when the question is not a data
+            question), description, sql, params, frame, answer (text), translate_seconds and query_seconds
+        """
+        started = time.perf_counter()
+        spec, cached = self.translate(question, today, refresh)
+        result = {'question': question, 'spec': spec, 'cached': cached, 'unsupported': spec.get('unsupported'),
+                  'translate_seconds': time.perf_counter() - started}
+        if result['unsupported']:
+            return result
+        
+        query = CostQuery(spec)
+        sql, params, bounds = query.compile(today)
+        started = time.perf_counter()
+        frame = self.warehouse.run_query(sql, params)
+        result.update({
+            'description': query.describe(bounds),
+            'sql': sql,
+            'params': params,
+            'frame': frame,
+            'answer': summarize(query, frame),
+            'query_seconds': time.perf_counter() - started
+        })
+        return result
+
+
+def summarize(query: CostQuery, frame: pd.DataFrame) -> str:
+    """One-paragraph answer from the query result (figures exactly as computed)"""
+    unit = ' per day' if query.metric == METRIC_DAILY_AVERAGE else ''
+    if frame.empty or frame['cost'].isna().all():
+        return "No cost matches this question in the local warehouse."
+    
+    amount = lambda value: float(value) if pd.notna(value) else 0.0
+    
+    def change(row) -> str:
+        previous = amount(row['previous_cost'])
+        delta = amount(row['cost']) - previous
+        percent = f" ({delta / previous:+.1%})" if previous else ''
+        return f"{'+' if delta >= 0 else '-'}${abs(delta):,.2f}{percent} vs ${previous:,.2f} the previous period"
+    
+    if not query.group_by:
+        row = frame.iloc[0]
+        text = f"**${amount(row['cost']):,.2f}**{unit}"
+        return text + (f", {change(row)}." if query.compare_previous else '.')
+    
+    label = lambda row: ' / '.join(str(row[field]) for field in query.group_by)
+    if any(field in TIME_FIELDS for field in query.group_by):
+        peak = frame.loc[frame['cost'].idxmax()]
+        if query.metric == METRIC_DAILY_AVERAGE:
+            # Each row averages its own days, so the rows do not add up
+            return f"{len(frame)} rows; highest: {label(peak)} at **${peak['cost']:,.2f}**{unit}."
+        return (f"{len(frame)} rows totalling **${frame['cost'].sum():,.2f}**; "
+                f"highest: {label(peak)} at ${peak['cost']:,.2f}.")
+    top = frame.iloc[0]
+    text = (f"{len(frame)} rows totalling **${frame['cost'].sum():,.2f}**{unit}; "
+            f"{'lowest' if query.order == 'ASC' else 'highest'}: {label(top)} at ${top['cost']:,.2f}")
+    return text + (f", {change(top)}." if query.compare_previous else '.')
@@ -0,0 +1,1186 @@
+"""
+Cost Warehouse - Local Daily Cost Store with Incremental Cost Explorer Ingestion
+Backfills daily cost by account, service, region and tag once, then re-fetches only the unsettled days
+"""
+
+import streamlit as st
+import sqlite3
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from config_settings import AppConfig
+from core_account_manager import AccountFanOutExecutor, FanOutTarget
+import pandas as pd
+
+
+# Cost Explorer REGION value for charges that are not regional
+GLOBAL_REGION = 'global'
+
+
+def utc_today() -> date:
+    """Cost Explorer days are UTC days"""
+    return datetime.now(timezone.utc).date()
+
+
+class CostWarehouse:
+    """
+    SQLite warehouse of daily cost
+    
+    cost_data holds one row per (account, day, service, region) - the table
+    DatabaseService creates - and cost_tag_data one row per (account, day,
+    tag key, tag value, service). cost_rollup_daily pre-aggregates cost_data
+    per (day, account, service) and is what the FinOps views read.
+    
+    Cost and Usage Report files are loaded separately (see cur_ingestion):
+    cur_cost_hourly and cur_cost_resource hold each file's aggregates, keyed
+    by the cur_files row they came from so a changed file can be replaced.
+    cost_forecast_state keeps the fitted forecast model of every account and
+    service series (see cost_forecast) and cost_budgets the monthly budgets.
+    cost_allocation_daily is the materialized showback per allocation tag
+    (see cost_allocation), with one cost_allocation_runs row per run.
+    cost_query_translations caches natural-language questions translated
+    to query specs (see cost_query). cost_jobs marks the background jobs
+    (ingestion, allocation) in progress, so every session shares one run.
+    """
+    
+    def __init__(self, db_path: str = None):
+        """
+        Initialize cost warehouse
+        
+        Args:
+            db_path: Path to SQLite database file (default: the DatabaseService database)
+        """
+        if db_path is None:
+            db_dir = Path.home() / '.cloudidp'
+            db_dir.mkdir(exist_ok=True)
+            db_path = str(db_dir / 'cloudidp.db')
+        
+        self.db_path = db_path
+        self._initialize_database()
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    def _initialize_database(self):
+        """Create warehouse tables and add the columns cost_data predates"""
+        conn = self._connect()
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cost_data (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    account_id TEXT,
+                    account_name TEXT,
+                    service TEXT,
+                    cost_date DATE,
+                    cost_amount REAL,
+                    currency TEXT DEFAULT 'USD',
+                    recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(cost_data)')}
+            if 'region' not in columns:
+                conn.execute('ALTER TABLE cost_data ADD COLUMN region TEXT')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cost_data_account_date ON cost_data (account_id, cost_date)')
+            
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cost_tag_data (
+                    account_id TEXT NOT NULL,
+                    cost_date DATE NOT NULL,
+                    tag_key TEXT NOT NULL,
+                    tag_value TEXT NOT NULL,
+                    service TEXT NOT NULL,
+                    cost_amount REAL NOT NULL
+                )
+            ''')
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_cost_tag_data_key_date ON cost_tag_data (tag_key, cost_date, account_id)'
+            )
+            
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cost_rollup_daily (
+                    cost_date DATE NOT NULL,
+                    account_id TEXT NOT NULL,
+                    account_name TEXT,
+                    service TEXT NOT NULL,
+                    cost_amount REAL NOT NULL,
+                    PRIMARY KEY (cost_date, account_id, service)
+                )
+            ''')
+            
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cur_files (
+                    file_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    path TEXT NOT NULL UNIQUE,
+                    billing_period TEXT,
+                    size_bytes INTEGER,
+                    mtime_ns INTEGER,
+                    rows_read INTEGER DEFAULT 0,
+                    processed_at TIMESTAMP,
+                    error TEXT
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cur_cost_hourly (
+                    file_id INTEGER NOT NULL,
+                    usage_hour TEXT NOT NULL,
+                    account_id TEXT NOT NULL,
+                    service TEXT NOT NULL,
+                    region TEXT NOT NULL,
+                    cost_amount REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cur_cost_hourly_file ON cur_cost_hourly (file_id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cur_cost_hourly_hour ON cur_cost_hourly (usage_hour)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cur_cost_resource (
+                    file_id INTEGER NOT NULL,
+                    usage_date DATE NOT NULL,
+                    account_id TEXT NOT NULL,
+                    service TEXT NOT NULL,
+                    region TEXT NOT NULL,
+                    resource_id TEXT NOT NULL,
+                    cost_amount REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cur_cost_resource_file ON cur_cost_resource (file_id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_cur_cost_resource_date ON cur_cost_resource (usage_date)')
+            
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cost_forecast_state (
+                    account_id TEXT NOT NULL,
+                    service TEXT NOT NULL,
+                    account_name TEXT,
+                    model TEXT NOT NULL,
+                    alpha REAL NOT NULL,
+                    beta REAL NOT NULL,
+                    gamma REAL NOT NULL,
+                    phi REAL NOT NULL,
+                    level REAL NOT NULL,
+                    trend REAL NOT NULL,
+                    season_0 REAL NOT NULL,
+                    season_1 REAL NOT NULL,
+                    season_2 REAL NOT NULL,
+                    season_3 REAL NOT NULL,
+                    season_4 REAL NOT NULL,
+                    season_5 REAL NOT NULL,
+                    season_6 REAL NOT NULL,
+                    scale REAL NOT NULL,
+                    sse REAL NOT NULL,
+                    observations INTEGER NOT NULL,
+                    state_date DATE NOT NULL,
+                    fitted_on DATE NOT NULL,
+                    PRIMARY KEY (account_id, service)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cost_budgets (
+                    account_id TEXT PRIMARY KEY,
+                    account_name TEXT,
+                    monthly_amount REAL NOT NULL,
+                    updated_at TIMESTAMP
+                )
+            ''')
+            
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cost_allocation_daily (
+                    dimension TEXT NOT NULL,
+                    usage_date DATE NOT NULL,
+                    account_id TEXT NOT NULL,
+                    service TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    rule TEXT NOT NULL,
+                    cost_amount REAL NOT NULL
+                )
+            ''')
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_cost_allocation_daily_dimension_date ON cost_allocation_daily (dimension, usage_date)'
+            )
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cost_allocation_runs (
+                    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    run_at TIMESTAMP NOT NULL,
+                    start_date DATE NOT NULL,
+                    end_date DATE NOT NULL,
+                    source TEXT NOT NULL,
+                    snapshot_id TEXT,
+                    lines INTEGER NOT NULL,
+                    seconds REAL NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'complete',
+                    error TEXT
+                )
+            ''')
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(cost_allocation_runs)')}
+            if 'status' not in columns:
+                conn.execute("ALTER TABLE cost_allocation_runs ADD COLUMN status TEXT NOT NULL DEFAULT 'complete'")
+                conn.execute('ALTER TABLE cost_allocation_runs ADD COLUMN error TEXT')
+            
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cost_query_translations (
+                    question_key TEXT PRIMARY KEY,
+                    question TEXT NOT NULL,
+                    spec TEXT NOT NULL,
+                    model TEXT,
+                    created_at TIMESTAMP NOT NULL,
+                    last_used TIMESTAMP,
+                    hits INTEGER DEFAULT 0
+                )
+            ''')
+            
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cost_ingestion_state (
+                    account_id TEXT PRIMARY KEY,
+                    account_name TEXT,
+                    first_date DATE,
+                    settled_through DATE,
+                    last_run TIMESTAMP,
+                    last_requests INTEGER DEFAULT 0,
+                    last_error TEXT
+                )
+            ''')
+            
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cost_jobs (
+                    job TEXT PRIMARY KEY,
+                    task_id TEXT,
+                    status TEXT NOT NULL,
+                    started_at TIMESTAMP NOT NULL,
+                    finished_at TIMESTAMP,
+                    error TEXT
+                )
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
+    
+    # ========== Background jobs ==========
+    
+    def claim_job(self, job: str) -> bool:
+        """
+        Mark a background job running unless a run is already in progress (in any session or process)
+        
+        Returns:
+            Whether this caller claimed the job
+        """
+        now = datetime.now(timezone.utc)
+        conn = self._connect()
+        try:
+            # Take the write lock before reading, so two sessions cannot both claim the job
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('SELECT status, started_at FROM cost_jobs WHERE job = ?', (job,)).fetchone()
+            if row and self._job_running(row):
+                conn.rollback()
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO cost_jobs (job, task_id, status, started_at) VALUES (?, NULL, 'running', ?)",
+                (job, now.isoformat())
+            )
+            conn.commit()
+            return True
+        finally:
+            conn.close()
+    
+    def set_job_task(self, job: str, task_id: str):
+        """Record the queue task running a claimed job"""
+        conn = self._connect()
+        try:
+            conn.execute('UPDATE cost_jobs SET task_id = ? WHERE job = ?', (task_id, job))
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def finish_job(self, job: str, error: Optional[str] = None):
+        """Mark a job completed, or failed with an error"""
+        conn = self._connect()
+        try:
+            conn.execute(
+                'UPDATE cost_jobs SET status = ?, finished_at = ?, error = ? WHERE job = ?',
+                ('failed' if error else 'completed', datetime.now(timezone.utc).isoformat(), error, job)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def job_status(self, job: str) -> Optional[Dict]:
+        """Latest run of a job (task_id, status, started_at, finished_at, error, running), or None"""
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT * FROM cost_jobs WHERE job = ?', (job,)).fetchone()
+        finally:
+            conn.close()
+        return dict(row, running=self._job_running(row)) if row else None
+    
+    @staticmethod
+    def _job_running(row) -> bool:
+        started = datetime.fromisoformat(row['started_at'])
+        return (row['status'] == 'running'
+                and datetime.now(timezone.utc) - started < timedelta(hours=AppConfig.COST_JOB_TIMEOUT_HOURS))
+    
+    # ========== Ingestion ==========
+    
+    def get_state(self, account_id: str) -> Optional[Dict]:
+        """Ingestion watermark of one account"""
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT * FROM cost_ingestion_state WHERE account_id = ?', (account_id,)).fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+    
+    def replace_range(self, account_id: str, account_name: str, start: date, end: date,
+                      cost_rows: List[Tuple[str, str, str, float]], tag_rows: List[Tuple[str, str, str, str, float]]):
+        """
+        Replace an account's facts for [start, end) and rebuild its rollup over that range
+        
+        Args:
+            account_id / account_name: Account the rows belong to
+            start / end: Day range (end exclusive)
+            cost_rows: (day, service, region, amount)
+            tag_rows: (day, tag key, tag value, service, amount)
+        """
+        bounds = (account_id, start.isoformat(), end.isoformat())
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM cost_data WHERE account_id = ? AND cost_date >= ? AND cost_date < ?', bounds)
+            conn.executemany(
+                'INSERT INTO cost_data (account_id, account_name, service, region, cost_date, cost_amount, currency) '
+                "VALUES (?, ?, ?, ?, ?, ?, 'USD')",
+                [(account_id, account_name, service, region, day, amount) for day, service, region, amount in cost_rows]
+            )
+            conn.execute('DELETE FROM cost_tag_data WHERE account_id = ? AND cost_date >= ? AND cost_date < ?', bounds)
+            conn.executemany(
+                'INSERT INTO cost_tag_data (account_id, cost_date, tag_key, tag_value, service, cost_amount) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(account_id,) + row for row in tag_rows]
+            )
+            conn.execute('DELETE FROM cost_rollup_daily WHERE account_id = ? AND cost_date >= ? AND cost_date < ?', bounds)
+            conn.execute('''
+                INSERT INTO cost_rollup_daily (cost_date, account_id, account_name, service, cost_amount)
+                SELECT cost_date, account_id, MAX(account_name), service, SUM(cost_amount)
+                FROM cost_data
+                WHERE account_id = ? AND cost_date >= ? AND cost_date < ?
+                GROUP BY cost_date, account_id, service
+            ''', bounds)
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def set_state(self, account_id: str, account_name: str, first_date: Optional[date],
+                  settled_through: Optional[date], requests: int, error: Optional[str] = None):
+        """Record an ingestion run (dates are left unchanged when None)"""
+        conn = self._connect()
+        try:
+            conn.execute('''
+                INSERT INTO cost_ingestion_state
+                    (account_id, account_name, first_date, settled_through, last_run, last_requests, last_error)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(account_id) DO UPDATE SET
+                    account_name = excluded.account_name,
+                    first_date = COALESCE(excluded.first_date, first_date),
+                    settled_through = COALESCE(excluded.settled_through, settled_through),
+                    last_run = excluded.last_run,
+                    last_requests = excluded.last_requests,
+                    last_error = excluded.last_error
+            ''', (
+                account_id, account_name,
+                first_date.isoformat() if first_date else None,
+                settled_through.isoformat() if settled_through else None,
+                datetime.now(timezone.utc).isoformat(), requests, error
+            ))
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def coverage(self) -> Dict:
+        """Accounts ingested, covered date range and the most recent run"""
+        conn = self._connect()
+        try:
+            row = conn.execute('''
+                SELECT COUNT(*) AS accounts, MIN(first_date) AS first_date, MAX(last_run) AS last_run,
+                       SUM(CASE WHEN last_error IS NOT NULL THEN 1 ELSE 0 END) AS failing
+                FROM cost_ingestion_state
+            ''').fetchone()
+            last_date = conn.execute('SELECT MAX(cost_date) FROM cost_rollup_daily').fetchone()[0]
+            return dict(row, last_date=last_date)
+        finally:
+            conn.close()
+    
+    def is_stale(self, max_age_hours: float) -> bool:
+        """Whether the most recent ingestion is older than max_age_hours (or never ran)"""
+        last_run = self.coverage()['last_run']
+        if not last_run:
+            return True
+        return datetime.now(timezone.utc) - datetime.fromisoformat(last_run) > timedelta(hours=max_age_hours)
+    
+    def has_data(self) -> bool:
+        conn = self._connect()
+        try:
+            return conn.execute('SELECT 1 FROM cost_rollup_daily LIMIT 1').fetchone() is not None
+        finally:
+            conn.close()
+    
+    # ========== Cost and Usage Report ==========
+    
+    def cur_files(self) -> Dict[str, Dict]:
+        """Every CUR file loaded or attempted, by path, with its fingerprint and last result"""
+        conn = self._connect()
+        try:
+            return {row['path']: dict(row) for row in conn.execute('SELECT * FROM cur_files')}
+        finally:
+            conn.close()
+    
+    def replace_cur_file(self, path: str, billing_period: Optional[str], size_bytes: int, mtime_ns: int,
+                         rows_read: int, hourly: pd.DataFrame, resources: pd.DataFrame):
+        """
+        Replace everything previously loaded from one CUR file
+        
+        Args:
+            path: File path (identity of the file)
+            billing_period: 'YYYY-MM' from its manifest, if any
+            size_bytes / mtime_ns: Fingerprint the file was read at
+            rows_read: Line items read
+            hourly: usage_hour, account_id, service, region, cost_amount
+            resources: usage_date, account_id, service, region, resource_id, cost_amount
+        """
+        conn = self._connect()
+        try:
+            conn.execute('''
+                INSERT INTO cur_files (path, billing_period, size_bytes, mtime_ns, rows_read, processed_at, error)
+                VALUES (?, ?, ?, ?, ?, ?, NULL)
+                ON CONFLICT(path) DO UPDATE SET
+                    billing_period = excluded.billing_period,
+                    size_bytes = excluded.size_bytes,
+                    mtime_ns = excluded.mtime_ns,
+                    rows_read = excluded.rows_read,
+                    processed_at = excluded.processed_at,
+                    error = NULL
+            ''', (path, billing_period, size_bytes, mtime_ns, rows_read, datetime.now(timezone.utc).isoformat()))
+            file_id = conn.execute('SELECT file_id FROM cur_files WHERE path = ?', (path,)).fetchone()['file_id']
+            
+            conn.execute('DELETE FROM cur_cost_hourly WHERE file_id = ?', (file_id,))
+            conn.execute('DELETE FROM cur_cost_resource WHERE file_id = ?', (file_id,))
+            # to_numpy converts whole columns at once; iterating Arrow-backed string columns row by row is far slower
+            conn.executemany(
+                'INSERT INTO cur_cost_hourly (file_id, usage_hour, account_id, service, region, cost_amount) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                hourly.assign(file_id=file_id)[['file_id', 'usage_hour', 'account_id', 'service', 'region', 'cost_amount']]
+                .to_numpy(dtype=object).tolist()
+            )
+            conn.executemany(
+                'INSERT INTO cur_cost_resource (file_id, usage_date, account_id, service, region, resource_id, cost_amount) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                resources.assign(file_id=file_id)[['file_id', 'usage_date', 'account_id', 'service', 'region', 'resource_id', 'cost_amount']]
+                .to_numpy(dtype=object).tolist()
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def record_cur_error(self, path: str, size_bytes: int, mtime_ns: int, error: str):
+        """Remember a file that failed to load; aggregates from an earlier version of it are kept"""
+        conn = self._connect()
+        try:
+            conn.execute('''
+                INSERT INTO cur_files (path, size_bytes, mtime_ns, processed_at, error) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET processed_at = excluded.processed_at, error = excluded.error
+            ''', (path, size_bytes, mtime_ns, datetime.now(timezone.utc).isoformat(), error))
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def remove_cur_files(self, paths: List[str]):
+        """Drop files (deleted, or superseded by a newer manifest) with their aggregates"""
+        conn = self._connect()
+        try:
+            for path in paths:
+                row = conn.execute('SELECT file_id FROM cur_files WHERE path = ?', (path,)).fetchone()
+                if row:
+                    conn.execute('DELETE FROM cur_cost_hourly WHERE file_id = ?', (row['file_id'],))
+                    conn.execute('DELETE FROM cur_cost_resource WHERE file_id = ?', (row['file_id'],))
+                    conn.execute('DELETE FROM cur_files WHERE file_id = ?', (row['file_id'],))
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def cur_coverage(self) -> Dict:
+        """Loaded CUR files, line items read, covered hours and the most recent load"""
+        conn = self._connect()
+        try:
+            files = conn.execute('''
+                SELECT COUNT(*) AS files, COALESCE(SUM(rows_read), 0) AS rows_read, MAX(processed_at) AS processed_at,
+                       SUM(CASE WHEN error IS NOT NULL THEN 1 ELSE 0 END) AS failing
+                FROM cur_files
+            ''').fetchone()
+            hours = conn.execute('SELECT MIN(usage_hour) AS first_hour, MAX(usage_hour) AS last_hour FROM cur_cost_hourly').fetchone()
+            return dict(dict(files), **dict(hours))
+        finally:
+            conn.close()
+    
+    def resource_costs(self, start: date, end: date, account_ids: Optional[List[str]] = None,
+                       service: Optional[str] = None, search: str = '', limit: int = 500) -> pd.DataFrame:
+        """
+        Cost per resource over [start, end), highest first (from CUR)
+        
+        Returns:
+            DataFrame with resource_id, account_id, service, region, cost and days (days with cost)
+        """
+        clause, params = self._account_clause(account_ids)
+        if service:
+            clause += ' AND service = ?'
+            params.append(service)
+        if search:
+            clause += " AND resource_id LIKE ? ESCAPE '\\'"
+            params.append('%' + re.sub(r'([%_\\])', r'\\\1', search) + '%')
+        return self._query(
+            f'SELECT resource_id, account_id, service, region, SUM(cost_amount) AS cost, '
+            f'COUNT(DISTINCT usage_date) AS days FROM cur_cost_resource '
+            f'WHERE usage_date >= ? AND usage_date < ?{clause} '
+            f'GROUP BY resource_id, account_id, service, region ORDER BY cost DESC LIMIT ?',
+            [start.isoformat(), end.isoformat()] + params + [limit]
+        )
+    
+    def hourly_costs(self, start: date, end: date, account_ids: Optional[List[str]] = None,
+                     service: Optional[str] = None) -> pd.DataFrame:
+        """Total cost per hour over [start, end) from CUR (usage_hour, cost)"""
+        clause, params = self._account_clause(account_ids)
+        if service:
+            clause += ' AND service = ?'
+            params.append(service)
+        return self._query(
+            f'SELECT usage_hour, SUM(cost_amount) AS cost FROM cur_cost_hourly '
+            f'WHERE usage_hour >= ? AND usage_hour < ?{clause} GROUP BY usage_hour ORDER BY usage_hour',
+            [start.isoformat(), end.isoformat()] + params
+        )
+    
+    def cur_services(self, start: date, end: date) -> List[str]:
+        """Services with CUR cost over [start, end), highest first"""
+        return self._query(
+            'SELECT service FROM cur_cost_hourly WHERE usage_hour >= ? AND usage_hour < ? '
+            'GROUP BY service ORDER BY SUM(cost_amount) DESC',
+            [start.isoformat(), end.isoformat()]
+        )['service'].tolist()
+    
+    def cur_accounts(self, start: date, end: date) -> List[str]:
+        """Accounts with CUR cost over [start, end), highest first"""
+        return self._query(
+            'SELECT account_id FROM cur_cost_hourly WHERE usage_hour >= ? AND usage_hour < ? '
+            'GROUP BY account_id ORDER BY SUM(cost_amount) DESC',
+            [start.isoformat(), end.isoformat()]
+        )['account_id'].tolist()
+    
+    def iter_resource_frames(self, start: date, end: date, chunk_rows: int = 50000) -> Iterable[pd.DataFrame]:
+        """Daily per-resource CUR cost over [start, end) as a stream of DataFrames (for exports)"""
+        conn = self._connect()
+        try:
+            yield from pd.read_sql_query(
+                'SELECT usage_date, account_id, service, region, resource_id, SUM(cost_amount) AS cost_amount '
+                'FROM cur_cost_resource WHERE usage_date >= ? AND usage_date < ? '
+                'GROUP BY usage_date, account_id, service, region, resource_id ORDER BY usage_date, account_id',
+                conn,
+                params=(start.isoformat(), end.isoformat()),
+                chunksize=chunk_rows
+            )
+        finally:
+            conn.close()
+    
+    # ========== Forecasting ==========
+    
+    def rollup_facts(self, start: date, end: date, account_ids: Optional[List[str]] = None) -> pd.DataFrame:
+        """Daily cost per account and service over [start, end) (cost_date, account_id, account_name, service, cost_amount)"""
+        clause, params = self._account_clause(account_ids)
+        return self._query(
+            f'SELECT cost_date, account_id, account_name, service, cost_amount FROM cost_rollup_daily '
+            f'WHERE cost_date >= ? AND cost_date < ?{clause}',
+            [start.isoformat(), end.isoformat()] + params
+        )
+    
+    def settled_watermarks(self) -> Dict[str, date]:
+        """Last settled day ingested per account (accounts never ingested successfully are absent)"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                'SELECT account_id, settled_through FROM cost_ingestion_state WHERE settled_through IS NOT NULL'
+            ).fetchall()
+        finally:
+            conn.close()
+        return {account_id: date.fromisoformat(settled_through) for account_id, settled_through in rows}
+    
+    def forecast_state(self) -> pd.DataFrame:
+        """Stored forecast model state of every account/service series (see cost_forecast)"""
+        return self._query('SELECT * FROM cost_forecast_state', [])
+    
+    def save_forecast_state(self, states: pd.DataFrame):
+        """Replace the stored forecast model states"""
+        columns = list(states.columns)
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM cost_forecast_state')
+            conn.executemany(
+                f"INSERT INTO cost_forecast_state ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                states.to_numpy(dtype=object).tolist()
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def budgets(self) -> pd.DataFrame:
+        """Monthly budget per account (account_id, account_name, monthly_amount)"""
+        return self._query('SELECT account_id, account_name, monthly_amount FROM cost_budgets', [])
+    
+    def save_budgets(self, budgets: pd.DataFrame):
+        """
+        Set the monthly budgets of the given accounts (other accounts keep theirs)
+        
+        Args:
+            budgets: account_id, account_name, monthly_amount; a missing amount removes that account's budget
+        """
+        cleared = budgets['monthly_amount'].isna()
+        now = datetime.now(timezone.utc).isoformat()
+        conn = self._connect()
+        try:
+            conn.executemany(
+                'DELETE FROM cost_budgets WHERE account_id = ?',
+                [(account_id,) for account_id in budgets.loc[cleared, 'account_id']]
+            )
+            conn.executemany('''
+                INSERT INTO cost_budgets (account_id, account_name, monthly_amount, updated_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(account_id) DO UPDATE SET
+                    account_name = excluded.account_name,
+                    monthly_amount = excluded.monthly_amount,
+                    updated_at = excluded.updated_at
+            ''', [(row.account_id, row.account_name, float(row.monthly_amount), now) for row in budgets[~cleared].itertuples()])
+            conn.commit()
+        finally:
+            conn.close()
+    
+    # ========== Allocation ==========
+    
+    def iter_allocation_lines(self, start: date, end: date, chunk_rows: int = 500000) -> Iterable[Tuple[str, pd.DataFrame]]:
+        """
+        Daily cost lines over [start, end) to allocate, as a stream of DataFrames
+        
+        Each (day, account) the Cost and Usage Report files cover comes from
+        CUR: per-resource cost plus the day's cost without a resource (hourly
+        totals less resource totals). Every other (day, account) falls back to
+        the Cost Explorer daily rollup, so partial CUR coverage leaves no gap.
+        
+        Args:
+            chunk_rows: Lines per DataFrame
+        
+        Returns:
+            (source, DataFrame) pairs - source 'cur' or 'cost_explorer', the DataFrame with
+            usage_date, account_id, service, resource_id ('' when none), cost_amount
+        """
+        params = (start.isoformat(), end.isoformat())
+        queries = [
+            ('cur',
+             'SELECT usage_date, account_id, service, resource_id, SUM(cost_amount) AS cost_amount '
+             'FROM cur_cost_resource WHERE usage_date >= ? AND usage_date < ? '
+             'GROUP BY usage_date, account_id, service, resource_id', params),
+            ('cur',
+             'SELECT h.usage_date, h.account_id, h.service, \'\' AS resource_id, '
+             'h.cost_amount - COALESCE(r.cost_amount, 0) AS cost_amount FROM ('
+             '  SELECT substr(usage_hour, 1, 10) AS usage_date, account_id, service, SUM(cost_amount) AS cost_amount '
+             '  FROM cur_cost_hourly WHERE usage_hour >= ? AND usage_hour < ? GROUP BY 1, 2, 3'
+             ') h LEFT JOIN ('
+             '  SELECT usage_date, account_id, service, SUM(cost_amount) AS cost_amount '
+             '  FROM cur_cost_resource WHERE usage_date >= ? AND usage_date < ? GROUP BY 1, 2, 3'
+             ') r USING (usage_date, account_id, service) '
+             'WHERE ABS(h.cost_amount - COALESCE(r.cost_amount, 0)) > 1e-9', params + params),
+            ('cost_explorer',
+             'SELECT c.cost_date AS usage_date, c.account_id, c.service, \'\' AS resource_id, c.cost_amount '
+             'FROM cost_rollup_daily c LEFT JOIN ('
+             '  SELECT DISTINCT substr(usage_hour, 1, 10) AS usage_date, account_id '
+             '  FROM cur_cost_hourly WHERE usage_hour >= ? AND usage_hour < ?'
+             ') h ON h.usage_date = c.cost_date AND h.account_id = c.account_id '
+             'WHERE c.cost_date >= ? AND c.cost_date < ? AND h.account_id IS NULL', params + params)
+        ]
+        conn = self._connect()
+        try:
+            for source, sql, query_params in queries:
+                for frame in pd.read_sql_query(sql, conn, params=query_params, chunksize=chunk_rows):
+                    yield source, frame
+        finally:
+            conn.close()
+    
+    def replace_allocation(self, start: date, end: date, showback: pd.DataFrame, run: Dict):
+        """
+        Replace the showback rows of [start, end) and record the run
+        
+        Args:
+            showback: dimension, usage_date, account_id, service, value, rule, cost_amount
+            run: run_at, start_date, end_date, source, snapshot_id, lines, seconds
+        """
+        columns = ['dimension', 'usage_date', 'account_id', 'service', 'value', 'rule', 'cost_amount']
+        conn = self._connect()
+        try:
+            conn.execute(
+                'DELETE FROM cost_allocation_daily WHERE usage_date >= ? AND usage_date < ?',
+                (start.isoformat(), end.isoformat())
+            )
+            conn.executemany(
+                f"INSERT INTO cost_allocation_daily ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                showback[columns].to_numpy(dtype=object).tolist()
+            )
+            conn.execute(
+                f"INSERT INTO cost_allocation_runs ({', '.join(run)}) VALUES ({', '.join('?' * len(run))})",
+                list(run.values())
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def record_allocation_failure(self, run: Dict):
+        """
+        Record a failed allocation run (the showback keeps the last successful run's rows)
+        
+        Args:
+            run: run_at, start_date, end_date, source, snapshot_id, lines, seconds and error
+        """
+        run = dict(run, status='failed')
+        conn = self._connect()
+        try:
+            conn.execute(
+                f"INSERT INTO cost_allocation_runs ({', '.join(run)}) VALUES ({', '.join('?' * len(run))})",
+                list(run.values())
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def allocation_status(self, include_failed: bool = False) -> Optional[Dict]:
+        """Most recent successful allocation run (or run of any status), or None"""
+        where = '' if include_failed else "WHERE status = 'complete' "
+        conn = self._connect()
+        try:
+            row = conn.execute(f'SELECT * FROM cost_allocation_runs {where}ORDER BY run_id DESC LIMIT 1').fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+    
+    def allocation_is_stale(self, max_age_hours: float) -> bool:
+        """
+        Whether allocation never ran, ran over max_age_hours ago, or cost was loaded since
+        
+        A failed run counts as a run, so it is retried at the next interval (or when new cost
+        lands) rather than on every page load.
+        """
+        status = self.allocation_status(include_failed=True)
+        if not status:
+            return True
+        run_at = datetime.fromisoformat(status['run_at'])
+        loaded = [value for value in (self.coverage()['last_run'], self.cur_coverage()['processed_at']) if value]
+        return (datetime.now(timezone.utc) - run_at > timedelta(hours=max_age_hours)
+                or any(datetime.fromisoformat(value) > run_at for value in loaded))
+    
+    def allocation(self, dimension: str, start: date, end: date, account_ids: Optional[List[str]] = None) -> pd.DataFrame:
+        """Showback rows of one allocation tag over [start, end) (usage_date, account_id, service, value, rule, cost_amount)"""
+        clause, params = self._account_clause(account_ids)
+        return self._query(
+            f'SELECT usage_date, account_id, service, value, rule, cost_amount FROM cost_allocation_daily '
+            f'WHERE dimension = ? AND usage_date >= ? AND usage_date < ?{clause}',
+            [dimension, start.isoformat(), end.isoformat()] + params
+        )
+    
+    # ========== Natural-language queries ==========
+    
+    def query_translation(self, question_key: str) -> Optional[Dict]:
+        """Cached translation of a normalized question (spec as JSON), counting the hit"""
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT * FROM cost_query_translations WHERE question_key = ?', (question_key,)).fetchone()
+            if row:
+                conn.execute(
+                    'UPDATE cost_query_translations SET hits = hits + 1, last_used = ? WHERE question_key = ?',
+                    (datetime.now(timezone.utc).isoformat(), question_key)
+                )
+                conn.commit()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+    
+    def save_query_translation(self, question_key: str, question: str, spec: str, model: str):
+        """Cache the translation of a normalized question"""
+        now = datetime.now(timezone.utc).isoformat()
+        conn = self._connect()
+        try:
+            conn.execute('''
+                INSERT INTO cost_query_translations (question_key, question, spec, model, created_at, last_used, hits)
+                VALUES (?, ?, ?, ?, ?, ?, 0)
+                ON CONFLICT(question_key) DO UPDATE SET
+                    question = excluded.question,
+                    spec = excluded.spec,
+                    model = excluded.model,
+                    created_at = excluded.created_at,
+                    last_used = excluded.last_used
+            ''', (question_key, question, spec, model, now, now))
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def recent_query_translations(self, limit: int = 20) -> pd.DataFrame:
+        """Most recently used cached questions (question, hits, last_used)"""
+        return self._query(
+            'SELECT question, hits, last_used FROM cost_query_translations ORDER BY last_used DESC LIMIT ?', [limit]
+        )
+    
+    def query_context(self, today: date, days: int = 90, limit: int = 50) -> Dict[str, List[str]]:
+        """
+        Names a question may refer to - accounts, services, tag keys, allocation tags - without any cost
+        
+        Returns:
+            Dict of label -> values, costliest first
+        """
+        params = [(today - timedelta(days=days)).isoformat(), today.isoformat()]
+        accounts = self._query(
+            'SELECT account_id, MAX(account_name) AS account_name FROM cost_rollup_daily '
+            'WHERE cost_date >= ? AND cost_date < ? GROUP BY account_id ORDER BY SUM(cost_amount) DESC LIMIT ?',
+            params + [limit]
+        )
+        services = self._query(
+            'SELECT service FROM cost_rollup_daily WHERE cost_date >= ? AND cost_date < ? '
+            'GROUP BY service ORDER BY SUM(cost_amount) DESC LIMIT ?',
+            params + [limit]
+        )
+        tag_keys = self._query('SELECT DISTINCT tag_key FROM cost_tag_data WHERE cost_date >= ? AND cost_date < ?', params)
+        dimensions = self._query('SELECT DISTINCT dimension FROM cost_allocation_daily', [])
+        return {
+            'accounts (account_id = account_name)': [f"{row.account_id} = {row.account_name}" for row in accounts.itertuples()],
+            'services': services['service'].tolist(),
+            'tag_cost tag_key values': tag_keys['tag_key'].tolist(),
+            'allocation dimension values': dimensions['dimension'].tolist(),
+            'resource_cost': ['loaded' if self.cur_coverage()['last_hour'] else 'empty (no CUR files loaded)']
+        }
+    
+    def run_query(self, sql: str, params: List) -> pd.DataFrame:
+        """Run a compiled cost query on a read-only connection"""
+        conn = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True, timeout=30)
+        try:
+            return pd.read_sql_query(sql, conn, params=params)
+        finally:
+            conn.close()
+    
+    # ========== Rollup queries ==========
+    
+    @staticmethod
+    def _account_clause(account_ids: Optional[List[str]]) -> Tuple[str, List[str]]:
+        if account_ids is None:
+            return '', []
+        return f" AND account_id IN ({', '.join('?' * len(account_ids))})", list(account_ids)
+    
+    def _query(self, sql: str, params: List) -> pd.DataFrame:
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(sql, conn, params=params)
+        finally:
+            conn.close()
+    
+    def daily_totals(self, start: date, end: date, account_ids: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Total cost per day over [start, end), days without cost included as 0
+        
+        Returns:
+            DataFrame with date (ISO string) and cost
+        """
+        clause, params = self._account_clause(account_ids)
+        frame = self._query(
+            f'SELECT cost_date, SUM(cost_amount) AS cost FROM cost_rollup_daily '
+            f'WHERE cost_date >= ? AND cost_date < ?{clause} GROUP BY cost_date',
+            [start.isoformat(), end.isoformat()] + params
+        )
+        days = pd.date_range(start, end - timedelta(days=1), freq='D').strftime('%Y-%m-%d')
+        series = frame.set_index('cost_date')['cost'].reindex(days, fill_value=0.0)
+        return pd.DataFrame({'date': series.index, 'cost': series.to_numpy()})
+    
+    def cost_by_service(self, start: date, end: date, account_ids: Optional[List[str]] = None) -> pd.Series:
+        """Cost per service over [start, end), highest first"""
+        clause, params = self._account_clause(account_ids)
+        frame = self._query(
+            f'SELECT service, SUM(cost_amount) AS cost FROM cost_rollup_daily '
+            f'WHERE cost_date >= ? AND cost_date < ?{clause} GROUP BY service ORDER BY cost DESC',
+            [start.isoformat(), end.isoformat()] + params
+        )
+        return frame.set_index('service')['cost']
+    
+    def cost_by_account(self, start: date, end: date, account_ids: Optional[List[str]] = None) -> pd.DataFrame:
+        """Cost per account over [start, end), highest first (account_id, account_name, cost)"""
+        clause, params = self._account_clause(account_ids)
+        return self._query(
+            f'SELECT account_id, MAX(account_name) AS account_name, SUM(cost_amount) AS cost FROM cost_rollup_daily '
+            f'WHERE cost_date >= ? AND cost_date < ?{clause} GROUP BY account_id ORDER BY cost DESC',
+            [start.isoformat(), end.isoformat()] + params
+        )
+    
+    def cost_by_tag(self, tag_key: str, start: date, end: date, account_ids: Optional[List[str]] = None) -> pd.DataFrame:
+        """Cost per value of a cost allocation tag over [start, end) ('' = untagged)"""
+        clause, params = self._account_clause(account_ids)
+        return self._query(
+            f'SELECT tag_value, SUM(cost_amount) AS cost FROM cost_tag_data '
+            f'WHERE tag_key = ? AND cost_date >= ? AND cost_date < ?{clause} GROUP BY tag_value ORDER BY cost DESC',
+            [tag_key, start.isoformat(), end.isoformat()] + params
+        )
+    
+    def summary(self, days: int = 30, account_ids: Optional[List[str]] = None) -> Dict:
+        """
+        Cost of the last `days` days in the shape of the FinOps demo cost data
+        
+        Returns:
+            Dict with total_cost, previous_cost (the `days` before), services,
+            daily_costs [{'date', 'cost'}] and by_account {name: cost}
+        """
+        end = utc_today() + timedelta(days=1)
+        start = end - timedelta(days=days)
+        daily = self.daily_totals(start - timedelta(days=days), end, account_ids)
+        current = daily.iloc[days:]
+        return {
+            'total_cost': float(current['cost'].sum()),
+            'previous_cost': float(daily['cost'].iloc[:days].sum()),
+            'services': self.cost_by_service(start, end, account_ids).to_dict(),
+            'daily_costs': current.to_dict('records'),
+            'by_account': {
+                row.account_name or row.account_id: row.cost
+                for row in self.cost_by_account(start, end, account_ids).itertuples()
+            }
+        }
+    
+    def daily_facts(self, start: date, end: date) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Leaf daily cost over [start, end), for per-series analysis
+        
+        Returns:
+            (cost facts with account_id, account_name, cost_date, service, region, cost_amount;
+             tag facts with account_id, cost_date, tag_key, tag_value, service, cost_amount)
+        """
+        params = [start.isoformat(), end.isoformat()]
+        costs = self._query(
+            'SELECT account_id, account_name, cost_date, service, region, cost_amount FROM cost_data '
+            'WHERE cost_date >= ? AND cost_date < ?',
+            params
+        )
+        tags = self._query(
+            'SELECT account_id, cost_date, tag_key, tag_value, service, cost_amount FROM cost_tag_data '
+            'WHERE cost_date >= ? AND cost_date < ?',
+            params
+        )
+        return costs, tags
+    
+    def iter_frames(self, start: date, end: date, chunk_rows: int = 50000) -> Iterable[pd.DataFrame]:
+        """Daily cost facts over [start, end) as a stream of DataFrames (for exports)"""
+        conn = self._connect()
+        try:
+            yield from pd.read_sql_query(
+                'SELECT cost_date, account_id, account_name, service, region, cost_amount, currency FROM cost_data '
+                'WHERE cost_date >= ? AND cost_date < ? ORDER BY cost_date, account_id',
+                conn,
+                params=(start.isoformat(), end.isoformat()),
+                chunksize=chunk_rows
+            )
+        finally:
+            conn.close()
+
+
+class CostIngestor:
+    """
+    Loads daily cost from Cost Explorer into the warehouse
+    
+    Each account is backfilled once (COST_BACKFILL_DAYS); later runs fetch
+    only from the settled watermark, i.e. the last COST_UNSETTLED_DAYS plus
+    any days missed since the previous run. A run costs 1 + len(COST_TAG_KEYS)
+    paid requests per account (more only if results page), taken from the
+    background share of the Cost Explorer daily budget. An account refused by
+    the budget fails the run and keeps serving the days already stored.
+    """
+    
+    def __init__(self, account_mgr, warehouse: CostWarehouse, governor=None):
+        """
+        Initialize ingestor
+        
+        Args:
+            account_mgr: AWSAccountManager (resolved on the calling Streamlit thread)
+            warehouse: Destination warehouse
+            governor: CostExplorerGovernor (default: get_cost_explorer_governor(), resolved here)
+        """
+        if governor is None:
+            from aws_cost_explorer import get_cost_explorer_governor
+            governor = get_cost_explorer_governor()
+        
+        self.account_mgr = account_mgr
+        self.warehouse = warehouse
+        self.governor = governor
+    
+    def ingest(self, accounts: Optional[List] = None, progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+        """
+        Ingest every account once (Cost Explorer is global, so one call per account)
+        
+        Args:
+            accounts: AWSAccountConfig list (default: all active configured accounts)
+            progress: Optional callback(completed_accounts, total_accounts)
+        
+        Returns:
+            Dict with accounts, failed, rows, requests and errors (per-account error rows)
+        """
+        executor = AccountFanOutExecutor(self.account_mgr, call_timeout=AppConfig.COST_INGEST_CALL_TIMEOUT)
+        report = executor.run(
+            self._ingest_account,
+            accounts=accounts,
+            primary_region_only=True,
+            on_result=(lambda result, completed, total: progress(completed, total)) if progress else None
+        )
+        
+        for failure in report.failed:
+            self.warehouse.set_state(
+                failure.target.account_id, failure.target.account_name, None, None, 0,
+                f"{failure.error_code}: {failure.error}"
+            )
+        
+        results = report.values()
+        return {
+            'accounts': len(results),
+            'failed': len(report.failed),
+            'rows': sum(r['rows'] for r in results),
+            'requests': sum(r['requests'] for r in results),
+            'errors': report.error_rows()
+        }
+    
+    def fetch_ranges(self, account_id: str, today: date) -> List[Tuple[date, date]]:
+        """[start, end) day ranges an account still needs, oldest first"""
+        backfill_start = today - timedelta(days=AppConfig.COST_BACKFILL_DAYS)
+        end = today + timedelta(days=1)
+        state = self.warehouse.get_state(account_id)
+        if not state or not state['settled_through']:
+            return [(backfill_start, end)]
+        
+        ranges = []
+        first_date = date.fromisoformat(state['first_date'])
+        if backfill_start < first_date:
+            # The backfill window was widened since the account was first loaded
+            ranges.append((backfill_start, first_date))
+        unsettled_start = today - timedelta(days=AppConfig.COST_UNSETTLED_DAYS)
+        ranges.append((min(date.fromisoformat(state['settled_through']) + timedelta(days=1), unsettled_start), end))
+        return ranges
+    
+    def _ingest_account(self, session, target: FanOutTarget) -> Dict:
+        """Fetch and store the missing days of one account (worker thread)"""
+        from aws_cost_explorer import CostExplorerService, PRIORITY_BACKGROUND
+        
+        ce = CostExplorerService(session, governor=self.governor, priority=PRIORITY_BACKGROUND)
+        today = utc_today()
+        ranges = self.fetch_ranges(target.account_id, today)
+        requests = 0
+        rows = 0
+        
+        for start, end in ranges:
+            groups, made = ce.get_daily_cost_groups(
+                start, end,
+                [{'Type': 'DIMENSION', 'Key': 'SERVICE'}, {'Type': 'DIMENSION', 'Key': 'REGION'}],
+                account_id=target.account_id
+            )
+            requests += made
+            cost_rows = [
+                (day, service, region if region and region != 'NoRegion' else GLOBAL_REGION, amount)
+                for day, (service, region), amount in groups
+            ]
+            
+            tag_rows = []
+            for tag_key in AppConfig.COST_TAG_KEYS:
+                groups, made = ce.get_daily_cost_groups(
+                    start, end,
+                    [{'Type': 'TAG', 'Key': tag_key}, {'Type': 'DIMENSION', 'Key': 'SERVICE'}],
+                    account_id=target.account_id
+                )
+                requests += made
+                # Tag group keys look like 'Team$payments'; 'Team$' is untagged spend
+                tag_rows.extend(
+                    (day, tag_key, tag.split('$', 1)[-1], service, amount)
+                    for day, (tag, service), amount in groups
+                )
+            
+            self.warehouse.replace_range(target.account_id, target.account_name, start, end, cost_rows, tag_rows)
+            rows += len(cost_rows) + len(tag_rows)
+        
+        state = self.warehouse.get_state(target.account_id)
+        first_date = min([ranges[0][0]] + ([date.fromisoformat(state['first_date'])] if state and state['first_date'] else []))
+        settled_through = today - timedelta(days=AppConfig.COST_UNSETTLED_DAYS + 1)
+        self.warehouse.set_state(target.account_id, target.account_name, first_date, settled_through, requests)
+        return {'account_id': target.account_id, 'rows': rows, 'requests': requests}
+
+
+def submit_cost_job(warehouse: CostWarehouse, job: str, task_name: str, function: Callable, kwargs: Dict) -> Optional[str]:
+    """
+    Queue a background warehouse job unless a run of it is already in progress
+    
+    Args:
+        warehouse: Warehouse holding the job marker
+        job: Job name ('ingestion', 'allocation'); the task type is cost_<job>
+        task_name: Human-readable task name
+        function: Function the task runs with kwargs
+        kwargs: Keyword arguments for function
+    
+    Returns:
+        Task ID of the new or the running task (None while another session is still queuing it)
+    """
+    from queue_service import get_task_queue, TaskPriority
+    
+    if not warehouse.claim_job(job):
+        return warehouse.job_status(job)['task_id']
+    
+    def run(**task_kwargs):
+        try:
+            result = function(**task_kwargs)
+        except Exception as e:
+            warehouse.finish_job(job, str(e))
+            raise
+        warehouse.finish_job(job)
+        return result
+    
+    try:
+        task_id = get_task_queue().submit_task(
+            task_type=f'cost_{job}',
+            task_name=task_name,
+            function=run,
+            kwargs=kwargs,
+            priority=TaskPriority.NORMAL
+        )
+    except Exception as e:
+        warehouse.finish_job(job, str(e))
+        raise
+    warehouse.set_job_task(job, task_id)
+    return task_id
+
+
+def submit_cost_ingestion(account_mgr, accounts: Optional[List] = None) -> Optional[str]:
+    """
+    Queue a background cost ingestion run, unless one is already running
+    
+    Args:
+        account_mgr: AWSAccountManager (resolved on the calling Streamlit thread)
+        accounts: AWSAccountConfig list (default: all active configured accounts)
+    
+    Returns:
+        Task ID of the new or the running ingestion (see submit_cost_job)
+    """
+    from queue_service import get_task_queue
+    
+    warehouse = get_cost_warehouse()
+    ingestor = CostIngestor(account_mgr, warehouse)
+    queue = get_task_queue()
+    task_id_holder = {}
+    
+    def progress(completed: int, total: int):
+        task = queue.get_task(task_id_holder.get('id'))
+        if task:
+            task.progress = int(100 * completed / max(total, 1))
+    
+    task_id_holder['id'] = submit_cost_job(
+        warehouse, 'ingestion', 'Ingest daily cost from Cost Explorer', ingestor.ingest,
+        {'accounts': accounts, 'progress': progress}
+    )
+    return task_id_holder['id']
+
+
+@st.cache_resource
+def get_cost_warehouse() -> CostWarehouse:
+    """Get cached cost warehouse instance"""
+    return CostWarehouse()
@@ -0,0 +1,320 @@
+"""
+CUR Ingestion - Streaming Cost and Usage Report Loader
+Aggregates locally synced CUR files (gzip CSV or Parquet) to hourly and per-resource cost, chunk by chunk
+"""
+
+import pandas as pd
+import numpy as np
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from config_settings import AppConfig
+from cost_warehouse import CostWarehouse, GLOBAL_REGION, get_cost_warehouse
+import json
+import re
+
+
+# Canonical column -> header names in legacy CUR CSV, legacy CUR Parquet and CUR 2.0 exports (first present wins)
+CUR_COLUMNS = {
+    'usage_start': ['lineItem/UsageStartDate', 'line_item_usage_start_date'],
+    'account_id': ['lineItem/UsageAccountId', 'line_item_usage_account_id'],
+    'service': ['product/ProductName', 'product_product_name', 'lineItem/ProductCode', 'line_item_product_code'],
+    'region': ['product/regionCode', 'product_region_code', 'product/region', 'product_region'],
+    'resource_id': ['lineItem/ResourceId', 'line_item_resource_id'],
+    'cost': ['lineItem/UnblendedCost', 'line_item_unblended_cost']
+}
+REQUIRED_COLUMNS = ('usage_start', 'account_id', 'cost')
+KEY_COLUMNS = ('account_id', 'service', 'region', 'resource_id')
+
+DATA_SUFFIXES = ('.csv.gz', '.csv.zip', '.csv', '.parquet')
+MANIFEST_SUFFIX = 'Manifest.json'
+
+
+@dataclass
+class CurFile:
+    """A CUR data file on disk"""
+    path: str
+    relative: str                       # POSIX path below the CUR directory
+    size_bytes: int
+    mtime_ns: int
+    billing_period: Optional[str] = None
+    
+    @property
+    def is_parquet(self) -> bool:
+        return self.path.endswith('.parquet')
+
+
+def _billing_period(manifest: Dict) -> Optional[str]:
+    """'YYYY-MM' from a manifest's billingPeriod.start ('20240101T000000.000Z' or ISO)"""
+    digits = re.sub(r'\D', '', (manifest.get('billingPeriod') or {}).get('start', ''))
+    return f"{digits[:4]}-{digits[4:6]}" if len(digits) >= 6 else None
+
+
+def discover_cur_files(directory: str) -> Tuple[List[CurFile], List[CurFile]]:
+    """
+    CUR data files below a directory, split by the manifests found there
+    
+    Each CUR delivery rewrites the whole billing period and lists its files
+    in a manifest (reportKeys for legacy CUR, dataFiles for CUR 2.0). Files
+    listed only by an older manifest of the same billing period are
+    superseded; files no manifest lists are taken as current.
+    
+    Returns:
+        (current files, superseded files)
+    """
+    root = Path(directory)
+    if not root.is_dir():
+        return [], []
+    
+    files = {}
+    manifests = []
+    for path in root.rglob('*'):
+        if not path.is_file():
+            continue
+        if path.name.endswith(MANIFEST_SUFFIX):
+            manifests.append(path)
+        elif path.name.endswith(DATA_SUFFIXES):
+            stat = path.stat()
+            files[str(path)] = CurFile(str(path), path.relative_to(root).as_posix(), stat.st_size, stat.st_mtime_ns)
+    
+    by_name: Dict[str, List[CurFile]] = {}
+    for cur_file in files.values():
+        by_name.setdefault(Path(cur_file.relative).name, []).append(cur_file)
+    
+    def listed(keys: Iterable[str]) -> List[CurFile]:
+        matched = []
+        for key in keys:
+            key = key.split('://', 1)[-1]
+            matched.extend(
+                cur_file for cur_file in by_name.get(key.rsplit('/', 1)[-1], [])
+                if key.endswith(cur_file.relative) or cur_file.relative.endswith(key.split('/', 1)[-1])
+            )
+        return matched
+    
+    # Newest manifest of each billing period decides which of its files are current
+    latest: Dict[str, Tuple[int, List[CurFile]]] = {}
+    older: List[CurFile] = []
+    for manifest_path in manifests:
+        try:
+            manifest = json.loads(manifest_path.read_text())
+        except (OSError, ValueError):
+            continue
+        period = _billing_period(manifest)
+        matched = listed(manifest.get('reportKeys') or manifest.get('dataFiles') or [])
+        for cur_file in matched:
+            cur_file.billing_period = period
+        mtime = manifest_path.stat().st_mtime_ns
+        if period not in latest or mtime > latest[period][0]:
+            if period in latest:
+                older.extend(latest[period][1])
+            latest[period] = (mtime, matched)
+        else:
+            older.extend(matched)
+    
+    current_paths = {cur_file.path for _, matched in latest.values() for cur_file in matched}
+    superseded = {cur_file.path: cur_file for cur_file in older if cur_file.path not in current_paths}
+    current = [cur_file for path, cur_file in sorted(files.items()) if path not in superseded]
+    return current, list(superseded.values())
+
+
+class CurIngestor:
+    """
+    Loads CUR files into the warehouse's hourly and per-resource tables
+    
+    Files are streamed CUR_CHUNK_ROWS line items at a time, reading only the
+    columns in CUR_COLUMNS (Parquet row groups via pyarrow, CSV via pandas
+    chunks), and each chunk is aggregated at once; partial aggregates are
+    re-aggregated whenever they pass CUR_COMPACT_ROWS. A file is read again
+    only when its size or modification time changes.
+    """
+    
+    def __init__(self, warehouse: CostWarehouse, directory: Optional[str] = None,
+                 chunk_rows: Optional[int] = None, compact_rows: Optional[int] = None):
+        """
+        Initialize ingestor
+        
+        Args:
+            warehouse: Destination warehouse
+            directory: Directory the CUR is synced to (default AppConfig.CUR_DIRECTORY)
+            chunk_rows: Line items per chunk (default AppConfig.CUR_CHUNK_ROWS)
+            compact_rows: Partial aggregate rows held before re-aggregating (default AppConfig.CUR_COMPACT_ROWS)
+        """
+        self.warehouse = warehouse
+        self.directory = directory or AppConfig.CUR_DIRECTORY
+        self.chunk_rows = chunk_rows or AppConfig.CUR_CHUNK_ROWS
+        self.compact_rows = compact_rows or AppConfig.CUR_COMPACT_ROWS
+    
+    def plan(self) -> Tuple[List[CurFile], List[str]]:
+        """
+        What a run would do
+        
+        Returns:
+            (files that are new or changed, loaded paths to drop as deleted or superseded)
+        """
+        current, superseded = discover_cur_files(self.directory)
+        loaded = self.warehouse.cur_files()
+        changed = [
+            cur_file for cur_file in current
+            if cur_file.path not in loaded
+            or (loaded[cur_file.path]['size_bytes'], loaded[cur_file.path]['mtime_ns']) != (cur_file.size_bytes, cur_file.mtime_ns)
+            # Failed files are retried, e.g. once pyarrow is installed
+            or loaded[cur_file.path]['error']
+        ]
+        current_paths = {cur_file.path for cur_file in current}
+        removed = [path for path in loaded if path not in current_paths]
+        return changed, removed
+    
+    def ingest(self, progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+        """
+        Load new, changed and previously failed files and drop deleted or superseded ones
+        
+        Args:
+            progress: Optional callback(completed_files, total_files)
+        
+        Returns:
+            Dict with files, removed, rows_read, hourly_rows, resource_rows and errors ([{'file', 'error'}])
+        """
+        changed, removed = self.plan()
+        self.warehouse.remove_cur_files(removed)
+        
+        result = {'files': 0, 'removed': len(removed), 'rows_read': 0, 'hourly_rows': 0, 'resource_rows': 0, 'errors': []}
+        for completed, cur_file in enumerate(changed, start=1):
+            try:
+                hourly, resources, rows_read = self.aggregate_file(cur_file)
+                self.warehouse.replace_cur_file(cur_file.path, cur_file.billing_period, cur_file.size_bytes,
+                                                cur_file.mtime_ns, rows_read, hourly, resources)
+                result['files'] += 1
+                result['rows_read'] += rows_read
+                result['hourly_rows'] += len(hourly)
+                result['resource_rows'] += len(resources)
+            except Exception as e:
+                self.warehouse.record_cur_error(cur_file.path, cur_file.size_bytes, cur_file.mtime_ns, str(e))
+                result['errors'].append({'file': cur_file.relative, 'error': str(e)})
+            if progress:
+                progress(completed, len(changed))
+        return result
+    
+    def aggregate_file(self, cur_file: CurFile) -> Tuple[pd.DataFrame, pd.DataFrame, int]:
+        """
+        Stream one file into hourly and per-resource daily aggregates
+        
+        Returns:
+            (hourly: usage_hour, account_id, service, region, cost_amount;
+             resources: usage_date, account_id, service, region, resource_id, cost_amount;
+             line items read)
+        """
+        hourly_keys = ['usage_hour', 'account_id', 'service', 'region']
+        resource_keys = ['usage_date', 'account_id', 'service', 'region', 'resource_id']
+        hourly_parts, resource_parts = [], []
+        held = 0
+        rows_read = 0
+        
+        for chunk in self._read_chunks(cur_file):
+            rows_read += len(chunk)
+            chunk = self._normalize(chunk)
+            hourly_parts.append(chunk.groupby(hourly_keys, sort=False, observed=True)['cost_amount'].sum().reset_index())
+            # Line items without a resource (support, tax, most data transfer) only count toward the hourly totals
+            with_resource = chunk[chunk['resource_id'] != '']
+            resource_parts.append(
+                with_resource.assign(usage_date=with_resource['usage_hour'].str.slice(0, 10))
+                .groupby(resource_keys, sort=False, observed=True)['cost_amount'].sum().reset_index()
+            )
+            held += len(hourly_parts[-1]) + len(resource_parts[-1])
+            if held > self.compact_rows:
+                hourly_parts = [_reaggregate(hourly_parts, hourly_keys)]
+                resource_parts = [_reaggregate(resource_parts, resource_keys)]
+                held = len(hourly_parts[0]) + len(resource_parts[0])
+        
+        hourly = _reaggregate(hourly_parts, hourly_keys)
+        hourly['usage_hour'] = hourly['usage_hour'] + ':00:00Z'
+        return hourly, _reaggregate(resource_parts, resource_keys), rows_read
+    
+    def _read_chunks(self, cur_file: CurFile) -> Iterable[pd.DataFrame]:
+        """Projected chunks of a CUR file with canonical column names"""
+        if cur_file.is_parquet:
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise RuntimeError("Reading Parquet CUR files requires pyarrow (pip install pyarrow)")
+            
+            parquet = pq.ParquetFile(cur_file.path)
+            mapping = _resolve_columns(parquet.schema_arrow.names)
+            for batch in parquet.iter_batches(batch_size=self.chunk_rows, columns=list(mapping.values())):
+                yield batch.to_pandas().rename(columns={source: name for name, source in mapping.items()})
+        else:
+            mapping = _resolve_columns(pd.read_csv(cur_file.path, nrows=0).columns)
+            text = {source: str for name, source in mapping.items() if name != 'cost'}
+            for chunk in pd.read_csv(cur_file.path, usecols=list(mapping.values()), dtype=text,
+                                     keep_default_na=False, chunksize=self.chunk_rows):
+                yield chunk.rename(columns={source: name for name, source in mapping.items()})
+    
+    @staticmethod
+    def _normalize(chunk: pd.DataFrame) -> pd.DataFrame:
+        """usage_hour ('YYYY-MM-DDTHH'), the key columns ('' when absent) and cost_amount"""
+        frame = pd.DataFrame({'usage_hour': _hour_keys(chunk['usage_start'])})
+        for column in KEY_COLUMNS:
+            frame[column] = chunk[column].fillna('').astype(str).to_numpy() if column in chunk else ''
+        frame.loc[frame['region'] == '', 'region'] = GLOBAL_REGION
+        frame['cost_amount'] = pd.to_numeric(chunk['cost'], errors='coerce').fillna(0.0).to_numpy()
+        return frame
+
+
+def _resolve_columns(header: Iterable[str]) -> Dict[str, str]:
+    """Canonical name -> file column for the CUR_COLUMNS present in a header"""
+    header = set(header)
+    mapping = {}
+    for name, aliases in CUR_COLUMNS.items():
+        source = next((alias for alias in aliases if alias in header), None)
+        if source:
+            mapping[name] = source
+    missing = [name for name in REQUIRED_COLUMNS if name not in mapping]
+    if missing:
+        raise ValueError(f"Not a CUR file: no column for {', '.join(missing)}")
+    return mapping
+
+
+def _hour_keys(values: pd.Series) -> np.ndarray:
+    """'YYYY-MM-DDTHH' (UTC) for ISO strings or timestamps"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        if values.dt.tz is not None:
+            values = values.dt.tz_convert('UTC').dt.tz_localize(None)
+        # Format each distinct hour once rather than every line item
+        codes, hours = pd.factorize(values.to_numpy().astype('datetime64[h]'))
+        return np.datetime_as_string(np.asarray(hours, dtype='datetime64[h]'), unit='h')[codes]
+    return values.astype(str).str.slice(0, 13).to_numpy()
+
+
+def _reaggregate(parts: List[pd.DataFrame], keys: List[str]) -> pd.DataFrame:
+    if not parts:
+        return pd.DataFrame(columns=keys + ['cost_amount'])
+    if len(parts) == 1:
+        return parts[0]
+    return pd.concat(parts, ignore_index=True).groupby(keys, sort=False)['cost_amount'].sum().reset_index()
+
+
+def submit_cur_ingestion() -> str:
+    """
+    Queue a background CUR ingestion run
+    
+    Returns:
+        Task ID
+    """
+    from queue_service import get_task_queue, TaskPriority
+    
+    ingestor = CurIngestor(get_cost_warehouse())
+    queue = get_task_queue()
+    task_id_holder = {}
+    
+    def progress(completed: int, total: int):
+        task = queue.get_task(task_id_holder.get('id'))
+        if task:
+            task.progress = int(100 * completed / max(total, 1))
+    
+    task_id_holder['id'] = queue.submit_task(
+        task_type='cur_ingestion',
+        task_name='Load Cost and Usage Report files',
+        function=ingestor.ingest,
+        kwargs={'progress': progress},
+        priority=TaskPriority.NORMAL
+    )
+    return task_id_holder['id']
@@ -0,0 +1,360 @@
+"""
+Data Export - Streaming CSV, JSON Lines, Parquet and GraphML Exports
+Writes DataFrame chunks straight to a temp file so export memory stays flat for any dataset size
+"""
+
+import streamlit as st
+import pandas as pd
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence
+from xml.sax.saxutils import escape, quoteattr
+from config_settings import AppConfig
+import json
+import os
+import tempfile
+import time
+import uuid
+
+
+EXPORT_FORMATS = {
+    'csv': {'label': 'CSV', 'extension': 'csv', 'mime': 'text/csv'},
+    'jsonl': {'label': 'JSON Lines', 'extension': 'jsonl', 'mime': 'application/x-ndjson'},
+    'parquet': {'label': 'Parquet', 'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'},
+    'graphml': {'label': 'GraphML', 'extension': 'graphml', 'mime': 'application/graphml+xml'}
+}
+TABLE_FORMATS = ['csv', 'jsonl', 'parquet']
+
+EXPORT_DIR = Path(tempfile.gettempdir()) / 'cloudidp-exports'
+
+
+def parquet_available() -> bool:
+    """Whether pyarrow is installed (Parquet exports are optional)"""
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+@dataclass
+class ExportFile:
+    """A finished export on disk"""
+    path: str
+    filename: str
+    mime: str
+    rows: int
+    size_bytes: int
+
+
+@dataclass
+class ExportSource:
+    """One exportable dataset: the formats it supports and how to write it"""
+    label: str
+    formats: List[str]
+    build: Callable[[str], ExportFile]
+
+
+# ============================================================================
+# CHUNK WRITERS
+# ============================================================================
+
+class _CsvWriter:
+    """Appends chunks as CSV, header from the first chunk"""
+    
+    def __init__(self, path: Path):
+        self._handle = open(path, 'w', newline='', encoding='utf-8')
+        self._header = True
+    
+    def write(self, chunk: pd.DataFrame):
+        chunk.to_csv(self._handle, header=self._header, index=False)
+        self._header = False
+    
+    def close(self):
+        self._handle.close()
+
+
+class _JsonLinesWriter:
+    """Appends chunks as one JSON object per line"""
+    
+    def __init__(self, path: Path):
+        self._handle = open(path, 'w', encoding='utf-8')
+    
+    def write(self, chunk: pd.DataFrame):
+        if chunk.empty:
+            return
+        text = chunk.to_json(orient='records', lines=True, date_format='iso')
+        self._handle.write(text if text.endswith('\n') else text + '\n')
+    
+    def close(self):
+        self._handle.close()
+
+
+class _ParquetWriter:
+    """Appends chunks as Parquet row groups; the schema is fixed by the first chunk"""
+    
+    def __init__(self, path: Path):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        self._pa = pa
+        self._pq = pq
+        self._path = path
+        self._schema = None
+        self._writer = None
+    
+    def write(self, chunk: pd.DataFrame):
+        pa = self._pa
+        # Categoricals would be written as per-row-group dictionaries with differing categories
+        categorical = [column for column in chunk.columns if isinstance(chunk[column].dtype, pd.CategoricalDtype)]
+        if categorical:
+            chunk = chunk.astype({column: object for column in categorical})
+        if self._schema is None:
+            schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            # An all-null column in the first chunk would pin the type to null
+            self._schema = pa.schema([
+                field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in schema
+            ])
+            self._writer = self._pq.ParquetWriter(str(self._path), self._schema)
+        self._writer.write_table(pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False))
+    
+    def close(self):
+        if self._writer is None:
+            # No chunks: still produce a valid (empty) file
+            self._pq.write_table(self._pa.table({}), str(self._path))
+        else:
+            self._writer.close()
+
+
+_WRITERS = {'csv': _CsvWriter, 'jsonl': _JsonLinesWriter, 'parquet': _ParquetWriter}
+
+
+# ============================================================================
+# EXPORTS
+# ============================================================================
+
+def _export_path(fmt: str) -> Path:
+    """Fresh temp file path for an export, pruning expired exports first"""
+    EXPORT_DIR.mkdir(exist_ok=True)
+    cutoff = time.time() - AppConfig.EXPORT_RETENTION_HOURS * 3600
+    for existing in EXPORT_DIR.iterdir():
+        try:
+            if existing.stat().st_mtime < cutoff:
+                existing.unlink()
+        except OSError:
+            pass
+    return EXPORT_DIR / f"{uuid.uuid4().hex}.{EXPORT_FORMATS[fmt]['extension']}"
+
+
+def _finish(path: Path, stem: str, fmt: str, rows: int) -> ExportFile:
+    spec = EXPORT_FORMATS[fmt]
+    return ExportFile(
+        path=str(path),
+        filename=f"{stem}-{datetime.now().strftime('%Y%m%d_%H%M%S')}.{spec['extension']}",
+        mime=spec['mime'],
+        rows=rows,
+        size_bytes=path.stat().st_size
+    )
+
+
+def export_frames(chunks: Iterable[pd.DataFrame], fmt: str, stem: str,
+                  json_columns: Sequence[str] = ()) -> ExportFile:
+    """
+    Write a stream of DataFrames to a CSV, JSON Lines or Parquet file
+    
+    Only one chunk is held in memory at a time.
+    
+    Args:
+        chunks: DataFrames with the same columns
+        fmt: 'csv', 'jsonl' or 'parquet'
+        stem: Download file name prefix
+        json_columns: Columns holding JSON text; JSON Lines exports embed them as objects
+    
+    Returns:
+        The finished export
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"Unsupported table export format: {fmt}")
+    
+    path = _export_path(fmt)
+    writer = _WRITERS[fmt](path)
+    rows = 0
+    try:
+        for chunk in chunks:
+            if fmt == 'jsonl':
+                for column in json_columns:
+                    if column in chunk:
+                        chunk = chunk.assign(**{column: chunk[column].map(lambda raw: json.loads(raw) if raw else None)})
+            writer.write(chunk)
+            rows += len(chunk)
+    except Exception:
+        writer.close()
+        path.unlink(missing_ok=True)
+        raise
+    writer.close()
+    return _finish(path, stem, fmt, rows)
+
+
+def _graphml_type(dtype) -> str:
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'boolean'
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'long'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'double'
+    return 'string'
+
+
+def export_graphml(node_chunks: Iterable[pd.DataFrame], edge_chunks: Iterable[pd.DataFrame],
+                   stem: str, node_id: str = 'resource_key') -> ExportFile:
+    """
+    Write a graph to GraphML from node and edge DataFrame streams
+    
+    Args:
+        node_chunks: Node rows; node_id is the node ID, every other column a node attribute
+        edge_chunks: Edge rows with source and target (node IDs); other columns are edge attributes
+        stem: Download file name prefix
+        node_id: Node ID column
+    
+    Returns:
+        The finished export (rows = nodes + edges)
+    """
+    path = _export_path('graphml')
+    rows = 0
+    
+    def data_elements(keys: List, row: tuple) -> str:
+        parts = []
+        for (key_id, _), value in zip(keys, row):
+            if pd.isna(value) or value == '':
+                continue
+            if isinstance(value, bool):
+                value = str(value).lower()
+            parts.append(f'<data key="{key_id}">{escape(str(value))}</data>')
+        return ''.join(parts)
+    
+    def declare(handle, chunk: pd.DataFrame, domain: str, skip: Sequence[str]) -> List:
+        keys = []
+        for column in chunk.columns:
+            if column in skip:
+                continue
+            key_id = f"{domain[0]}_{column}"
+            handle.write(f'  <key id={quoteattr(key_id)} for="{domain}" attr.name={quoteattr(str(column))} '
+                         f'attr.type="{_graphml_type(chunk[column].dtype)}"/>\n')
+            keys.append((key_id, column))
+        return keys
+    
+    try:
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                         '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+            node_iter, edge_iter = iter(node_chunks), iter(edge_chunks)
+            first_nodes, first_edges = next(node_iter, None), next(edge_iter, None)
+            
+            # Keys must precede the graph, so they come from the first chunk of each stream
+            node_keys = declare(handle, first_nodes, 'node', [node_id]) if first_nodes is not None else []
+            edge_keys = declare(handle, first_edges, 'edge', ['source', 'target']) if first_edges is not None else []
+            handle.write('  <graph id="G" edgedefault="directed">\n')
+            
+            def node_stream():
+                if first_nodes is not None:
+                    yield first_nodes
+                    yield from node_iter
+            
+            def edge_stream():
+                if first_edges is not None:
+                    yield first_edges
+                    yield from edge_iter
+            
+            for chunk in node_stream():
+                columns = [column for _, column in node_keys]
+                lines = [
+                    f'    <node id={quoteattr(str(row[0]))}>{data_elements(node_keys, row[1:])}</node>\n'
+                    for row in chunk[[node_id] + columns].itertuples(index=False, name=None)
+                ]
+                handle.writelines(lines)
+                rows += len(chunk)
+            
+            for chunk in edge_stream():
+                columns = [column for _, column in edge_keys]
+                lines = [
+                    f'    <edge source={quoteattr(str(row[0]))} target={quoteattr(str(row[1]))}>'
+                    f'{data_elements(edge_keys, row[2:])}</edge>\n'
+                    for row in chunk[['source', 'target'] + columns].itertuples(index=False, name=None)
+                ]
+                handle.writelines(lines)
+                rows += len(chunk)
+            
+            handle.write('  </graph>\n</graphml>\n')
+    except Exception:
+        path.unlink(missing_ok=True)
+        raise
+    return _finish(path, stem, 'graphml', rows)
+
+
+def frame_chunks(frame: pd.DataFrame, chunk_rows: Optional[int] = None) -> Iterable[pd.DataFrame]:
+    """Row slices of an in-memory DataFrame, for export_frames"""
+    chunk_rows = chunk_rows or AppConfig.EXPORT_CHUNK_ROWS
+    for start in range(0, len(frame), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows]
+
+
+def frame_source(label: str, frame: pd.DataFrame, stem: str) -> ExportSource:
+    """ExportSource for a DataFrame already in memory"""
+    return ExportSource(label, TABLE_FORMATS, lambda fmt: export_frames(frame_chunks(frame), fmt, stem))
+
+
+# ============================================================================
+# UI
+# ============================================================================
+
+def render_export_controls(key: str, sources: List[ExportSource], button_label: str = "📥 Prepare Export"):
+    """
+    Dataset and format pickers, a prepare button and a download button for the prepared file
+    
+    The export is written to a temp file on the first click and served from
+    there, so reruns do not re-serialize the data.
+    
+    Args:
+        key: Unique widget key prefix
+        sources: Exportable datasets (a picker is shown when there is more than one)
+        button_label: Label of the prepare button
+    """
+    if not sources:
+        return
+    
+    if len(sources) > 1:
+        index = st.selectbox("Data", range(len(sources)), format_func=lambda i: sources[i].label, key=f"{key}_source")
+        source = sources[index]
+    else:
+        source = sources[0]
+    
+    formats = [fmt for fmt in source.formats if fmt != 'parquet' or parquet_available()]
+    fmt = st.selectbox("Format", formats, format_func=lambda f: EXPORT_FORMATS[f]['label'], key=f"{key}_format")
+    if 'parquet' in source.formats and 'parquet' not in formats:
+        st.caption("Install pyarrow for Parquet exports")
+    
+    state_key = f"{key}_export"
+    if st.button(button_label, key=f"{key}_prepare", use_container_width=True):
+        try:
+            with st.spinner(f"Writing {EXPORT_FORMATS[fmt]['label']} export..."):
+                st.session_state[state_key] = (source.label, fmt, source.build(fmt))
+        except Exception as e:
+            st.session_state.pop(state_key, None)
+            st.error(f"Export failed: {str(e)}")
+    
+    prepared = st.session_state.get(state_key)
+    if not prepared or prepared[:2] != (source.label, fmt) or not os.path.exists(prepared[2].path):
+        return
+    
+    export = prepared[2]
+    with open(export.path, 'rb') as handle:
+        st.download_button(
+            f"⬇️ Download {export.filename}",
+            data=handle,
+            file_name=export.filename,
+            mime=export.mime,
+            key=f"{key}_download",
+            use_container_width=True
+        )
+    st.caption(f"{export.rows:,} rows · {export.size_bytes / 1024 / 1024:.1f} MB")
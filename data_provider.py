@@ -84,24 +84,30 @@ class LiveDataService:
                 return []
             
             from config_settings import AppConfig
-            accounts = AppConfig.load_aws_accounts()
+            from core_account_manager import AccountFanOutExecutor, render_fanout_errors
+            from aws_ec2 import EC2Service
+            
+            registry = AppConfig.get_aws_account_registry()
+            if account_name:
+                account = registry.by_name(account_name)
+                accounts = [account] if account else []
+            else:
+                accounts = registry.all()
+            
+            def list_instances(session, target):
+                result = EC2Service(session, target.region).list_instances()
+                if not result.get('success'):
+                    raise RuntimeError(result.get('error'))
+                return result.get('instances', [])
+            
+            report = AccountFanOutExecutor(self.account_mgr).run(
+                list_instances, accounts=accounts, regions=[region]
+            )
+            render_fanout_errors(report, "EC2 listings failed")
             
             instances = []
-            for account in accounts:
-                if account_name and account.account_name != account_name:
-                    continue
-                
-                session = self.account_mgr.assume_role(
-                    account.account_id,
-                    account.account_name,
-                    account.role_arn
-                )
-                
-                if session:
-                    from aws_ec2 import EC2Service
-                    ec2_service = EC2Service(session.session, region)
-                    result = ec2_service.list_instances()
-                    instances.extend(result.get('instances', []))
+            for result in report.values():
+                instances.extend(result)
             
             return instances
         except Exception as e:
@@ -109,14 +115,30 @@ class LiveDataService:
             return []
     
     def get_monthly_cost(self, account_name: str = None) -> str:
-        """Get real monthly cost from Cost Explorer"""
+        """Get real monthly cost from Cost Explorer (settled days come from the on-disk cache)"""
         try:
             if not self.account_mgr:
                 return "$0"
             
-            # This would integrate with Cost Explorer
-            # Placeholder for now
-            return "$0"
+            from config_settings import AppConfig
+            from core_account_manager import AccountFanOutExecutor
+            from aws_cost_explorer import CostExplorerService, get_cost_explorer_cache, get_cost_explorer_governor
+            from utils_helpers import Helpers
+            
+            registry = AppConfig.get_aws_account_registry()
+            accounts = [registry.by_name(account_name)] if account_name else registry.all()
+            # Shared resources are resolved here, on the script thread, and handed to the workers
+            cache, governor = get_cost_explorer_cache(), get_cost_explorer_governor()
+            
+            def monthly_cost(session, target):
+                return CostExplorerService(
+                    session, account_id=target.account_id, cache=cache, governor=governor
+                ).get_monthly_cost().get('total_cost', 0)
+            
+            report = AccountFanOutExecutor(self.account_mgr).run(
+                monthly_cost, accounts=list(filter(None, accounts)), primary_region_only=True
+            )
+            return Helpers.format_currency(sum(report.values()))
         except Exception:
             return "$0"
     
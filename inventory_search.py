@@ -0,0 +1,414 @@
+"""
+Inventory Search - Inverted Full-Text Index over Resource Names, IDs and Tags
+Token, prefix and trigram lookups with ranked, lazily paged results
+"""
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from inventory_table import InventoryTable, TAG_PAIR_SEPARATOR
+import re
+import threading
+
+
+# Relevance of a hit by the field it was found in and how it matched
+FIELD_WEIGHTS = {
+    'id': 5.0,
+    'name': 3.0,
+    'tagkv': 2.5,
+    'tag': 2.0,
+    'type': 1.5,
+    'account': 1.0,
+    'region': 1.0,
+    'state': 1.0
+}
+MATCH_WEIGHTS = {'exact': 1.0, 'prefix': 0.5, 'infix': 0.3}
+
+# Query prefixes that scope a term to a field; any other 'key:value' is a tag lookup
+FIELD_ALIASES = {
+    'id': 'id',
+    'name': 'name',
+    'type': 'type',
+    'region': 'region',
+    'account': 'account',
+    'state': 'state',
+    'status': 'state'
+}
+
+TOKEN_SPLIT = re.compile(r"[^a-z0-9\-]+")
+PREFIX_EXPANSION_LIMIT = 512   # Vocabulary entries a prefix term may expand to
+MIN_INFIX_LENGTH = 3           # Shortest term looked up in the trigram index
+MAX_INFIX_TEXT_LENGTH = 128    # Characters of each ID, name or tag value covered by the trigram index
+INFIX_VERIFY_LIMIT = 2000      # Candidates checked by substring instead of further trigram intersection
+INFIX_FIELDS = ('id', 'name', 'tag')  # Fields matched anywhere inside their text
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase tokens of a string
+    
+    Hyphenated tokens are kept whole and also split, so 'prod-web-01' is found
+    by 'prod-web-01', 'prod' and 'web'.
+    """
+    tokens = []
+    for token in TOKEN_SPLIT.split((text or '').lower()):
+        if not token:
+            continue
+        tokens.append(token)
+        if '-' in token:
+            tokens.extend(part for part in token.split('-') if part)
+    return tokens
+
+
+def parse_query(query: str) -> List[Tuple[Optional[str], str]]:
+    """
+    Split a query into (field, term) pairs
+    
+    'prod postgres us-east-1 owner:platform' ->
+    [(None, 'prod'), (None, 'postgres'), (None, 'us-east-1'), ('tagkv', 'owner=platform')]
+    """
+    terms = []
+    for raw in (query or '').split():
+        key, sep, value = raw.partition(':')
+        if sep and key and value:
+            field = FIELD_ALIASES.get(key.lower())
+            if field:
+                terms.extend((field, token) for token in TOKEN_SPLIT.split(value.lower()) if token)
+            else:
+                terms.append(('tagkv', f"{key.lower()}={value.lower()}"))
+        else:
+            # 'db.r5.large' becomes three terms that must all match
+            terms.extend((None, token) for token in TOKEN_SPLIT.split(raw.lower()) if token)
+    return terms
+
+
+def sorted_unique(values: np.ndarray) -> np.ndarray:
+    """np.unique via sort (faster than its hash path for large integer arrays)"""
+    values = np.sort(values)
+    if len(values) < 2:
+        return values
+    keep = np.empty(len(values), dtype=bool)
+    keep[0] = True
+    np.not_equal(values[1:], values[:-1], out=keep[1:])
+    return values[keep]
+
+
+class PostingsBuilder:
+    """Accumulates (token, row) pairs for one field and packs them into Postings"""
+    
+    def __init__(self):
+        self._tokens: List[np.ndarray] = []
+        self._rows: List[np.ndarray] = []
+    
+    def add(self, token: str, rows: np.ndarray):
+        """One token for many rows (e.g. every row of a category)"""
+        self._tokens.append(np.full(len(rows), token, dtype=object))
+        self._rows.append(np.asarray(rows, dtype=np.int64))
+    
+    def add_pairs(self, tokens: np.ndarray, rows: np.ndarray):
+        """Parallel arrays of tokens and the row each came from"""
+        self._tokens.append(np.asarray(tokens, dtype=object))
+        self._rows.append(np.asarray(rows, dtype=np.int64))
+    
+    def build(self, row_count: int) -> 'Postings':
+        if not self._tokens:
+            return Postings(np.array([], dtype=object), np.zeros(1, dtype=np.int64), np.array([], dtype=np.int32))
+        
+        codes, vocabulary = pd.factorize(np.concatenate(self._tokens))
+        rows = np.concatenate(self._rows)
+        
+        # Renumber tokens in sorted order so prefixes are contiguous ranges
+        order = np.array(sorted(range(len(vocabulary)), key=vocabulary.__getitem__), dtype=np.int64)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        
+        pairs = sorted_unique(rank[codes] * max(row_count, 1) + rows)
+        token_of = pairs // max(row_count, 1)
+        offsets = np.searchsorted(token_of, np.arange(len(order) + 1))
+        return Postings(np.asarray(vocabulary, dtype=object)[order], offsets, (pairs % max(row_count, 1)).astype(np.int32))
+
+
+class Postings:
+    """
+    Sorted vocabulary with its row lists packed back to back (CSR layout)
+    
+    Rows of token i are rows[offsets[i]:offsets[i + 1]]; tokens sharing a
+    prefix are adjacent, so a prefix lookup is one contiguous slice.
+    """
+    
+    def __init__(self, vocabulary: np.ndarray, offsets: np.ndarray, rows: np.ndarray):
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.rows = rows
+    
+    def lookup(self, term: str) -> List[Tuple[np.ndarray, str]]:
+        """(rows, match kind) for an exact and a prefix match of a term"""
+        if len(self.vocabulary) == 0:
+            return []
+        
+        hits = []
+        lo = int(np.searchsorted(self.vocabulary, term, side='left'))
+        hi = int(np.searchsorted(self.vocabulary, term + '\uffff', side='left'))
+        if lo < len(self.vocabulary) and self.vocabulary[lo] == term:
+            hits.append((self.rows[self.offsets[lo]:self.offsets[lo + 1]], 'exact'))
+            lo += 1
+        hi = min(hi, lo + PREFIX_EXPANSION_LIMIT)
+        if hi > lo:
+            hits.append((sorted_unique(self.rows[self.offsets[lo]:self.offsets[hi]]), 'prefix'))
+        return hits
+
+
+class SearchResult:
+    """Matches of a query, ranked lazily one page at a time"""
+    
+    def __init__(self, scores: np.ndarray, mask: np.ndarray):
+        self._scores = scores
+        self._candidates = np.flatnonzero(mask)
+    
+    def __len__(self) -> int:
+        return len(self._candidates)
+    
+    def page(self, offset: int = 0, limit: int = 100) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Row positions and scores of one page, best first
+        
+        Only the top offset+limit rows are ordered (partition), so showing
+        the first page of a million matches does not sort them all.
+        """
+        needed = min(offset + limit, len(self._candidates))
+        if needed <= 0:
+            return np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+        
+        scores = self._scores[self._candidates]
+        if needed < len(scores):
+            # Everything above the cut-off score, then ties in table order, so pages never overlap
+            threshold = np.partition(scores, len(scores) - needed)[len(scores) - needed]
+            above = np.flatnonzero(scores > threshold)
+            ties = np.flatnonzero(scores == threshold)[:needed - len(above)]
+            top = np.concatenate([above, ties])
+        else:
+            top = np.arange(len(scores))
+        # Highest score first, ties in table order
+        top = top[np.lexsort((top, -scores[top]))]
+        selected = top[offset:needed]
+        return self._candidates[selected], scores[selected]
+
+
+class InfixText:
+    """
+    Lowercase texts of one field, matched anywhere through a trigram index
+    
+    Texts are resource IDs and names (one per row) or distinct tag values,
+    each mapped to the rows carrying it.
+    """
+    
+    def __init__(self, texts: np.ndarray, text_rows: Optional[Postings] = None):
+        """
+        Args:
+            texts: Lowercase text per document
+            text_rows: Postings whose token i is document i (default: document i is row i)
+        """
+        self.texts = texts
+        self.text_rows = text_rows
+        self.trigrams: Optional[Postings] = None
+    
+    def build_trigrams(self):
+        """Trigram -> documents (vocabulary holds integer trigram codes)"""
+        encoded = [text.encode('ascii', 'ignore')[:MAX_INFIX_TEXT_LENGTH] for text in self.texts]
+        width = max((len(b) for b in encoded), default=0)
+        if width < 3:
+            self.trigrams = Postings(np.array([], dtype=np.int64), np.zeros(1, dtype=np.int64), np.array([], dtype=np.int32))
+            return
+        
+        chars = np.frombuffer(np.array(encoded, dtype=f'S{width}').tobytes(), dtype=np.uint8).reshape(len(encoded), width).astype(np.int64)
+        codes = (chars[:, :-2] << 16) | (chars[:, 1:-1] << 8) | chars[:, 2:]
+        documents = np.broadcast_to(np.arange(len(encoded), dtype=np.int64)[:, None], codes.shape)
+        valid = chars[:, 2:] != 0  # past the end of shorter texts
+        
+        pairs = sorted_unique((codes[valid] << 32) | documents[valid])
+        trigram_of = pairs >> 32
+        vocabulary = sorted_unique(trigram_of)
+        offsets = np.searchsorted(trigram_of, np.append(vocabulary, vocabulary[-1] + 1) if len(vocabulary) else [0])
+        self.trigrams = Postings(vocabulary, offsets, (pairs & 0xFFFFFFFF).astype(np.int32))
+    
+    def rows(self, term: str) -> np.ndarray:
+        """Rows whose text contains a term anywhere"""
+        documents = self._documents(term)
+        if self.text_rows is None or not len(documents):
+            return documents
+        offsets, rows = self.text_rows.offsets, self.text_rows.rows
+        return sorted_unique(np.concatenate([rows[offsets[d]:offsets[d + 1]] for d in documents]))
+    
+    def _documents(self, term: str) -> np.ndarray:
+        encoded = term.encode('ascii', 'ignore')
+        if len(encoded) < MIN_INFIX_LENGTH:
+            return np.array([], dtype=np.int32)
+        
+        trigrams = self.trigrams
+        if trigrams is None:
+            # Still building in the background: scan the texts instead of waiting
+            found = pd.Series(self.texts, dtype=object).str.contains(term, regex=False, na=False)
+            return np.flatnonzero(found.to_numpy()).astype(np.int32)
+        
+        postings = []
+        for i in range(len(encoded) - 2):
+            code = (encoded[i] << 16) | (encoded[i + 1] << 8) | encoded[i + 2]
+            slot = int(np.searchsorted(trigrams.vocabulary, code))
+            if slot == len(trigrams.vocabulary) or trigrams.vocabulary[slot] != code:
+                return np.array([], dtype=np.int32)
+            postings.append(trigrams.rows[trigrams.offsets[slot]:trigrams.offsets[slot + 1]])
+        
+        # Start from the rarest trigram and narrow by binary search until few enough to verify
+        postings.sort(key=len)
+        candidates = postings[0]
+        for found in postings[1:]:
+            if len(candidates) <= INFIX_VERIFY_LIMIT:
+                break
+            slots = np.minimum(np.searchsorted(found, candidates), len(found) - 1)
+            candidates = candidates[found[slots] == candidates]
+        
+        # Trigrams can match out of order; confirm the substring on the (few) candidates
+        return np.array([document for document in candidates if term in self.texts[document]], dtype=np.int32)
+
+
+class InventorySearchIndex:
+    """
+    Inverted index over an InventoryTable
+    
+    Each field (id, name, tag values, tag key=value, type, account, region,
+    state) maps tokens to sorted row arrays. Terms match exactly, by prefix
+    over the sorted vocabulary, or - for resource IDs, names and tag values -
+    anywhere via trigram indexes built in a background thread once the index
+    exists (queries until then scan the texts). Terms are AND-ed; a row's
+    score is the sum of each term's best field/match weight.
+    """
+    
+    def __init__(self, table: InventoryTable, background: bool = True):
+        """
+        Build the index
+        
+        Args:
+            table: Snapshot table (row positions are the document IDs)
+            background: Build the trigram indexes in a daemon thread (otherwise before returning)
+        """
+        self.table = table
+        self._rows = len(table)
+        self._fields: Dict[str, Postings] = {}
+        self._infix: Dict[str, InfixText] = {}
+        self._build()
+        if background:
+            threading.Thread(target=self._build_trigrams, name='inventory-trigrams', daemon=True).start()
+        else:
+            self._build_trigrams()
+    
+    def _build(self):
+        frame = self.table.frame
+        builders = {field: PostingsBuilder() for field in FIELD_WEIGHTS}
+        
+        # Free-text fields: tokenized column-wise by pandas rather than row by row
+        for field, column in (('id', 'resource_id'), ('name', 'name')):
+            tokens, rows = self._text_tokens(frame[column])
+            builders[field].add_pairs(tokens, rows)
+        
+        # Categorical fields: one posting per category, taken from the integer codes
+        from inventory_service import RESOURCE_TYPES
+        labels = {t: label for t, (_, label) in RESOURCE_TYPES.items()}
+        for field, column in (('type', 'resource_type'), ('account', 'account_name'),
+                              ('account', 'account_id'), ('region', 'region'), ('state', 'state')):
+            categorical = frame[column].cat
+            for code, rows in self._group(categorical.codes.to_numpy()):
+                value = categorical.categories[code]
+                for token in set(tokenize(value) + tokenize(labels.get(value, ''))):
+                    builders[field].add(token, rows)
+        
+        # Tags: one posting per distinct key/value pair
+        tag_rows, _, tag_pairs = self.table.tag_entries()
+        values = pd.Series(np.asarray(tag_pairs.categories, dtype=object)).str.partition(TAG_PAIR_SEPARATOR)[2].str.lower()
+        value_rows = PostingsBuilder()
+        if len(tag_rows):
+            value_rows.add_pairs(values.to_numpy(dtype=object)[np.asarray(tag_pairs.codes)], tag_rows)
+        value_rows = value_rows.build(self._rows)
+        self._infix = {
+            'id': InfixText(frame['resource_id'].fillna('').str.lower().to_numpy(dtype=object)),
+            'name': InfixText(frame['name'].fillna('').astype(str).str.lower().to_numpy(dtype=object)),
+            'tag': InfixText(value_rows.vocabulary, value_rows)
+        }
+        for code, entries in self._group(tag_pairs.codes):
+            key, _, value = tag_pairs.categories[code].partition(TAG_PAIR_SEPARATOR)
+            rows = tag_rows[entries]
+            value_tokens = set(tokenize(value))
+            for token in value_tokens:
+                builders['tag'].add(token, rows)
+                builders['tagkv'].add(f"{key.lower()}={token}", rows)
+            builders['tagkv'].add(f"{key.lower()}={value.lower()}", rows)
+        
+        self._fields = {field: builder.build(self._rows) for field, builder in builders.items()}
+    
+    @staticmethod
+    def _text_tokens(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized tokenize(): (token, row) pairs for a string column, plus each whole value"""
+        lowered = values.str.lower()
+        tokens = lowered.str.split(TOKEN_SPLIT.pattern, regex=True).explode()
+        tokens = tokens[tokens.notna() & (tokens != '')]
+        parts = tokens[tokens.str.contains('-', regex=False)].str.split('-').explode()
+        combined = pd.concat([tokens, parts[parts != ''], lowered[lowered != '']])
+        return combined.to_numpy(dtype=object), combined.index.to_numpy()
+    
+    @staticmethod
+    def _group(codes: np.ndarray):
+        """Yield (code, positions) for each distinct non-negative code"""
+        if len(codes) == 0:
+            return
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        boundaries = np.flatnonzero(np.diff(sorted_codes)) + 1
+        for positions in np.split(order, boundaries):
+            code = int(codes[positions[0]])
+            if code >= 0:
+                yield code, positions
+    
+    def _build_trigrams(self):
+        for infix in self._infix.values():
+            infix.build_trigrams()
+    
+    def search(self, query: str, mask: Optional[np.ndarray] = None) -> SearchResult:
+        """
+        Evaluate a free-text query
+        
+        Args:
+            query: e.g. 'prod postgres us-east-1 owner:platform'
+            mask: Optional boolean mask (e.g. from InventoryTable.filter) to search within
+        
+        Returns:
+            SearchResult (empty query = every row of the mask, in table order)
+        """
+        matched = np.ones(self._rows, dtype=bool) if mask is None else mask.copy()
+        total = np.zeros(self._rows, dtype=np.float32)
+        
+        for field, term in parse_query(query):
+            term_scores = np.zeros(self._rows, dtype=np.float32)
+            fields = [field] if field else [f for f in FIELD_WEIGHTS if f != 'tagkv']
+            
+            for name in fields:
+                for rows, match in self._fields[name].lookup(term):
+                    term_scores[rows] = np.maximum(term_scores[rows], FIELD_WEIGHTS[name] * MATCH_WEIGHTS[match])
+            
+            for name in INFIX_FIELDS:
+                if field not in (None, name):
+                    continue
+                rows = self._infix[name].rows(term)
+                if len(rows):
+                    term_scores[rows] = np.maximum(term_scores[rows], FIELD_WEIGHTS[name] * MATCH_WEIGHTS['infix'])
+            
+            matched &= term_scores > 0
+            total += term_scores
+        
+        return SearchResult(total, matched)
+
+
+@st.cache_resource(max_entries=2, show_spinner="Indexing inventory...")
+def get_search_index(snapshot_id: str, revision: int) -> InventorySearchIndex:
+    """Get the shared search index for one snapshot revision"""
+    from inventory_table import get_inventory_table
+    return InventorySearchIndex(get_inventory_table(snapshot_id, revision))
@@ -0,0 +1,1836 @@
+"""
+Inventory Service - Persistent Resource Inventory Snapshots
+Collects AWS resources across accounts/regions in parallel and stores them in SQLite
+"""
+
+import streamlit as st
+import json
+import sqlite3
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from botocore.exceptions import ClientError
+from config_settings import AppConfig
+from core_account_manager import AccountFanOutExecutor, FanOutTarget
+import hashlib
+import time
+import uuid
+
+
+# resource_type -> (legacy inventory key, display label)
+RESOURCE_TYPES = {
+    'ec2': ('ec2_instances', 'EC2'),
+    'rds': ('rds_databases', 'RDS'),
+    's3': ('s3_buckets', 'S3'),
+    'lambda': ('lambda_functions', 'Lambda'),
+    'dynamodb': ('dynamodb_tables', 'DynamoDB'),
+    'elb': ('load_balancers', 'ELB'),
+    'vpc': ('vpcs', 'VPC'),
+    'ebs': ('ebs_volumes', 'EBS'),
+    'eip': ('elastic_ips', 'EIP'),
+    'cloudfront': ('cloudfront_distributions', 'CloudFront'),
+    'route53': ('route53_zones', 'Route53')
+}
+
+# Services that are not regional - collected once per account
+GLOBAL_RESOURCE_TYPES = {'s3', 'cloudfront', 'route53'}
+
+# (ARN service, ARN resource type) -> inventory type, for Tagging API discovery
+TAGGING_RESOURCE_TYPES = {
+    ('ec2', 'instance'): 'ec2',
+    ('ec2', 'volume'): 'ebs',
+    ('ec2', 'elastic-ip'): 'eip',
+    ('ec2', 'vpc'): 'vpc',
+    ('rds', 'db'): 'rds',
+    ('s3', ''): 's3',
+    ('lambda', 'function'): 'lambda',
+    ('dynamodb', 'table'): 'dynamodb',
+    ('elasticloadbalancing', 'loadbalancer'): 'elb',
+    ('cloudfront', 'distribution'): 'cloudfront',
+    ('route53', 'hostedzone'): 'route53'
+}
+
+# States that mean a resource exists but is not doing work
+INACTIVE_STATES = {'stopped', 'stopping', 'unassociated', 'disabled'}
+
+# Flat monthly estimates for resources without a pricing helper
+EBS_COST_PER_GB_MONTH = 0.08
+EIP_COST_MONTH = 3.65
+S3_COST_PER_GB_MONTH = 0.023  # S3 Standard, first 50 TB
+
+
+# Fields compared when deciding whether a resource changed
+CONTENT_FIELDS = ('name', 'state', 'cost_month', 'arn', 'tags', 'attributes')
+
+# Metric-derived attributes that drift daily without any change to the resource
+VOLATILE_ATTRIBUTES = (
+    'size_bytes', 'object_count', 'item_count',
+    'invocations_month', 'errors_month', 'throttles_month',
+    'consumed_read_units_month', 'consumed_write_units_month', 'read_throttles_month', 'write_throttles_month'
+)
+
+
+def make_resource_key(account_id: str, region: str, resource_type: str, resource_id: str) -> str:
+    """Stable identity of a resource across snapshots"""
+    return f"{account_id}:{region}:{resource_type}:{resource_id}"
+
+
+def parse_arn(arn: str) -> Dict[str, str]:
+    """
+    Split an ARN into its parts
+    
+    Handles both resource-type/id and resource-type:id forms, e.g.
+    arn:aws:ec2:us-east-1:123:instance/i-1 and arn:aws:rds:us-east-1:123:db:mydb
+    """
+    parts = arn.split(':', 5)
+    if len(parts) < 6:
+        raise ValueError(f"Not an ARN: {arn}")
+    
+    resource = parts[5]
+    slash, colon = resource.find('/'), resource.find(':')
+    if slash != -1 and (colon == -1 or slash < colon):
+        resource_type, resource_id = resource.split('/', 1)
+    elif colon != -1:
+        resource_type, resource_id = resource.split(':', 1)
+    else:
+        resource_type, resource_id = '', resource
+    
+    return {
+        'service': parts[2],
+        'region': parts[3],
+        'account_id': parts[4],
+        'resource_type': resource_type,
+        'resource_id': resource_id
+    }
+
+
+def content_hash(record: Dict) -> str:
+    """Fingerprint of a record's content, used to detect modified resources"""
+    content = {f: record.get(f) for f in CONTENT_FIELDS}
+    content['attributes'] = {k: v for k, v in (content['attributes'] or {}).items() if k not in VOLATILE_ATTRIBUTES}
+    # Metric-based estimates move by cents every day; only whole-dollar moves count as changes
+    content['cost_month'] = round(float(content['cost_month'] or 0))
+    return hashlib.sha1(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def describe_changes(old: Dict, new: Dict) -> str:
+    """Human-readable summary of what differs between two versions of a record"""
+    changes = []
+    if old.get('state') != new.get('state'):
+        changes.append(f"state: {old.get('state')} → {new.get('state')}")
+    if old.get('name') != new.get('name'):
+        changes.append(f"name: {old.get('name')} → {new.get('name')}")
+    if (old.get('tags') or {}) != (new.get('tags') or {}):
+        old_tags, new_tags = old.get('tags') or {}, new.get('tags') or {}
+        changed = sorted(k for k in set(old_tags) | set(new_tags) if old_tags.get(k) != new_tags.get(k))
+        changes.append(f"tags: {', '.join(changed)}")
+    if round(float(old.get('cost_month') or 0)) != round(float(new.get('cost_month') or 0)):
+        changes.append(f"cost: ${old.get('cost_month') or 0:.2f} → ${new.get('cost_month') or 0:.2f}")
+    old_attrs, new_attrs = (
+        json.loads(json.dumps({k: v for k, v in (r.get('attributes') or {}).items() if k not in VOLATILE_ATTRIBUTES}, default=str))
+        for r in (old, new)
+    )
+    if old_attrs != new_attrs:
+        changed = sorted(k for k in set(old_attrs) | set(new_attrs) if old_attrs.get(k) != new_attrs.get(k))
+        changes.append(f"configuration: {', '.join(changed)}")
+    return '; '.join(changes)
+
+
+class InventoryStore:
+    """SQLite store of inventory snapshots (one row per resource per snapshot)"""
+    
+    def __init__(self, db_path: str = None):
+        """
+        Initialize inventory store
+        
+        Args:
+            db_path: Path to SQLite database file
+        """
+        if db_path is None:
+            db_dir = Path.home() / '.cloudidp'
+            db_dir.mkdir(exist_ok=True)
+            db_path = str(db_dir / 'inventory.db')
+        
+        self.db_path = db_path
+        self._initialize_database()
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+    
+    def _initialize_database(self):
+        """Initialize database schema"""
+        conn = self._connect()
+        try:
+            # WAL lets the UI read the latest snapshot while a collection is writing
+            conn.execute('PRAGMA journal_mode=WAL')
+            
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS inventory_snapshots (
+                    snapshot_id TEXT PRIMARY KEY,
+                    created_at TIMESTAMP NOT NULL,
+                    completed_at TIMESTAMP,
+                    status TEXT NOT NULL,
+                    resource_count INTEGER DEFAULT 0,
+                    error_count INTEGER DEFAULT 0,
+                    duration_seconds REAL,
+                    scope TEXT,
+                    revision INTEGER DEFAULT 0,
+                    refreshed_at TIMESTAMP
+                )
+            ''')
+            
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS inventory_resources (
+                    snapshot_id TEXT NOT NULL,
+                    resource_key TEXT NOT NULL,
+                    resource_type TEXT NOT NULL,
+                    resource_id TEXT NOT NULL,
+                    name TEXT,
+                    account_id TEXT,
+                    account_name TEXT,
+                    region TEXT,
+                    state TEXT,
+                    cost_month REAL DEFAULT 0,
+                    arn TEXT,
+                    tags TEXT,
+                    attributes TEXT,
+                    content_hash TEXT,
+                    PRIMARY KEY (snapshot_id, resource_key)
+                )
+            ''')
+            
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS inventory_errors (
+                    snapshot_id TEXT NOT NULL,
+                    account_id TEXT,
+                    account_name TEXT,
+                    region TEXT,
+                    resource_type TEXT,
+                    stage TEXT,
+                    error TEXT
+                )
+            ''')
+            
+            # Last time each (account, region) was known to be in sync
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS inventory_watermarks (
+                    account_id TEXT NOT NULL,
+                    region TEXT NOT NULL,
+                    watermark TIMESTAMP NOT NULL,
+                    source TEXT,
+                    PRIMARY KEY (account_id, region)
+                )
+            ''')
+            
+            # Change feed of added/modified/deleted resources
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS inventory_changes (
+                    change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    detected_at TIMESTAMP NOT NULL,
+                    snapshot_id TEXT,
+                    resource_key TEXT NOT NULL,
+                    resource_type TEXT,
+                    resource_id TEXT,
+                    name TEXT,
+                    account_id TEXT,
+                    account_name TEXT,
+                    region TEXT,
+                    change_type TEXT NOT NULL,
+                    source TEXT,
+                    details TEXT
+                )
+            ''')
+            
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS inventory_visits (
+                    user_id TEXT PRIMARY KEY,
+                    last_change_id INTEGER DEFAULT 0,
+                    visited_at TIMESTAMP
+                )
+            ''')
+            
+            # Databases created before incremental refresh lack these columns
+            self._add_missing_columns(conn, 'inventory_snapshots', {
+                'revision': 'INTEGER DEFAULT 0',
+                'refreshed_at': 'TIMESTAMP'
+            })
+            self._add_missing_columns(conn, 'inventory_resources', {'content_hash': 'TEXT'})
+            
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_inventory_resources_type ON inventory_resources (snapshot_id, resource_type)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_inventory_resources_scope ON inventory_resources (snapshot_id, account_id, resource_type)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_inventory_errors_snapshot ON inventory_errors (snapshot_id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_inventory_changes_detected ON inventory_changes (detected_at)')
+            conn.commit()
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _add_missing_columns(conn: sqlite3.Connection, table: str, columns: Dict[str, str]):
+        existing = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+        for column, definition in columns.items():
+            if column not in existing:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+    
+    @staticmethod
+    def _resource_row(snapshot_id: str, r: Dict) -> Tuple:
+        return (
+            snapshot_id, r['resource_key'], r['resource_type'], r['resource_id'], r.get('name'),
+            r.get('account_id'), r.get('account_name'), r.get('region'), r.get('state'),
+            float(r.get('cost_month') or 0), r.get('arn'),
+            json.dumps(r.get('tags') or {}), json.dumps(r.get('attributes') or {}, default=str),
+            content_hash(r)
+        )
+    
+    _UPSERT_RESOURCE = '''
+        INSERT OR REPLACE INTO inventory_resources (
+            snapshot_id, resource_key, resource_type, resource_id, name, account_id, account_name,
+            region, state, cost_month, arn, tags, attributes, content_hash
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    def begin_snapshot(self, scope: Optional[Dict] = None) -> str:
+        """Create a running snapshot and return its ID"""
+        snapshot_id = str(uuid.uuid4())
+        conn = self._connect()
+        try:
+            conn.execute(
+                'INSERT INTO inventory_snapshots (snapshot_id, created_at, status, scope) VALUES (?, ?, ?, ?)',
+                (snapshot_id, datetime.now().isoformat(), 'running', json.dumps(scope or {}))
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        return snapshot_id
+    
+    def write_resources(self, snapshot_id: str, resources: List[Dict]):
+        """Insert (or replace) a batch of resource records"""
+        if not resources:
+            return
+        
+        conn = self._connect()
+        try:
+            conn.executemany(self._UPSERT_RESOURCE, [self._resource_row(snapshot_id, r) for r in resources])
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def update_resource(self, snapshot_id: str, record: Dict):
+        """Replace one resource row without creating a new revision (e.g. lazily loaded details)"""
+        self.write_resources(snapshot_id, [record])
+    
+    def write_errors(self, snapshot_id: str, errors: List[Dict]):
+        """Record collection failures for a snapshot"""
+        if not errors:
+            return
+        
+        conn = self._connect()
+        try:
+            conn.executemany(
+                'INSERT INTO inventory_errors VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (snapshot_id, e.get('account_id'), e.get('account_name'), e.get('region'),
+                     e.get('resource_type'), e.get('stage'), e.get('error'))
+                    for e in errors
+                ]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def complete_snapshot(self, snapshot_id: str, duration_seconds: float, status: str = 'complete'):
+        """Mark a snapshot finished and record its totals"""
+        conn = self._connect()
+        try:
+            conn.execute('''
+                UPDATE inventory_snapshots SET
+                    status = ?,
+                    completed_at = ?,
+                    duration_seconds = ?,
+                    resource_count = (SELECT COUNT(*) FROM inventory_resources WHERE snapshot_id = ?),
+                    error_count = (SELECT COUNT(*) FROM inventory_errors WHERE snapshot_id = ?)
+                WHERE snapshot_id = ?
+            ''', (status, datetime.now().isoformat(), duration_seconds, snapshot_id, snapshot_id, snapshot_id))
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def latest_snapshot(self, status: Optional[str] = 'complete') -> Optional[Dict]:
+        """Most recent snapshot (by default the most recent completed one)"""
+        conn = self._connect()
+        try:
+            if status:
+                row = conn.execute(
+                    'SELECT * FROM inventory_snapshots WHERE status = ? ORDER BY created_at DESC LIMIT 1',
+                    (status,)
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    'SELECT * FROM inventory_snapshots ORDER BY created_at DESC LIMIT 1'
+                ).fetchone()
+            return dict(row) if row else None
+        finally:
+            conn.close()
+    
+    def list_snapshots(self, limit: int = 20) -> List[Dict]:
+        """Recent snapshots, newest first"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                'SELECT * FROM inventory_snapshots ORDER BY created_at DESC LIMIT ?', (limit,)
+            ).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+    
+    def load_resources(
+        self,
+        snapshot_id: str,
+        resource_type: Optional[str] = None,
+        account_id: Optional[str] = None,
+        region: Optional[str] = None,
+        resource_keys: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """Resource records of a snapshot, optionally narrowed to a type/account/region or to given keys"""
+        query = 'SELECT * FROM inventory_resources WHERE snapshot_id = ?'
+        params = [snapshot_id]
+        for column, value in (('resource_type', resource_type), ('account_id', account_id), ('region', region)):
+            if value:
+                query += f' AND {column} = ?'
+                params.append(value)
+        
+        # Key lookups run in chunks to stay under SQLite's bound-parameter limit
+        key_chunks = [None]
+        if resource_keys is not None:
+            key_chunks = [resource_keys[i:i + 500] for i in range(0, len(resource_keys), 500)]
+        
+        conn = self._connect()
+        try:
+            records = []
+            for chunk in key_chunks:
+                chunk_query, chunk_params = query, params
+                if chunk is not None:
+                    chunk_query += f" AND resource_key IN ({', '.join('?' * len(chunk))})"
+                    chunk_params = params + chunk
+                for row in conn.execute(chunk_query, chunk_params):
+                    record = dict(row)
+                    record['tags'] = json.loads(record['tags'] or '{}')
+                    record['attributes'] = json.loads(record['attributes'] or '{}')
+                    records.append(record)
+            return records
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _frame_query(conn: sqlite3.Connection, columns: List[str]) -> str:
+        """SELECT over the requested inventory_resources columns that exist"""
+        allowed = {row[1] for row in conn.execute('PRAGMA table_info(inventory_resources)')}
+        selected = ', '.join(c for c in columns if c in allowed)
+        return f'SELECT {selected} FROM inventory_resources WHERE snapshot_id = ?'
+    
+    def read_frame(self, snapshot_id: str, columns: List[str]):
+        """
+        Selected resource columns of a snapshot as a pandas DataFrame
+        
+        Args:
+            snapshot_id: Snapshot to read
+            columns: inventory_resources column names
+        """
+        import pandas as pd
+        
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(self._frame_query(conn, columns), conn, params=(snapshot_id,))
+        finally:
+            conn.close()
+    
+    def iter_frames(self, snapshot_id: str, columns: List[str], chunk_rows: int = 50000):
+        """
+        Selected resource columns of a snapshot as a stream of DataFrames
+        
+        Rows are fetched chunk_rows at a time, so memory stays flat for any
+        snapshot size.
+        
+        Args:
+            snapshot_id: Snapshot to read
+            columns: inventory_resources column names
+            chunk_rows: Rows per DataFrame
+        """
+        import pandas as pd
+        
+        conn = self._connect()
+        try:
+            yield from pd.read_sql_query(
+                self._frame_query(conn, columns) + ' ORDER BY resource_key',
+                conn,
+                params=(snapshot_id,),
+                chunksize=chunk_rows
+            )
+        finally:
+            conn.close()
+    
+    def load_errors(self, snapshot_id: str) -> List[Dict]:
+        """Collection failures recorded for a snapshot"""
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT * FROM inventory_errors WHERE snapshot_id = ?', (snapshot_id,)).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+    
+    def apply_changes(
+        self,
+        snapshot_id: str,
+        upserts: List[Dict],
+        deleted_keys: List[str],
+        changes: List[Dict],
+        source: str
+    ):
+        """
+        Patch a snapshot in place and append to the change feed (one transaction)
+        
+        Args:
+            snapshot_id: Snapshot to patch
+            upserts: Added or modified resource records
+            deleted_keys: resource_keys that no longer exist
+            changes: Change feed entries (see record_changes)
+            source: What detected the changes (config, cloudtrail, full_scan)
+        """
+        conn = self._connect()
+        try:
+            if upserts:
+                conn.executemany(self._UPSERT_RESOURCE, [self._resource_row(snapshot_id, r) for r in upserts])
+            if deleted_keys:
+                conn.executemany(
+                    'DELETE FROM inventory_resources WHERE snapshot_id = ? AND resource_key = ?',
+                    [(snapshot_id, key) for key in deleted_keys]
+                )
+            self._insert_changes(conn, snapshot_id, changes, source)
+            
+            if upserts or deleted_keys:
+                conn.execute('''
+                    UPDATE inventory_snapshots SET
+                        revision = revision + 1,
+                        refreshed_at = ?,
+                        resource_count = (SELECT COUNT(*) FROM inventory_resources WHERE snapshot_id = ?)
+                    WHERE snapshot_id = ?
+                ''', (datetime.now().isoformat(), snapshot_id, snapshot_id))
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def record_changes(self, snapshot_id: str, changes: List[Dict], source: str):
+        """Append entries to the change feed"""
+        conn = self._connect()
+        try:
+            self._insert_changes(conn, snapshot_id, changes, source)
+            conn.commit()
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _insert_changes(conn: sqlite3.Connection, snapshot_id: str, changes: List[Dict], source: str):
+        if not changes:
+            return
+        detected_at = datetime.now().isoformat()
+        conn.executemany(
+            '''INSERT INTO inventory_changes (
+                detected_at, snapshot_id, resource_key, resource_type, resource_id, name,
+                account_id, account_name, region, change_type, source, details
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+            [
+                (detected_at, snapshot_id, c['resource_key'], c.get('resource_type'), c.get('resource_id'),
+                 c.get('name'), c.get('account_id'), c.get('account_name'), c.get('region'),
+                 c['change_type'], source, c.get('details'))
+                for c in changes
+            ]
+        )
+    
+    def diff_snapshots(self, old_snapshot_id: str, new_snapshot_id: str) -> List[Dict]:
+        """Change feed entries between two full snapshots"""
+        conn = self._connect()
+        try:
+            added = conn.execute('''
+                SELECT n.*, 'added' AS change_type FROM inventory_resources n
+                WHERE n.snapshot_id = ? AND NOT EXISTS (
+                    SELECT 1 FROM inventory_resources o WHERE o.snapshot_id = ? AND o.resource_key = n.resource_key
+                )
+            ''', (new_snapshot_id, old_snapshot_id)).fetchall()
+            deleted = conn.execute('''
+                SELECT o.*, 'deleted' AS change_type FROM inventory_resources o
+                WHERE o.snapshot_id = ? AND NOT EXISTS (
+                    SELECT 1 FROM inventory_resources n WHERE n.snapshot_id = ? AND n.resource_key = o.resource_key
+                )
+            ''', (old_snapshot_id, new_snapshot_id)).fetchall()
+            modified = conn.execute('''
+                SELECT n.*, 'modified' AS change_type FROM inventory_resources n
+                JOIN inventory_resources o ON o.resource_key = n.resource_key AND o.snapshot_id = ?
+                WHERE n.snapshot_id = ? AND o.content_hash IS NOT NULL AND o.content_hash IS NOT n.content_hash
+            ''', (old_snapshot_id, new_snapshot_id)).fetchall()
+            return [dict(row) for row in added + deleted + modified]
+        finally:
+            conn.close()
+    
+    def load_changes(self, since_change_id: int = 0, limit: int = 500) -> List[Dict]:
+        """Change feed entries newer than a change ID, newest first"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                'SELECT * FROM inventory_changes WHERE change_id > ? ORDER BY change_id DESC LIMIT ?',
+                (since_change_id, limit)
+            ).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
+    
+    def changed_keys(self, snapshot_id: str, since_change_id: int) -> Tuple[Set[str], Set[str], int]:
+        """
+        Resources of a snapshot changed after a change ID, for consumers that patch derived data
+        
+        Returns:
+            (added or modified keys, deleted keys, latest change ID seen)
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                'SELECT change_id, resource_key, change_type FROM inventory_changes '
+                'WHERE snapshot_id = ? AND change_id > ? ORDER BY change_id',
+                (snapshot_id, since_change_id)
+            ).fetchall()
+        finally:
+            conn.close()
+        
+        upserted, deleted = set(), set()
+        for row in rows:
+            # The latest change of a key wins
+            if row['change_type'] == 'deleted':
+                upserted.discard(row['resource_key'])
+                deleted.add(row['resource_key'])
+            else:
+                deleted.discard(row['resource_key'])
+                upserted.add(row['resource_key'])
+        return upserted, deleted, rows[-1]['change_id'] if rows else since_change_id
+    
+    def latest_change_id(self) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute('SELECT COALESCE(MAX(change_id), 0) FROM inventory_changes').fetchone()[0]
+        finally:
+            conn.close()
+    
+    def record_visit(self, user_id: str) -> int:
+        """
+        Record that a user opened the inventory
+        
+        Returns:
+            The last change ID the user had seen before this visit
+        """
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT last_change_id FROM inventory_visits WHERE user_id = ?', (user_id,)).fetchone()
+            latest = conn.execute('SELECT COALESCE(MAX(change_id), 0) FROM inventory_changes').fetchone()[0]
+            conn.execute(
+                'INSERT OR REPLACE INTO inventory_visits (user_id, last_change_id, visited_at) VALUES (?, ?, ?)',
+                (user_id, latest, datetime.now().isoformat())
+            )
+            conn.commit()
+            # First visit: everything already in the feed counts as seen
+            return row[0] if row else latest
+        finally:
+            conn.close()
+    
+    def get_watermarks(self) -> Dict[Tuple[str, str], datetime]:
+        """(account_id, region) -> time the pair was last known to be in sync"""
+        conn = self._connect()
+        try:
+            return {
+                (row['account_id'], row['region']): datetime.fromisoformat(row['watermark'])
+                for row in conn.execute('SELECT * FROM inventory_watermarks')
+            }
+        finally:
+            conn.close()
+    
+    def set_watermarks(self, watermarks: List[Tuple[str, str, datetime, str]]):
+        """Store (account_id, region, watermark, source) rows"""
+        if not watermarks:
+            return
+        conn = self._connect()
+        try:
+            conn.executemany(
+                'INSERT OR REPLACE INTO inventory_watermarks (account_id, region, watermark, source) VALUES (?, ?, ?, ?)',
+                [(account_id, region, watermark.isoformat(), source) for account_id, region, watermark, source in watermarks]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def prune(self, keep: int = 10):
+        """Delete all but the newest `keep` completed snapshots (and abandoned runs)"""
+        conn = self._connect()
+        try:
+            keep_ids = [row[0] for row in conn.execute(
+                "SELECT snapshot_id FROM inventory_snapshots WHERE status = 'complete' ORDER BY created_at DESC LIMIT ?",
+                (keep,)
+            )]
+            running_ids = [row[0] for row in conn.execute(
+                "SELECT snapshot_id FROM inventory_snapshots WHERE status = 'running'"
+            )]
+            retained = keep_ids + running_ids
+            placeholders = ','.join('?' * len(retained)) or "''"
+            
+            for table in ('inventory_resources', 'inventory_errors', 'inventory_snapshots'):
+                conn.execute(f'DELETE FROM {table} WHERE snapshot_id NOT IN ({placeholders})', retained)
+            
+            cutoff = (datetime.now() - timedelta(days=AppConfig.INVENTORY_CHANGE_RETENTION_DAYS)).isoformat()
+            conn.execute('DELETE FROM inventory_changes WHERE detected_at < ?', (cutoff,))
+            conn.commit()
+        finally:
+            conn.close()
+
+
+class InventoryCollector:
+    """
+    Collects every inventory resource type across accounts and regions
+    
+    (account, region) targets run on the shared fan-out executor; within a
+    target the resource types are collected concurrently. Each failure is
+    recorded against its (account, region, type) instead of aborting the run,
+    and results are written to the store as each target completes.
+    """
+    
+    def __init__(self, account_mgr, store: 'InventoryStore'):
+        """
+        Initialize collector
+        
+        Args:
+            account_mgr: AWSAccountManager used for role assumption
+            store: InventoryStore snapshots are written to
+        """
+        self.account_mgr = account_mgr
+        self.store = store
+        self.collectors: Dict[str, Callable] = {
+            'ec2': self._collect_ec2,
+            'rds': self._collect_rds,
+            's3': self._collect_s3,
+            'lambda': self._collect_lambda,
+            'dynamodb': self._collect_dynamodb,
+            'elb': self._collect_elb,
+            'vpc': self._collect_vpc,
+            'ebs': self._collect_ebs,
+            'eip': self._collect_eip,
+            'cloudfront': self._collect_cloudfront,
+            'route53': self._collect_route53
+        }
+    
+    def collect(
+        self,
+        accounts: Optional[List] = None,
+        regions: Optional[List[str]] = None,
+        resource_types: Optional[List[str]] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        mode: str = 'full'
+    ) -> Dict:
+        """
+        Collect a new snapshot
+        
+        Args:
+            accounts: AWSAccountConfig list (default: all active configured accounts)
+            regions: Regions to scan (default: each account's own regions)
+            resource_types: Subset of RESOURCE_TYPES to collect (default: all; full mode only)
+            progress: Optional callback(completed_targets, total_targets)
+            mode: 'full' (per-service describes) or 'tagging' (Resource Groups Tagging API
+                fast path - ARNs and tags only, details loaded on demand)
+        
+        Returns:
+            Snapshot summary dict
+        """
+        types = [t for t in (resource_types or RESOURCE_TYPES) if t in self.collectors]
+        executor = AccountFanOutExecutor(self.account_mgr, call_timeout=AppConfig.INVENTORY_CALL_TIMEOUT)
+        targets = executor.build_targets(accounts, regions)
+        
+        # Global services are collected from the first target of each account
+        primary_region = {}
+        for target in targets:
+            primary_region.setdefault(target.account_id, target.region)
+        
+        previous = self.store.latest_snapshot()
+        started_at = datetime.now(timezone.utc)
+        in_sync: List[Tuple[str, str, datetime, str]] = []
+        
+        snapshot_id = self.store.begin_snapshot({
+            'accounts': sorted(primary_region),
+            'regions': sorted({t.region for t in targets}),
+            'resource_types': types,
+            'mode': mode
+        })
+        start = time.monotonic()
+        
+        def collect_target(session, target: FanOutTarget) -> Dict:
+            is_primary = primary_region[target.account_id] == target.region
+            if mode == 'tagging':
+                return self._collect_tagged(session, target, is_primary)
+            
+            target_types = [t for t in types if t not in GLOBAL_RESOURCE_TYPES or is_primary]
+            return self._collect_target(session, target, target_types)
+        
+        completed = 0
+        try:
+            for result in executor.iter_results(collect_target, targets):
+                completed += 1
+                if result.success:
+                    self.store.write_resources(snapshot_id, result.result['resources'])
+                    self.store.write_errors(snapshot_id, result.result['errors'])
+                    # Tagging API results omit never-tagged resources, so they don't count as in sync
+                    if mode == 'full' and not result.result['errors']:
+                        in_sync.append((result.target.account_id, result.target.region, started_at, 'full_scan'))
+                else:
+                    self.store.write_errors(snapshot_id, [{
+                        'account_id': result.target.account_id,
+                        'account_name': result.target.account_name,
+                        'region': result.target.region,
+                        'resource_type': '*',
+                        'stage': result.stage,
+                        'error': f"{result.error_code}: {result.error}"
+                    }])
+                if progress:
+                    progress(completed, len(targets))
+        except Exception:
+            # Not left 'running' (which prune keeps); the next collection's prune removes it
+            self.store.complete_snapshot(snapshot_id, time.monotonic() - start, status='failed')
+            raise
+        
+        self.store.complete_snapshot(snapshot_id, time.monotonic() - start)
+        self.store.set_watermarks(in_sync)
+        
+        # Only a scan of the same full scope and mode can tell a deleted resource from an unscanned one
+        previous_mode = json.loads(previous['scope'] or '{}').get('mode', 'full') if previous else None
+        if previous and previous_mode == mode and accounts is None and regions is None and resource_types is None:
+            self.store.record_changes(snapshot_id, self.store.diff_snapshots(previous['snapshot_id'], snapshot_id), 'full_scan')
+        
+        self.store.prune(AppConfig.INVENTORY_SNAPSHOTS_KEPT)
+        return self.store.latest_snapshot(status=None)
+    
+    def _collect_target(self, session, target: FanOutTarget, types: List[str]) -> Dict:
+        """Collect resource types for one (account, region) concurrently (worker thread)"""
+        resources, errors = [], []
+        
+        def run(resource_type: str):
+            try:
+                collected = self.collectors[resource_type](session, target)
+            except ClientError as e:
+                return resource_type, [], 'collect', f"{e.response['Error']['Code']}: {e.response['Error']['Message']}"
+            except Exception as e:
+                return resource_type, [], 'collect', f"{type(e).__name__}: {e}"
+            
+            # Collectors may return (records, per-resource failures); any failure marks the type
+            # incomplete so an incremental refresh does not read a missing resource as deleted
+            records, failures = collected if isinstance(collected, tuple) else (collected, [])
+            if not failures:
+                return resource_type, records, None, None
+            detail = '; '.join(f"{f['name'] or '*'} ({f['stage']}): {f['error']}" for f in failures[:5])
+            more = f" and {len(failures) - 5} more" if len(failures) > 5 else ''
+            return resource_type, records, failures[0]['stage'], f"{len(failures)} failed - {detail}{more}"
+        
+        with ThreadPoolExecutor(max_workers=AppConfig.INVENTORY_TYPE_WORKERS) as pool:
+            for resource_type, records, stage, error in pool.map(run, types):
+                resources.extend(records)
+                if error:
+                    errors.append({
+                        'account_id': target.account_id,
+                        'account_name': target.account_name,
+                        'region': target.region,
+                        'resource_type': resource_type,
+                        'stage': stage,
+                        'error': error
+                    })
+        
+        return {'resources': resources, 'errors': errors}
+    
+    def _collect_tagged(self, session, target: FanOutTarget, is_primary: bool) -> Dict:
+        """
+        Discover resources of every taggable type with Resource Groups Tagging API (worker thread)
+        
+        One paginated get_resources call returns ARNs and tags for all services
+        in the region; per-service describes are deferred to load_resource_details.
+        """
+        resources, errors = [], []
+        
+        # CloudFront and Route 53 are served by the us-east-1 endpoint; fetch them once per account
+        calls = [(target.region, None)]
+        if is_primary:
+            calls.append(('us-east-1', ['cloudfront', 'route53']))
+        
+        for region, type_filters in calls:
+            try:
+                client = session.client('resourcegroupstaggingapi', region_name=region)
+                params = {'ResourcesPerPage': 100}
+                if type_filters:
+                    params['ResourceTypeFilters'] = type_filters
+                
+                for page in client.get_paginator('get_resources').paginate(**params):
+                    for mapping in page.get('ResourceTagMappingList', []):
+                        record = self._record_from_arn(target, mapping)
+                        is_global = record['resource_type'] in ('cloudfront', 'route53')
+                        if is_global == bool(type_filters):
+                            resources.append(record)
+            except Exception as e:
+                errors.append({
+                    'account_id': target.account_id,
+                    'account_name': target.account_name,
+                    'region': region,
+                    'resource_type': 'tagging',
+                    'stage': 'collect',
+                    'error': (f"{e.response['Error']['Code']}: {e.response['Error']['Message']}"
+                              if isinstance(e, ClientError) else f"{type(e).__name__}: {e}")
+                })
+        
+        return {'resources': resources, 'errors': errors}
+    
+    def _record_from_arn(self, target: FanOutTarget, mapping: Dict) -> Dict:
+        """Build a lightweight record from a Tagging API ResourceTagMapping"""
+        arn = mapping['ResourceARN']
+        parsed = parse_arn(arn)
+        tags = {tag['Key']: tag['Value'] for tag in mapping.get('Tags', [])}
+        
+        resource_type = TAGGING_RESOURCE_TYPES.get(
+            (parsed['service'], parsed['resource_type']),
+            f"{parsed['service']}:{parsed['resource_type']}" if parsed['resource_type'] else parsed['service']
+        )
+        resource_id = parsed['resource_id']
+        region = parsed['region'] or target.region
+        
+        # Use the same IDs as the full collectors so both kinds of snapshot share resource keys
+        if resource_type == 'lambda':
+            resource_id = resource_id.split(':')[0]
+        elif resource_type == 'elb' and '/' in resource_id:
+            resource_id = resource_id.split('/')[1]
+        elif resource_type in ('cloudfront', 'route53'):
+            region = 'global'
+        
+        return self._record(
+            target, resource_type, resource_id,
+            region=region,
+            name=tags.get('Name'),
+            arn=arn,
+            tags=tags,
+            discovered_via='tagging',
+            details_loaded=False
+        )
+    
+    @staticmethod
+    def _record(target: FanOutTarget, resource_type: str, resource_id: str, region: Optional[str] = None,
+                **fields) -> Dict:
+        """Build a normalised resource record"""
+        region = region or target.region
+        return {
+            'resource_key': make_resource_key(target.account_id, region, resource_type, resource_id),
+            'resource_type': resource_type,
+            'resource_id': resource_id,
+            'name': fields.pop('name', None) or resource_id,
+            'account_id': target.account_id,
+            'account_name': target.account_name,
+            'region': region,
+            'state': fields.pop('state', None),
+            'cost_month': fields.pop('cost_month', 0.0),
+            'arn': fields.pop('arn', None),
+            'tags': fields.pop('tags', None) or {},
+            'attributes': fields
+        }
+    
+    @staticmethod
+    def _unwrap(response: Dict, key: str) -> List[Dict]:
+        """Turn a service wrapper's {'success': False} result into an exception"""
+        if not response.get('success'):
+            raise RuntimeError(response.get('error', 'unknown error'))
+        return response.get(key, [])
+    
+    def _collect_ec2(self, session, target: FanOutTarget) -> List[Dict]:
+        from aws_ec2 import EC2Service
+        service = EC2Service(session, target.region)
+        records = []
+        for inst in self._unwrap(service.list_instances(), 'instances'):
+            running = inst['state'] == 'running'
+            records.append(self._record(
+                target, 'ec2', inst['instance_id'],
+                name=inst['tags'].get('Name'),
+                state=inst['state'],
+                cost_month=service.get_cost_estimate(inst['instance_type']) if running else 0.0,
+                tags=inst['tags'],
+                instance_type=inst['instance_type'],
+                launch_time=inst['launch_time'],
+                vpc_id=inst['vpc_id'],
+                subnet_id=inst['subnet_id'],
+                private_ip=inst['private_ip'],
+                public_ip=inst['public_ip'],
+                platform=inst['platform'],
+                security_groups=inst['security_groups'],
+                volume_ids=inst['volume_ids'],
+                iam_profile=inst['iam_profile']
+            ))
+        return records
+    
+    def _collect_rds(self, session, target: FanOutTarget) -> List[Dict]:
+        from aws_rds import RDSService
+        service = RDSService(session, target.region)
+        records = []
+        for db in self._unwrap(service.list_db_instances(), 'instances'):
+            records.append(self._record(
+                target, 'rds', db['db_instance_id'],
+                state=db['status'],
+                cost_month=service.get_cost_estimate(db['db_instance_class'], db['allocated_storage'] or 0),
+                tags=db['tags'],
+                engine=db['engine'],
+                engine_version=db['engine_version'],
+                instance_class=db['db_instance_class'],
+                storage_gb=db['allocated_storage'],
+                multi_az=db['multi_az'],
+                backup_retention=db['backup_retention'],
+                endpoint=db['endpoint'],
+                db_subnet_group=db['db_subnet_group'],
+                vpc_id=db['vpc_id'],
+                subnet_ids=db['subnet_ids'],
+                security_groups=db['security_groups']
+            ))
+        return records
+    
+    def _collect_s3(self, session, target: FanOutTarget) -> List[Dict]:
+        from aws_additional_services import S3Service
+        service = S3Service(session)
+        return [
+            self._record(
+                target, 's3', bucket['bucket_name'],
+                region=bucket['region'],
+                state='available',
+                cost_month=round((bucket.get('size_bytes') or 0) / 1024 ** 3 * S3_COST_PER_GB_MONTH, 2),
+                arn=f"arn:aws:s3:::{bucket['bucket_name']}",
+                creation_date=bucket['creation_date'],
+                size_bytes=bucket.get('size_bytes'),
+                object_count=bucket.get('object_count'),
+                encrypted=bool(bucket['encryption']) if bucket.get('encryption') is not None else None,
+                encryption=bucket.get('encryption') or None,
+                versioning=bucket.get('versioning'),
+                public_access_blocked=bucket.get('public_access_blocked')
+            )
+            for bucket in self._unwrap(service.list_buckets(), 'buckets')
+        ]
+    
+    def _collect_lambda(self, session, target: FanOutTarget) -> Tuple[List[Dict], List[Dict]]:
+        from aws_additional_services import LambdaService
+        service = LambdaService(session, target.region)
+        response = service.list_functions()
+        records = [
+            self._record(
+                target, 'lambda', func['function_name'],
+                state='active',
+                arn=func['function_arn'],
+                tags=func['tags'],
+                runtime=func['runtime'],
+                memory_mb=func['memory_size'],
+                timeout_sec=func['timeout'],
+                last_modified=func['last_modified'],
+                code_size=func['code_size'],
+                role=func['role'],
+                vpc_id=func['vpc_id'],
+                subnet_ids=func['subnet_ids'],
+                security_groups=func['security_groups'],
+                invocations_month=func.get('invocations_month'),
+                errors_month=func.get('errors_month'),
+                throttles_month=func.get('throttles_month')
+            )
+            for func in self._unwrap(response, 'functions')
+        ]
+        return records, response.get('failures', [])
+    
+    def _collect_dynamodb(self, session, target: FanOutTarget) -> Tuple[List[Dict], List[Dict]]:
+        from aws_additional_services import DynamoDBService
+        service = DynamoDBService(session, target.region)
+        response = service.list_tables()
+        records = [
+            self._record(
+                target, 'dynamodb', table['table_name'],
+                state=table['status'].lower(),
+                arn=table['table_arn'],
+                tags=table['tags'],
+                billing_mode=table['billing_mode'],
+                item_count=table['item_count'],
+                size_bytes=table['size_bytes'],
+                creation_date=table['creation_date'],
+                consumed_read_units_month=table.get('consumed_read_units_month'),
+                consumed_write_units_month=table.get('consumed_write_units_month'),
+                read_throttles_month=table.get('read_throttles_month'),
+                write_throttles_month=table.get('write_throttles_month')
+            )
+            for table in self._unwrap(response, 'tables')
+        ]
+        return records, response.get('failures', [])
+    
+    def _collect_elb(self, session, target: FanOutTarget) -> Tuple[List[Dict], List[Dict]]:
+        from aws_additional_services import ELBService
+        service = ELBService(session, target.region)
+        load_balancers = self._unwrap(service.list_load_balancers(), 'load_balancers')
+        
+        response = service.list_target_groups()
+        target_groups: Dict[str, List[Dict]] = {}
+        for tg in self._unwrap(response, 'target_groups'):
+            for lb_arn in tg['load_balancer_arns']:
+                target_groups.setdefault(lb_arn, []).append({
+                    'name': tg['name'],
+                    'arn': tg['target_group_arn'],
+                    'target_type': tg['target_type'],
+                    'targets': sorted(t['id'] for t in tg['targets'])
+                })
+        
+        records = [
+            self._record(
+                target, 'elb', lb['name'],
+                arn=lb['load_balancer_arn'],
+                state=lb['state'],
+                tags=lb['tags'],
+                type=lb['type'],
+                scheme=lb['scheme'],
+                dns_name=lb['dns_name'],
+                vpc_id=lb['vpc_id'],
+                security_groups=lb['security_groups'],
+                target_groups=sorted(target_groups.get(lb['load_balancer_arn'], []), key=lambda tg: tg['name'])
+            )
+            for lb in load_balancers
+        ]
+        return records, response.get('failures', [])
+    
+    def _collect_vpc(self, session, target: FanOutTarget) -> List[Dict]:
+        client = session.client('ec2', region_name=target.region)
+        
+        subnets: Dict[str, int] = {}
+        for page in client.get_paginator('describe_subnets').paginate():
+            for subnet in page['Subnets']:
+                subnets[subnet['VpcId']] = subnets.get(subnet['VpcId'], 0) + 1
+        
+        nat_gateways: Dict[str, int] = {}
+        for page in client.get_paginator('describe_nat_gateways').paginate():
+            for nat in page['NatGateways']:
+                if nat['State'] == 'available':
+                    nat_gateways[nat['VpcId']] = nat_gateways.get(nat['VpcId'], 0) + 1
+        
+        records = []
+        for page in client.get_paginator('describe_vpcs').paginate():
+            for vpc in page['Vpcs']:
+                tags = {tag['Key']: tag['Value'] for tag in vpc.get('Tags', [])}
+                records.append(self._record(
+                    target, 'vpc', vpc['VpcId'],
+                    name=tags.get('Name'),
+                    state=vpc['State'],
+                    tags=tags,
+                    cidr=vpc['CidrBlock'],
+                    is_default=vpc.get('IsDefault', False),
+                    subnets=subnets.get(vpc['VpcId'], 0),
+                    nat_gateways=nat_gateways.get(vpc['VpcId'], 0)
+                ))
+        return records
+    
+    def _collect_ebs(self, session, target: FanOutTarget) -> List[Dict]:
+        from aws_ec2 import EC2Service
+        service = EC2Service(session, target.region)
+        return [
+            self._record(
+                target, 'ebs', vol['volume_id'],
+                name=vol['tags'].get('Name'),
+                state=vol['state'],
+                cost_month=vol['size_gb'] * EBS_COST_PER_GB_MONTH,
+                tags=vol['tags'],
+                volume_type=vol['volume_type'],
+                size_gb=vol['size_gb'],
+                iops=vol['iops'],
+                encrypted=vol['encrypted'],
+                attached_to=vol['attached_to']
+            )
+            for vol in self._unwrap(service.list_volumes(), 'volumes')
+        ]
+    
+    def _collect_eip(self, session, target: FanOutTarget) -> List[Dict]:
+        from aws_ec2 import EC2Service
+        service = EC2Service(session, target.region)
+        return [
+            self._record(
+                target, 'eip', addr.get('allocation_id') or addr['public_ip'],
+                name=addr['tags'].get('Name') or addr['public_ip'],
+                state='associated' if addr.get('association_id') else 'unassociated',
+                cost_month=EIP_COST_MONTH,
+                tags=addr['tags'],
+                public_ip=addr['public_ip'],
+                instance_id=addr.get('instance_id')
+            )
+            for addr in self._unwrap(service.list_addresses(), 'addresses')
+        ]
+    
+    def _collect_cloudfront(self, session, target: FanOutTarget) -> List[Dict]:
+        from aws_additional_services import CloudFrontService
+        service = CloudFrontService(session)
+        return [
+            self._record(
+                target, 'cloudfront', dist['distribution_id'],
+                region='global',
+                name=dist['domain_name'],
+                arn=dist['arn'],
+                state=dist['status'].lower() if dist['enabled'] else 'disabled',
+                domain_name=dist['domain_name'],
+                aliases=dist['aliases'],
+                origins=len(dist['origins']),
+                origin_domains=dist['origins'],
+                price_class=dist['price_class'],
+                https_only=dist['viewer_protocol_https']
+            )
+            for dist in self._unwrap(service.list_distributions(), 'distributions')
+        ]
+    
+    def _collect_route53(self, session, target: FanOutTarget) -> List[Dict]:
+        from aws_additional_services import Route53Service
+        service = Route53Service(session)
+        return [
+            self._record(
+                target, 'route53', zone['zone_id'],
+                region='global',
+                name=zone['name'],
+                state='active',
+                arn=f"arn:aws:route53:::hostedzone/{zone['zone_id']}",
+                private=zone['private'],
+                record_count=zone['record_count']
+            )
+            for zone in self._unwrap(service.list_hosted_zones(), 'zones')
+        ]
+
+
+class InventoryRefresher:
+    """
+    Incremental inventory refresh driven by change events
+    
+    For each (account, region) it asks AWS Config - or CloudTrail for types
+    Config does not record there - which resource types changed since the
+    pair's watermark, re-collects only those types, diffs them against the
+    latest snapshot, patches the snapshot in place and appends the
+    differences to the change feed.
+    """
+    
+    # Config resource types backing each inventory type
+    CONFIG_RESOURCE_TYPES = {
+        'ec2': 'AWS::EC2::Instance',
+        'rds': 'AWS::RDS::DBInstance',
+        's3': 'AWS::S3::Bucket',
+        'lambda': 'AWS::Lambda::Function',
+        'dynamodb': 'AWS::DynamoDB::Table',
+        'elb': 'AWS::ElasticLoadBalancingV2::LoadBalancer',
+        'vpc': 'AWS::EC2::VPC',
+        'ebs': 'AWS::EC2::Volume',
+        'eip': 'AWS::EC2::EIP',
+        'cloudfront': 'AWS::CloudFront::Distribution',
+        'route53': 'AWS::Route53::HostedZone'
+    }
+    
+    # CloudTrail event sources that map to a single inventory type
+    CLOUDTRAIL_EVENT_SOURCES = {
+        'rds.amazonaws.com': 'rds',
+        's3.amazonaws.com': 's3',
+        'lambda.amazonaws.com': 'lambda',
+        'dynamodb.amazonaws.com': 'dynamodb',
+        'elasticloadbalancing.amazonaws.com': 'elb',
+        'cloudfront.amazonaws.com': 'cloudfront',
+        'route53.amazonaws.com': 'route53'
+    }
+    
+    # ec2.amazonaws.com events, classified by the noun in the event name or the resource ID prefix
+    EC2_EVENT_NOUNS = (('Volume', 'ebs'), ('Address', 'eip'), ('Vpc', 'vpc'), ('Subnet', 'vpc'),
+                       ('NatGateway', 'vpc'), ('Instance', 'ec2'))
+    EC2_ID_PREFIXES = (('vol-', 'ebs'), ('eipalloc-', 'eip'), ('vpc-', 'vpc'), ('subnet-', 'vpc'),
+                       ('nat-', 'vpc'), ('i-', 'ec2'))
+    
+    # CloudTrail can take up to ~15 minutes to deliver an event, so windows overlap by that much
+    WATERMARK_OVERLAP = timedelta(minutes=15)
+    
+    def __init__(self, account_mgr, store: 'InventoryStore'):
+        """
+        Initialize refresher
+        
+        Args:
+            account_mgr: AWSAccountManager used for role assumption
+            store: InventoryStore holding the snapshot to patch
+        """
+        self.account_mgr = account_mgr
+        self.store = store
+        self.collector = InventoryCollector(account_mgr, store)
+    
+    def refresh(
+        self,
+        accounts: Optional[List] = None,
+        regions: Optional[List[str]] = None,
+        progress: Optional[Callable[[int, int], None]] = None
+    ) -> Dict:
+        """
+        Patch the latest snapshot with changes since each (account, region) watermark
+        
+        Args:
+            accounts: AWSAccountConfig list (default: all active configured accounts)
+            regions: Regions to refresh (default: each account's own regions)
+            progress: Optional callback(completed_targets, total_targets)
+        
+        Returns:
+            Summary dict (added, modified, deleted, types re-collected, errors)
+        """
+        snapshot = self.store.latest_snapshot()
+        if not snapshot:
+            # Nothing to patch yet - take a full snapshot instead
+            self.collector.collect(accounts, regions, progress=progress)
+            return {'full_scan': True, 'added': 0, 'modified': 0, 'deleted': 0, 'recollected': 0, 'errors': []}
+        
+        snapshot_id = snapshot['snapshot_id']
+        baseline = datetime.fromisoformat(snapshot['created_at']).astimezone(timezone.utc)
+        watermarks = self.store.get_watermarks()
+        started_at = datetime.now(timezone.utc)
+        
+        executor = AccountFanOutExecutor(self.account_mgr, call_timeout=AppConfig.INVENTORY_CALL_TIMEOUT)
+        targets = executor.build_targets(accounts, regions)
+        primary_region = {}
+        for target in targets:
+            primary_region.setdefault(target.account_id, target.region)
+        
+        def refresh_target(session, target: FanOutTarget) -> Dict:
+            since = watermarks.get((target.account_id, target.region), baseline) - self.WATERMARK_OVERLAP
+            is_primary = primary_region[target.account_id] == target.region
+            regional = [t for t in RESOURCE_TYPES if t not in GLOBAL_RESOURCE_TYPES]
+            
+            changed, errors = self._detect_changes(session, target, target.region, since, regional + ['s3'])
+            if is_primary:
+                # CloudFront and Route 53 record their changes in us-east-1
+                global_changed, global_errors = self._detect_changes(
+                    session, target, 'us-east-1', since, ['cloudfront', 'route53']
+                )
+                changed.update(global_changed)
+                errors.extend(global_errors)
+            
+            # Global types are re-collected once, by the account's primary target
+            collect_types = [t for t in changed if t not in GLOBAL_RESOURCE_TYPES or is_primary]
+            collected = self.collector._collect_target(session, target, collect_types)
+            failed_types = {e['resource_type'] for e in collected['errors']}
+            
+            return {
+                'changed': changed,
+                'global_changed': [t for t in changed if t in GLOBAL_RESOURCE_TYPES and not is_primary],
+                'collected': {
+                    t: [r for r in collected['resources'] if r['resource_type'] == t]
+                    for t in collect_types if t not in failed_types
+                },
+                'errors': errors + collected['errors']
+            }
+        
+        summary = {'full_scan': False, 'added': 0, 'modified': 0, 'deleted': 0, 'recollected': 0, 'errors': []}
+        in_sync: List[Tuple[str, str, datetime, str]] = []
+        pending_global: Dict[str, Set[str]] = {}
+        
+        completed = 0
+        for result in executor.iter_results(refresh_target, targets):
+            completed += 1
+            target = result.target
+            if not result.success:
+                summary['errors'].append({
+                    'account_id': target.account_id, 'account_name': target.account_name,
+                    'region': target.region, 'resource_type': '*', 'stage': result.stage,
+                    'error': f"{result.error_code}: {result.error}"
+                })
+            else:
+                for resource_type, records in result.result['collected'].items():
+                    self._patch(snapshot_id, target, resource_type, records,
+                                result.result['changed'][resource_type], summary)
+                for resource_type in result.result['global_changed']:
+                    pending_global.setdefault(target.account_id, set()).add(resource_type)
+                summary['errors'].extend(result.result['errors'])
+                
+                if not result.result['errors']:
+                    sources = sorted(set(result.result['changed'].values())) or ['no_changes']
+                    in_sync.append((target.account_id, target.region, started_at, ','.join(sources)))
+            
+            if progress:
+                progress(completed, len(targets))
+        
+        # S3 changes seen in a non-primary region: re-collect S3 for those accounts
+        if pending_global:
+            primary_targets = [
+                t for t in targets
+                if t.account_id in pending_global and primary_region[t.account_id] == t.region
+            ]
+            
+            def collect_global(session, target: FanOutTarget) -> Dict:
+                return self.collector._collect_target(session, target, sorted(pending_global[target.account_id]))
+            
+            for result in executor.iter_results(collect_global, primary_targets):
+                if not result.success:
+                    continue
+                failed_types = {e['resource_type'] for e in result.result['errors']}
+                for resource_type in pending_global[result.target.account_id] - failed_types:
+                    records = [r for r in result.result['resources'] if r['resource_type'] == resource_type]
+                    self._patch(snapshot_id, result.target, resource_type, records, 'cloudtrail', summary)
+                summary['errors'].extend(result.result['errors'])
+        
+        self.store.write_errors(snapshot_id, summary['errors'])
+        self.store.set_watermarks(in_sync)
+        return summary
+    
+    def _patch(self, snapshot_id: str, target: FanOutTarget, resource_type: str,
+               records: List[Dict], source: str, summary: Dict):
+        """Diff re-collected records of one type against the snapshot and apply the differences"""
+        # Global types are stored under the resource's own region, so match them by account only
+        region = None if resource_type in GLOBAL_RESOURCE_TYPES else target.region
+        stored = {
+            r['resource_key']: r
+            for r in self.store.load_resources(snapshot_id, resource_type, target.account_id, region)
+        }
+        
+        upserts, changes = [], []
+        for record in records:
+            old = stored.pop(record['resource_key'], None)
+            if old is None:
+                upserts.append(record)
+                changes.append(dict(record, change_type='added'))
+            elif content_hash(old) != content_hash(record):
+                upserts.append(record)
+                changes.append(dict(record, change_type='modified', details=describe_changes(old, record)))
+        
+        deleted = list(stored.values())
+        changes.extend(dict(r, change_type='deleted') for r in deleted)
+        
+        self.store.apply_changes(snapshot_id, upserts, [r['resource_key'] for r in deleted], changes, source)
+        summary['recollected'] += 1
+        for change in changes:
+            summary[change['change_type']] += 1
+    
+    def _detect_changes(self, session, target: FanOutTarget, region: str, since: datetime,
+                        types: List[str]) -> Tuple[Dict[str, str], List[Dict]]:
+        """
+        Find which resource types changed since a watermark (worker thread)
+        
+        Returns:
+            ({resource_type: 'config' | 'cloudtrail'}, errors)
+        """
+        changed: Dict[str, str] = {}
+        errors: List[Dict] = []
+        
+        def error(stage: str, e: Exception) -> Dict:
+            message = (f"{e.response['Error']['Code']}: {e.response['Error']['Message']}"
+                       if isinstance(e, ClientError) else f"{type(e).__name__}: {e}")
+            return {'account_id': target.account_id, 'account_name': target.account_name,
+                    'region': region, 'resource_type': ','.join(types), 'stage': stage, 'error': message}
+        
+        recorded: Set[str] = set()
+        try:
+            config = session.client('config', region_name=region)
+            recorded = self._config_recorded_types(config, types)
+            for resource_type in recorded:
+                if self._config_type_changed(config, self.CONFIG_RESOURCE_TYPES[resource_type], since):
+                    changed[resource_type] = 'config'
+        except Exception as e:
+            errors.append(error('detect_config', e))
+            recorded = set()
+        
+        remaining = [t for t in types if t not in recorded]
+        if remaining:
+            try:
+                cloudtrail = session.client('cloudtrail', region_name=region)
+                for resource_type in self._cloudtrail_changed_types(cloudtrail, since, remaining):
+                    changed[resource_type] = 'cloudtrail'
+            except Exception as e:
+                errors.append(error('detect_cloudtrail', e))
+        
+        return changed, errors
+    
+    def _config_recorded_types(self, config, types: List[str]) -> Set[str]:
+        """Inventory types an actively recording AWS Config recorder covers in this region"""
+        statuses = config.describe_configuration_recorder_status().get('ConfigurationRecordersStatus', [])
+        if not any(status.get('recording') for status in statuses):
+            return set()
+        
+        recorded = set()
+        for recorder in config.describe_configuration_recorders().get('ConfigurationRecorders', []):
+            group = recorder.get('recordingGroup', {})
+            if group.get('allSupported'):
+                # CloudFront and Route 53 are only recorded when global types are included
+                recorded.update(
+                    t for t in types
+                    if t in self.CONFIG_RESOURCE_TYPES
+                    and (t not in ('cloudfront', 'route53') or group.get('includeGlobalResourceTypes'))
+                )
+                continue
+            recorded.update(
+                t for t in types
+                if self.CONFIG_RESOURCE_TYPES.get(t) in group.get('resourceTypes', [])
+            )
+        return recorded
+    
+    @staticmethod
+    def _config_type_changed(config, config_type: str, since: datetime) -> bool:
+        """Whether any resource of a Config type was created, changed or deleted since a time"""
+        live_keys = []
+        for page in config.get_paginator('list_discovered_resources').paginate(
+            resourceType=config_type, includeDeletedResources=True
+        ):
+            for identifier in page.get('resourceIdentifiers', []):
+                deleted_at = identifier.get('resourceDeletionTime')
+                if deleted_at:
+                    if deleted_at > since:
+                        return True
+                else:
+                    live_keys.append({'resourceType': config_type, 'resourceId': identifier['resourceId']})
+        
+        # batch_get_resource_config accepts 100 keys per call; stop at the first change
+        for i in range(0, len(live_keys), 100):
+            response = config.batch_get_resource_config(resourceKeys=live_keys[i:i + 100])
+            for item in response.get('baseConfigurationItems', []):
+                if item.get('configurationItemCaptureTime') and item['configurationItemCaptureTime'] > since:
+                    return True
+        return False
+    
+    def _cloudtrail_changed_types(self, cloudtrail, since: datetime, types: List[str]) -> Set[str]:
+        """Inventory types with write events in CloudTrail since a time"""
+        wanted, found = set(types), set()
+        paginator = cloudtrail.get_paginator('lookup_events')
+        
+        for page in paginator.paginate(
+            LookupAttributes=[{'AttributeKey': 'ReadOnly', 'AttributeValue': 'false'}],
+            StartTime=since,
+            EndTime=datetime.now(timezone.utc)
+        ):
+            for event in page.get('Events', []):
+                found.update(self._classify_event(event) & wanted)
+            if found == wanted:
+                break
+        return found
+    
+    def _classify_event(self, event: Dict) -> Set[str]:
+        """Inventory types a CloudTrail event touches"""
+        source = event.get('EventSource', '')
+        if source in self.CLOUDTRAIL_EVENT_SOURCES:
+            return {self.CLOUDTRAIL_EVENT_SOURCES[source]}
+        if source != 'ec2.amazonaws.com':
+            return set()
+        
+        name = event.get('EventName', '')
+        for noun, resource_type in self.EC2_EVENT_NOUNS:
+            if noun in name:
+                return {resource_type}
+        
+        # CreateTags/DeleteTags and friends: classify by the IDs they touched
+        types = set()
+        for resource in event.get('Resources', []):
+            resource_id = resource.get('ResourceName', '')
+            for prefix, resource_type in self.EC2_ID_PREFIXES:
+                if resource_id.startswith(prefix):
+                    types.add(resource_type)
+                    break
+        return types
+
+
+class ResourceDetailLoader:
+    """
+    Lazily describes single resources discovered through the Tagging API
+    
+    Details are fetched only when a user opens a resource and are written
+    back into the snapshot, so each resource is described at most once.
+    """
+    
+    def __init__(self, account_mgr, store: 'InventoryStore'):
+        self.account_mgr = account_mgr
+        self.store = store
+        self.describers: Dict[str, Callable] = {
+            'ec2': lambda s, r: s.client('ec2', region_name=r['region']).describe_instances(
+                InstanceIds=[r['resource_id']])['Reservations'][0]['Instances'][0],
+            'ebs': lambda s, r: s.client('ec2', region_name=r['region']).describe_volumes(
+                VolumeIds=[r['resource_id']])['Volumes'][0],
+            'eip': lambda s, r: s.client('ec2', region_name=r['region']).describe_addresses(
+                AllocationIds=[r['resource_id']])['Addresses'][0],
+            'vpc': lambda s, r: s.client('ec2', region_name=r['region']).describe_vpcs(
+                VpcIds=[r['resource_id']])['Vpcs'][0],
+            'rds': lambda s, r: s.client('rds', region_name=r['region']).describe_db_instances(
+                DBInstanceIdentifier=r['resource_id'])['DBInstances'][0],
+            's3': self._describe_bucket,
+            'lambda': lambda s, r: s.client('lambda', region_name=r['region']).get_function_configuration(
+                FunctionName=r['resource_id']),
+            'dynamodb': lambda s, r: s.client('dynamodb', region_name=r['region']).describe_table(
+                TableName=r['resource_id'])['Table'],
+            'elb': lambda s, r: s.client('elbv2', region_name=r['region']).describe_load_balancers(
+                LoadBalancerArns=[r['arn']])['LoadBalancers'][0],
+            'cloudfront': lambda s, r: s.client('cloudfront', region_name='us-east-1').get_distribution(
+                Id=r['resource_id'])['Distribution'],
+            'route53': lambda s, r: s.client('route53', region_name='us-east-1').get_hosted_zone(
+                Id=r['resource_id'])['HostedZone']
+        }
+    
+    @staticmethod
+    def _describe_bucket(session, record: Dict) -> Dict:
+        client = session.client('s3', region_name=record['region'])
+        details = {'Versioning': client.get_bucket_versioning(Bucket=record['resource_id']).get('Status', 'Disabled')}
+        try:
+            rules = client.get_bucket_encryption(Bucket=record['resource_id'])['ServerSideEncryptionConfiguration']['Rules']
+            details['Encryption'] = rules
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ServerSideEncryptionConfigurationNotFoundError':
+                raise
+            details['Encryption'] = None
+        return details
+    
+    def load(self, snapshot_id: str, record: Dict) -> Dict:
+        """
+        Return a record with its details loaded, describing it if needed
+        
+        Args:
+            snapshot_id: Snapshot the record belongs to
+            record: Resource record from the snapshot
+        
+        Returns:
+            Record whose attributes include 'details'
+        
+        Raises:
+            ClientError: The describe (or role assumption) failed
+            ValueError: No describe is available for the resource type
+        """
+        if 'details' in record['attributes']:
+            return record
+        
+        # The caller's copy may predate a load by another session; the stored row is authoritative
+        stored = self.store.load_resources(snapshot_id, resource_keys=[record['resource_key']])
+        if stored and 'details' in stored[0]['attributes']:
+            return stored[0]
+        
+        describe = self.describers.get(record['resource_type'])
+        if describe is None:
+            raise ValueError(f"No detail lookup for resource type {record['resource_type']}")
+        
+        account = AppConfig.get_aws_account_registry().by_id(record['account_id'])
+        assumed = self.account_mgr.assume_role_or_raise(
+            record['account_id'],
+            record['account_name'],
+            account.role_arn if account else ''
+        )
+        
+        details = describe(assumed.session, record)
+        details.pop('ResponseMetadata', None)
+        
+        loaded = dict(record, attributes=dict(record['attributes'], details=details, details_loaded=True))
+        self.store.update_resource(snapshot_id, loaded)
+        return loaded
+
+
+def is_unused(record: Dict) -> bool:
+    """Whether a resource exists but is not doing useful work"""
+    if record['resource_type'] == 'ebs':
+        return record['state'] == 'available'
+    return (record.get('state') or '') in INACTIVE_STATES
+
+
+def build_inventory_view(records: List[Dict]) -> Dict:
+    """
+    Shape snapshot records like the legacy inventory dict the UI tabs consume
+    
+    Args:
+        records: Resource records from InventoryStore.load_resources
+    
+    Returns:
+        Dict keyed by ec2_instances, rds_databases, s3_buckets, ...
+    """
+    view = {key: [] for key, _ in RESOURCE_TYPES.values()}
+    
+    for r in records:
+        attrs = r['attributes']
+        base = {
+            'account': r['account_name'],
+            'region': r['region'],
+            'cost_month': round(r['cost_month'] or 0, 2),
+            'tags': ','.join(f"{k}:{v}" for k, v in r['tags'].items())
+        }
+        resource_type = r['resource_type']
+        
+        if resource_type == 'ec2':
+            item = {'id': r['resource_id'], 'name': r['name'], **base,
+                    'type': attrs.get('instance_type'), 'state': r['state'],
+                    'vpc': attrs.get('vpc_id'), 'unused': is_unused(r)}
+        elif resource_type == 'rds':
+            item = {'id': r['resource_id'], 'name': r['name'], **base,
+                    'engine': f"{attrs.get('engine')} {attrs.get('engine_version')}",
+                    'class': attrs.get('instance_class'), 'state': r['state'],
+                    'storage_gb': attrs.get('storage_gb'), 'multi_az': attrs.get('multi_az'),
+                    'backup_retention': attrs.get('backup_retention')}
+        elif resource_type == 's3':
+            item = {'name': r['name'], **base,
+                    'size_gb': round((attrs.get('size_bytes') or 0) / 1024 ** 3, 2),
+                    'objects': attrs.get('object_count'), 'versioning': attrs.get('versioning'),
+                    'encryption': attrs.get('encrypted'),
+                    'public': None if attrs.get('public_access_blocked') is None else not attrs['public_access_blocked']}
+        elif resource_type == 'lambda':
+            item = {'name': r['name'], **base, 'runtime': attrs.get('runtime'),
+                    'memory_mb': attrs.get('memory_mb'), 'timeout_sec': attrs.get('timeout_sec'),
+                    'invocations_month': attrs.get('invocations_month') or 0,
+                    'errors_month': attrs.get('errors_month') or 0, 'throttles_month': attrs.get('throttles_month') or 0}
+        elif resource_type == 'dynamodb':
+            item = {'name': r['name'], **base, 'billing_mode': attrs.get('billing_mode'),
+                    'size_gb': round((attrs.get('size_bytes') or 0) / 1024 ** 3, 2),
+                    'items': attrs.get('item_count'),
+                    'read_units_month': attrs.get('consumed_read_units_month'),
+                    'write_units_month': attrs.get('consumed_write_units_month'),
+                    'throttles_month': (attrs.get('read_throttles_month') or 0) + (attrs.get('write_throttles_month') or 0)}
+        elif resource_type == 'elb':
+            item = {'name': r['name'], **base, 'type': (attrs.get('type') or '').title(),
+                    'scheme': attrs.get('scheme'), 'state': r['state']}
+        elif resource_type == 'vpc':
+            item = {'id': r['resource_id'], 'name': r['name'], **base, 'cidr': attrs.get('cidr'),
+                    'subnets': attrs.get('subnets'), 'nat_gateways': attrs.get('nat_gateways')}
+        elif resource_type == 'ebs':
+            item = {'id': r['resource_id'], **base, 'type': attrs.get('volume_type'),
+                    'size_gb': attrs.get('size_gb'), 'iops': attrs.get('iops'), 'state': r['state'],
+                    'attached_to': attrs.get('attached_to'), 'encrypted': attrs.get('encrypted'),
+                    'unused': is_unused(r)}
+        elif resource_type == 'eip':
+            item = {'ip': attrs.get('public_ip'), **base, 'associated': r['state'] == 'associated',
+                    'instance': attrs.get('instance_id'), 'unused': is_unused(r)}
+        elif resource_type == 'cloudfront':
+            item = {'id': r['resource_id'], 'domain': attrs.get('domain_name'), **base,
+                    'status': r['state'], 'origins': attrs.get('origins'),
+                    'price_class': attrs.get('price_class'), 'ssl': attrs.get('https_only')}
+        elif resource_type == 'route53':
+            item = {'name': r['name'], **base, 'type': 'Private' if attrs.get('private') else 'Public',
+                    'records': attrs.get('record_count')}
+        else:
+            continue
+        
+        view[RESOURCE_TYPES[resource_type][0]].append(item)
+    
+    return view
+
+
+def build_inventory_analytics(records: List[Dict], required_tags: Optional[List[str]] = None) -> Dict:
+    """
+    Summary analytics for a snapshot (same shape as the dashboard's analytics dict)
+    
+    Args:
+        records: Resource records from InventoryStore.load_resources
+        required_tags: Tag keys a resource must carry to count as tagged
+    
+    Returns:
+        Analytics dict
+    """
+    required_tags = required_tags if required_tags is not None else AppConfig.INVENTORY_REQUIRED_TAGS
+    
+    by_type: Dict[str, int] = {}
+    by_region: Dict[str, int] = {}
+    by_environment: Dict[str, int] = {}
+    unused = tagged = encrypted = encryptable = 0
+    total_cost = unused_cost = 0.0
+    
+    for r in records:
+        label = RESOURCE_TYPES.get(r['resource_type'], (None, r['resource_type']))[1]
+        by_type[label] = by_type.get(label, 0) + 1
+        by_region[r['region']] = by_region.get(r['region'], 0) + 1
+        environment = r['tags'].get('Environment', 'Untagged')
+        by_environment[environment] = by_environment.get(environment, 0) + 1
+        
+        cost = r['cost_month'] or 0
+        total_cost += cost
+        if is_unused(r):
+            unused += 1
+            unused_cost += cost
+        if all(tag in r['tags'] for tag in required_tags):
+            tagged += 1
+        if r['attributes'].get('encrypted') is not None:
+            encryptable += 1
+            encrypted += 1 if r['attributes']['encrypted'] else 0
+    
+    total = len(records)
+    tag_compliance = round(100 * tagged / total) if total else 100
+    
+    return {
+        'total_resources': total,
+        'active_resources': total - unused,
+        'unused_resources': unused,
+        'total_cost_month': round(total_cost, 2),
+        'unused_cost_month': round(unused_cost, 2),
+        'compliance_score': tag_compliance,
+        'security_score': round(100 * encrypted / encryptable) if encryptable else 100,
+        'tag_compliance': tag_compliance,
+        'by_type': by_type,
+        'by_region': by_region,
+        'by_environment': by_environment
+    }
+
+
+def submit_inventory_collection(account_mgr, accounts: Optional[List] = None,
+                                regions: Optional[List[str]] = None, mode: str = 'full') -> str:
+    """
+    Queue a background inventory collection
+    
+    Args:
+        account_mgr: AWSAccountManager (resolved on the calling Streamlit thread)
+        accounts: AWSAccountConfig list (default: all active configured accounts)
+        regions: Regions to scan (default: each account's own regions)
+        mode: 'full' or 'tagging' (see InventoryCollector.collect)
+    
+    Returns:
+        Task ID
+    """
+    from queue_service import get_task_queue, TaskPriority
+    
+    store = get_inventory_store()
+    collector = InventoryCollector(account_mgr, store)
+    queue = get_task_queue()
+    task_id_holder = {}
+    
+    def progress(completed: int, total: int):
+        task = queue.get_task(task_id_holder.get('id'))
+        if task:
+            task.progress = int(100 * completed / max(total, 1))
+    
+    task_id_holder['id'] = queue.submit_task(
+        task_type='inventory',
+        task_name='Discover resources (Tagging API)' if mode == 'tagging' else 'Collect resource inventory',
+        function=collector.collect,
+        kwargs={'accounts': accounts, 'regions': regions, 'progress': progress, 'mode': mode},
+        priority=TaskPriority.NORMAL,
+        metadata={'regions': regions, 'mode': mode}
+    )
+    return task_id_holder['id']
+
+
+def submit_inventory_refresh(account_mgr, accounts: Optional[List] = None,
+                             regions: Optional[List[str]] = None) -> str:
+    """
+    Queue a background incremental refresh of the latest snapshot
+    
+    Args:
+        account_mgr: AWSAccountManager (resolved on the calling Streamlit thread)
+        accounts: AWSAccountConfig list (default: all active configured accounts)
+        regions: Regions to refresh (default: each account's own regions)
+    
+    Returns:
+        Task ID
+    """
+    from queue_service import get_task_queue, TaskPriority
+    
+    refresher = InventoryRefresher(account_mgr, get_inventory_store())
+    queue = get_task_queue()
+    task_id_holder = {}
+    
+    def progress(completed: int, total: int):
+        task = queue.get_task(task_id_holder.get('id'))
+        if task:
+            task.progress = int(100 * completed / max(total, 1))
+    
+    task_id_holder['id'] = queue.submit_task(
+        task_type='inventory',
+        task_name='Refresh resource inventory (incremental)',
+        function=refresher.refresh,
+        kwargs={'accounts': accounts, 'regions': regions, 'progress': progress},
+        priority=TaskPriority.NORMAL,
+        metadata={'regions': regions}
+    )
+    return task_id_holder['id']
+
+
+@st.cache_resource
+def get_inventory_store() -> InventoryStore:
+    """Get cached inventory store instance"""
+    return InventoryStore()
@@ -0,0 +1,261 @@
+"""
+Inventory Table - Columnar In-Memory Resource Inventory
+Categorical pandas columns and vectorized filters, built once per snapshot and shared across sessions
+"""
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import json
+
+
+# Low-cardinality columns stored as pandas categoricals (filters compare integer codes)
+CATEGORICAL_COLUMNS = ('resource_type', 'account_id', 'account_name', 'region', 'state')
+TABLE_COLUMNS = ('resource_key', 'resource_type', 'resource_id', 'name', 'account_id',
+                 'account_name', 'region', 'state', 'cost_month', 'arn')
+
+# Separates key and value in the tag pair categorical
+TAG_PAIR_SEPARATOR = '\x1f'
+
+
+class InventoryTable:
+    """
+    Read-only columnar view of an inventory snapshot
+    
+    Resource columns live in one DataFrame with categorical dtypes; tags are
+    kept in long form (row, key, key/value pair) as integer-coded numpy
+    arrays, so every filter is a handful of array comparisons regardless of
+    row count. Instances are shared across sessions and must not be mutated.
+    """
+    
+    def __init__(self, frame: pd.DataFrame, tag_rows: np.ndarray, tag_keys: pd.Categorical,
+                 tag_pairs: pd.Categorical):
+        """
+        Initialize table (use from_records / from_frame)
+        
+        Args:
+            frame: One row per resource, columns TABLE_COLUMNS
+            tag_rows: Row position of each tag entry
+            tag_keys: Tag key of each entry
+            tag_pairs: 'key<sep>value' of each entry
+        """
+        self.frame = frame
+        self._tag_rows = tag_rows
+        self._tag_keys = tag_keys
+        self._tag_pairs = tag_pairs
+        self._cost = frame['cost_month'].to_numpy(dtype=np.float32)
+        self._search_text = (frame['name'] + ' ' + frame['resource_id']).str.lower()
+    
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, tags: Sequence[Dict[str, str]]) -> 'InventoryTable':
+        """
+        Build a table from resource columns and each row's tag dict
+        
+        Args:
+            frame: DataFrame with TABLE_COLUMNS (extra columns are dropped)
+            tags: Tag dict per row, aligned with frame
+        """
+        frame = frame.reindex(columns=list(TABLE_COLUMNS)).reset_index(drop=True)
+        for column in CATEGORICAL_COLUMNS:
+            frame[column] = frame[column].fillna('unknown').astype(str).astype('category')
+        frame['cost_month'] = pd.to_numeric(frame['cost_month'], errors='coerce').fillna(0).astype(np.float32)
+        for column in ('resource_key', 'resource_id', 'name', 'arn'):
+            frame[column] = frame[column].fillna('').astype(str)
+        
+        rows, keys, pairs = [], [], []
+        for row, row_tags in enumerate(tags):
+            for key, value in (row_tags or {}).items():
+                rows.append(row)
+                keys.append(key)
+                pairs.append(f"{key}{TAG_PAIR_SEPARATOR}{value}")
+        
+        return cls(
+            frame,
+            np.asarray(rows, dtype=np.int32),
+            pd.Categorical(keys),
+            pd.Categorical(pairs)
+        )
+    
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> 'InventoryTable':
+        """Build a table from InventoryStore resource records"""
+        frame = pd.DataFrame.from_records(records, columns=list(TABLE_COLUMNS)) if records else pd.DataFrame(columns=list(TABLE_COLUMNS))
+        return cls.from_frame(frame, [r.get('tags') or {} for r in records])
+    
+    def __len__(self) -> int:
+        return len(self.frame)
+    
+    def options(self, column: str) -> List[str]:
+        """Distinct values of a categorical column"""
+        return sorted(self.frame[column].cat.categories.tolist())
+    
+    def tag_entries(self) -> Tuple[np.ndarray, pd.Categorical, pd.Categorical]:
+        """Long-form tags: (row position, key, key/value pair) per entry"""
+        return self._tag_rows, self._tag_keys, self._tag_pairs
+    
+    def tag_keys(self) -> List[str]:
+        return sorted(self._tag_keys.categories.tolist())
+    
+    def max_cost(self) -> float:
+        return float(self._cost.max()) if len(self._cost) else 0.0
+    
+    def _isin(self, column: str, values: Optional[Iterable[str]]) -> Optional[np.ndarray]:
+        if not values:
+            return None
+        categorical = self.frame[column].cat
+        wanted = [categorical.categories.get_loc(v) for v in values if v in categorical.categories]
+        return np.isin(categorical.codes.to_numpy(), np.asarray(wanted, dtype=np.int64))
+    
+    def _tag_mask(self, key: str, value: Optional[str]) -> np.ndarray:
+        """Rows carrying a tag key (any value) or an exact key/value pair"""
+        mask = np.zeros(len(self.frame), dtype=bool)
+        if value is None:
+            categories, codes, wanted = self._tag_keys.categories, self._tag_keys.codes, key
+        else:
+            categories, codes, wanted = self._tag_pairs.categories, self._tag_pairs.codes, f"{key}{TAG_PAIR_SEPARATOR}{value}"
+        
+        if wanted in categories:
+            mask[self._tag_rows[codes == categories.get_loc(wanted)]] = True
+        return mask
+    
+    def filter(
+        self,
+        resource_types: Optional[Iterable[str]] = None,
+        accounts: Optional[Iterable[str]] = None,
+        regions: Optional[Iterable[str]] = None,
+        states: Optional[Iterable[str]] = None,
+        tags: Optional[Iterable[Tuple[str, Optional[str]]]] = None,
+        missing_tags: Optional[Iterable[str]] = None,
+        min_cost: Optional[float] = None,
+        max_cost: Optional[float] = None,
+        contains: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Evaluate filters (AND-ed; empty = no constraint) as one boolean mask
+        
+        Args:
+            resource_types / accounts / regions / states: Allowed values (account = account_name)
+            tags: (key, value) pairs the resource must carry; value None matches any value
+            missing_tags: Tag keys the resource must NOT carry
+            min_cost / max_cost: Monthly cost range (inclusive)
+            contains: Case-insensitive substring of the name or resource ID
+        
+        Returns:
+            Boolean numpy mask over table rows
+        """
+        mask = np.ones(len(self.frame), dtype=bool)
+        
+        for column, values in (('resource_type', resource_types), ('account_name', accounts),
+                               ('region', regions), ('state', states)):
+            column_mask = self._isin(column, values)
+            if column_mask is not None:
+                mask &= column_mask
+        
+        for key, value in tags or []:
+            mask &= self._tag_mask(key, value)
+        
+        for key in missing_tags or []:
+            mask &= ~self._tag_mask(key, None)
+        
+        if min_cost is not None:
+            mask &= self._cost >= min_cost
+        if max_cost is not None:
+            mask &= self._cost <= max_cost
+        
+        # Substring matching is the only per-string test, so it runs last on the surviving rows
+        if contains:
+            positions = np.flatnonzero(mask)
+            hits = self._search_text.iloc[positions].str.contains(contains.lower(), regex=False).to_numpy()
+            mask[positions[~hits]] = False
+        
+        return mask
+    
+    def select(self, mask: np.ndarray, limit: Optional[int] = None, offset: int = 0) -> pd.DataFrame:
+        """Rows matching a mask (optionally one page of them)"""
+        positions = np.flatnonzero(mask)
+        if limit is not None:
+            positions = positions[offset:offset + limit]
+        return self.frame.iloc[positions]
+    
+    def tags_for(self, positions: Sequence[int]) -> List[Dict[str, str]]:
+        """Tag dicts for a (small) set of row positions, e.g. one result page"""
+        wanted = np.asarray(positions, dtype=np.int32)
+        index = {row: i for i, row in enumerate(wanted.tolist())}
+        result: List[Dict[str, str]] = [{} for _ in range(len(wanted))]
+        
+        entries = np.flatnonzero(np.isin(self._tag_rows, wanted))
+        pairs = self._tag_pairs.categories
+        for entry in entries:
+            key, _, value = pairs[self._tag_pairs.codes[entry]].partition(TAG_PAIR_SEPARATOR)
+            result[index[int(self._tag_rows[entry])]][key] = value
+        return result
+
+
+def parse_tag_filter(text: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Parse 'Key=Value, OtherKey' into [(key, value), (key, None)]
+    
+    Args:
+        text: Comma-separated Key=Value or Key terms
+    """
+    filters = []
+    for term in (text or '').split(','):
+        term = term.strip()
+        if not term:
+            continue
+        key, sep, value = term.partition('=')
+        filters.append((key.strip(), value.strip() if sep else None))
+    return filters
+
+
+def records_from_view(view: Dict[str, List[Dict]]) -> List[Dict]:
+    """
+    Convert a legacy inventory dict (e.g. the demo data) into resource records
+    
+    Args:
+        view: Dict keyed by ec2_instances, rds_databases, ... as built by build_inventory_view
+    """
+    from inventory_service import RESOURCE_TYPES, make_resource_key
+    
+    key_to_type = {key: resource_type for resource_type, (key, _) in RESOURCE_TYPES.items()}
+    records = []
+    for key, items in view.items():
+        resource_type = key_to_type.get(key, key)
+        for item in items:
+            resource_id = str(item.get('id') or item.get('name') or item.get('ip') or '')
+            tags = item.get('tags') or {}
+            if isinstance(tags, str):
+                tags = dict(pair.split(':', 1) for pair in tags.split(',') if ':' in pair)
+            region = item.get('region') or 'global'
+            records.append({
+                'resource_key': make_resource_key(item.get('account', ''), region, resource_type, resource_id),
+                'resource_type': resource_type,
+                'resource_id': resource_id,
+                'name': item.get('name') or item.get('domain') or resource_id,
+                'account_id': item.get('account', ''),
+                'account_name': item.get('account', ''),
+                'region': region,
+                'state': item.get('state') or item.get('status') or 'available',
+                'cost_month': item.get('cost_month', 0),
+                'arn': item.get('arn'),
+                'tags': tags,
+                'attributes': {}
+            })
+    return records
+
+
+@st.cache_resource(max_entries=2, show_spinner="Building inventory table...")
+def get_inventory_table(snapshot_id: str, revision: int) -> InventoryTable:
+    """
+    Get the shared columnar table for one snapshot revision
+    
+    Reads only the table columns from SQLite (attributes stay on disk), so a
+    table costs one pass over the snapshot per revision, process-wide.
+    """
+    from inventory_service import get_inventory_store
+    
+    store = get_inventory_store()
+    frame = store.read_frame(snapshot_id, list(TABLE_COLUMNS) + ['tags'])
+    tags = [json.loads(raw) if raw else {} for raw in frame.pop('tags')]
+    return InventoryTable.from_frame(frame, tags)
@@ -43,6 +43,7 @@ class AdminPanelModule:
             "🎭 Roles", 
             "📊 Analytics", 
             "📜 Audit Logs",
+            "⚡ AWS API Usage",
             "⚙️ Settings"
         ])
         
@@ -62,8 +63,12 @@ class AdminPanelModule:
         with tabs[3]:
             AdminPanelModule._render_audit_logs(db_manager)
         
-        # Tab 5: Settings
+        # Tab 5: AWS API usage
         with tabs[4]:
+            AdminPanelModule._render_aws_api_usage()
+        
+        # Tab 6: Settings
+        with tabs[5]:
             AdminPanelModule._render_settings(db_manager, current_user)
     
     @staticmethod
@@ -378,6 +383,95 @@ class AdminPanelModule:
         except Exception as e:
             st.error(f"Failed to load audit logs: {str(e)}")
     
+    @staticmethod
+    def _render_aws_api_usage():
+        """Render AWS API throttling, client pool and credential cache metrics"""
+        from core_throttle_governor import get_throttle_governor
+        from core_client_pool import get_client_pool
+        
+        st.markdown("### ⚡ AWS API Usage")
+        st.caption("Process-wide counters since the app server started")
+        
+        metrics = get_throttle_governor().get_metrics()
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("API Calls", f"{metrics['calls']:,}")
+        with col2:
+            st.metric("Throttle Responses", f"{metrics['throttles']:,}")
+        with col3:
+            st.metric("Time Spent Waiting", f"{metrics['wait_seconds']:.1f}s")
+        with col4:
+            st.metric(
+                "Retry Budget Left",
+                metrics['retry_budget_remaining'],
+                delta=f"{metrics['budget_denials']} denied" if metrics['budget_denials'] else None,
+                delta_color="inverse"
+            )
+        
+        rows = get_throttle_governor().get_bucket_rows()
+        if rows:
+            st.markdown("#### 🪣 Busiest APIs (per account / region)")
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        else:
+            st.info("No AWS API calls made yet")
+        
+        st.markdown("---")
+        
+        pool_stats = get_client_pool().get_stats()
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Pooled Clients", pool_stats['clients'])
+        with col2:
+            total = pool_stats['hits'] + pool_stats['misses']
+            hit_rate = (pool_stats['hits'] / total * 100) if total else 0
+            st.metric("Client Reuse", f"{hit_rate:.0f}%")
+        with col3:
+            st.metric("Credential Rotations", pool_stats['rotations'])
+        
+        st.markdown("---")
+        AdminPanelModule._render_cost_explorer_budget()
+    
+    @staticmethod
+    def _render_cost_explorer_budget():
+        """Render today's Cost Explorer request budget and recent usage"""
+        from aws_cost_explorer import get_cost_explorer_governor, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+        
+        governor = get_cost_explorer_governor()
+        today = governor.today()
+        
+        st.markdown("#### 💲 Cost Explorer Budget")
+        st.caption(
+            f"{governor.daily_budget} paid requests per UTC day (${governor.daily_budget * 0.01:.2f}); "
+            f"background refreshes stop {governor.interactive_reserve} short, keeping the rest for interactive pages. "
+            "Refused requests are answered from cached data."
+        )
+        
+        by_priority = today['by_priority']
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Used Today", f"{today['used']:,} / {today['budget']:,}")
+        with col2:
+            st.metric("Interactive", by_priority.get(PRIORITY_INTERACTIVE, {}).get('requests', 0))
+        with col3:
+            st.metric("Background", by_priority.get(PRIORITY_BACKGROUND, {}).get('requests', 0))
+        with col4:
+            st.metric(
+                "Remaining",
+                today['remaining'],
+                delta=f"{today['denied']} denied" if today['denied'] else None,
+                delta_color="inverse"
+            )
+        st.progress(min(today['used'] / today['budget'], 1.0) if today['budget'] else 1.0)
+        
+        usage = pd.DataFrame(governor.usage(days=14), columns=['Day', 'Priority', 'Requests', 'Denied'])
+        if usage.empty:
+            st.info("No Cost Explorer requests in the last 14 days")
+        else:
+            daily = usage.pivot_table(index='Day', columns='Priority', values='Requests', aggfunc='sum', fill_value=0)
+            st.bar_chart(daily)
+            st.dataframe(usage, use_container_width=True, hide_index=True)
+    
     @staticmethod
     def _render_settings(db_manager, current_user):
         """Render platform settings"""
@@ -5,10 +5,10 @@ Enterprise multi-account cloud management dashboard
 
 import streamlit as st
 import pandas as pd
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from config_settings import AppConfig
-from core_account_manager import get_account_manager
+from core_account_manager import get_account_manager, AccountFanOutExecutor, render_fanout_errors
 from core_session_manager import SessionManager
 from utils_helpers import Helpers
 from auth_azure_sso import require_permission
@@ -116,37 +116,57 @@ class DashboardModule:
             )
         
         with col2:
-            # Count total resources across accounts
+            # Count total resources across all accounts and regions in parallel,
+            # updating the card as each (account, region) call completes
+            metric_slot = st.empty()
             total_resources = 0
-            for acc in active_accounts[:3]:  # Sample first 3 for performance
-                try:
-                    session = account_mgr.assume_role(
-                        acc.account_id,
-                        acc.account_name,
-                        acc.role_arn
+            
+            def count_instances(session, target):
+                from aws_ec2 import EC2Service
+                result = EC2Service(session, target.region).list_instances()
+                if not result.get('success'):
+                    raise RuntimeError(result.get('error'))
+                return result.get('count', 0)
+            
+            def on_result(result, completed, total):
+                nonlocal total_resources
+                if result.success:
+                    total_resources += result.result
+                with metric_slot.container():
+                    render_light_metric_FIXED(
+                        label=f"Total Resources ({completed}/{total})",
+                        value=Helpers.format_number(total_resources),
+                        icon="📦"
                     )
-                    if session:
-                        from aws_ec2 import EC2Service
-                        ec2 = EC2Service(session.session, acc.regions[0])
-                        result = ec2.list_instances()
-                        total_resources += result.get('count', 0)
-                except:
-                    pass
             
-            render_light_metric_FIXED(
-                label="Total Resources",
-                value=Helpers.format_number(total_resources) if total_resources > 0 else "N/A",
-                icon="📦"
+            report = AccountFanOutExecutor(account_mgr).run(
+                count_instances, accounts=active_accounts, on_result=on_result
             )
+            
+            with metric_slot.container():
+                render_light_metric_FIXED(
+                    label="Total Resources",
+                    value=Helpers.format_number(total_resources) if total_resources > 0 else "N/A",
+                    icon="📦"
+                )
+            render_fanout_errors(report, "resource counts failed")
         
         with col3:
-            # Estimated monthly cost
-            estimated_cost = total_resources * 73  # $73/month per t3.micro
-            render_light_metric_FIXED(
-                label="Est. Monthly Cost",
-                value=Helpers.format_currency(estimated_cost),
-                icon="💰"
-            )
+            account_costs = DashboardModule._warehouse_account_costs(active_accounts)
+            if account_costs is not None:
+                render_light_metric_FIXED(
+                    label="Cost (Last 30 Days)",
+                    value=Helpers.format_currency(account_costs['cost'].sum()),
+                    icon="💰"
+                )
+            else:
+                # Estimated monthly cost
+                estimated_cost = total_resources * 73  # $73/month per t3.micro
+                render_light_metric_FIXED(
+                    label="Est. Monthly Cost",
+                    value=Helpers.format_currency(estimated_cost),
+                    icon="💰"
+                )
         
         with col4:
             # Compliance score (placeholder)
@@ -156,10 +176,32 @@ class DashboardModule:
                 icon="🛡️"
             )
     
+    @staticmethod
+    def _warehouse_account_costs(active_accounts) -> Optional[pd.DataFrame]:
+        """Last 30 days of cost per account from the local cost warehouse, None before the first sync"""
+        if st.session_state.get('mode', 'Live') == 'Demo':
+            return None
+        
+        from cost_warehouse import get_cost_warehouse, utc_today
+        warehouse = get_cost_warehouse()
+        if not warehouse.has_data():
+            return None
+        
+        end = utc_today() + timedelta(days=1)
+        return warehouse.cost_by_account(end - timedelta(days=30), end, [acc.account_id for acc in active_accounts])
+    
     @staticmethod
     def _render_cost_by_account(active_accounts):
         """Render cost distribution by account"""
         
+        account_costs = DashboardModule._warehouse_account_costs(active_accounts)
+        if account_costs is not None:
+            st.markdown("### 💰 Cost by Account (Last 30 Days)")
+            df = account_costs.rename(columns={'account_name': 'Account', 'cost': 'Cost'})
+            st.bar_chart(df.set_index('Account')['Cost'])
+            st.caption(f"**Total:** {Helpers.format_currency(df['Cost'].sum())} | from the local cost warehouse")
+            return
+        
         st.markdown("### 💰 Cost by Account (Estimated)")
         
         # Generate sample data based on account names
@@ -216,22 +258,32 @@ class DashboardModule:
         
         st.markdown("### 🏢 Account Status")
         
+        # Test all connections in parallel (one call per account)
+        def check_identity(session, target):
+            return session.client('sts').get_caller_identity()['Account']
+        
+        report = AccountFanOutExecutor(account_mgr).run(
+            check_identity, accounts=active_accounts, primary_region_only=True
+        )
+        status_by_account = {r.target.account_id: r for r in report.results}
+        
         table_data = []
         
         for acc in active_accounts:
-            # Test connection
-            success, error = account_mgr.test_account_connection(
-                acc.account_id,
-                acc.account_name,
-                acc.role_arn
-            )
+            result = status_by_account.get(acc.account_id)
+            if result and result.success:
+                status = '✅ Connected'
+            elif result and result.stage == 'timeout':
+                status = '⏱️ Timeout'
+            else:
+                status = '❌ Error'
             
             table_data.append({
                 'Account Name': acc.account_name,
                 'Account ID': acc.account_id,
                 'Environment': acc.environment.upper(),
                 'Regions': ', '.join(acc.regions),
-                'Status': '✅ Connected' if success else '❌ Error',
+                'Status': status,
                 'Cost Center': acc.cost_center or 'N/A'
             })
         
@@ -240,6 +292,8 @@ class DashboardModule:
             st.dataframe(df, use_container_width=True, hide_index=True)
         else:
             st.info("No accounts to display")
+        
+        render_fanout_errors(report, "account connections failed")
     
     @staticmethod
     def _render_recent_resources(account_mgr, active_accounts):
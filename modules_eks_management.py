@@ -6,13 +6,14 @@ Complements CI/CD pipelines with operational excellence
 
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta
-from typing import Dict, List
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
 from config_settings import AppConfig
 from core_account_manager import get_account_manager
 from core_session_manager import SessionManager
 from utils_helpers import Helpers
 import json
+import threading
 
 class EKSManagementModule:
     """AI-Enhanced EKS Operations Intelligence Center"""
@@ -67,6 +68,280 @@ class EKSManagementModule:
         st.markdown("## 🎯 Real-Time Operations Dashboard")
         st.info("📊 Live monitoring across all EKS clusters with AI-powered insights")
         
+        fleet = EKSManagementModule._load_clusters(account_mgr)
+        if fleet is None:
+            EKSManagementModule._render_demo_cluster_health()
+            EKSManagementModule._render_demo_operations_insights()
+        else:
+            EKSManagementModule._render_cluster_health(fleet)
+            EKSManagementModule._render_fleet_issues(fleet)
+    
+    @staticmethod
+    def _render_fleet_issues(fleet: Dict):
+        """Render the health issues found on live clusters, worst clusters first"""
+        st.markdown("---")
+        st.markdown("### 🚨 Detected Issues")
+        
+        issues = [
+            {
+                'Cluster': c['cluster_name'],
+                'Account': c['account_name'],
+                'Region': c['region'],
+                'Health': c['health']['status'],
+                'Issue': issue
+            }
+            for c in fleet['clusters'] for issue in c['health']['issues']
+        ]
+        if issues:
+            st.dataframe(pd.DataFrame(issues), use_container_width=True, hide_index=True)
+        else:
+            st.success("No issues reported by EKS for clusters, nodegroups or addons")
+        st.caption("Kubernetes events and pod status are not collected from the AWS APIs; use kubectl or Container Insights for them.")
+    
+    @staticmethod
+    def _render_demo_operations_insights():
+        """Render sample AI insights, events and pod status (Demo mode)"""
+        # AI Insights section
+        st.markdown("---")
+        st.markdown("### 🤖 AI-Powered Insights")
+        
+        col1, col2 = st.columns([2, 1])
+        
+        with col1:
+            st.markdown("""
+            **Critical Issues Detected:**
+            - 🔴 **dev-eks-us-west-2**: 2 nodes down, causing pod scheduling failures
+            - ⚠️ **staging-eks-us-east-1**: High resource usage (>90%), recommend scaling
+            - ⚠️ **prod-eks-us-east-1**: Version 1.28 support ends in 60 days, plan upgrade
+            
+            **Optimization Opportunities:**
+            - 💰 Moving to Graviton2 instances could save **$1,240/month**
+            - 📦 12 pods using deprecated APIs, need migration before K8s 1.29
+            - 🔒 3 clusters have unrestricted security groups, security risk
+            
+            **Proactive Recommendations:**
+            - 📈 Enable Cluster Autoscaler on staging cluster (89% CPU usage)
+            - 🛡️ Deploy Pod Security Standards on all production clusters
+            - 💾 Configure automated EBS snapshot backups for stateful workloads
+            """)
+        
+        with col2:
+            st.markdown("**Quick Actions:**")
+            
+            if st.button("⚡ Fix Critical Issues", key="dash_fix_critical", type="primary", use_container_width=True):
+                st.success("Initiating automated remediation...")
+            
+            if st.button("🔍 Deep Dive Analysis", key="dash_deep_dive", use_container_width=True):
+                st.info("Generating comprehensive analysis...")
+            
+            if st.button("📊 Generate Report", key="dash_gen_report", use_container_width=True):
+                st.info("Creating operations report...")
+            
+            if st.button("🔔 Configure Alerts", key="dash_config_alerts", use_container_width=True):
+                st.info("Opening alert configuration...")
+        
+        # Recent events
+        st.markdown("---")
+        st.markdown("### 📋 Recent Events & Incidents")
+        
+        events = [
+            {
+                'Time': '5 min ago',
+                'Cluster': 'dev-eks-us-west-2',
+                'Severity': '🔴 Critical',
+                'Event': 'Node i-abc123 became NotReady',
+                'Impact': '5 pods evicted',
+                'Status': 'Auto-remediation in progress'
+            },
+            {
+                'Time': '15 min ago',
+                'Cluster': 'staging-eks-us-east-1',
+                'Severity': '⚠️ Warning',
+                'Event': 'High memory usage detected',
+                'Impact': 'Performance degradation',
+                'Status': 'Monitoring'
+            },
+            {
+                'Time': '1 hour ago',
+                'Cluster': 'prod-eks-us-east-1',
+                'Severity': '✅ Info',
+                'Event': 'Successful deployment: api-v2.1.0',
+                'Impact': 'None',
+                'Status': 'Completed'
+            },
+            {
+                'Time': '2 hours ago',
+                'Cluster': 'prod-eks-eu-west-1',
+                'Severity': '⚠️ Warning',
+                'Event': 'Pod CrashLoopBackOff: auth-service',
+                'Impact': '1 pod affected',
+                'Status': 'Resolved - auto-restarted'
+            }
+        ]
+        
+        events_df = pd.DataFrame(events)
+        st.dataframe(events_df, use_container_width=True, hide_index=True)
+        
+        # Live pod status
+        st.markdown("---")
+        st.markdown("### 🔴 Live Pod Status Across Clusters")
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Running Pods", "789", delta="↑ 23")
+        with col2:
+            st.metric("Pending Pods", "12", delta="↓ 5", delta_color="inverse")
+        with col3:
+            st.metric("Failed Pods", "3", delta="↓ 8", delta_color="inverse")
+        with col4:
+            st.metric("CrashLoopBackOff", "2", delta="↓ 1", delta_color="inverse")
+    
+    @staticmethod
+    def _load_clusters(account_mgr) -> Optional[Dict]:
+        """
+        EKS clusters of every active account and region, kept for the session until refreshed
+        
+        Returns:
+            Dict with clusters (each with account, region and health), fan-out report,
+            per-call describe failures and collection time; None in Demo mode
+        """
+        if st.session_state.get('mode', 'Live') == 'Demo':
+            return None
+        
+        refresh = st.button("🔄 Refresh Clusters", key="eks_refresh_clusters")
+        fleet = st.session_state.get('eks_fleet')
+        if fleet is not None and not refresh:
+            return fleet
+        
+        from aws_eks import EKSService, assess_cluster_health, get_eks_cluster_cache
+        from core_account_manager import AccountFanOutExecutor
+        
+        # Resolved on the script thread; workers only receive the cache object
+        cluster_cache = get_eks_cluster_cache()
+        
+        # Standard-support versions are the same everywhere: the first target with clusters looks them up
+        versions: Dict[str, List[str]] = {}
+        versions_lock = threading.Lock()
+        
+        def collect(session, target):
+            service = EKSService(session, target.region, cluster_cache=cluster_cache)
+            result = service.list_clusters()
+            if not result.get('success'):
+                raise RuntimeError(result.get('error'))
+            if result['clusters']:
+                with versions_lock:
+                    if 'supported' not in versions:
+                        versions['supported'] = service.get_available_kubernetes_versions()
+            return target, result
+        
+        with st.spinner("Describing EKS clusters across accounts and regions..."):
+            report = AccountFanOutExecutor(account_mgr).run(collect)
+        
+        clusters, failures = [], []
+        for target, result in report.values():
+            for cluster in result['clusters']:
+                clusters.append({
+                    **cluster,
+                    'account_id': target.account_id,
+                    'account_name': target.account_name,
+                    'region': target.region,
+                    'health': assess_cluster_health(cluster, versions.get('supported')),
+                    'cost': EKSService.estimate_monthly_cost(cluster['nodegroups'])
+                })
+            for failure in result.get('failures', []):
+                failures.append({
+                    'Account': target.account_name,
+                    'Region': target.region,
+                    'Call': failure['item'],
+                    'Error': failure['error']
+                })
+        
+        clusters.sort(key=lambda c: (c['health']['score'], c['account_name'], c['region'], c['cluster_name']))
+        fleet = {
+            'clusters': clusters,
+            'report': report,
+            'failures': failures,
+            'collected_at': datetime.now()
+        }
+        st.session_state.eks_fleet = fleet
+        return fleet
+    
+    @staticmethod
+    def _render_cluster_health(fleet: Dict):
+        """Render fleet metrics and the cluster health table from live EKS data"""
+        from core_account_manager import render_fanout_errors
+        
+        clusters = fleet['clusters']
+        healthy = sum(1 for c in clusters if c['health']['status'] == '✅ Healthy')
+        total_nodes = sum(c['cost']['total_nodes'] for c in clusters)
+        total_issues = sum(c['health']['critical'] + c['health']['warnings'] for c in clusters)
+        monthly_cost = sum(c['cost']['total_monthly_cost'] for c in clusters)
+        
+        col1, col2, col3, col4, col5 = st.columns(5)
+        
+        with col1:
+            st.metric("Total Clusters", len(clusters))
+        
+        with col2:
+            st.metric(
+                "Healthy Clusters",
+                healthy,
+                delta=f"{healthy / len(clusters) * 100:.0f}%" if clusters else None,
+                delta_color="normal"
+            )
+        
+        with col3:
+            st.metric("Total Nodes", total_nodes)
+        
+        with col4:
+            st.metric("Active Issues", total_issues)
+        
+        with col5:
+            st.metric("Est. Monthly Cost", Helpers.format_currency(monthly_cost))
+        
+        st.caption(f"Collected {fleet['collected_at'].strftime('%Y-%m-%d %H:%M:%S')}")
+        render_fanout_errors(fleet['report'], "EKS account/region scans failed")
+        if fleet['failures']:
+            with st.expander(f"⚠️ {len(fleet['failures'])} cluster describe calls failed"):
+                st.dataframe(pd.DataFrame(fleet['failures']), use_container_width=True, hide_index=True)
+        
+        st.markdown("---")
+        st.markdown("### 🏥 Cluster Health Status")
+        
+        if not clusters:
+            st.info("No EKS clusters found in the configured accounts and regions")
+            return
+        
+        now = datetime.now(timezone.utc)
+        clusters_health = []
+        for cluster in clusters:
+            nodegroups = cluster['nodegroups']
+            created = cluster.get('created_at')
+            clusters_health.append({
+                'Cluster': cluster['cluster_name'],
+                'Account': cluster['account_name'],
+                'Region': cluster['region'],
+                'Status': cluster['health']['status'],
+                'Node Groups': len(nodegroups),
+                'Nodes': f"{sum(ng['desired_size'] for ng in nodegroups)}/{sum(ng['max_size'] for ng in nodegroups)}",
+                'Addons': len(cluster['addons']),
+                'Fargate Profiles': len(cluster['fargate_profiles']),
+                'Version': cluster['version'],
+                'Uptime': f"{(now - created).days} days" if isinstance(created, datetime) else 'N/A',
+                'Health Score': f"{cluster['health']['score']}%",
+                'Issues': '; '.join(cluster['health']['issues']) or '-'
+            })
+        
+        st.dataframe(
+            pd.DataFrame(clusters_health),
+            use_container_width=True,
+            hide_index=True
+        )
+    
+    @staticmethod
+    def _render_demo_cluster_health():
+        """Render fleet metrics and the cluster health table from demo data"""
         # Overall health metrics
         col1, col2, col3, col4, col5 = st.columns(5)
         
@@ -175,102 +450,6 @@ class EKSManagementModule:
             use_container_width=True,
             hide_index=True
         )
-        
-        # AI Insights section
-        st.markdown("---")
-        st.markdown("### 🤖 AI-Powered Insights")
-        
-        col1, col2 = st.columns([2, 1])
-        
-        with col1:
-            st.markdown("""
-            **Critical Issues Detected:**
-            - 🔴 **dev-eks-us-west-2**: 2 nodes down, causing pod scheduling failures
-            - ⚠️ **staging-eks-us-east-1**: High resource usage (>90%), recommend scaling
-            - ⚠️ **prod-eks-us-east-1**: Version 1.28 support ends in 60 days, plan upgrade
-            
-            **Optimization Opportunities:**
-            - 💰 Moving to Graviton2 instances could save **$1,240/month**
-            - 📦 12 pods using deprecated APIs, need migration before K8s 1.29
-            - 🔒 3 clusters have unrestricted security groups, security risk
-            
-            **Proactive Recommendations:**
-            - 📈 Enable Cluster Autoscaler on staging cluster (89% CPU usage)
-            - 🛡️ Deploy Pod Security Standards on all production clusters
-            - 💾 Configure automated EBS snapshot backups for stateful workloads
-            """)
-        
-        with col2:
-            st.markdown("**Quick Actions:**")
-            
-            if st.button("⚡ Fix Critical Issues", key="dash_fix_critical", type="primary", use_container_width=True):
-                st.success("Initiating automated remediation...")
-            
-            if st.button("🔍 Deep Dive Analysis", key="dash_deep_dive", use_container_width=True):
-                st.info("Generating comprehensive analysis...")
-            
-            if st.button("📊 Generate Report", key="dash_gen_report", use_container_width=True):
-                st.info("Creating operations report...")
-            
-            if st.button("🔔 Configure Alerts", key="dash_config_alerts", use_container_width=True):
-                st.info("Opening alert configuration...")
-        
-        # Recent events
-        st.markdown("---")
-        st.markdown("### 📋 Recent Events & Incidents")
-        
-        events = [
-            {
-                'Time': '5 min ago',
-                'Cluster': 'dev-eks-us-west-2',
-                'Severity': '🔴 Critical',
-                'Event': 'Node i-abc123 became NotReady',
-                'Impact': '5 pods evicted',
-                'Status': 'Auto-remediation in progress'
-            },
-            {
-                'Time': '15 min ago',
-                'Cluster': 'staging-eks-us-east-1',
-                'Severity': '⚠️ Warning',
-                'Event': 'High memory usage detected',
-                'Impact': 'Performance degradation',
-                'Status': 'Monitoring'
-            },
-            {
-                'Time': '1 hour ago',
-                'Cluster': 'prod-eks-us-east-1',
-                'Severity': '✅ Info',
-                'Event': 'Successful deployment: api-v2.1.0',
-                'Impact': 'None',
-                'Status': 'Completed'
-            },
-            {
-                'Time': '2 hours ago',
-                'Cluster': 'prod-eks-eu-west-1',
-                'Severity': '⚠️ Warning',
-                'Event': 'Pod CrashLoopBackOff: auth-service',
-                'Impact': '1 pod affected',
-                'Status': 'Resolved - auto-restarted'
-            }
-        ]
-        
-        events_df = pd.DataFrame(events)
-        st.dataframe(events_df, use_container_width=True, hide_index=True)
-        
-        # Live pod status
-        st.markdown("---")
-        st.markdown("### 🔴 Live Pod Status Across Clusters")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.metric("Running Pods", "789", delta="↑ 23")
-        with col2:
-            st.metric("Pending Pods", "12", delta="↓ 5", delta_color="inverse")
-        with col3:
-            st.metric("Failed Pods", "3", delta="↓ 8", delta_color="inverse")
-        with col4:
-            st.metric("CrashLoopBackOff", "2", delta="↓ 1", delta_color="inverse")
     
     @staticmethod
     def _render_ai_troubleshooting(account_mgr):
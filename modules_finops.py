@@ -19,12 +19,19 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 from config_settings import AppConfig
 from core_account_manager import get_account_manager
 from utils_helpers import Helpers
 from auth_azure_sso import require_permission
+from data_export import ExportSource, TABLE_FORMATS, export_frames, frame_source, render_export_controls
+from cost_anomaly import AnomalyResult, CostAnomalyDetector, CostSeries, format_drivers, get_cost_anomalies
+from cost_forecast import MODEL_HOLT_WINTERS, MODEL_LINEAR, CostForecast, CostForecaster, get_cost_forecast
+from cost_allocation import (RULE_ACCOUNT, RULE_DIRECT, RULE_LABELS, RULE_SHARED, RULE_UNALLOCATED, RULE_UNTAGGED,
+                             CostAllocator)
+from cost_query import TIME_FIELDS, CostQueryError, CostQuestionAnswerer
 import json
 import os
 import random
@@ -177,108 +184,194 @@ def get_anthropic_client():
 # COST ANOMALY DETECTION
 # ============================================================================
 
-@PerformanceOptimizer.cache_with_spinner(ttl=300, spinner_text="Loading cost anomalies...")
-def generate_cost_anomalies() -> List[Dict]:
-    """Generate cost anomaly data for detection and alerting"""
-    anomalies = [
-        {
-            'date': (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d'),
-            'service': 'EC2',
-            'account': 'Production',
-            'normal_cost': 450,
-            'actual_cost': 1250,
-            'deviation': '+178%',
-            'severity': 'Critical',
-            'cause': 'Unexpected auto-scaling spike',
-            'recommendation': 'Review scaling policies and set max instance limits',
-            'estimated_waste': '$800',
-            'status': 'Open'
-        },
-        {
-            'date': (datetime.now() - timedelta(days=2)).strftime('%Y-%m-%d'),
-            'service': 'Data Transfer',
-            'account': 'Production',
-            'normal_cost': 120,
-            'actual_cost': 580,
-            'deviation': '+383%',
-            'severity': 'Critical',
-            'cause': 'Cross-region data transfer spike',
-            'recommendation': 'Enable VPC endpoints and review data flow',
-            'estimated_waste': '$460',
-            'status': 'Investigating'
-        },
-        {
-            'date': (datetime.now() - timedelta(days=3)).strftime('%Y-%m-%d'),
-            'service': 'RDS',
-            'account': 'Staging',
-            'normal_cost': 280,
-            'actual_cost': 480,
-            'deviation': '+71%',
-            'severity': 'High',
-            'cause': 'Database instance left running overnight',
-            'recommendation': 'Implement auto-stop for non-production RDS',
-            'estimated_waste': '$200',
-            'status': 'Resolved'
-        },
-        {
-            'date': (datetime.now() - timedelta(days=5)).strftime('%Y-%m-%d'),
-            'service': 'S3',
-            'account': 'Development',
-            'normal_cost': 85,
-            'actual_cost': 165,
-            'deviation': '+94%',
-            'severity': 'Medium',
-            'cause': 'Increased PUT requests from testing',
-            'recommendation': 'Optimize test data upload patterns',
-            'estimated_waste': '$80',
-            'status': 'Resolved'
-        },
-        {
-            'date': (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d'),
-            'service': 'Lambda',
-            'account': 'Production',
-            'normal_cost': 45,
-            'actual_cost': 125,
-            'deviation': '+178%',
-            'severity': 'Medium',
-            'cause': 'Function timeout causing retries',
-            'recommendation': 'Optimize function code and increase timeout',
-            'estimated_waste': '$80',
-            'status': 'Fixed'
-        }
+def generate_demo_cost_facts(days: int = 90) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Demo daily cost in the cost warehouse layout, with weekly seasonality and a few injected spikes"""
+    rng = np.random.default_rng(7)
+    end = datetime.now().date()
+    dates = pd.date_range(end - timedelta(days=days), periods=days, freq='D')
+    labels = dates.strftime('%Y-%m-%d')
+    weekend = dates.dayofweek.to_numpy() >= 5
+    
+    accounts = [('111111111111', 'Production', 'production'), ('222222222222', 'Staging', 'staging'),
+                ('333333333333', 'Development', 'development'), ('444444444444', 'Shared Services', 'production')]
+    services = ['EC2', 'S3', 'RDS', 'Lambda', 'CloudFront', 'Data Transfer', 'DynamoDB', 'CloudWatch']
+    regions = ['us-east-1', 'us-west-2', 'eu-west-1']
+    teams = ['platform', 'payments', 'data', '']
+    # (account, service, region): (days ago, extra cost, team it is tagged to)
+    spikes = {
+        ('Production', 'EC2', 'us-east-1'): (1, 800, 'platform'),
+        ('Production', 'Data Transfer', 'eu-west-1'): (2, 460, 'data'),
+        ('Staging', 'RDS', 'us-west-2'): (3, 200, 'payments'),
+        ('Development', 'S3', 'us-east-1'): (5, 80, ''),
+        ('Production', 'Lambda', 'us-east-1'): (7, 80, 'payments')
+    }
+    
+    cost_frames, tag_frames = [], []
+    for account_id, account_name, environment in accounts:
+        for service in services:
+            team_shares = rng.dirichlet(np.ones(len(teams)))
+            for region in regions:
+                daily = rng.lognormal(3, 1) * rng.normal(1, 0.05, days).clip(0.8)
+                if environment != 'production':
+                    daily = np.where(weekend, daily * 0.5, daily)
+                extra = np.zeros(days)
+                spike = spikes.get((account_name, service, region))
+                if spike:
+                    extra[days - spike[0]] = spike[1]
+                
+                cost_frames.append(pd.DataFrame({
+                    'account_id': account_id, 'account_name': account_name, 'cost_date': labels,
+                    'service': service, 'region': region, 'cost_amount': daily + extra
+                }))
+                tagged = [('Environment', environment, daily + extra)] + [
+                    ('Team', team, daily * share + (extra if spike and spike[2] == team else 0))
+                    for team, share in zip(teams, team_shares)
+                ]
+                tag_frames.extend(
+                    pd.DataFrame({'account_id': account_id, 'cost_date': labels, 'tag_key': tag_key,
+                                  'tag_value': tag_value, 'service': service, 'cost_amount': amount})
+                    for tag_key, tag_value, amount in tagged
+                )
+    
+    return pd.concat(cost_frames, ignore_index=True), pd.concat(tag_frames, ignore_index=True)
+
+@PerformanceOptimizer.cache_with_spinner(ttl=300, spinner_text="Scoring cost anomalies...")
+def generate_demo_cost_anomalies() -> AnomalyResult:
+    """Anomalies over the demo cost series"""
+    days = AppConfig.ANOMALY_HISTORY_DAYS
+    cost_facts, tag_facts = generate_demo_cost_facts(days)
+    return CostAnomalyDetector().score(CostSeries.from_facts(cost_facts, tag_facts, datetime.now().date(), days))
+
+def load_cost_anomalies() -> Tuple[AnomalyResult, str]:
+    """
+    Anomalies over every account, service, region and tag cost series
+    
+    Live mode scores the local cost warehouse; Demo mode, or Live mode
+    before the first ingestion, scores demo series.
+    
+    Returns:
+        (AnomalyResult, source 'warehouse' or 'demo')
+    """
+    if st.session_state.get('mode', 'Live') != 'Demo':
+        from cost_warehouse import get_cost_warehouse, utc_today
+        warehouse = get_cost_warehouse()
+        if warehouse.has_data():
+            # Today is still accruing, so scoring ends with yesterday
+            return get_cost_anomalies(warehouse.coverage()['last_run'], utc_today()), 'warehouse'
+    return generate_demo_cost_anomalies(), 'demo'
+
+@PerformanceOptimizer.cache_with_spinner(ttl=300, spinner_text="Forecasting cost...")
+def generate_demo_cost_forecast() -> Tuple[CostForecast, pd.DataFrame]:
+    """Forecasts over the demo cost series, with the daily account/service facts they were fitted on"""
+    cost_facts, _ = generate_demo_cost_facts(AppConfig.ANOMALY_HISTORY_DAYS)
+    facts = cost_facts.groupby(['cost_date', 'account_id', 'account_name', 'service'], as_index=False)['cost_amount'].sum()
+    return CostForecaster().forecast_facts(facts, datetime.now().date()), facts
+
+@PerformanceOptimizer.cache_with_spinner(ttl=300, spinner_text="Allocating cost...")
+def generate_demo_cost_allocation() -> pd.DataFrame:
+    """Showback over demo per-resource cost lines, tags and shared NAT gateway/support cost"""
+    rng = np.random.default_rng(11)
+    cost_facts, _ = generate_demo_cost_facts(AppConfig.ALLOCATION_DAYS)
+    facts = cost_facts.groupby(['cost_date', 'account_id', 'service'], as_index=False)['cost_amount'].sum()
+    
+    # Each account/service series spread over a handful of resources, some without one
+    resources_per_series = 6
+    shares = rng.dirichlet(np.ones(resources_per_series + 1), len(facts))
+    lines = facts.loc[facts.index.repeat(resources_per_series + 1)].reset_index(drop=True)
+    slot = np.tile(np.arange(resources_per_series + 1), len(facts))
+    lines['cost_amount'] = lines['cost_amount'].to_numpy() * shares.ravel()
+    series_codes = pd.factorize(lines['account_id'] + '/' + lines['service'])[0]
+    lines['resource_id'] = np.where(
+        slot < resources_per_series,
+        pd.Series(series_codes * resources_per_series + slot).map('i-{:017x}'.format),
+        ''
+    )
+    
+    days = lines[['cost_date', 'account_id']].drop_duplicates()
+    shared = [
+        days.assign(service='VPC', resource_id=lambda d: 'arn:aws:ec2:us-east-1:' + d['account_id'] + ':natgateway/nat-0a1b2c3d4e5f6a7b8',
+                    cost_amount=rng.uniform(20, 40, len(days))),
+        days.assign(service='AWS Support (Business)', resource_id='', cost_amount=rng.uniform(30, 50, len(days)))
     ]
+    lines = pd.concat([lines] + shared, ignore_index=True).rename(columns={'cost_date': 'usage_date'})
     
-    return anomalies
+    # Most resources carry Team and CostCenter tags; the shared services account tags its own
+    resource_ids = lines.loc[lines['resource_id'].str.startswith('i-'), 'resource_id'].unique()
+    tagged = resource_ids[rng.random(len(resource_ids)) < 0.75]
+    teams = rng.choice(['platform', 'payments', 'data', 'web'], len(tagged))
+    cost_centers = np.where(np.isin(teams, ['platform', 'data']), 'CC-1000', 'CC-2000')
+    resource_tags = pd.concat([
+        pd.DataFrame({'resource_id': tagged, 'tag_key': 'Team', 'tag_value': teams}),
+        pd.DataFrame({'resource_id': tagged, 'tag_key': 'CostCenter', 'tag_value': cost_centers})
+    ], ignore_index=True)
+    account_tags = {
+        '111111111111': {'CostCenter': 'CC-2000'},
+        '444444444444': {'Team': 'platform', 'CostCenter': 'CC-1000'}
+    }
+    return CostAllocator(resource_tags, account_tags).allocate([lines])
 
-def detect_anomalies_ml(cost_history: List[Dict]) -> Dict:
-    """ML-based anomaly detection with statistical analysis"""
-    # Calculate baseline statistics
-    costs = [item['cost'] for item in cost_history]
-    mean = sum(costs) / len(costs)
-    variance = sum((x - mean) ** 2 for x in costs) / len(costs)
-    std_dev = variance ** 0.5
+@st.cache_resource
+def get_demo_cost_warehouse():
+    """Warehouse in a temp file holding the demo cost and showback, so Demo mode questions run the same local queries"""
+    import tempfile
+    from pathlib import Path
+    from cost_warehouse import CostWarehouse
+    
+    db_path = Path(tempfile.gettempdir()) / 'cloudidp-demo-cost.db'
+    db_path.unlink(missing_ok=True)
+    warehouse = CostWarehouse(str(db_path))
     
-    # Detect anomalies (> 2 standard deviations)
-    anomaly_threshold = mean + (2 * std_dev)
+    days = AppConfig.COST_BACKFILL_DAYS
+    cost_facts, tag_facts = generate_demo_cost_facts(days)
+    end = datetime.now().date()
+    start = end - timedelta(days=days)
+    for (account_id, account_name), costs in cost_facts.groupby(['account_id', 'account_name']):
+        tags = tag_facts[(tag_facts['account_id'] == account_id) & (tag_facts['tag_value'] != '')]
+        warehouse.replace_range(
+            account_id, account_name, start, end,
+            costs[['cost_date', 'service', 'region', 'cost_amount']].itertuples(index=False, name=None),
+            tags[['cost_date', 'tag_key', 'tag_value', 'service', 'cost_amount']].itertuples(index=False, name=None)
+        )
+    warehouse.replace_allocation(end - timedelta(days=AppConfig.ALLOCATION_DAYS), end, generate_demo_cost_allocation(), {
+        'run_at': datetime.now(timezone.utc).isoformat(), 'start_date': (end - timedelta(days=AppConfig.ALLOCATION_DAYS)).isoformat(),
+        'end_date': end.isoformat(), 'source': 'demo', 'snapshot_id': None, 'lines': 0, 'seconds': 0.0
+    })
+    return warehouse
+
+def load_cost_forecast(history_days: int = 60) -> Dict:
+    """
+    Forecasts of every account/service series, with the actual cost they continue
     
-    detected = []
-    for item in cost_history[-7:]:  # Last 7 days
-        if item['cost'] > anomaly_threshold:
-            deviation_pct = ((item['cost'] - mean) / mean) * 100
-            detected.append({
-                'date': item['date'],
-                'expected': f"${mean:.2f}",
-                'actual': f"${item['cost']:.2f}",
-                'deviation': f"+{deviation_pct:.0f}%",
-                'confidence': '95%' if item['cost'] > anomaly_threshold * 1.5 else '85%'
-            })
+    Live mode fits the local cost warehouse (no Cost Explorer calls); Demo
+    mode, or Live mode before the first ingestion, fits demo series.
     
+    Returns:
+        Dict with forecast (CostForecast), daily (date, cost for the last history_days through the
+        forecast origin), month_to_date (account_id, account_name, cost this month) and source
+    """
+    if st.session_state.get('mode', 'Live') != 'Demo':
+        from cost_warehouse import get_cost_warehouse, utc_today
+        warehouse = get_cost_warehouse()
+        if warehouse.has_data():
+            today = utc_today()
+            return {
+                'forecast': get_cost_forecast(warehouse.coverage()['last_run'], today),
+                'daily': warehouse.daily_totals(today - timedelta(days=history_days), today),
+                'month_to_date': warehouse.cost_by_account(today.replace(day=1), today),
+                'source': 'warehouse'
+            }
+    
+    forecast, facts = generate_demo_cost_forecast()
+    today = forecast.origin + timedelta(days=1)
+    daily = facts.groupby('cost_date', as_index=False)['cost_amount'].sum()
+    month = facts[facts['cost_date'] >= today.replace(day=1).isoformat()]
     return {
-        'detected': detected,
-        'baseline_mean': mean,
-        'baseline_std': std_dev,
-        'threshold': anomaly_threshold,
-        'total_anomalies': len(detected)
+        'forecast': forecast,
+        'daily': daily.rename(columns={'cost_date': 'date', 'cost_amount': 'cost'}).tail(history_days),
+        'month_to_date': month.groupby('account_id', as_index=False).agg(
+            account_name=('account_name', 'first'), cost=('cost_amount', 'sum')
+        ),
+        'source': 'demo'
     }
 
 # ============================================================================
@@ -532,6 +625,23 @@ def generate_demo_cost_data() -> Dict:
     
     return cost_data
 
+def load_cost_data(days: int = 30) -> Dict:
+    """
+    Cost data for the FinOps views
+    
+    Live mode reads the local cost warehouse rollups (no Cost Explorer calls);
+    Demo mode, or Live mode before the first ingestion, gets demo data.
+    
+    Returns:
+        Dict with total_cost, services, daily_costs, by_account and source ('warehouse' or 'demo')
+    """
+    if st.session_state.get('mode', 'Live') != 'Demo':
+        from cost_warehouse import get_cost_warehouse
+        warehouse = get_cost_warehouse()
+        if warehouse.has_data():
+            return dict(warehouse.summary(days), source='warehouse')
+    return dict(generate_demo_cost_data(), source='demo')
+
 @PerformanceOptimizer.cache_with_spinner(ttl=300, spinner_text="Generating AI recommendations...")
 def generate_demo_recommendations() -> List[Dict]:
     """Generate demo optimization recommendations"""
@@ -631,10 +741,13 @@ class FinOpsEnterpriseModule:
         with col2:
             st.success("🌱 Sustainability + 🚨 Anomaly Detection: **Enabled** | ⚡ Performance: **Optimized**")
         
+        FinOpsEnterpriseModule._render_cost_sync_status(account_mgr)
+        
         # Main tabs - Added Cost Anomalies
         tabs = st.tabs([
             "🎯 Cost Dashboard",
             "🚨 Cost Anomalies",
+            "🧾 Resource Costs",
             "🌱 Sustainability & CO2",
             "🤖 AI Insights",
             "💬 Ask AI",
@@ -652,46 +765,126 @@ class FinOpsEnterpriseModule:
             FinOpsEnterpriseModule._render_cost_anomalies()
         
         with tabs[2]:
-            FinOpsEnterpriseModule._render_sustainability_carbon()
+            FinOpsEnterpriseModule._render_resource_costs()
         
         with tabs[3]:
-            FinOpsEnterpriseModule._render_ai_insights(ai_available)
+            FinOpsEnterpriseModule._render_sustainability_carbon()
         
         with tabs[4]:
-            FinOpsEnterpriseModule._render_ai_query(ai_available)
+            FinOpsEnterpriseModule._render_ai_insights(ai_available)
         
         with tabs[5]:
-            FinOpsEnterpriseModule._render_multi_account_costs(account_mgr)
+            FinOpsEnterpriseModule._render_ai_query(ai_available)
         
         with tabs[6]:
-            FinOpsEnterpriseModule._render_cost_trends()
+            FinOpsEnterpriseModule._render_multi_account_costs(account_mgr)
         
         with tabs[7]:
-            FinOpsEnterpriseModule._render_optimization()
+            FinOpsEnterpriseModule._render_cost_trends()
         
         with tabs[8]:
-            FinOpsEnterpriseModule._render_budget_management()
+            FinOpsEnterpriseModule._render_optimization()
         
         with tabs[9]:
+            FinOpsEnterpriseModule._render_budget_management()
+        
+        with tabs[10]:
             FinOpsEnterpriseModule._render_tag_based_costs()
     
+    @staticmethod
+    def _render_cost_sync_status(account_mgr):
+        """Show what the cost warehouse holds and keep it synced with Cost Explorer"""
+        if st.session_state.get('mode', 'Live') == 'Demo':
+            return
+        
+        from cost_warehouse import get_cost_warehouse, submit_cost_ingestion, utc_today
+        from aws_cost_explorer import get_cost_explorer_governor, PRIORITY_BACKGROUND
+        from queue_service import get_task_queue, TaskStatus
+        
+        warehouse = get_cost_warehouse()
+        # Background syncs stop short of the daily budget, leaving the reserve for interactive pages
+        budget_left = get_cost_explorer_governor().available(PRIORITY_BACKGROUND) > 0
+        # The in-progress marker lives in the warehouse, so every session shares one run
+        job = warehouse.job_status('ingestion')
+        running = bool(job and job['running'])
+        failed_recently = bool(job and job['status'] == 'failed' and datetime.now(timezone.utc)
+                               - datetime.fromisoformat(job['finished_at']) < timedelta(hours=AppConfig.COST_SYNC_INTERVAL_HOURS))
+        
+        # Backfill on first use, then pick up the unsettled days whenever the last run is stale
+        # (a failed run is retried at the next interval or from the button, not on every rerun)
+        if not running and not failed_recently and budget_left and warehouse.is_stale(AppConfig.COST_SYNC_INTERVAL_HOURS):
+            submit_cost_ingestion(account_mgr)
+            job = warehouse.job_status('ingestion')
+            running = True
+        task = get_task_queue().get_task(job['task_id']) if job and job['task_id'] else None
+        
+        coverage = warehouse.coverage()
+        col1, col2 = st.columns([4, 1])
+        
+        with col1:
+            if running:
+                progress = task.progress if task else 0
+                st.info(f"⏳ Syncing daily cost from Cost Explorer ({progress}%) - refresh to see new data when it completes")
+            elif coverage['last_date']:
+                failing = f" | ⚠️ {coverage['failing']} account(s) failed last sync" if coverage['failing'] else ""
+                st.caption(
+                    f"🗄️ Cost warehouse: {coverage['accounts']} account(s), {coverage['first_date']} → "
+                    f"{coverage['last_date']} | synced {coverage['last_run'][:16].replace('T', ' ')} UTC{failing}"
+                )
+            else:
+                st.warning("No cost data ingested yet - showing sample data until the first sync completes")
+            if not running and not budget_left:
+                st.caption("💲 Today's Cost Explorer budget for background syncs is spent - "
+                           "showing the last synced data until 00:00 UTC")
+        
+        with col2:
+            if st.button("🔄 Sync Costs", use_container_width=True, disabled=running or not budget_left,
+                         help=f"Fetch the last {AppConfig.COST_UNSETTLED_DAYS} unsettled days (and any missed days) from Cost Explorer"):
+                submit_cost_ingestion(account_mgr)
+                st.rerun()
+        
+        if not running and job and job['status'] == 'failed':
+            st.error(f"Cost sync failed: {job['error']}")
+        elif task and task.status == TaskStatus.COMPLETED and task.result and task.result.get('errors'):
+            with st.expander(f"⚠️ Cost sync failed for {task.result['failed']} account(s)"):
+                st.dataframe(task.result['errors'], use_container_width=True, hide_index=True)
+        
+        if coverage['last_date']:
+            with st.expander("📤 Export daily cost"):
+                days = st.number_input("Days", min_value=1, max_value=AppConfig.COST_BACKFILL_DAYS * 4,
+                                       value=AppConfig.COST_BACKFILL_DAYS, key="cost_export_days")
+                end = utc_today() + timedelta(days=1)
+                start = end - timedelta(days=int(days))
+                render_export_controls("cost_export", [ExportSource(
+                    "Daily cost by account, service and region",
+                    TABLE_FORMATS,
+                    lambda fmt: export_frames(warehouse.iter_frames(start, end, AppConfig.EXPORT_CHUNK_ROWS), fmt, "daily-cost")
+                )])
+    
     @staticmethod
     def _render_cost_dashboard(account_mgr, ai_available):
         """Enhanced cost dashboard with AI insights"""
         
         st.markdown("### 🎯 Cost Overview")
         
-        cost_data = generate_demo_cost_data()
+        cost_data = load_cost_data()
         
         # Top metrics
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
+            previous = cost_data.get('previous_cost')
+            if previous:
+                delta = f"{(cost_data['total_cost'] / previous - 1) * 100:+.1f}%"
+            else:
+                # Warehouse data without a previous period shows no change rather than the sample figure
+                delta = "-5.2%" if cost_data['source'] == 'demo' else None
             st.metric(
                 "Total Monthly Cost",
                 Helpers.format_currency(cost_data['total_cost']),
-                delta="-5.2%",
-                help="Current month vs last month"
+                delta=delta,
+                delta_color="inverse",
+                help="Last 30 days vs the 30 days before"
             )
         
         with col2:
@@ -773,180 +966,155 @@ class FinOpsEnterpriseModule:
     
     @staticmethod
     def _render_cost_anomalies():
-        """NEW: Cost Anomaly Detection and Alerting"""
+        """Cost anomalies over every account, service, region and tag series"""
         
         st.markdown("### 🚨 Cost Anomaly Detection")
-        st.info("📊 ML-powered detection of unusual spending patterns and cost spikes")
-        
-        anomalies = generate_cost_anomalies()
         
-        # Summary metrics
-        total_waste = sum(
-            float(a['estimated_waste'].replace('$', '').replace(',', ''))
-            for a in anomalies
+        result, source = load_cost_anomalies()
+        summary = result.summary()
+        st.info(
+            f"📊 {summary['series']:,} account, service, region and tag series scored against a rolling "
+            f"median/MAD baseline with day-of-week seasonality in {summary['seconds']:.2f}s"
+            + (" | sample data" if source == 'demo' else "")
         )
         
-        critical_count = sum(1 for a in anomalies if a['severity'] == 'Critical')
-        open_count = sum(1 for a in anomalies if a['status'] in ['Open', 'Investigating'])
-        
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
             st.metric(
                 "Anomalies Detected",
-                len(anomalies),
-                delta="Last 7 days",
-                help="Total cost anomalies identified"
+                summary['anomalies'],
+                delta=f"Last {summary['days_scored']} days",
+                delta_color="off",
+                help="Anomalous days, counted once at the highest anomalous level (account, service, region/tag)"
             )
         
         with col2:
             st.metric(
                 "Critical Anomalies",
-                critical_count,
-                delta="🔴 Immediate attention",
-                help="High-severity cost spikes"
+                summary['critical'],
+                help="At least 4x over the series' own threshold"
             )
         
         with col3:
             st.metric(
-                "Estimated Waste",
-                f"${total_waste:,.0f}",
-                delta="Recoverable",
-                help="Total wasted spend from anomalies"
+                "Excess Spend",
+                f"${summary['excess']:,.0f}",
+                help="Cost above the expected cost on anomalous days"
             )
         
         with col4:
             st.metric(
-                "Open Investigations",
-                open_count,
-                delta=f"{len(anomalies)-open_count} resolved",
-                help="Anomalies under investigation"
+                "Flagged Series-Days",
+                summary['flagged_series_days'],
+                help="Anomalous days at every level, including those explaining a higher-level anomaly"
             )
         
-        st.markdown("---")
+        col1, col2, col3 = st.columns([2, 2, 1])
+        with col1:
+            severities = st.multiselect("Severity", ['Critical', 'High', 'Medium'],
+                                        default=['Critical', 'High', 'Medium'], key="anomaly_severity")
+        with col2:
+            levels = st.multiselect("Series level", ['account', 'service', 'region', 'tag'],
+                                    default=['account', 'service', 'region', 'tag'], key="anomaly_levels")
+        with col3:
+            roots_only = st.checkbox("Highest level only", value=True, key="anomaly_roots",
+                                     help="Hide anomalies already explained by an anomaly one level up")
+        
+        anomalies = result.frame(roots_only=roots_only, levels=levels, severities=severities)
         
-        # Anomalies table
+        st.markdown("---")
         st.markdown("### 🔍 Detected Anomalies")
         
-        for anomaly in anomalies:
+        if anomalies.empty:
+            st.success("✅ No cost anomalies in the scored days")
+        
+        shown = anomalies.head(50)
+        for anomaly in shown.itertuples():
             severity_icon = {
                 'Critical': '🔴',
                 'High': '🟠',
-                'Medium': '🟡',
-                'Low': '🟢'
-            }.get(anomaly['severity'], '⚪')
-            
-            status_icon = {
-                'Open': '🔴',
-                'Investigating': '🟡',
-                'Resolved': '🟢',
-                'Fixed': '✅'
-            }.get(anomaly['status'], '⚪')
+                'Medium': '🟡'
+            }.get(anomaly.severity, '⚪')
+            deviation = f"+{anomaly.deviation_pct:.0f}%" if pd.notna(anomaly.deviation_pct) else "new spend"
             
             with st.expander(
-                f"{severity_icon} {anomaly['service']} - {anomaly['account']} | {anomaly['deviation']} spike on {anomaly['date']} | {status_icon} {anomaly['status']}"
+                f"{severity_icon} {anomaly.label} | {deviation} on {anomaly.date} | +${anomaly.excess:,.0f}"
             ):
-                col1, col2, col3 = st.columns([2, 2, 1])
+                col1, col2 = st.columns([1, 2])
                 
                 with col1:
                     st.markdown("**📊 Cost Details:**")
-                    st.markdown(f"- **Normal Cost:** ${anomaly['normal_cost']}")
-                    st.markdown(f"- **Actual Cost:** ${anomaly['actual_cost']}")
-                    st.markdown(f"- **Deviation:** {anomaly['deviation']}")
-                    st.markdown(f"- **Wasted:** {anomaly['estimated_waste']}")
+                    st.markdown(f"- **Level:** {anomaly.level}")
+                    st.markdown(f"- **Expected Cost:** ${anomaly.expected:,.2f}")
+                    st.markdown(f"- **Actual Cost:** ${anomaly.actual:,.2f}")
+                    st.markdown(f"- **Excess:** ${anomaly.excess:,.2f}")
+                    st.markdown(f"- **Robust Z-Score:** {anomaly.score:.1f}")
+                    st.markdown(f"- **Severity:** {anomaly.severity}")
                 
                 with col2:
-                    st.markdown("**🔍 Analysis:**")
-                    st.markdown(f"- **Root Cause:** {anomaly['cause']}")
-                    st.markdown(f"- **Severity:** {anomaly['severity']}")
-                    st.markdown(f"- **Status:** {anomaly['status']}")
-                    st.markdown(f"- **Recommendation:** {anomaly['recommendation']}")
-                
-                with col3:
-                    st.markdown("**⚡ Actions:**")
-                    
-                    if st.button("🔔 Alert Team", key=f"alert_{anomaly['date']}_{anomaly['service']}", use_container_width=True):
-                        st.success("Team notified!")
-                    
-                    if st.button("📋 Create Ticket", key=f"ticket_{anomaly['date']}_{anomaly['service']}", use_container_width=True):
-                        st.success("Ticket created!")
-                    
-                    if anomaly['status'] in ['Open', 'Investigating']:
-                        if st.button("✅ Mark Resolved", key=f"resolve_{anomaly['date']}_{anomaly['service']}", use_container_width=True):
-                            st.success("Marked as resolved!")
-        
-        # ML Detection visualization
-        st.markdown("---")
-        st.markdown("### 📈 ML Anomaly Detection")
-        
-        # Generate sample cost history
-        cost_history = []
-        base_cost = 450
-        for i in range(30):
-            date = (datetime.now() - timedelta(days=30-i)).strftime('%Y-%m-%d')
-            # Normal variation
-            cost = base_cost + random.uniform(-50, 50)
-            # Add some anomalies
-            if i in [28, 25, 20]:  # Add spikes
-                cost = base_cost + random.uniform(300, 800)
-            cost_history.append({'date': date, 'cost': cost})
-        
-        ml_results = detect_anomalies_ml(cost_history)
-        
-        col1, col2 = st.columns([2, 1])
-        
-        with col1:
-            # Visualization
-            history_df = pd.DataFrame(cost_history)
-            history_df['date'] = pd.to_datetime(history_df['date'])
+                    st.markdown("**🧭 Drill-Down:**")
+                    if anomaly.drivers:
+                        drivers = pd.DataFrame(anomaly.drivers)
+                        drivers['share'] = drivers['share'].map('{:.0%}'.format)
+                        st.dataframe(
+                            drivers.rename(columns=str.title),
+                            use_container_width=True,
+                            hide_index=True,
+                            column_config={
+                                column: st.column_config.NumberColumn(format="$%.2f")
+                                for column in ('Actual', 'Expected', 'Excess')
+                            }
+                        )
+                    else:
+                        st.caption("No finer series behind this one")
+        
+        if len(anomalies) > len(shown):
+            st.caption(f"Showing the {len(shown)} largest of {len(anomalies)} anomalies - export for the full list")
+        
+        if not anomalies.empty:
+            st.markdown("---")
+            st.markdown("### 📈 Series Detail")
             
-            fig = go.Figure()
+            position = st.selectbox(
+                "Anomaly",
+                range(len(shown)),
+                format_func=lambda i: f"{shown['label'].iloc[i]} ({shown['date'].iloc[i]})",
+                key="anomaly_series"
+            )
+            history = result.history(int(shown['series'].iloc[position]))
+            flagged = history[history['actual'] >= history['threshold']]
             
-            # Plot cost line
+            fig = go.Figure()
             fig.add_trace(go.Scatter(
-                x=history_df['date'],
-                y=history_df['cost'],
-                mode='lines+markers',
-                name='Daily Cost',
+                x=history['date'], y=history['actual'], mode='lines', name='Daily Cost',
                 line=dict(color='blue', width=2)
             ))
-            
-            # Add baseline
-            fig.add_hline(
-                y=ml_results['baseline_mean'],
-                line_dash="dash",
-                line_color="green",
-                annotation_text=f"Baseline (${ml_results['baseline_mean']:.2f})"
-            )
-            
-            # Add anomaly threshold
-            fig.add_hline(
-                y=ml_results['threshold'],
-                line_dash="dash",
-                line_color="red",
-                annotation_text=f"Anomaly Threshold (${ml_results['threshold']:.2f})"
-            )
-            
+            fig.add_trace(go.Scatter(
+                x=history['date'], y=history['expected'], mode='lines', name='Expected',
+                line=dict(color='green', dash='dash')
+            ))
+            fig.add_trace(go.Scatter(
+                x=history['date'], y=history['threshold'], mode='lines', name='Anomaly Threshold',
+                line=dict(color='red', dash='dash')
+            ))
+            fig.add_trace(go.Scatter(
+                x=flagged['date'], y=flagged['actual'], mode='markers', name='Anomaly',
+                marker=dict(color='red', size=10)
+            ))
             fig.update_layout(
-                title='Cost History with ML-Detected Anomalies',
+                title=shown['label'].iloc[position],
                 xaxis_title='Date',
                 yaxis_title='Cost ($)',
                 hovermode='x unified'
             )
-            
             st.plotly_chart(fig, use_container_width=True)
-        
-        with col2:
-            st.markdown("**📊 ML Statistics:**")
-            st.metric("Baseline Mean", f"${ml_results['baseline_mean']:.2f}")
-            st.metric("Std Deviation", f"${ml_results['baseline_std']:.2f}")
-            st.metric("Anomaly Threshold", f"${ml_results['threshold']:.2f}")
-            st.metric("Anomalies Found", ml_results['total_anomalies'])
             
-            if ml_results['detected']:
-                st.markdown("**🚨 Recent Anomalies:**")
-                for det in ml_results['detected']:
-                    st.markdown(f"- **{det['date']}:** {det['actual']} (expected {det['expected']})")
+            with st.expander("📤 Export anomalies"):
+                export = anomalies.drop(columns=['series', 'multiple', 'root']).assign(
+                    drivers=anomalies['drivers'].map(format_drivers)
+                )
+                render_export_controls("anomaly_export", [frame_source("Cost anomalies", export, "cost-anomalies")])
         
         # Anomaly prevention tips
         st.markdown("---")
@@ -978,6 +1146,123 @@ class FinOpsEnterpriseModule:
             🔴 API call loops
             """)
     
+    @staticmethod
+    def _render_resource_costs():
+        """Per-resource and hourly cost from Cost and Usage Report files synced to disk"""
+        
+        st.markdown("### 🧾 Resource Costs (Cost and Usage Report)")
+        
+        if st.session_state.get('mode', 'Live') == 'Demo':
+            st.info("Resource-level and hourly cost come from your Cost and Usage Report files - switch to Live mode to load them")
+            return
+        
+        from cost_warehouse import get_cost_warehouse, utc_today
+        from cur_ingestion import submit_cur_ingestion
+        from data_export import parquet_available
+        from queue_service import get_task_queue, TaskStatus
+        
+        warehouse = get_cost_warehouse()
+        task_id = st.session_state.get('cur_ingestion_task')
+        task = get_task_queue().get_task(task_id) if task_id else None
+        running = task is not None and task.status in (TaskStatus.PENDING, TaskStatus.RUNNING)
+        coverage = warehouse.cur_coverage()
+        
+        col1, col2 = st.columns([4, 1])
+        
+        with col1:
+            if running:
+                st.info(f"⏳ Loading CUR files ({task.progress}%) - refresh to see new data when it completes")
+            elif coverage['files']:
+                failing = f" | ⚠️ {coverage['failing']} file(s) failed to load" if coverage['failing'] else ""
+                st.caption(
+                    f"🗄️ {coverage['files']} CUR file(s), {coverage['rows_read']:,} line items, "
+                    f"{(coverage['first_hour'] or '')[:10]} → {(coverage['last_hour'] or '')[:10]} | "
+                    f"loaded {coverage['processed_at'][:16].replace('T', ' ')} UTC{failing}"
+                )
+            if not parquet_available():
+                st.caption("Install pyarrow to load Parquet CUR files (CSV files load without it)")
+        
+        with col2:
+            if st.button("🔄 Load CUR files", use_container_width=True, disabled=running,
+                         help=f"Load new and changed files from {AppConfig.CUR_DIRECTORY}"):
+                st.session_state.cur_ingestion_task = submit_cur_ingestion()
+                st.rerun()
+        
+        if task and task.status == TaskStatus.FAILED:
+            st.error(f"CUR load failed: {task.error}")
+        elif task and task.status == TaskStatus.COMPLETED and task.result and task.result.get('errors'):
+            with st.expander(f"⚠️ {len(task.result['errors'])} CUR file(s) failed to load"):
+                st.dataframe(task.result['errors'], use_container_width=True, hide_index=True)
+        
+        if not coverage['last_hour']:
+            st.info(f"""
+            No Cost and Usage Report data loaded yet. Sync your CUR export bucket to
+            `{AppConfig.CUR_DIRECTORY}` and press **Load CUR files**, e.g.:
+            
+            `aws s3 sync s3://<cur-bucket>/<prefix> {AppConfig.CUR_DIRECTORY}`
+            
+            Gzip CSV and Parquet (legacy CUR and CUR 2.0) exports are supported.
+            """)
+            return
+        
+        # The last covered day anchors the window; CUR files lag by up to a day
+        last_day = datetime.strptime(coverage['last_hour'][:10], '%Y-%m-%d').date()
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            days = st.selectbox("Period", [7, 14, 30, 90], index=2, format_func=lambda d: f"Last {d} days", key="cur_days")
+        end = min(last_day, utc_today()) + timedelta(days=1)
+        start = end - timedelta(days=days)
+        with col2:
+            account = st.selectbox("Account", ['All'] + warehouse.cur_accounts(start, end), key="cur_account")
+        with col3:
+            service = st.selectbox("Service", ['All'] + warehouse.cur_services(start, end), key="cur_service")
+        with col4:
+            search = st.text_input("Resource ID contains", key="cur_search")
+        
+        account_ids = None if account == 'All' else [account]
+        service = None if service == 'All' else service
+        resources = warehouse.resource_costs(start, end, account_ids, service, search.strip())
+        hourly = warehouse.hourly_costs(start, end, account_ids, service)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Total Cost", f"${hourly['cost'].sum():,.2f}", help="Includes cost not attributed to a resource")
+        with col2:
+            st.metric("Top Resources Cost", f"${resources['cost'].sum():,.2f}", help=f"The {len(resources)} costliest resources shown below")
+        with col3:
+            peak = hourly.loc[hourly['cost'].idxmax()] if not hourly.empty else None
+            st.metric("Peak Hour", f"${peak['cost']:,.2f}" if peak is not None else "n/a",
+                      delta=peak['usage_hour'][:13].replace('T', ' ') + ":00 UTC" if peak is not None else None,
+                      delta_color="off")
+        
+        if not hourly.empty:
+            chart = hourly.assign(usage_hour=pd.to_datetime(hourly['usage_hour']))
+            fig = px.line(chart, x='usage_hour', y='cost', title='Hourly Cost',
+                          labels={'usage_hour': 'Hour (UTC)', 'cost': 'Cost ($)'})
+            fig.update_layout(height=350)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        st.markdown("#### 💸 Costliest Resources")
+        if resources.empty:
+            st.info("No resource-level cost for this selection (some charges, e.g. support and tax, have no resource ID)")
+        else:
+            st.dataframe(
+                resources.rename(columns={
+                    'resource_id': 'Resource', 'account_id': 'Account', 'service': 'Service',
+                    'region': 'Region', 'cost': 'Cost ($)', 'days': 'Days Billed'
+                }),
+                use_container_width=True,
+                hide_index=True,
+                column_config={'Cost ($)': st.column_config.NumberColumn(format="$%.2f")}
+            )
+        
+        with st.expander("📤 Export daily cost per resource"):
+            render_export_controls("cur_export", [ExportSource(
+                "Daily cost per resource (all accounts and services)",
+                TABLE_FORMATS,
+                lambda fmt: export_frames(warehouse.iter_resource_frames(start, end, AppConfig.EXPORT_CHUNK_ROWS), fmt, "resource-cost")
+            )])
+    
     @staticmethod
     def _render_sustainability_carbon():
         """Sustainability & CO2 emissions tracking"""
@@ -1097,7 +1382,7 @@ class FinOpsEnterpriseModule:
             st.info("Configure ANTHROPIC_API_KEY in Streamlit secrets to enable AI features")
             return
         
-        cost_data = generate_demo_cost_data()
+        cost_data = load_cost_data()
         
         with st.spinner("🤖 AI analyzing your cost data..."):
             analysis = analyze_costs_with_ai(cost_data, cost_data['total_cost'], cost_data['services'])
@@ -1125,30 +1410,39 @@ class FinOpsEnterpriseModule:
     
     @staticmethod
     def _render_ai_query(ai_available):
-        """Natural language query interface"""
+        """Natural language query interface: exact figures from local queries, or free-form AI advice"""
         
-        st.markdown("### 💬 Ask AI About Your Costs")
+        st.markdown("### 💬 Ask About Your Costs")
         
-        if not ai_available:
+        exact = st.radio(
+            "Answer with",
+            ["📊 Exact figures", "🤖 AI advice"],
+            horizontal=True,
+            key="finops_ai_answer_mode",
+            help="Exact figures: AI only turns the question into a query, which runs on the local cost warehouse "
+                 "(repeated questions need no AI call). AI advice: AI answers from a cost summary."
+        ) == "📊 Exact figures"
+        
+        if not exact and not ai_available:
             st.warning("⚠️ AI features not available. Configure ANTHROPIC_API_KEY to enable.")
             return
-        
-        st.info("💡 Ask questions in plain English about your AWS costs")
+        if exact and not ai_available:
+            st.caption("AI is not configured - only questions asked before (and cached) can be answered")
         
         # Sample questions
         col1, col2 = st.columns(2)
         
         with col1:
-            if st.button("💰 What are my top 3 cost drivers?", key="finops_query_btn_1", use_container_width=True):
-                st.session_state.finops_ai_query = "What are my top 3 cost drivers?"
-            if st.button("📈 How can I reduce my EC2 costs?", key="finops_query_btn_2", use_container_width=True):
-                st.session_state.finops_ai_query = "How can I reduce my EC2 costs?"
+            if st.button("💰 What are my top 3 services this month?", key="finops_query_btn_1", use_container_width=True):
+                st.session_state.finops_ai_query = "What are my top 3 services this month?"
+            if st.button("📈 How did EC2 cost change vs the previous 30 days?", key="finops_query_btn_2", use_container_width=True):
+                st.session_state.finops_ai_query = "How did EC2 cost change vs the previous 30 days?"
         
         with col2:
-            if st.button("🎯 Where should I focus optimization?", key="finops_query_btn_3", use_container_width=True):
+            if st.button("📅 What was my daily cost last month?", key="finops_query_btn_3", use_container_width=True):
+                st.session_state.finops_ai_query = "What was my daily cost last month?"
+            if st.button("🎯 Where should I focus optimization?", key="finops_query_btn_4", use_container_width=True):
                 st.session_state.finops_ai_query = "Where should I focus my optimization efforts?"
-            if st.button("🌱 How can I reduce my carbon footprint?", key="finops_query_btn_4", use_container_width=True):
-                st.session_state.finops_ai_query = "How can I reduce my carbon footprint?"
         
         # Query input - FIXED: Unique key
         query = st.text_input(
@@ -1158,18 +1452,95 @@ class FinOpsEnterpriseModule:
             key="finops_ai_query_text_input_unique"
         )
         
-        if st.button("🔍 Ask AI", type="primary", key="finops_ask_ai_submit_btn"):
-            if query:
-                cost_data = generate_demo_cost_data()
-                
-                with st.spinner("🤖 AI thinking..."):
-                    response = natural_language_query(query, cost_data)
-                
-                st.markdown("---")
-                st.markdown("### 🤖 AI Response:")
-                st.markdown(response)
-            else:
+        if not exact:
+            if st.button("🔍 Ask AI", type="primary", key="finops_ask_ai_submit_btn"):
+                if query:
+                    cost_data = load_cost_data()
+                    
+                    with st.spinner("🤖 AI thinking..."):
+                        response = natural_language_query(query, cost_data)
+                    
+                    st.markdown("---")
+                    st.markdown("### 🤖 AI Response:")
+                    st.markdown(response)
+                else:
+                    st.warning("Please enter a question")
+            return
+        
+        from cost_warehouse import get_cost_warehouse, utc_today
+        
+        # Translations are cached in the warehouse they were made against: a demo translation names demo accounts
+        warehouse = get_cost_warehouse()
+        if st.session_state.get('mode', 'Live') == 'Demo' or not warehouse.has_data():
+            warehouse = get_demo_cost_warehouse()
+            st.caption("📊 Answering from sample data - sync costs in Live mode to query your own")
+        
+        col1, col2 = st.columns([1, 4])
+        with col1:
+            asked = st.button("🔍 Ask", type="primary", key="finops_ask_query_submit_btn")
+        with col2:
+            refresh = st.checkbox("Translate again (ignore the cached query)", key="finops_query_refresh")
+        
+        if asked:
+            if not query:
                 st.warning("Please enter a question")
+                return
+            answerer = CostQuestionAnswerer(warehouse, get_anthropic_client() if ai_available else None)
+            try:
+                with st.spinner("🤖 Translating question..."):
+                    st.session_state.finops_query_result = answerer.answer(query, utc_today(), refresh)
+            except CostQueryError as e:
+                st.error(f"Could not turn this question into a cost query: {e}")
+                return
+            except Exception as e:
+                st.error(f"Error processing query: {str(e)}")
+                return
+        
+        result = st.session_state.get('finops_query_result')
+        if not result:
+            return
+        
+        st.markdown("---")
+        if result['unsupported']:
+            st.info(f"This isn't answerable from cost data ({result['unsupported']}) - try **🤖 AI advice** instead")
+            return
+        
+        st.markdown(f"**{result['question']}**")
+        st.markdown(result['answer'].replace('$', '\\$'))
+        translated = ("♻️ cached translation" if result['cached']
+                      else f"🤖 translated in {result['translate_seconds']:.1f}s")
+        st.caption(f"{result['description']} | {translated} | ⚡ ran locally in {result['query_seconds'] * 1000:.0f} ms")
+        
+        frame = result['frame']
+        group_by = result['spec'].get('group_by') or []
+        if group_by and not frame.empty:
+            time_field = next((field for field in group_by if field in TIME_FIELDS), None)
+            if time_field:
+                fig = px.line(frame, x=time_field, y='cost', color=next((f for f in group_by if f != time_field), None),
+                              labels={'cost': 'Cost ($)'}, title=result['description'])
+                fig.update_layout(height=350)
+                st.plotly_chart(fig, use_container_width=True)
+            st.dataframe(
+                frame,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'cost': st.column_config.NumberColumn("Cost ($)", format="$%.2f"),
+                    'previous_cost': st.column_config.NumberColumn("Previous Period ($)", format="$%.2f")
+                }
+            )
+            with st.expander("📤 Export result"):
+                render_export_controls("cost_query_export", [frame_source(result['question'], frame, "cost-query")])
+        
+        with st.expander("🔎 Query"):
+            st.json(result['spec'])
+            st.code(result['sql'], language='sql')
+            st.caption(f"Parameters: {result['params']}")
+        
+        recent = warehouse.recent_query_translations()
+        if not recent.empty:
+            with st.expander(f"♻️ Cached questions ({len(recent)} most recent)"):
+                st.dataframe(recent, use_container_width=True, hide_index=True)
     
     @staticmethod
     def _render_multi_account_costs(account_mgr):
@@ -1177,7 +1548,7 @@ class FinOpsEnterpriseModule:
         
         st.markdown("### 📊 Multi-Account Cost Analysis")
         
-        cost_data = generate_demo_cost_data()
+        cost_data = load_cost_data()
         
         account_df = pd.DataFrame([
             {
@@ -1210,18 +1581,95 @@ class FinOpsEnterpriseModule:
                 use_container_width=True,
                 hide_index=True
             )
+        
+        if st.session_state.get('mode', 'Live') != 'Demo':
+            FinOpsEnterpriseModule._render_account_cost_drilldown(account_mgr)
     
     @staticmethod
-    def _render_cost_trends():
-        """Cost trends visualization"""
+    def _render_account_cost_drilldown(account_mgr):
+        """Up-to-the-hour cost of one account straight from Cost Explorer (settled days served from cache)"""
+        from aws_cost_explorer import CostExplorerService, CostQueryStats, get_cost_explorer_cache
+        
+        st.markdown("---")
+        st.markdown("#### 🔎 Live Account Drill-Down")
+        
+        names = [acc.account_name for acc in AppConfig.load_aws_accounts() if acc.status == 'active']
+        selected = st.selectbox(
+            "Account",
+            [''] + names,
+            format_func=lambda name: name or "Select an account...",
+            key="finops_drilldown_account"
+        )
+        if not selected:
+            return
+        account = AppConfig.get_aws_account(selected)
+        
+        try:
+            session = account_mgr.assume_role_or_raise(account.account_id, account.account_name, account.role_arn).session
+        except Exception as e:
+            st.error(f"Could not access {account.account_name}: {str(e)}")
+            return
+        
+        stats = CostQueryStats()
+        ce = CostExplorerService(session, account_id=account.account_id, cache=get_cost_explorer_cache(), stats=stats)
+        with st.spinner("Loading Cost Explorer data..."):
+            # One request covers the widest window; the calls below are derived from the cache
+            prefetched = ce.prefetch(90)
+            if not prefetched['success']:
+                st.error(f"Cost Explorer error: {prefetched['error']}")
+                return
+            quarter = ce.get_monthly_cost(months=3)
+            services = ce.get_cost_by_service(days=30)
+            trend = ce.get_cost_trend(days=30)
+            forecast = ce.get_cost_forecast(days=30)
+        
+        failed = next((r for r in (quarter, services, trend) if not r['success']), None)
+        if failed:
+            st.error(f"Cost Explorer error: {failed['error']}")
+            return
         
-        st.markdown("### 📈 Cost Trends (30 Days)")
+        if ce.stale:
+            st.warning("💲 Today's Cost Explorer request budget is spent - showing the most recent cached data")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Last 30 Days", Helpers.format_currency(services['total']))
+        with col2:
+            st.metric("Last 90 Days", Helpers.format_currency(quarter['total_cost']))
+        with col3:
+            # A forecast is unavailable only if the budget is spent and none was ever cached
+            st.metric("30-Day Forecast", Helpers.format_currency(forecast['forecast']) if forecast['success'] else "n/a")
         
-        cost_data = generate_demo_cost_data()
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            trend_df = pd.DataFrame(trend['daily_costs'])
+            st.plotly_chart(px.line(trend_df, x='date', y='cost', title='Daily Cost (30 Days)'), use_container_width=True)
+        with col2:
+            service_df = pd.DataFrame(list(services['costs'].items())[:10], columns=['Service', 'Cost'])
+            st.dataframe(service_df, use_container_width=True, hide_index=True)
         
-        trend_df = pd.DataFrame(cost_data['daily_costs'])
+        st.caption(stats.caption())
+    
+    @staticmethod
+    def _render_cost_trends():
+        """Cost trends with the forecast of every account and service series"""
+        
+        horizon = AppConfig.FORECAST_HORIZON_DAYS
+        st.markdown(f"### 📈 Cost Trends & {horizon}-Day Forecast")
+        
+        data = load_cost_forecast()
+        forecast = data['forecast']
+        summary = forecast.summary()
+        st.info(
+            f"🔮 {summary['series']:,} account/service series forecast locally ({summary['holt_winters']:,} Holt-Winters "
+            f"with weekly seasonality, {summary['linear']:,} linear trend) in {summary['seconds']:.2f}s - no Cost Explorer calls"
+            + (" | sample data" if data['source'] == 'demo' else "")
+        )
+        
+        trend_df = data['daily'].copy()
         trend_df['date'] = pd.to_datetime(trend_df['date'])
         trend_df['7day_avg'] = trend_df['cost'].rolling(window=7).mean()
+        projection = forecast.totals(horizon)
         
         fig = go.Figure()
         
@@ -1241,8 +1689,35 @@ class FinOpsEnterpriseModule:
             line=dict(color='blue', width=3)
         ))
         
+        fig.add_trace(go.Scatter(
+            x=projection['date'],
+            y=projection['upper'],
+            mode='lines',
+            line=dict(width=0),
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        
+        fig.add_trace(go.Scatter(
+            x=projection['date'],
+            y=projection['lower'],
+            mode='lines',
+            name='80% Range',
+            line=dict(width=0),
+            fill='tonexty',
+            fillcolor='rgba(255, 153, 0, 0.2)'
+        ))
+        
+        fig.add_trace(go.Scatter(
+            x=projection['date'],
+            y=projection['forecast'],
+            mode='lines',
+            name='Forecast',
+            line=dict(color='#FF9900', width=2, dash='dash')
+        ))
+        
         fig.update_layout(
-            title='Daily Cost Trend with 7-Day Moving Average',
+            title='Daily Cost with 7-Day Moving Average and Forecast',
             xaxis_title='Date',
             yaxis_title='Cost ($)',
             hovermode='x unified'
@@ -1250,15 +1725,46 @@ class FinOpsEnterpriseModule:
         
         st.plotly_chart(fig, use_container_width=True)
         
-        col1, col2, col3 = st.columns(3)
+        recent = trend_df['cost'].tail(30)
+        col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Avg Daily Cost", Helpers.format_currency(trend_df['cost'].mean()))
+            st.metric("Avg Daily Cost", Helpers.format_currency(recent.mean()), help="Last 30 days")
         with col2:
-            st.metric("Peak Daily Cost", Helpers.format_currency(trend_df['cost'].max()))
+            st.metric("Peak Daily Cost", Helpers.format_currency(recent.max()), help="Last 30 days")
         with col3:
-            trend = "↑ Increasing" if trend_df['cost'].iloc[-1] > trend_df['cost'].iloc[0] else "↓ Decreasing"
-            st.metric("Trend", trend)
+            st.metric(
+                f"Next {horizon} Days",
+                Helpers.format_currency(projection['forecast'].sum()),
+                delta=f"{Helpers.format_currency(projection['lower'].sum())} - {Helpers.format_currency(projection['upper'].sum())}",
+                delta_color="off"
+            )
+        with col4:
+            change = (projection['forecast'].mean() / recent.mean() - 1) * 100 if recent.mean() > 0 else 0.0
+            st.metric("Trend", "↑ Increasing" if change > 0 else "↓ Decreasing", delta=f"{change:+.1f}% daily run rate",
+                      delta_color="inverse", help=f"Forecast daily average over the next {horizon} days vs the last 30 days")
+        
+        with st.expander("🔍 Forecast by account and service"):
+            series = forecast.series_frame(horizon)
+            series['model'] = series['model'].map({MODEL_HOLT_WINTERS: 'Holt-Winters', MODEL_LINEAR: 'Linear trend'})
+            table = series.rename(columns={
+                'account_name': 'Account', 'service': 'Service', 'model': 'Model', 'forecast': f'Next {horizon} Days ($)',
+                'lower': 'Low ($)', 'upper': 'High ($)', 'trend_per_day': 'Trend ($/day)'
+            }).drop(columns='account_id')
+            st.dataframe(
+                table.head(100),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    column: st.column_config.NumberColumn(format="$%.2f")
+                    for column in (f'Next {horizon} Days ($)', 'Low ($)', 'High ($)', 'Trend ($/day)')
+                }
+            )
+            st.caption(
+                f"Stored fits are carried forward as new days land and refitted every {AppConfig.FORECAST_REFIT_DAYS} days "
+                f"({summary['refitted']:,} fitted, {summary['advanced']:,} carried forward this run)"
+            )
+            render_export_controls("forecast_export", [frame_source("Cost forecast by account and service", series, "cost-forecast")])
     
     @staticmethod
     def _render_optimization():
@@ -1309,53 +1815,258 @@ class FinOpsEnterpriseModule:
     
     @staticmethod
     def _render_budget_management():
-        """Budget management"""
+        """Monthly budgets against month-to-date spend plus the forecast for the rest of the month"""
         
         st.markdown("### 🎯 Budget Management")
         
-        budgets = [
-            {'Budget Name': 'Production Monthly', 'Amount': '$15,000', 'Current Spend': '$11,400', 'Utilization': '76%', 'Forecast': '$14,250', 'Status': '✅ On Track'},
-            {'Budget Name': 'Staging Monthly', 'Amount': '$5,000', 'Current Spend': '$4,650', 'Utilization': '93%', 'Forecast': '$5,580', 'Status': '⚠️ At Risk'},
-            {'Budget Name': 'Development Monthly', 'Amount': '$3,000', 'Current Spend': '$2,100', 'Utilization': '70%', 'Forecast': '$2,520', 'Status': '✅ On Track'}
-        ]
+        data = load_cost_forecast()
+        forecast = data['forecast']
+        today = forecast.origin + timedelta(days=1)
+        month_end = (today.replace(day=1) + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        
+        remaining = forecast.by_account(month_end)
+        table = data['month_to_date'].merge(remaining, how='outer', on='account_id', suffixes=('', '_forecast'))
+        table['account_name'] = table['account_name'].fillna(table['account_name_forecast']).fillna(table['account_id'])
+        table = table.fillna({'cost': 0.0, 'forecast': 0.0, 'lower': 0.0, 'upper': 0.0})
+        table['projected'] = table['cost'] + table['forecast']
+        table['projected_high'] = table['cost'] + table['upper']
+        
+        if data['source'] == 'demo':
+            # Sample budgets around the projection so every status shows up
+            table['monthly_amount'] = (table['projected'] * np.resize([1.25, 0.95, 1.02, 1.5], len(table))).round(-2)
+        else:
+            from cost_warehouse import get_cost_warehouse
+            budgets = get_cost_warehouse().budgets()[['account_id', 'monthly_amount']]
+            table = table.merge(budgets, how='left', on='account_id')
+        
+        budget = table['monthly_amount']
+        table['status'] = np.select(
+            [budget.isna() | (budget <= 0), table['projected'] > budget,
+             (table['projected_high'] > budget) | (table['projected'] >= budget * AppConfig.COST_CRITICAL_THRESHOLD)],
+            ['➖ No Budget', '🔴 Forecast Over Budget', '⚠️ At Risk'],
+            default='✅ On Track'
+        )
+        table = table.sort_values('projected', ascending=False, ignore_index=True)
+        
+        st.caption(
+            f"Month to date through {forecast.origin:%b %d} plus the forecast for {today:%b %d} - {month_end:%b %d} "
+            f"(80% range) | local forecasts, no Cost Explorer calls" + (" | sample data" if data['source'] == 'demo' else "")
+        )
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Total Budget", Helpers.format_currency(budget.sum()))
+        with col2:
+            st.metric("Month to Date", Helpers.format_currency(table['cost'].sum()))
+        with col3:
+            st.metric(
+                "Forecast Month End",
+                Helpers.format_currency(table['projected'].sum()),
+                delta=f"up to {Helpers.format_currency(table['projected_high'].sum())}",
+                delta_color="off"
+            )
+        with col4:
+            st.metric("Accounts At Risk", int(table['status'].isin(['🔴 Forecast Over Budget', '⚠️ At Risk']).sum()))
+        
+        edited = st.data_editor(
+            pd.DataFrame({
+                'Account': table['account_name'],
+                'Budget ($)': budget,
+                'Month to Date ($)': table['cost'],
+                'Forecast Month End ($)': table['projected'],
+                'High ($)': table['projected_high'],
+                'Utilization': np.where(budget > 0, table['cost'] / budget * 100, np.nan),
+                'Status': table['status']
+            }),
+            use_container_width=True,
+            hide_index=True,
+            disabled=['Account', 'Month to Date ($)', 'Forecast Month End ($)', 'High ($)', 'Utilization', 'Status'],
+            column_config={
+                'Budget ($)': st.column_config.NumberColumn(format="$%.0f", min_value=0, help="Monthly budget - edit and save"),
+                'Month to Date ($)': st.column_config.NumberColumn(format="$%.2f"),
+                'Forecast Month End ($)': st.column_config.NumberColumn(format="$%.2f"),
+                'High ($)': st.column_config.NumberColumn(format="$%.2f", help="Upper end of the 80% forecast range"),
+                'Utilization': st.column_config.ProgressColumn(format="%.0f%%", min_value=0, max_value=100)
+            },
+            key="finops_budget_editor"
+        )
         
-        df = pd.DataFrame(budgets)
-        st.dataframe(df, use_container_width=True, hide_index=True)
+        if data['source'] == 'demo':
+            st.caption("Budgets are sample values in Demo mode")
+        elif st.button("💾 Save Budgets", key="finops_save_budgets"):
+            from cost_warehouse import get_cost_warehouse
+            get_cost_warehouse().save_budgets(pd.DataFrame({
+                'account_id': table['account_id'],
+                'account_name': table['account_name'],
+                'monthly_amount': edited['Budget ($)'].where(edited['Budget ($)'] > 0)
+            }))
+            st.success("✅ Budgets saved")
+            st.rerun()
+        
+        chart = table[budget > 0]
+        if not chart.empty:
+            fig = go.Figure()
+            fig.add_trace(go.Bar(x=chart['account_name'], y=chart['monthly_amount'], name='Budget', marker_color='lightgray'))
+            fig.add_trace(go.Bar(x=chart['account_name'], y=chart['cost'], name='Month to Date', marker_color='#232F3E'))
+            fig.add_trace(go.Bar(
+                x=chart['account_name'], y=chart['forecast'], base=chart['cost'], name='Forecast Rest of Month',
+                marker_color='#FF9900',
+                error_y=dict(type='data', symmetric=False, array=chart['upper'] - chart['forecast'],
+                             arrayminus=chart['forecast'] - chart['lower'])
+            ))
+            fig.update_layout(barmode='group', title='Budget vs Forecast Month End', yaxis_title='Cost ($)', height=400)
+            st.plotly_chart(fig, use_container_width=True)
     
     @staticmethod
     def _render_tag_based_costs():
-        """Tag-based cost allocation"""
+        """Showback per allocation tag, with shared and untagged cost split proportionally"""
         
         st.markdown("### 🏷️ Tag-Based Cost Allocation")
         
-        tag_costs = [
-            {'Tag': 'Department', 'Value': 'Engineering', 'Cost': '$8,450', 'Percentage': '42%'},
-            {'Tag': 'Department', 'Value': 'Data Science', 'Cost': '$5,230', 'Percentage': '26%'},
-            {'Tag': 'Department', 'Value': 'Marketing', 'Cost': '$3,120', 'Percentage': '16%'},
-            {'Tag': 'Department', 'Value': 'Untagged', 'Cost': '$3,200', 'Percentage': '16%'}
-        ]
-        
-        df = pd.DataFrame(tag_costs)
-        
-        col1, col2 = st.columns([2, 1])
+        if st.session_state.get('mode', 'Live') == 'Demo':
+            warehouse = None
+            showback_all = generate_demo_cost_allocation()
+            end = datetime.now().date() + timedelta(days=1)
+            st.caption("📊 Sample allocation - switch to Live mode to allocate your warehouse cost by inventory tags")
+        else:
+            from cost_allocation import submit_cost_allocation
+            from cost_warehouse import get_cost_warehouse
+            
+            warehouse = get_cost_warehouse()
+            # Shared with every session through the warehouse, like the cost sync
+            job = warehouse.job_status('allocation')
+            running = bool(job and job['running'])
+            has_cost = warehouse.has_data() or bool(warehouse.cur_coverage()['last_hour'])
+            
+            # Re-allocate whenever cost was loaded since the last run, or it is older than the stale interval
+            if not running and has_cost and warehouse.allocation_is_stale(AppConfig.ALLOCATION_STALE_HOURS):
+                submit_cost_allocation()
+                running = True
+            
+            status = warehouse.allocation_status()
+            last_run = warehouse.allocation_status(include_failed=True)
+            col1, col2 = st.columns([4, 1])
+            
+            with col1:
+                if running:
+                    st.info("⏳ Allocating cost by tag - refresh to see the new showback when it completes")
+                if status:
+                    source = {
+                        'cur': 'Cost and Usage Report',
+                        'cost_explorer': 'Cost Explorer (account tags only)',
+                        'cost_explorer+cur': 'Cost and Usage Report, and Cost Explorer for days and accounts it does not cover'
+                    }.get(status['source'], status['source'])
+                    st.caption(
+                        f"🧮 {status['lines']:,} cost lines from {source}, {status['start_date']} → {status['end_date']} | "
+                        f"allocated {status['run_at'][:16].replace('T', ' ')} UTC in {status['seconds']:.1f}s"
+                    )
+            
+            with col2:
+                if st.button("🔄 Re-allocate", use_container_width=True, disabled=running or not has_cost,
+                             help="Re-read inventory tags and recompute the showback for the last "
+                                  f"{AppConfig.ALLOCATION_DAYS} days"):
+                    submit_cost_allocation()
+                    st.rerun()
+            
+            if not running and last_run and last_run['status'] == 'failed':
+                st.error(f"Cost allocation failed: {last_run['error']}")
+            
+            if not status:
+                if not has_cost:
+                    st.info("No cost loaded yet - sync Cost Explorer or load Cost and Usage Report files first")
+                return
+            showback_all = None
+            end = datetime.strptime(status['end_date'], '%Y-%m-%d').date()
         
+        col1, col2 = st.columns(2)
         with col1:
-            fig = px.bar(df, x='Value', y='Cost', text='Percentage', title='Cost by Department', color='Cost')
-            st.plotly_chart(fig, use_container_width=True)
+            dimension = st.selectbox("Allocate by tag", AppConfig.ALLOCATION_TAG_KEYS, key="allocation_dimension")
+        with col2:
+            periods = [d for d in [7, 30, 60, 90] if d <= AppConfig.ALLOCATION_DAYS] or [AppConfig.ALLOCATION_DAYS]
+            days = st.selectbox("Period", periods, index=min(1, len(periods) - 1),
+                                format_func=lambda d: f"Last {d} days", key="allocation_days")
+        start = end - timedelta(days=days)
+        
+        if warehouse is not None:
+            showback = warehouse.allocation(dimension, start, end)
+        else:
+            showback = showback_all[(showback_all['dimension'] == dimension)
+                                    & (showback_all['usage_date'] >= start.isoformat())
+                                    & (showback_all['usage_date'] < end.isoformat())]
+        
+        if showback.empty:
+            st.info("No allocated cost in this period")
+            return
         
+        total = showback['cost_amount'].sum()
+        by_rule = showback.groupby('rule')['cost_amount'].sum()
+        col1, col2, col3, col4, col5 = st.columns(5)
+        with col1:
+            st.metric("Allocated Cost", f"${total:,.2f}")
         with col2:
-            st.dataframe(df, use_container_width=True, hide_index=True)
+            st.metric("Resource Tags", f"{by_rule.get(RULE_DIRECT, 0) / total:.0%}", help="Cost of resources carrying the tag")
+        with col3:
+            st.metric("Account Tags", f"{by_rule.get(RULE_ACCOUNT, 0) / total:.0%}",
+                      help="Cost of untagged resources, inherited from the account's tag")
+        with col4:
+            st.metric("Split Cost", f"{(by_rule.get(RULE_SHARED, 0) + by_rule.get(RULE_UNTAGGED, 0)) / total:.0%}",
+                      help="Shared cost (NAT gateways, support...) and untagged cost, split in proportion to tagged cost")
+        with col5:
+            st.metric("Unallocated", f"${by_rule.get(RULE_UNALLOCATED, 0):,.2f}",
+                      help="Cost with nothing tagged in its account or organization that day to split against")
+        
+        # Showback per value: what each team or cost center owns and how it got there
+        rules = [RULE_DIRECT, RULE_ACCOUNT, RULE_SHARED, RULE_UNTAGGED, RULE_UNALLOCATED]
+        table = (showback.pivot_table(index='value', columns='rule', values='cost_amount', aggfunc='sum', fill_value=0)
+                 .reindex(columns=rules, fill_value=0).rename_axis(columns=None))
+        table['total'] = table.sum(axis=1)
+        table = table.sort_values('total', ascending=False)
+        
+        chart = table[rules].reset_index().melt(id_vars='value', var_name='rule', value_name='cost')
+        chart = chart[chart['cost'] > 0].assign(rule=lambda frame: frame['rule'].map(RULE_LABELS))
+        fig = px.bar(chart, x='value', y='cost', color='rule', title=f'Showback by {dimension}',
+                     labels={'value': dimension, 'cost': 'Cost ($)', 'rule': 'Allocated by'},
+                     category_orders={'value': table.index.tolist(), 'rule': [RULE_LABELS[rule] for rule in rules]})
+        fig.update_layout(height=400)
+        st.plotly_chart(fig, use_container_width=True)
         
-        st.markdown("---")
-        st.markdown("#### 🎯 Tag Compliance")
+        showback_table = table.reset_index().assign(share=lambda frame: frame['total'] / total * 100)
+        showback_table = showback_table.rename(columns={'value': dimension, 'total': 'Total ($)', 'share': 'Share (%)',
+                                                        **{rule: f"{RULE_LABELS[rule]} ($)" for rule in rules}})
+        st.dataframe(
+            showback_table,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                column: st.column_config.NumberColumn(format="%.1f%%" if column == 'Share (%)' else "$%.2f")
+                for column in showback_table.columns[1:]
+            }
+        )
         
-        col1, col2, col3 = st.columns(3)
+        st.markdown(f"#### 🔍 {dimension} Breakdown")
+        value = st.selectbox(dimension, table.index.tolist(), key="allocation_value")
+        detail = showback[showback['value'] == value]
+        col1, col2 = st.columns(2)
         with col1:
-            st.metric("Tagged Resources", "84%", delta="↑ 5%")
+            by_service = (detail.groupby('service', as_index=False)['cost_amount'].sum()
+                          .sort_values('cost_amount', ascending=False).head(15))
+            fig = px.bar(by_service, x='cost_amount', y='service', orientation='h', title=f'{value} by Service',
+                         labels={'cost_amount': 'Cost ($)', 'service': 'Service'})
+            fig.update_layout(height=400, yaxis={'categoryorder': 'total ascending'})
+            st.plotly_chart(fig, use_container_width=True)
         with col2:
-            st.metric("Untagged Cost", "$3,200", delta="↓ $450")
-        with col3:
-            st.metric("Tag Coverage Goal", "95%", delta="11% to go")
+            daily = detail.groupby('usage_date', as_index=False)['cost_amount'].sum()
+            fig = px.line(daily, x='usage_date', y='cost_amount', title=f'{value} Daily Cost',
+                          labels={'usage_date': 'Date', 'cost_amount': 'Cost ($)'})
+            fig.update_layout(height=400)
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with st.expander("📤 Export showback"):
+            render_export_controls("allocation_export", [
+                frame_source(f"Showback by {dimension}", showback_table, f"showback-{dimension.lower()}"),
+                frame_source(f"Daily allocation by {dimension}, account, service and rule", showback,
+                             f"allocation-{dimension.lower()}")
+            ])
 
 # Backward compatibility - support both old and new class names
 FinOpsModule = FinOpsEnterpriseModule
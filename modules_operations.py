@@ -614,24 +614,27 @@ Would you like me to execute these fixes automatically?
         st.info("🤖 AI-enhanced EC2 instance management with smart recommendations")
         
         try:
-            ec2 = session.client('ec2')
-            response = ec2.describe_instances()
+            from aws_ec2 import EC2Service
+            
+            result = EC2Service(session, region).list_instances()
+            if not result['success']:
+                st.error(f"Error loading instances: {result.get('error')}")
+                return
             
             instances = []
-            for reservation in response.get('Reservations', []):
-                for instance in reservation.get('Instances', []):
-                    tags = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
-                    instances.append({
-                        'instance_id': instance['InstanceId'],
-                        'name': tags.get('Name', 'Unnamed'),
-                        'state': instance['State']['Name'],
-                        'instance_type': instance['InstanceType'],
-                        'environment': tags.get('Environment', 'untagged'),
-                        'az': instance['Placement']['AvailabilityZone'],
-                        'private_ip': instance.get('PrivateIpAddress', 'N/A'),
-                        'public_ip': instance.get('PublicIpAddress', 'N/A'),
-                        'launch_time': instance['LaunchTime']
-                    })
+            for instance in result['instances']:
+                tags = instance['tags']
+                instances.append({
+                    'instance_id': instance['instance_id'],
+                    'name': tags.get('Name', 'Unnamed'),
+                    'state': instance['state'],
+                    'instance_type': instance['instance_type'],
+                    'environment': tags.get('Environment', 'untagged'),
+                    'az': instance['availability_zone'],
+                    'private_ip': instance['private_ip'],
+                    'public_ip': instance['public_ip'],
+                    'launch_time': instance['launch_time']
+                })
             
             if instances:
                 # Metrics
@@ -718,12 +721,113 @@ Would you like me to execute these fixes automatically?
                 df = pd.DataFrame(df_data)
                 st.dataframe(df, use_container_width=True, hide_index=True)
                 
+                OperationsModule._render_bulk_instance_actions(session, region, instances)
+            
             else:
                 st.info(f"No EC2 instances found in {region}")
         
         except Exception as e:
             st.error(f"Error loading instances: {str(e)}")
     
+    @staticmethod
+    def _render_bulk_instance_actions(session, region, instances):
+        """Start, stop, reboot or tag many instances with batched EC2 calls"""
+        st.markdown("---")
+        st.markdown("### ⚡ Bulk Actions")
+        
+        sid = st.session_state.ops_session_id
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            environments = st.multiselect(
+                "Environments",
+                options=sorted({i['environment'] for i in instances}),
+                key=f"bulk_envs_{sid}"
+            )
+        
+        with col2:
+            states = st.multiselect(
+                "States",
+                options=sorted({i['state'] for i in instances}),
+                key=f"bulk_states_{sid}"
+            )
+        
+        targets = [
+            i['instance_id'] for i in instances
+            if (not environments or i['environment'] in environments)
+            and (not states or i['state'] in states)
+        ]
+        
+        action = st.radio(
+            "Action",
+            options=["Start", "Stop", "Reboot", "Add Tag"],
+            horizontal=True,
+            key=f"bulk_action_{sid}"
+        )
+        
+        tags = {}
+        wait = False
+        if action == "Add Tag":
+            col1, col2 = st.columns(2)
+            with col1:
+                tag_key = st.text_input("Tag Key", key=f"bulk_tag_key_{sid}")
+            with col2:
+                tag_value = st.text_input("Tag Value", key=f"bulk_tag_value_{sid}")
+            if tag_key:
+                tags = {tag_key: tag_value}
+        elif action in ("Start", "Stop"):
+            wait = st.checkbox(
+                f"Wait until instances are {'running' if action == 'Start' else 'stopped'}",
+                key=f"bulk_wait_{sid}"
+            )
+        
+        confirmed = st.checkbox(
+            f"I confirm: {action.lower()} {len(targets)} instance(s) in {region}",
+            key=f"bulk_confirm_{sid}"
+        )
+        
+        if not st.button("🚀 Execute", key=f"bulk_execute_{sid}", type="primary",
+                         disabled=not (targets and confirmed and (tags or action != "Add Tag"))):
+            return
+        
+        from aws_ec2 import EC2Service
+        
+        ec2 = EC2Service(session, region)
+        with st.spinner(f"Running {action.lower()} on {len(targets)} instance(s)..."):
+            if action == "Start":
+                report = ec2.start_instances(targets, wait=wait)
+            elif action == "Stop":
+                report = ec2.stop_instances(targets, wait=wait)
+            elif action == "Reboot":
+                report = ec2.reboot_instances(targets)
+            else:
+                report = ec2.tag_instances(targets, tags)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("✅ Succeeded", report['succeeded'])
+        with col2:
+            st.metric("❌ Failed", report['failed'])
+        with col3:
+            st.metric("⏱️ Duration", f"{report['elapsed_seconds']:.1f}s")
+        
+        if report['failed']:
+            st.error(f"❌ {report['failed']} of {report['requested']} instance(s) failed")
+        else:
+            st.success(f"✅ {action} completed for {report['succeeded']} instance(s)")
+        
+        st.dataframe(
+            pd.DataFrame(report['results']).rename(columns={
+                'instance_id': 'Instance ID',
+                'success': 'Success',
+                'previous_state': 'Previous State',
+                'current_state': 'Current State',
+                'error': 'Error'
+            }),
+            use_container_width=True,
+            hide_index=True
+        )
+    
     @staticmethod
     def _render_ml_deployment(session, region):
         """ML model deployment and management"""
@@ -25,8 +25,17 @@ from core_account_manager import get_account_manager
 from core_session_manager import SessionManager
 from utils_helpers import Helpers
 from auth_azure_sso import require_permission
+from inventory_service import (
+    get_inventory_store, build_inventory_view, build_inventory_analytics,
+    submit_inventory_collection, submit_inventory_refresh, ResourceDetailLoader, RESOURCE_TYPES
+)
+from inventory_table import InventoryTable, get_inventory_table, parse_tag_filter, records_from_view
+from inventory_search import InventorySearchIndex, get_search_index
+from data_export import ExportSource, TABLE_FORMATS, export_frames, frame_source, render_export_controls
+from tag_policy_engine import get_tag_compliance, get_tag_policy
 import json
 import os
+import time
 
 # ============================================================================
 # PERFORMANCE OPTIMIZER - Makes module 10-100x faster!
@@ -125,12 +134,80 @@ def get_anthropic_client():
     except Exception as e:
         return None
 
+# ============================================================================
+# INVENTORY SNAPSHOTS
+# ============================================================================
+
+SEARCH_PAGE_SIZE = 100  # Ranked rows added per "Load more"
+
+@st.cache_data(max_entries=2, show_spinner="Loading inventory snapshot...")
+def _load_snapshot_records(snapshot_id: str, revision: int) -> List[Dict]:
+    """Records of one snapshot revision (incremental refreshes bump the revision, so no TTL)"""
+    return get_inventory_store().load_resources(snapshot_id)
+
+def _current_snapshot() -> Optional[Dict]:
+    """Latest completed snapshot in Live mode, or None to fall back to demo data"""
+    if st.session_state.get('mode', 'Live') == 'Demo':
+        return None
+    return get_inventory_store().latest_snapshot()
+
+def _latest_snapshot_records() -> Optional[List[Dict]]:
+    """Records of the latest completed snapshot in Live mode, or None to fall back to demo data"""
+    snapshot = _current_snapshot()
+    if not snapshot:
+        return None
+    return _load_snapshot_records(snapshot['snapshot_id'], snapshot['revision'] or 0)
+
+@st.cache_resource
+def _demo_inventory_table() -> InventoryTable:
+    """Columnar table over the sample inventory"""
+    return InventoryTable.from_records(records_from_view(_demo_inventory()))
+
+def _inventory_table() -> InventoryTable:
+    """Shared columnar table for the latest snapshot (or the sample data)"""
+    snapshot = _current_snapshot()
+    if snapshot:
+        return get_inventory_table(snapshot['snapshot_id'], snapshot['revision'] or 0)
+    return _demo_inventory_table()
+
+@st.cache_resource
+def _demo_search_index() -> InventorySearchIndex:
+    """Search index over the sample inventory"""
+    return InventorySearchIndex(_demo_inventory_table())
+
+def _search_index() -> InventorySearchIndex:
+    """Shared search index for the latest snapshot (or the sample data)"""
+    snapshot = _current_snapshot()
+    if snapshot:
+        return get_search_index(snapshot['snapshot_id'], snapshot['revision'] or 0)
+    return _demo_search_index()
+
+@st.cache_resource(max_entries=2)
+def _snapshot_view_frames(snapshot_id: str, revision: int) -> Dict[str, pd.DataFrame]:
+    """Per-type DataFrames of a snapshot revision, built once and shared across sessions"""
+    view = build_inventory_view(_load_snapshot_records(snapshot_id, revision))
+    return {key: pd.DataFrame(items) for key, items in view.items()}
+
+def _inventory_frame(inventory: Dict, key: str) -> pd.DataFrame:
+    """DataFrame for one inventory type - shared per snapshot in Live mode, built from demo data otherwise"""
+    snapshot = _current_snapshot()
+    if snapshot:
+        return _snapshot_view_frames(snapshot['snapshot_id'], snapshot['revision'] or 0)[key]
+    return pd.DataFrame(inventory[key])
+
+def generate_comprehensive_inventory() -> Dict:
+    """Resource inventory across all AWS services (latest snapshot, or demo data)"""
+    records = _latest_snapshot_records()
+    if records is not None:
+        return build_inventory_view(records)
+    return _demo_inventory()
+
 # ============================================================================
 # DEMO DATA GENERATION
 # ============================================================================
 
 @PerformanceOptimizer.cache_with_spinner(ttl=300, spinner_text="Loading resource inventory...")
-def generate_comprehensive_inventory() -> Dict:
+def _demo_inventory() -> Dict:
     """Generate comprehensive resource inventory across all AWS services"""
     
     return {
@@ -320,8 +397,15 @@ def generate_comprehensive_inventory() -> Dict:
         ]
     }
 
-@PerformanceOptimizer.cache_with_spinner(ttl=300, spinner_text="Analyzing resource usage...")
 def generate_resource_analytics() -> Dict:
+    """Resource usage analytics (computed from the latest snapshot, or demo data)"""
+    records = _latest_snapshot_records()
+    if records is not None:
+        return build_inventory_analytics(records)
+    return _demo_resource_analytics()
+
+@PerformanceOptimizer.cache_with_spinner(ttl=300, spinner_text="Analyzing resource usage...")
+def _demo_resource_analytics() -> Dict:
     """Generate resource usage analytics and insights"""
     
     return {
@@ -529,6 +613,8 @@ class ResourceInventoryModule:
         
         st.markdown("### 📊 Resource Inventory Overview")
         
+        ResourceInventoryModule._render_snapshot_status(account_mgr)
+        
         analytics = PerformanceOptimizer.load_once(
             key="resource_analytics",
             loader_func=generate_resource_analytics,
@@ -614,6 +700,131 @@ class ResourceInventoryModule:
             st.progress(analytics['compliance_score'] / 100)
             st.caption(f"{analytics['compliance_score']}% policy compliance")
     
+    @staticmethod
+    def _render_snapshot_status(account_mgr):
+        """Show which inventory snapshot is being served and queue a new collection"""
+        if st.session_state.get('mode', 'Live') == 'Demo':
+            return
+        
+        store = get_inventory_store()
+        snapshot = store.latest_snapshot()
+        
+        version = (snapshot['snapshot_id'], snapshot['revision']) if snapshot else None
+        if snapshot and st.session_state.get('inventory_snapshot_version') != version:
+            # A newer snapshot or refresh has landed - drop this session's copies of the old one
+            for key in ('resource_inventory', 'resource_analytics'):
+                st.session_state.pop(key, None)
+            st.session_state.inventory_snapshot_version = version
+        
+        col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
+        
+        with col1:
+            task_id = st.session_state.get('inventory_collection_task')
+            task = None
+            if task_id:
+                from queue_service import get_task_queue, TaskStatus
+                task = get_task_queue().get_task(task_id)
+            
+            if task and task.status in (TaskStatus.PENDING, TaskStatus.RUNNING):
+                st.info(f"⏳ Inventory collection in progress ({task.progress}%) - refresh to see new data when it completes")
+            elif snapshot:
+                refreshed = (
+                    f" | refreshed {snapshot['refreshed_at'][:19].replace('T', ' ')}"
+                    if snapshot['refreshed_at'] else ""
+                )
+                mode = json.loads(snapshot['scope'] or '{}').get('mode', 'full')
+                st.caption(
+                    f"📸 {'Tagging API discovery' if mode == 'tagging' else 'Snapshot'} from "
+                    f"{snapshot['completed_at'][:19].replace('T', ' ')}{refreshed} | "
+                    f"{snapshot['resource_count']} resources | "
+                    f"{snapshot['error_count']} collection errors | "
+                    f"collected in {snapshot['duration_seconds']:.1f}s"
+                )
+            else:
+                st.warning("No inventory snapshot yet - showing sample data until the first collection completes")
+        
+        with col2:
+            if st.button("⚡ Refresh Changes", use_container_width=True, disabled=snapshot is None,
+                         help="Re-collect only resource types AWS Config / CloudTrail report as changed"):
+                st.session_state.inventory_collection_task = submit_inventory_refresh(account_mgr)
+                st.rerun()
+        
+        with col3:
+            if st.button("🏷️ Fast Discovery", use_container_width=True,
+                         help="One Tagging API call stream per region - ARNs and tags only; "
+                              "resources that were never tagged are not listed"):
+                st.session_state.inventory_collection_task = submit_inventory_collection(account_mgr, mode='tagging')
+                st.rerun()
+        
+        with col4:
+            if st.button("📥 Full Collection", use_container_width=True):
+                st.session_state.inventory_collection_task = submit_inventory_collection(account_mgr)
+                st.rerun()
+        
+        if snapshot and snapshot['error_count']:
+            with st.expander(f"⚠️ {snapshot['error_count']} collection errors in this snapshot"):
+                st.dataframe(store.load_errors(snapshot['snapshot_id']), use_container_width=True, hide_index=True)
+        
+        if snapshot:
+            with st.expander(f"📤 Export snapshot ({snapshot['resource_count']:,} resources)"):
+                ResourceInventoryModule._render_snapshot_export(store, snapshot)
+        
+        ResourceInventoryModule._render_change_feed(store)
+    
+    @staticmethod
+    def _render_snapshot_export(store, snapshot: Dict):
+        """Stream every resource of the snapshot to a downloadable file"""
+        snapshot_id = snapshot['snapshot_id']
+        columns = ['resource_key', 'resource_type', 'resource_id', 'name', 'account_id', 'account_name',
+                   'region', 'state', 'cost_month', 'arn', 'tags', 'attributes']
+        render_export_controls(f"inventory_export_{snapshot_id[:8]}", [ExportSource(
+            "Inventory resources",
+            TABLE_FORMATS,
+            lambda fmt: export_frames(
+                store.iter_frames(snapshot_id, columns, AppConfig.EXPORT_CHUNK_ROWS),
+                fmt,
+                f"inventory-{snapshot_id[:8]}",
+                json_columns=('tags', 'attributes')
+            )
+        )])
+    
+    @staticmethod
+    def _render_change_feed(store):
+        """Resources added, modified or deleted since the user's previous visit"""
+        # The baseline is read once per session so the feed stays put across reruns
+        if 'inventory_last_seen_change' not in st.session_state:
+            user = st.session_state.get('user_info') or {}
+            st.session_state.inventory_last_seen_change = store.record_visit(user.get('email') or 'anonymous')
+        
+        changes = store.load_changes(since_change_id=st.session_state.inventory_last_seen_change)
+        if not changes:
+            return
+        
+        counts = {kind: sum(1 for c in changes if c['change_type'] == kind) for kind in ('added', 'modified', 'deleted')}
+        with st.expander(
+            f"🆕 Changed since your last visit: {counts['added']} added, "
+            f"{counts['modified']} modified, {counts['deleted']} deleted"
+        ):
+            icons = {'added': '🟢 Added', 'modified': '🟡 Modified', 'deleted': '🔴 Deleted'}
+            df = pd.DataFrame([
+                {
+                    'Change': icons.get(c['change_type'], c['change_type']),
+                    'Type': c['resource_type'],
+                    'Resource': c['name'] or c['resource_id'],
+                    'Account': c['account_name'],
+                    'Region': c['region'],
+                    'Details': c['details'] or '',
+                    'Detected': c['detected_at'][:19].replace('T', ' '),
+                    'Source': c['source']
+                }
+                for c in changes
+            ])
+            st.dataframe(df, use_container_width=True, hide_index=True)
+            
+            if st.button("✔️ Mark as Seen", key="inventory_mark_changes_seen"):
+                st.session_state.inventory_last_seen_change = changes[0]['change_id']
+                st.rerun()
+    
     # ========================================================================
     # TAB 2: RESOURCE SEARCH
     # ========================================================================
@@ -625,85 +836,154 @@ class ResourceInventoryModule:
         st.markdown("### 🔍 Advanced Resource Search")
         st.caption("Search across all resource types, accounts, and regions")
         
+        index = _search_index()
+        table = index.table
+        type_labels = {t: label for t, (_, label) in RESOURCE_TYPES.items()}
+        
         col1, col2, col3 = st.columns(3)
         
         with col1:
             search_text = st.text_input(
                 "Search Query",
-                placeholder="Resource ID, name, tag, IP...",
-                help="Search across all resource attributes"
+                placeholder="prod postgres us-east-1 owner:platform",
+                help="Words match names, IDs (including partial IDs like i-0abc), tags, types, accounts, "
+                     "regions and states. Key:value matches a tag; type:, region:, account:, state:, "
+                     "name: and id: restrict a word to one field. All words must match."
             )
         
         with col2:
             resource_types = st.multiselect(
                 "Resource Types",
-                options=['EC2', 'RDS', 'S3', 'Lambda', 'DynamoDB', 'ELB', 
-                        'VPC', 'CloudFront', 'Route53', 'EBS', 'EIP'],
-                default=['EC2', 'RDS', 'S3']
+                options=table.options('resource_type'),
+                format_func=lambda t: type_labels.get(t, t)
             )
         
         with col3:
-            search_scope = st.selectbox(
-                "Scope",
-                options=['All Accounts', 'Production Only', 'Non-Production']
-            )
+            accounts = st.multiselect("Accounts", options=table.options('account_name'))
         
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            regions = st.multiselect(
-                "Regions",
-                options=['All', 'us-east-1', 'us-west-2', 'eu-west-1'],
-                default=['All']
-            )
+            regions = st.multiselect("Regions", options=table.options('region'))
         
         with col2:
-            state_filter = st.selectbox(
-                "State",
-                options=['All States', 'Running/Active', 'Stopped/Inactive']
-            )
+            states = st.multiselect("State", options=table.options('state'))
         
         with col3:
             tag_filter = st.text_input(
                 "Tag Filter",
-                placeholder="Environment=Production",
-                help="Filter by tags (Key=Value)"
+                placeholder="Environment=Production, Owner",
+                help="Comma-separated Key=Value or Key (any value) terms - all must match"
             )
         
-        if st.button("🔍 Search Resources", type="primary"):
-            with st.spinner("Searching across all accounts and regions..."):
-                inventory = PerformanceOptimizer.load_once(
-                    key="resource_inventory",
-                    loader_func=generate_comprehensive_inventory
-                )
-                
-                # Simulate search results
-                total_results = 0
-                for resource_type in resource_types:
-                    if resource_type.lower() == 'ec2':
-                        total_results += len(inventory['ec2_instances'])
-                    elif resource_type.lower() == 'rds':
-                        total_results += len(inventory['rds_databases'])
-                    elif resource_type.lower() == 's3':
-                        total_results += len(inventory['s3_buckets'])
-                
-                st.success(f"✅ Found {total_results} resources matching your criteria")
-                
-                # Display results
-                if 'EC2' in resource_types and inventory.get('ec2_instances'):
-                    st.markdown("#### 💻 EC2 Instances")
-                    df = pd.DataFrame(inventory['ec2_instances'])
-                    st.dataframe(df, use_container_width=True, hide_index=True)
-                
-                if 'RDS' in resource_types and inventory.get('rds_databases'):
-                    st.markdown("#### 🗄️ RDS Databases")
-                    df = pd.DataFrame(inventory['rds_databases'])
-                    st.dataframe(df, use_container_width=True, hide_index=True)
-                
-                if 'S3' in resource_types and inventory.get('s3_buckets'):
-                    st.markdown("#### 📦 S3 Buckets")
-                    df = pd.DataFrame(inventory['s3_buckets'])
-                    st.dataframe(df, use_container_width=True, hide_index=True)
+        max_cost = max(1.0, round(table.max_cost() + 0.5))
+        cost_range = st.slider("Monthly Cost ($)", 0.0, max_cost, (0.0, max_cost))
+        
+        # Filters are vectorized over the shared table and the query is answered from the
+        # inverted index, so both run on every change
+        started = time.perf_counter()
+        mask = table.filter(
+            resource_types=resource_types,
+            accounts=accounts,
+            regions=regions,
+            states=states,
+            tags=parse_tag_filter(tag_filter),
+            min_cost=cost_range[0] if cost_range[0] > 0 else None,
+            max_cost=cost_range[1] if cost_range[1] < max_cost else None
+        )
+        result = index.search(search_text, mask=mask)
+        matches = len(result)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        
+        st.success(f"✅ Found {matches:,} of {len(table):,} resources ({elapsed_ms:.0f} ms)")
+        
+        # Ranked rows are materialised a page at a time; a new search starts again at one page
+        signature = (id(index), search_text, tuple(resource_types), tuple(accounts), tuple(regions),
+                     tuple(states), tag_filter, cost_range)
+        if st.session_state.get('inventory_search_signature') != signature:
+            st.session_state.inventory_search_signature = signature
+            st.session_state.inventory_search_shown = SEARCH_PAGE_SIZE
+        shown = st.session_state.inventory_search_shown
+        
+        page = table.frame.iloc[0:0]
+        if matches:
+            positions, scores = result.page(0, shown)
+            page = table.frame.iloc[positions]
+            df = page.drop(columns=['resource_key', 'account_id']).assign(
+                resource_type=page['resource_type'].map(lambda t: type_labels.get(t, t)).astype(str)
+            )
+            if search_text.strip():
+                df.insert(0, 'relevance', scores.round(2))
+            st.dataframe(df, use_container_width=True, hide_index=True)
+            
+            if matches > shown:
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    st.caption(f"Showing the top {shown:,} of {matches:,} matches")
+                with col2:
+                    if st.button("⬇️ Load More", key="inventory_search_more", use_container_width=True):
+                        st.session_state.inventory_search_shown = shown + SEARCH_PAGE_SIZE
+                        st.rerun()
+        
+        ResourceInventoryModule._render_resource_details(account_mgr, page)
+    
+    @staticmethod
+    def _render_resource_details(account_mgr, page: pd.DataFrame):
+        """
+        Describe a single snapshot resource on demand
+        
+        Args:
+            account_mgr: Account manager used to assume the resource's account role
+            page: Search result rows currently shown - the resources that can be opened
+        """
+        snapshot = _current_snapshot()
+        if not snapshot or page.empty:
+            return
+        
+        st.markdown("---")
+        st.markdown("#### 🔎 Resource Details")
+        st.caption("Open one of the search results shown above - details are fetched from AWS only for "
+                   "the resource you open, once per snapshot")
+        
+        labels = dict(zip(
+            page['resource_key'],
+            page['resource_type'].astype(str) + ' | ' + page['name'].fillna('').astype(str) + ' | '
+            + page['account_name'].astype(str) + ' | ' + page['region'].astype(str)
+        ))
+        resource_key = st.selectbox(
+            "Resource",
+            options=list(labels),
+            format_func=labels.get,
+            key="inventory_detail_resource"
+        )
+        if not resource_key:
+            return
+        
+        # One row from the store, so details loaded earlier (by any session) show without describing again
+        store = get_inventory_store()
+        records = store.load_resources(snapshot['snapshot_id'], resource_keys=[resource_key])
+        if not records:
+            st.info("This resource is no longer in the latest snapshot")
+            return
+        
+        record = records[0]
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown(f"**ARN:** `{record['arn'] or 'N/A'}`")
+            st.markdown(f"**State:** {record['state'] or 'unknown'}")
+        with col2:
+            st.markdown("**Tags:**")
+            st.json(record['tags'])
+        
+        if 'details' in record['attributes']:
+            st.json(json.loads(json.dumps(record['attributes']['details'], default=str)))
+        elif st.button("📋 Load Details", key="inventory_load_details"):
+            try:
+                with st.spinner("Describing resource..."):
+                    loaded = ResourceDetailLoader(account_mgr, store).load(snapshot['snapshot_id'], record)
+                st.json(json.loads(json.dumps(loaded['attributes']['details'], default=str)))
+            except Exception as e:
+                st.error(f"Could not load details: {str(e)}")
     
     # ========================================================================
     # TAB 3: COST ANALYSIS
@@ -791,14 +1071,8 @@ class ResourceInventoryModule:
             st.dataframe(df, use_container_width=True, hide_index=True)
             
             # Export option
-            if st.button("📥 Export Cost Report"):
-                csv = df.to_csv(index=False)
-                st.download_button(
-                    "Download CSV",
-                    csv,
-                    "resource_cost_analysis.csv",
-                    "text/csv"
-                )
+            with st.expander("📥 Export Cost Report"):
+                render_export_controls("export_cost_report", [frame_source("Resource costs", df, "resource_cost_analysis")])
     
     # ========================================================================
     # TAB 4: AI RECOMMENDATIONS
@@ -999,6 +1273,11 @@ class ResourceInventoryModule:
         st.markdown("### 🏷️ Tag Compliance & Governance")
         st.caption("Monitor and enforce tagging standards across resources")
         
+        snapshot = _current_snapshot()
+        if snapshot:
+            ResourceInventoryModule._render_snapshot_tag_compliance(snapshot)
+            return
+        
         analytics = PerformanceOptimizer.load_once(
             key="resource_analytics",
             loader_func=generate_resource_analytics
@@ -1080,6 +1359,74 @@ aws lambda tag-resource --resource arn:aws:lambda:us-east-1:123456789:function:l
     --tags Team=Platform,Project=DataProcessing
             """, language="bash")
     
+    @staticmethod
+    def _render_snapshot_tag_compliance(snapshot: Dict):
+        """Tag policy compliance of the latest inventory snapshot"""
+        policy = get_tag_policy()
+        result = get_tag_compliance(snapshot['snapshot_id'], snapshot['revision'] or 0)
+        summary = result.summary()
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            st.metric("Tag Compliance", f"{summary['compliance']}%", delta="Target: 95%")
+        
+        with col2:
+            st.metric("Compliant Resources", f"{summary['compliant']:,}/{summary['total']:,}")
+        
+        with col3:
+            st.metric("Missing Required Tags", f"{summary['missing']:,}",
+                     delta=f"{summary['invalid']:,} with invalid values", delta_color="inverse")
+        
+        with col4:
+            st.metric("Policy Tags", len(policy.keys), delta=", ".join(policy.keys))
+        
+        with st.expander("📋 Tag Policy Rules"):
+            st.dataframe(pd.DataFrame([
+                {
+                    'Tag Key': rule.key,
+                    'Environments': ', '.join(rule.environments) if rule.environments else 'All',
+                    'Resource Types': ', '.join(rule.resource_types) if rule.resource_types else 'All',
+                    'Required': rule.required,
+                    'Allowed Values': ', '.join(rule.allowed_values) if rule.allowed_values else 'Any',
+                    'Pattern': rule.pattern or ''
+                }
+                for rule in policy.rules
+            ]), use_container_width=True, hide_index=True)
+        
+        st.markdown("---")
+        
+        st.markdown("#### 📊 Compliance Matrix")
+        groupings = {
+            'Account': 'account_name',
+            'Team': 'team',
+            'Resource Type': 'resource_type',
+            'Environment': 'environment'
+        }
+        grouping = st.radio("Group by", options=list(groupings), horizontal=True, key="tag_compliance_group")
+        matrix = result.matrix(groupings[grouping])
+        if grouping == 'Resource Type':
+            matrix.index = [RESOURCE_TYPES.get(t, (None, t))[1] for t in matrix.index]
+        st.dataframe(
+            matrix,
+            use_container_width=True,
+            column_config={
+                column: st.column_config.ProgressColumn(column, format="%d%%", min_value=0, max_value=100)
+                for column in ['Compliance'] + policy.keys
+            }
+        )
+        
+        st.markdown("---")
+        
+        st.markdown("#### ⚠️ Non-Compliant Resources")
+        if summary['compliant'] == summary['total']:
+            st.success("✅ Every resource satisfies the tag policy")
+        else:
+            violations = result.violations(limit=SEARCH_PAGE_SIZE * 10)
+            st.dataframe(violations, use_container_width=True, hide_index=True)
+            if summary['total'] - summary['compliant'] > len(violations):
+                st.caption(f"Showing {len(violations):,} of {summary['total'] - summary['compliant']:,} non-compliant resources")
+    
     # ========================================================================
     # TAB 7: COMPUTE RESOURCES
     # ========================================================================
@@ -1099,15 +1446,14 @@ aws lambda tag-resource --resource arn:aws:lambda:us-east-1:123456789:function:l
         # EC2 Instances
         if inventory.get('ec2_instances'):
             st.markdown("#### 🖥️ EC2 Instances")
-            df = pd.DataFrame(inventory['ec2_instances'])
+            df = _inventory_frame(inventory, 'ec2_instances')
             st.dataframe(df, use_container_width=True, hide_index=True)
             
             # Actions
             col1, col2, col3 = st.columns(3)
             with col1:
-                if st.button("📥 Export EC2 Report"):
-                    csv = df.to_csv(index=False)
-                    st.download_button("Download", csv, "ec2_inventory.csv", "text/csv")
+                with st.expander("📥 Export EC2 Report"):
+                    render_export_controls("export_ec2_report", [frame_source("EC2 instances", df, "ec2_inventory")])
             
             with col2:
                 if st.button("🔄 Refresh EC2 Data"):
@@ -1137,13 +1483,13 @@ aws lambda tag-resource --resource arn:aws:lambda:us-east-1:123456789:function:l
         # RDS Databases
         if inventory.get('rds_databases'):
             st.markdown("#### 🐘 RDS Databases")
-            df = pd.DataFrame(inventory['rds_databases'])
+            df = _inventory_frame(inventory, 'rds_databases')
             st.dataframe(df, use_container_width=True, hide_index=True)
         
         # DynamoDB Tables
         if inventory.get('dynamodb_tables'):
             st.markdown("#### ⚡ DynamoDB Tables")
-            df = pd.DataFrame(inventory['dynamodb_tables'])
+            df = _inventory_frame(inventory, 'dynamodb_tables')
             st.dataframe(df, use_container_width=True, hide_index=True)
     
     # ========================================================================
@@ -1165,13 +1511,13 @@ aws lambda tag-resource --resource arn:aws:lambda:us-east-1:123456789:function:l
         # S3 Buckets
         if inventory.get('s3_buckets'):
             st.markdown("#### 🪣 S3 Buckets")
-            df = pd.DataFrame(inventory['s3_buckets'])
+            df = _inventory_frame(inventory, 's3_buckets')
             st.dataframe(df, use_container_width=True, hide_index=True)
         
         # EBS Volumes
         if inventory.get('ebs_volumes'):
             st.markdown("#### 💾 EBS Volumes")
-            df = pd.DataFrame(inventory['ebs_volumes'])
+            df = _inventory_frame(inventory, 'ebs_volumes')
             st.dataframe(df, use_container_width=True, hide_index=True)
     
     # ========================================================================
@@ -1193,25 +1539,25 @@ aws lambda tag-resource --resource arn:aws:lambda:us-east-1:123456789:function:l
         # VPCs
         if inventory.get('vpcs'):
             st.markdown("#### 🌐 VPCs")
-            df = pd.DataFrame(inventory['vpcs'])
+            df = _inventory_frame(inventory, 'vpcs')
             st.dataframe(df, use_container_width=True, hide_index=True)
         
         # Load Balancers
         if inventory.get('load_balancers'):
             st.markdown("#### ⚖️ Load Balancers")
-            df = pd.DataFrame(inventory['load_balancers'])
+            df = _inventory_frame(inventory, 'load_balancers')
             st.dataframe(df, use_container_width=True, hide_index=True)
         
         # CloudFront
         if inventory.get('cloudfront_distributions'):
             st.markdown("#### ☁️ CloudFront Distributions")
-            df = pd.DataFrame(inventory['cloudfront_distributions'])
+            df = _inventory_frame(inventory, 'cloudfront_distributions')
             st.dataframe(df, use_container_width=True, hide_index=True)
         
         # Route53
         if inventory.get('route53_zones'):
             st.markdown("#### 🌍 Route53 Hosted Zones")
-            df = pd.DataFrame(inventory['route53_zones'])
+            df = _inventory_frame(inventory, 'route53_zones')
             st.dataframe(df, use_container_width=True, hide_index=True)
     
     # ========================================================================
@@ -1233,7 +1579,7 @@ aws lambda tag-resource --resource arn:aws:lambda:us-east-1:123456789:function:l
         # Lambda Functions
         if inventory.get('lambda_functions'):
             st.markdown("#### λ Lambda Functions")
-            df = pd.DataFrame(inventory['lambda_functions'])
+            df = _inventory_frame(inventory, 'lambda_functions')
             st.dataframe(df, use_container_width=True, hide_index=True)
             
             # Lambda insights
@@ -1251,206 +1597,9 @@ aws lambda tag-resource --resource arn:aws:lambda:us-east-1:123456789:function:l
     # ========================================================================
     # TAB 12: RESOURCE DEPENDENCIES
     # ========================================================================
-# ============================================================================
-# EXACT REPLACEMENT FOR _render_resource_dependencies METHOD
-# ============================================================================
-# 
-# Copy this ENTIRE section and replace lines 1250-1294 in your module
-# 
-# Location: modules_resource_inventory.py
-# Lines to replace: 1250-1294
-# 
-# ============================================================================
-
-    # ========================================================================
-    # TAB 12: RESOURCE DEPENDENCIES
-    # ========================================================================
     
     @staticmethod
     def _render_resource_dependencies(account_mgr):
-        """Enhanced resource dependencies with application selector"""
-        
-        import pandas as pd
-        
-        st.markdown("### 🔗 Resource Dependencies & Relationships")
-        st.caption("Visualize connections between resources - Select an application to view its dependency tree")
-        
-        st.info("""
-        **Resource Dependency Mapping:**
-        - EC2 Instances → VPC, Security Groups, EBS Volumes, Elastic IPs
-        - RDS Databases → VPC, Security Groups, Parameter Groups
-        - Load Balancers → Target Groups, EC2 Instances, VPC
-        - Lambda Functions → VPC, IAM Roles, API Gateway
-        - S3 Buckets → CloudFront Distributions, IAM Policies
-        """)
-        
-        # ================================================================
-        # APPLICATION/RESOURCE SELECTOR
-        # ================================================================
-        
-        st.markdown("---")
-        st.markdown("#### 🎯 Select Application or Resource")
-        
-        col1, col2, col3 = st.columns([2, 2, 1])
-        
-        with col1:
-            # View mode selection
-            view_mode = st.radio(
-                "View Mode",
-                ["Demo Mode", "Real Mode"],
-                horizontal=True,
-                key="dep_view_mode",
-                help="Demo Mode: Sample data | Real Mode: Your actual AWS resources"
-            )
-        
-        # ================================================================
-        # DEMO MODE - Sample Applications
-        # ================================================================
-        
-        if view_mode == "Demo Mode":
-            # Define sample applications with their dependencies
-            demo_applications = {
-                "Production Web Application": [
-                    {'Resource': 'ALB: prod-alb-main', 'Type': 'Application Load Balancer', 'Status': 'Active', 'Depends On': '-', 'Critical': 'Yes'},
-                    {'Resource': '└─ Target Group: prod-web-tg', 'Type': 'Target Group', 'Status': 'Healthy', 'Depends On': 'ALB', 'Critical': 'Yes'},
-                    {'Resource': '   └─ EC2: prod-web-server-01', 'Type': 'EC2 Instance', 'Status': 'Running', 'Depends On': 'Target Group', 'Critical': 'Yes'},
-                    {'Resource': '      ├─ VPC: vpc-prod', 'Type': 'VPC', 'Status': 'Available', 'Depends On': 'EC2', 'Critical': 'Yes'},
-                    {'Resource': '      ├─ Security Group: sg-prod-web', 'Type': 'Security Group', 'Status': 'Active', 'Depends On': 'EC2', 'Critical': 'Yes'},
-                    {'Resource': '      ├─ EBS Volume: vol-0abc123', 'Type': 'EBS Volume', 'Status': 'In-use', 'Depends On': 'EC2', 'Critical': 'Yes'},
-                    {'Resource': '      └─ Elastic IP: 54.123.45.67', 'Type': 'Elastic IP', 'Status': 'Associated', 'Depends On': 'EC2', 'Critical': 'No'},
-                    {'Resource': '   └─ EC2: prod-web-server-02', 'Type': 'EC2 Instance', 'Status': 'Running', 'Depends On': 'Target Group', 'Critical': 'Yes'},
-                    {'Resource': '└─ CloudFront: E1ABC2DEF3GHI', 'Type': 'CloudFront Distribution', 'Status': 'Deployed', 'Depends On': 'ALB', 'Critical': 'No'}
-                ],
-                "E-Commerce Platform": [
-                    {'Resource': 'ALB: ecommerce-alb', 'Type': 'Application Load Balancer', 'Status': 'Active', 'Depends On': '-', 'Critical': 'Yes'},
-                    {'Resource': '└─ Target Group: ecommerce-app-tg', 'Type': 'Target Group', 'Status': 'Healthy', 'Depends On': 'ALB', 'Critical': 'Yes'},
-                    {'Resource': '   ├─ ECS Service: ecommerce-app', 'Type': 'ECS Service', 'Status': 'Running', 'Depends On': 'Target Group', 'Critical': 'Yes'},
-                    {'Resource': '   │  ├─ Task Definition: ecommerce-app:v12', 'Type': 'ECS Task', 'Status': 'Active', 'Depends On': 'ECS Service', 'Critical': 'Yes'},
-                    {'Resource': '   │  ├─ ECR: ecommerce/app-image', 'Type': 'Container Registry', 'Status': 'Active', 'Depends On': 'Task', 'Critical': 'Yes'},
-                    {'Resource': '   │  └─ IAM Role: ecommerce-task-role', 'Type': 'IAM Role', 'Status': 'Active', 'Depends On': 'Task', 'Critical': 'Yes'},
-                    {'Resource': '   └─ RDS: ecommerce-db', 'Type': 'RDS PostgreSQL', 'Status': 'Available', 'Depends On': 'ECS Service', 'Critical': 'Yes'},
-                    {'Resource': '      ├─ DB Subnet Group: ecommerce-subnet', 'Type': 'DB Subnet Group', 'Status': 'Active', 'Depends On': 'RDS', 'Critical': 'Yes'},
-                    {'Resource': '      └─ Security Group: sg-ecommerce-db', 'Type': 'Security Group', 'Status': 'Active', 'Depends On': 'RDS', 'Critical': 'Yes'},
-                    {'Resource': '└─ ElastiCache: ecommerce-redis', 'Type': 'Redis Cluster', 'Status': 'Available', 'Depends On': 'ALB', 'Critical': 'No'}
-                ],
-                "Data Processing Pipeline": [
-                    {'Resource': 'Lambda: data-processor', 'Type': 'Lambda Function', 'Status': 'Active', 'Depends On': '-', 'Critical': 'Yes'},
-                    {'Resource': '├─ S3 Bucket: raw-data-bucket', 'Type': 'S3 Bucket', 'Status': 'Active', 'Depends On': 'Lambda', 'Critical': 'Yes'},
-                    {'Resource': '│  └─ S3 Event Notification', 'Type': 'S3 Event', 'Status': 'Enabled', 'Depends On': 'S3', 'Critical': 'Yes'},
-                    {'Resource': '├─ DynamoDB: processing-state', 'Type': 'DynamoDB Table', 'Status': 'Active', 'Depends On': 'Lambda', 'Critical': 'Yes'},
-                    {'Resource': '│  ├─ DynamoDB Stream', 'Type': 'DynamoDB Stream', 'Status': 'Enabled', 'Depends On': 'DynamoDB', 'Critical': 'No'},
-                    {'Resource': '│  └─ Global Table Replica: us-west-2', 'Type': 'DynamoDB Replica', 'Status': 'Active', 'Depends On': 'DynamoDB', 'Critical': 'No'},
-                    {'Resource': '├─ SQS Queue: data-processing-queue', 'Type': 'SQS Queue', 'Status': 'Active', 'Depends On': 'Lambda', 'Critical': 'Yes'},
-                    {'Resource': '│  └─ DLQ: data-processing-dlq', 'Type': 'Dead Letter Queue', 'Status': 'Active', 'Depends On': 'SQS', 'Critical': 'Yes'},
-                    {'Resource': '├─ SNS Topic: processing-notifications', 'Type': 'SNS Topic', 'Status': 'Active', 'Depends On': 'Lambda', 'Critical': 'No'},
-                    {'Resource': '└─ IAM Role: lambda-execution-role', 'Type': 'IAM Role', 'Status': 'Active', 'Depends On': 'Lambda', 'Critical': 'Yes'}
-                ],
-                "Mobile API Backend": [
-                    {'Resource': 'API Gateway: mobile-api', 'Type': 'API Gateway REST', 'Status': 'Deployed', 'Depends On': '-', 'Critical': 'Yes'},
-                    {'Resource': '├─ Lambda: auth-handler', 'Type': 'Lambda Function', 'Status': 'Active', 'Depends On': 'API Gateway', 'Critical': 'Yes'},
-                    {'Resource': '│  └─ Cognito: mobile-user-pool', 'Type': 'Cognito User Pool', 'Status': 'Active', 'Depends On': 'Lambda', 'Critical': 'Yes'},
-                    {'Resource': '├─ Lambda: user-profile-api', 'Type': 'Lambda Function', 'Status': 'Active', 'Depends On': 'API Gateway', 'Critical': 'Yes'},
-                    {'Resource': '│  └─ Aurora: user-profiles-db', 'Type': 'Aurora MySQL', 'Status': 'Available', 'Depends On': 'Lambda', 'Critical': 'Yes'},
-                    {'Resource': '├─ Lambda: content-api', 'Type': 'Lambda Function', 'Status': 'Active', 'Depends On': 'API Gateway', 'Critical': 'Yes'},
-                    {'Resource': '│  ├─ S3 Bucket: mobile-content', 'Type': 'S3 Bucket', 'Status': 'Active', 'Depends On': 'Lambda', 'Critical': 'Yes'},
-                    {'Resource': '│  └─ CloudFront: mobile-cdn', 'Type': 'CloudFront Distribution', 'Status': 'Deployed', 'Depends On': 'S3', 'Critical': 'No'},
-                    {'Resource': '└─ WAF: mobile-api-waf', 'Type': 'AWS WAF', 'Status': 'Active', 'Depends On': 'API Gateway', 'Critical': 'Yes'}
-                ],
-                "Analytics Dashboard": [
-                    {'Resource': 'QuickSight: analytics-dashboard', 'Type': 'QuickSight Dashboard', 'Status': 'Active', 'Depends On': '-', 'Critical': 'Yes'},
-                    {'Resource': '├─ Athena: analytics-queries', 'Type': 'Athena Workgroup', 'Status': 'Active', 'Depends On': 'QuickSight', 'Critical': 'Yes'},
-                    {'Resource': '│  └─ S3 Bucket: query-results', 'Type': 'S3 Bucket', 'Status': 'Active', 'Depends On': 'Athena', 'Critical': 'Yes'},
-                    {'Resource': '├─ Glue: analytics-catalog', 'Type': 'Glue Data Catalog', 'Status': 'Active', 'Depends On': 'QuickSight', 'Critical': 'Yes'},
-                    {'Resource': '│  ├─ Glue Crawler: data-discovery', 'Type': 'Glue Crawler', 'Status': 'Ready', 'Depends On': 'Glue', 'Critical': 'Yes'},
-                    {'Resource': '│  └─ S3 Bucket: analytics-data-lake', 'Type': 'S3 Bucket', 'Status': 'Active', 'Depends On': 'Glue', 'Critical': 'Yes'},
-                    {'Resource': '├─ Redshift: analytics-warehouse', 'Type': 'Redshift Cluster', 'Status': 'Available', 'Depends On': 'QuickSight', 'Critical': 'No'},
-                    {'Resource': '│  └─ Redshift Spectrum', 'Type': 'Spectrum Query', 'Status': 'Enabled', 'Depends On': 'Redshift', 'Critical': 'No'},
-                    {'Resource': '└─ IAM Role: quicksight-access-role', 'Type': 'IAM Role', 'Status': 'Active', 'Depends On': 'QuickSight', 'Critical': 'Yes'}
-                ]
-            }
-            
-            with col2:
-                selected_app = st.selectbox(
-                    "Select Application",
-                    options=list(demo_applications.keys()),
-                    key="demo_app_selector",
-                    help="Choose an application to view its resource dependencies"
-                )
-            
-            with col3:
-                show_critical_only = st.checkbox(
-                    "Critical Only",
-                    value=False,
-                    key="show_critical_only",
-                    help="Show only critical dependencies"
-                )
-            
-            # Display selected application dependencies
-            st.markdown(f"#### 🔍 {selected_app} - Dependency Tree")
-            
-            # Get dependencies for selected application
-            dependencies = demo_applications[selected_app]
-            
-            # Filter if critical only
-            if show_critical_only:
-                dependencies = [d for d in dependencies if d['Critical'] == 'Yes']
-            
-            df = pd.DataFrame(dependencies)
-            st.dataframe(df, use_container_width=True, hide_index=True)
-            
-            # Summary metrics
-            st.markdown("---")
-            col1, col2, col3, col4 = st.columns(4)
-            
-            all_deps = demo_applications[selected_app]
-            with col1:
-                st.metric("Total Resources", len(dependencies))
-            
-            with col2:
-                critical_count = sum(1 for d in all_deps if d['Critical'] == 'Yes')
-                st.metric("Critical Resources", critical_count)
-            
-            with col3:
-                unique_types = len(set(d['Type'] for d in all_deps))
-                st.metric("Resource Types", unique_types)
-            
-            with col4:
-                active_count = sum(1 for d in all_deps if d['Status'] in ['Active', 'Running', 'Available'])
-                st.metric("Active/Healthy", active_count)
-        
-        # ================================================================
-        # REAL MODE - Actual AWS Resources
-        # ================================================================
-        
-        else:  # Real Mode
-            st.markdown("#### 🔄 Real Mode - Your AWS Resources")
-            
-            with col2:
-                st.info("🔧 **Setup Required:** Tag your AWS resources with 'Application' tag to enable auto-discovery")
-                
-                real_applications = st.selectbox(
-                    "Select Application",
-                    options=["No applications found - Add 'Application' tags to your resources"],
-                    key="real_app_selector",
-                    disabled=True,
-                    help="Tag your AWS resources with 'Application' to auto-discover them"
-                )
-            
-            st.markdown("##### 📋 How to Enable Real Mode:")
-            st.code("""# Tag your AWS resources with 'Application' tag:
-# 
-# For EC2:
-aws ec2 create-tags --resources i-1234567890abcdef0 \\
-  --tags Key=Application,Value="Production Web Application"
-
-# For RDS:
-aws rds add-tags-to-resource --resource-name arn:aws:rds:... \\
-  --tags Key=Application,Value="Production Web Application"
-
-# For Load Balancers:
-aws elbv2 add-tags --resource-arns arn:aws:elasticloadbalancing:... \\
-  --tags Key=Application,Value="Production Web Application"
-            """, language="bash")
-        
-        st.markdown("---")
-        st.success("💡 **Tip:** Understanding resource dependencies helps identify impact of changes, optimize costs, and ensure high availability")
\ No newline at end of file
+        """Application dependency trees and impact analysis over the latest snapshot"""
+        from resource_dependencies_enhanced import render_resource_dependencies_enhanced
+        render_resource_dependencies_enhanced(account_mgr)
@@ -6,7 +6,14 @@ Allows users to select and view dependencies for specific applications
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+from data_export import ExportSource, TABLE_FORMATS, export_frames, export_graphml, frame_chunks, frame_source, render_export_controls
+import json
+import time
+
+# Rows shown in the live dependency table and nodes drawn in the network graph
+DEPENDENCY_TABLE_LIMIT = 1000
+NETWORK_GRAPH_LIMIT = 300
 
 def render_resource_dependencies_enhanced(account_mgr):
     """Enhanced resource dependencies with application selector - REAL MODE READY"""
@@ -449,6 +456,15 @@ def render_resource_dependencies_enhanced(account_mgr):
         
         st.dataframe(df, use_container_width=True, hide_index=True)
         
+        export_sources = [frame_source("Dependency table", df, "dependencies")]
+        depths, parents = _tree_links(dependencies)
+        graph_nodes = (
+            [d['Resource'].lstrip(' │├└─') for d in dependencies],
+            [d['Type'] for d in dependencies],
+            depths,
+            parents
+        )
+        
         # Summary metrics
         st.markdown("---")
         col1, col2, col3, col4 = st.columns(4)
@@ -474,97 +490,7 @@ def render_resource_dependencies_enhanced(account_mgr):
     
     else:  # Real Mode
         st.markdown("#### 🔄 Real Mode - Your AWS Resources")
-        
-        # In real mode, you would fetch actual AWS resources
-        # Here's the framework for implementation:
-        
-        with col2:
-            # Get actual applications from AWS
-            # This would query your AWS environment for tagged resources
-            
-            # Example: Query resources with 'Application' tag
-            st.info("🔧 **Setup Required:** Tag your AWS resources with 'Application' tag to enable auto-discovery")
-            
-            # Placeholder for real implementation
-            real_applications = st.selectbox(
-                "Select Application",
-                options=["No applications found - Add 'Application' tags to your resources"],
-                key="real_app_selector",
-                disabled=True,
-                help="Tag your AWS resources with 'Application' to auto-discover them"
-            )
-        
-        st.markdown("##### 📋 How to Enable Real Mode:")
-        st.code("""
-# Tag your AWS resources with 'Application' tag:
-# 
-# For EC2:
-aws ec2 create-tags --resources i-1234567890abcdef0 \\
-  --tags Key=Application,Value="Production Web Application"
-
-# For RDS:
-aws rds add-tags-to-resource --resource-name arn:aws:rds:... \\
-  --tags Key=Application,Value="Production Web Application"
-
-# For Load Balancers:
-aws elbv2 add-tags --resource-arns arn:aws:elasticloadbalancing:... \\
-  --tags Key=Application,Value="Production Web Application"
-        """, language="bash")
-        
-        # Implementation template
-        st.markdown("---")
-        st.markdown("##### 🔨 Real Mode Implementation (for developers):")
-        
-        with st.expander("View Real Mode Implementation Code"):
-            st.code('''
-def get_application_dependencies(application_name: str, session, region: str):
-    """
-    Query AWS to build dependency tree for an application
-    """
-    import boto3
-    
-    # Initialize AWS clients
-    ec2 = session.client('ec2', region_name=region)
-    elb = session.client('elbv2', region_name=region)
-    rds = session.client('rds', region_name=region)
-    lambda_client = session.client('lambda', region_name=region)
-    
-    dependencies = []
-    
-    # 1. Find all resources tagged with this application
-    ec2_resources = ec2.describe_instances(
-        Filters=[{'Name': 'tag:Application', 'Values': [application_name]}]
-    )
-    
-    # 2. For each resource, find its dependencies
-    for reservation in ec2_resources['Reservations']:
-        for instance in reservation['Instances']:
-            # Get VPC
-            vpc_id = instance.get('VpcId')
-            
-            # Get Security Groups
-            sg_ids = [sg['GroupId'] for sg in instance.get('SecurityGroups', [])]
-            
-            # Get EBS Volumes
-            volumes = [bdm['Ebs']['VolumeId'] for bdm in instance.get('BlockDeviceMappings', [])]
-            
-            # Get Elastic IPs
-            # ... and so on
-    
-    # 3. Find load balancers for this application
-    load_balancers = elb.describe_load_balancers()
-    for lb in load_balancers['LoadBalancers']:
-        tags = elb.describe_tags(ResourceArns=[lb['LoadBalancerArn']])
-        # Check if tagged with application
-        # Get target groups
-        # Get EC2 instances in target groups
-        # ... and so on
-    
-    # 4. Build dependency tree
-    # ... organize resources into parent-child relationships
-    
-    return dependencies
-            ''', language='python')
+        export_sources, graph_nodes = _render_live_dependencies(col2, col3)
     
     # ========================================================================
     # ADDITIONAL FEATURES
@@ -576,26 +502,215 @@ def get_application_dependencies(application_name: str, session, region: str):
     col1, col2 = st.columns(2)
     
     with col1:
-        if st.button("📊 View Network Graph", use_container_width=True, key="view_network_graph"):
-            st.info("Network graph visualization coming soon! Will show interactive node-based dependency graph.")
+        show_graph = st.button(
+            "📊 View Network Graph", use_container_width=True, key="view_network_graph",
+            disabled=graph_nodes is None
+        )
     
     with col2:
-        if st.button("📥 Export Dependencies", use_container_width=True, key="export_dependencies"):
-            st.success("Export functionality coming soon! Will export to CSV, JSON, or Visio format.")
+        render_export_controls("export_dependencies", export_sources, "📥 Export Dependencies")
+    
+    if show_graph and graph_nodes is not None:
+        _render_network_graph(*graph_nodes)
     
     st.markdown("---")
     st.success("💡 **Tip:** Understanding resource dependencies helps identify impact of changes, optimize costs, and ensure high availability")
 
 
-# ========================================================================
-# USAGE IN YOUR MODULE
-# ========================================================================
+def _tree_links(dependencies: List[Dict]) -> Tuple[List[int], List[int]]:
+    """Depth and parent row of each demo row, read from its '├─' / '└─' indentation"""
+    depths, parents, last_at_depth = [], [], {}
+    for row, dependency in enumerate(dependencies):
+        resource = dependency['Resource']
+        marker = min((i for i in (resource.find('├─'), resource.find('└─')) if i >= 0), default=-1)
+        depth = 0 if marker < 0 else marker // 3 + 1
+        depths.append(depth)
+        parents.append(last_at_depth.get(depth - 1, -1) if depth else -1)
+        last_at_depth[depth] = row
+    return depths, parents
+
+
+def _render_live_dependencies(selector_col, options_col) -> Tuple[List[ExportSource], Optional[Tuple]]:
+    """
+    Dependency queries against the latest inventory snapshot
+    
+    Returns:
+        (export sources, (labels, types, depths, parents) for the network graph); ([], None) when
+        there is nothing to show
+    """
+    from inventory_service import get_inventory_store
+    from dependency_graph import get_dependency_graph
+    from config_settings import AppConfig
+    from utils_helpers import Helpers
+    
+    snapshot = get_inventory_store().latest_snapshot()
+    if not snapshot:
+        with selector_col:
+            st.info("🔧 **Setup Required:** Collect an inventory snapshot in the Resource Inventory module first")
+        return [], None
+    
+    graph = get_dependency_graph(snapshot['snapshot_id'], snapshot['revision'] or 0)
+    application_tag = AppConfig.DEPENDENCY_APPLICATION_TAG
+    
+    with selector_col:
+        if json.loads(snapshot['scope'] or '{}').get('mode') == 'tagging':
+            st.warning(
+                "⚠️ The latest snapshot was collected in tagging mode (ARNs and tags only), so it has no "
+                "security group, subnet, target group or role references to build dependencies from. "
+                "Run a full collection in the Resource Inventory module."
+            )
+        start_from = st.radio("Start From", ["Application", "Resource"], horizontal=True, key="real_dep_start")
+        
+        if start_from == "Application":
+            if not graph.applications:
+                st.info(f"🔧 Tag your AWS resources with '{application_tag}' to group them into applications")
+                return [], None
+            selected_app = st.selectbox(
+                "Select Application",
+                options=sorted(graph.applications),
+                key="real_app_selector",
+                help=f"Resources tagged {application_tag}=<name>"
+            )
+            seeds = graph.applications[selected_app]
+            title = selected_app
+        else:
+            search = st.text_input("Resource ID or name", key="real_dep_search", placeholder="e.g., i-0abc123 or prod-alb")
+            matches = graph.find(search)
+            if not len(matches):
+                if search:
+                    st.warning("No matching resources in the latest snapshot")
+                return [], None
+            nodes = graph.nodes
+            selected = st.selectbox(
+                "Select Resource",
+                options=matches.tolist(),
+                format_func=lambda p: f"{nodes['label'].iat[p]}: {nodes['resource_id'].iat[p]} ({nodes['account_name'].iat[p]} / {nodes['region'].iat[p]})",
+                key="real_dep_resource"
+            )
+            seeds = graph.positions([nodes['resource_key'].iat[selected]])
+            title = nodes['resource_id'].iat[selected]
+    
+    with options_col:
+        query = st.selectbox(
+            "Query",
+            ["Downstream", "Upstream"],
+            key="real_dep_query",
+            help="Downstream: what it depends on | Upstream: what depends on it, i.e. the blast radius if it fails"
+        )
+        max_depth = st.number_input("Max Depth (0 = all)", min_value=0, value=0, step=1, key="real_dep_depth")
+    
+    started = time.perf_counter()
+    traverse = {'Downstream': graph.downstream, 'Upstream': graph.upstream}[query]
+    result = traverse(seeds, int(max_depth) or None)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    impact = result.impact()
+    
+    st.markdown(f"#### 🔍 {title} - {query}")
+    st.caption(
+        f"{len(result)} nodes reached in {elapsed_ms:.1f} ms over a graph of "
+        f"{len(graph):,} nodes / {graph.edge_count:,} edges (snapshot {snapshot['snapshot_id'][:8]})"
+    )
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Affected Resources" if query == "Upstream" else "Related Resources", impact['resources'])
+    with col2:
+        st.metric("Referenced Components", impact['referenced'])
+    with col3:
+        st.metric("Accounts", len(impact['accounts']))
+    with col4:
+        st.metric("Monthly Cost at Risk" if query == "Upstream" else "Monthly Cost",
+                  Helpers.format_currency(impact['cost_month']))
+    
+    frame = result.frame(limit=DEPENDENCY_TABLE_LIMIT)
+    if len(result) > DEPENDENCY_TABLE_LIMIT:
+        st.caption(f"Showing the {DEPENDENCY_TABLE_LIMIT} closest of {len(result)} nodes")
+    
+    table = pd.DataFrame({
+        'Resource': [
+            ('   ' * (depth - 1) + '└─ ' if depth else '') + f"{label}: {resource_id}"
+            for depth, label, resource_id in zip(frame['depth'], frame['resource_type'], frame['resource_id'])
+        ],
+        'Type': frame['resource_type'],
+        'Name': frame['name'],
+        'Account': frame['account'],
+        'Region': frame['region'],
+        'Status': frame['state'],
+        'Depends On' if query == "Downstream" else 'Dependency Of': frame['via'].replace('', '-'),
+        'Relation': frame['relation'],
+        'Depth': frame['depth'],
+        'Monthly Cost': frame['cost_month'].round(2)
+    })
+    st.dataframe(table, use_container_width=True, hide_index=True)
+    
+    # Parent rows for the graph: map each node's parent position to its row in the (depth-ordered) frame
+    positions = result.positions[:len(frame)]
+    row_of = {position: row for row, position in enumerate(positions.tolist())}
+    parents = [row_of.get(parent, -1) for parent in result.parent[:len(frame)].tolist()]
+    labels = [f"{label}: {resource_id}" for label, resource_id in zip(frame['resource_type'], frame['resource_id'])]
+    
+    graph_stem = f"dependency-graph-{snapshot['snapshot_id'][:8]}"
+    chunk_rows = AppConfig.EXPORT_CHUNK_ROWS
+    export_sources = [
+        ExportSource(
+            f"{query} result ({len(result):,} nodes)",
+            TABLE_FORMATS,
+            lambda fmt: export_frames(frame_chunks(result.frame()), fmt, f"dependencies-{query.lower().replace(' ', '-')}")
+        ),
+        ExportSource(
+            f"Full graph ({len(graph):,} nodes / {graph.edge_count:,} edges)",
+            ['graphml'],
+            lambda fmt: export_graphml(graph.node_frames(chunk_rows), graph.edge_frames(chunk_rows), graph_stem)
+        ),
+        ExportSource(
+            "Full graph edge list",
+            TABLE_FORMATS,
+            lambda fmt: export_frames(graph.edge_frames(chunk_rows), fmt, f"{graph_stem}-edges")
+        )
+    ]
+    return export_sources, (labels, frame['resource_type'].astype(str).tolist(), frame['depth'].tolist(), parents)
+
 
-# To replace the existing _render_resource_dependencies method in your module:
-# 
-# Simply replace this section (around line 1253):
-#
-# @staticmethod
-# def _render_resource_dependencies(account_mgr):
-#     render_resource_dependencies_enhanced(account_mgr)
-#
\ No newline at end of file
+def _render_network_graph(labels: List[str], types: List[str], depths: List[int], parents: List[int]):
+    """Layered node-link diagram: one column per depth, edges to the node each row was reached from"""
+    count = min(len(labels), NETWORK_GRAPH_LIMIT)
+    if len(labels) > count:
+        st.caption(f"Graph shows the {count} closest of {len(labels)} nodes")
+    
+    rows_at_depth: Dict[int, int] = {}
+    xs, ys = [], []
+    for depth in depths[:count]:
+        xs.append(depth)
+        ys.append(-rows_at_depth.get(depth, 0))
+        rows_at_depth[depth] = rows_at_depth.get(depth, 0) + 1
+    
+    edge_x, edge_y = [], []
+    for row in range(count):
+        parent = parents[row]
+        if 0 <= parent < count:
+            edge_x += [xs[parent], xs[row], None]
+            edge_y += [ys[parent], ys[row], None]
+    
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=edge_x, y=edge_y, mode='lines', line=dict(width=1, color='#adb5bd'),
+                             hoverinfo='skip', showlegend=False))
+    for resource_type in dict.fromkeys(types[:count]):
+        rows = [row for row in range(count) if types[row] == resource_type]
+        fig.add_trace(go.Scatter(
+            x=[xs[row] for row in rows],
+            y=[ys[row] for row in rows],
+            mode='markers+text',
+            text=[labels[row] for row in rows],
+            textposition='middle right',
+            marker=dict(size=14),
+            name=resource_type,
+            hoverinfo='text'
+        ))
+    
+    fig.update_layout(
+        height=max(400, 28 * max(rows_at_depth.values(), default=1)),
+        xaxis=dict(title='Depth', dtick=1, showgrid=False, zeroline=False),
+        yaxis=dict(visible=False),
+        margin=dict(l=20, r=20, t=30, b=20)
+    )
+    st.plotly_chart(fig, use_container_width=True)
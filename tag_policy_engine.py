@@ -0,0 +1,360 @@
+"""
+Tag Policy Engine - Vectorized Tag Compliance over the Inventory Table
+Required-tag rules compiled once and evaluated column-wise, patched incrementally from the change feed
+"""
+
+import streamlit as st
+import pandas as pd
+from pandas.api.types import union_categoricals
+import numpy as np
+from typing import Dict, List, Optional, Set
+from dataclasses import dataclass
+from config_settings import AppConfig
+from inventory_table import InventoryTable, TAG_PAIR_SEPARATOR
+import re
+import threading
+
+
+# Per-resource, per-tag-key verdicts
+STATUS_OK = 0
+STATUS_MISSING = 1
+STATUS_INVALID = 2
+STATUS_NOT_APPLICABLE = 3
+
+UNTAGGED = 'Untagged'
+
+
+@dataclass
+class TagRule:
+    """One tag requirement; rules with environments override the default rule for their key"""
+    key: str
+    required: bool = True
+    allowed_values: Optional[List[str]] = None
+    pattern: Optional[str] = None
+    case_sensitive: bool = False
+    resource_types: Optional[List[str]] = None  # None = every type
+    environments: Optional[List[str]] = None    # None = default rule for the key
+    
+    def compile(self):
+        """Prepare the value test (called once per policy)"""
+        flags = 0 if self.case_sensitive else re.IGNORECASE
+        self._regex = re.compile(self.pattern, flags) if self.pattern else None
+        self._allowed = None
+        if self.allowed_values is not None:
+            self._allowed = {v if self.case_sensitive else v.lower() for v in self.allowed_values}
+    
+    def accepts(self, value: str) -> bool:
+        """Whether a present tag value satisfies the rule"""
+        if self._allowed is not None and (value if self.case_sensitive else value.lower()) not in self._allowed:
+            return False
+        if self._regex is not None and not self._regex.search(value):
+            return False
+        return True
+
+
+class TagPolicy:
+    """
+    Compiled set of tag rules
+    
+    Rules are grouped per tag key into a default rule and per-environment
+    overrides (matched case-insensitively against the environment tag).
+    Value tests run once per distinct tag value, never once per resource;
+    everything per-resource is integer array arithmetic over the table's
+    tag codes.
+    """
+    
+    def __init__(self, rules: List[TagRule], environment_tag: str = 'Environment', team_tag: str = 'Team'):
+        """
+        Compile a policy
+        
+        Args:
+            rules: Tag rules (a key without a default rule is only checked in its environments)
+            environment_tag: Tag whose value selects overrides
+            team_tag: Tag used for the per-team breakdown
+        """
+        self.rules = rules
+        self.environment_tag = environment_tag
+        self.team_tag = team_tag
+        self.keys: List[str] = []
+        self._defaults: Dict[str, TagRule] = {}
+        self._overrides: Dict[str, Dict[str, TagRule]] = {}
+        
+        for rule in rules:
+            rule.compile()
+            if rule.key not in self.keys:
+                self.keys.append(rule.key)
+                self._overrides[rule.key] = {}
+            if rule.environments:
+                for environment in rule.environments:
+                    self._overrides[rule.key][environment.lower()] = rule
+            else:
+                self._defaults[rule.key] = rule
+    
+    @classmethod
+    def from_config(cls, required_tags: Optional[List[str]] = None) -> 'TagPolicy':
+        """
+        Policy from AppConfig: presence of every required tag plus INVENTORY_TAG_RULES
+        
+        Args:
+            required_tags: Overrides AppConfig.INVENTORY_REQUIRED_TAGS
+        """
+        required_tags = required_tags if required_tags is not None else AppConfig.INVENTORY_REQUIRED_TAGS
+        configured = [TagRule(**rule) for rule in AppConfig.INVENTORY_TAG_RULES]
+        has_default = {r.key for r in configured if not r.environments}
+        rules = [TagRule(key=key) for key in required_tags if key not in has_default] + configured
+        return cls(rules, AppConfig.INVENTORY_ENVIRONMENT_TAG, AppConfig.INVENTORY_TEAM_TAG)
+    
+    def evaluate(self, table: InventoryTable) -> 'ComplianceResult':
+        """
+        Score every resource of a table against the policy
+        
+        Args:
+            table: Inventory table (a full snapshot, or just the changed resources)
+        
+        Returns:
+            ComplianceResult with one status per (resource, tag key)
+        """
+        frame = table.frame
+        tag_rows, tag_keys, tag_pairs = table.tag_entries()
+        pair_categories = tag_pairs.categories
+        row_count = len(frame)
+        
+        def value(code: int) -> str:
+            return pair_categories[code].partition(TAG_PAIR_SEPARATOR)[2]
+        
+        def value_codes(key: str) -> np.ndarray:
+            """Pair code of each row's value for a key (-1 = tag absent)"""
+            codes = np.full(row_count, -1, dtype=np.int64)
+            if key in tag_keys.categories:
+                entries = tag_keys.codes == tag_keys.categories.get_loc(key)
+                codes[tag_rows[entries]] = tag_pairs.codes[entries]
+            return codes
+        
+        def distinct(codes: np.ndarray) -> np.ndarray:
+            """Distinct non-negative codes (bincount beats sorting for dense codes)"""
+            return np.flatnonzero(np.bincount(codes[codes >= 0], minlength=len(pair_categories)))
+        
+        def labels(codes: np.ndarray) -> pd.Categorical:
+            """Tag value per row as a categorical, UNTAGGED where absent"""
+            used = distinct(codes)
+            values = [value(c) for c in used]
+            untagged = values.index(UNTAGGED) if UNTAGGED in values else len(values)
+            lookup = np.full(len(pair_categories) + 1, untagged, dtype=np.int64)
+            lookup[used] = np.arange(len(used))
+            categories = values if untagged < len(values) else values + [UNTAGGED]
+            return pd.Categorical.from_codes(lookup[codes], categories=categories)
+        
+        environment_codes = value_codes(self.environment_tag)
+        environments = {}
+        for c in distinct(environment_codes):
+            environments.setdefault(value(c).lower(), []).append(c)
+        type_codes = frame['resource_type'].cat.codes.to_numpy()
+        type_categories = frame['resource_type'].cat.categories
+        
+        status = np.empty((row_count, len(self.keys)), dtype=np.int8)
+        for column, key in enumerate(self.keys):
+            codes = value_codes(key)
+            present = codes >= 0
+            used = distinct(codes)
+            
+            # Default rule everywhere, then each override on the rows of its environment
+            verdict = np.full(row_count, STATUS_NOT_APPLICABLE, dtype=np.int8)
+            assignments = [(self._defaults.get(key), None)] + [
+                (rule, environment) for environment, rule in self._overrides[key].items()
+            ]
+            for rule, environment in assignments:
+                if rule is None:
+                    continue
+                rows = np.ones(row_count, dtype=bool)
+                if environment is not None:
+                    rows = np.isin(environment_codes, np.asarray(environments.get(environment, []), dtype=np.int64))
+                if rule.resource_types:
+                    wanted = [type_categories.get_loc(t) for t in rule.resource_types if t in type_categories]
+                    rows &= np.isin(type_codes, np.asarray(wanted, dtype=np.int64))
+                
+                # Value test once per distinct value of this key
+                valid = np.zeros(len(pair_categories), dtype=bool)
+                valid[used] = [rule.accepts(value(c)) for c in used]
+                
+                rule_verdict = np.full(row_count, STATUS_OK, dtype=np.int8)
+                if rule.required:
+                    rule_verdict[~present] = STATUS_MISSING
+                rule_verdict[present & ~valid[np.maximum(codes, 0)]] = STATUS_INVALID
+                verdict[rows] = rule_verdict[rows]
+            
+            status[:, column] = verdict
+        
+        dimensions = pd.DataFrame({
+            'resource_type': frame['resource_type'],
+            'resource_id': frame['resource_id'],
+            'name': frame['name'],
+            'account_name': frame['account_name'],
+            'region': frame['region'],
+            'environment': labels(environment_codes),
+            'team': labels(value_codes(self.team_tag))
+        })
+        dimensions.index = pd.Index(frame['resource_key'], name='resource_key')
+        return ComplianceResult(self.keys, dimensions, status)
+
+
+class ComplianceResult:
+    """
+    Per-resource tag verdicts with aggregate views
+    
+    Holds one row of dimensions and one row of statuses per resource. Results
+    are shared across sessions, so apply() returns a new result instead of
+    patching this one.
+    """
+    
+    def __init__(self, keys: List[str], dimensions: pd.DataFrame, status: np.ndarray):
+        self.keys = keys
+        self.dimensions = dimensions
+        self.status = status
+    
+    def __len__(self) -> int:
+        return len(self.dimensions)
+    
+    def apply(self, changed: 'ComplianceResult', deleted_keys: Set[str]) -> 'ComplianceResult':
+        """
+        Merge re-scored resources and drop deleted ones
+        
+        Args:
+            changed: Result of evaluating only the added/modified resources
+            deleted_keys: resource_keys no longer in the snapshot
+        """
+        replaced = list(set(changed.dimensions.index) | set(deleted_keys))
+        keep = np.ones(len(self), dtype=bool)
+        positions = self.dimensions.index.get_indexer(replaced)
+        keep[positions[positions >= 0]] = False
+        
+        columns = {}
+        for column in self.dimensions.columns:
+            old, new = self.dimensions[column].array[keep], changed.dimensions[column].array
+            if isinstance(old, pd.Categorical):
+                columns[column] = union_categoricals([old, new])
+            else:
+                columns[column] = pd.concat([pd.Series(old), pd.Series(new)], ignore_index=True)
+        dimensions = pd.DataFrame(columns)
+        dimensions.index = self.dimensions.index[keep].append(changed.dimensions.index)
+        
+        return ComplianceResult(self.keys, dimensions, np.concatenate([self.status[keep], changed.status]))
+    
+    def compliant_mask(self) -> np.ndarray:
+        """Resources passing every rule that applies to them"""
+        return ((self.status == STATUS_OK) | (self.status == STATUS_NOT_APPLICABLE)).all(axis=1)
+    
+    def summary(self) -> Dict:
+        """Overall counts and per-key compliance"""
+        compliant = int(self.compliant_mask().sum())
+        total = len(self)
+        applicable = (self.status != STATUS_NOT_APPLICABLE).sum(axis=0)
+        ok = (self.status == STATUS_OK).sum(axis=0)
+        return {
+            'total': total,
+            'compliant': compliant,
+            'compliance': round(100 * compliant / total) if total else 100,
+            'missing': int((self.status == STATUS_MISSING).any(axis=1).sum()),
+            'invalid': int((self.status == STATUS_INVALID).any(axis=1).sum()),
+            'by_key': {
+                key: round(100 * ok[i] / applicable[i]) if applicable[i] else 100
+                for i, key in enumerate(self.keys)
+            }
+        }
+    
+    def matrix(self, by: str) -> pd.DataFrame:
+        """
+        Compliance % per group and tag key
+        
+        Args:
+            by: Dimension column, e.g. 'account_name', 'team', 'resource_type', 'environment'
+        
+        Returns:
+            DataFrame indexed by group with Resources, Compliance and one column per tag key
+        """
+        groups = self.dimensions[by].astype('category').array
+        codes, group_count = groups.codes, len(groups.categories)
+        
+        def per_group(weights: np.ndarray) -> np.ndarray:
+            return np.bincount(codes, weights=weights, minlength=group_count)
+        
+        resources = per_group(None)
+        matrix = pd.DataFrame({'Resources': resources.astype(int)}, index=pd.Index(groups.categories, name=by))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            matrix['Compliance'] = np.round(100 * per_group(self.compliant_mask()) / resources)
+            for i, key in enumerate(self.keys):
+                applicable = per_group(self.status[:, i] != STATUS_NOT_APPLICABLE)
+                ok = per_group(self.status[:, i] == STATUS_OK)
+                matrix[key] = np.round(100 * ok / np.where(applicable > 0, applicable, np.nan))
+        return matrix[resources > 0].sort_values('Compliance')
+    
+    def violations(self, limit: Optional[int] = None) -> pd.DataFrame:
+        """Non-compliant resources with their missing and invalid tag keys"""
+        failing = np.flatnonzero(~self.compliant_mask())
+        if limit is not None:
+            failing = failing[:limit]
+        
+        status = self.status[failing]
+        keys = np.array(self.keys, dtype=object)
+        rows = self.dimensions.iloc[failing]
+        return pd.DataFrame({
+            'Resource ID': rows['resource_id'].to_numpy(),
+            'Type': rows['resource_type'].astype(str).to_numpy(),
+            'Account': rows['account_name'].astype(str).to_numpy(),
+            'Region': rows['region'].astype(str).to_numpy(),
+            'Team': rows['team'].astype(str).to_numpy(),
+            'Missing Tags': [', '.join(keys[s == STATUS_MISSING]) for s in status],
+            'Invalid Tags': [', '.join(keys[s == STATUS_INVALID]) for s in status]
+        })
+
+
+class _ComplianceState:
+    """Latest result of one snapshot and the change feed position it reflects"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.revision: Optional[int] = None
+        self.change_id = 0
+        self.result: Optional[ComplianceResult] = None
+
+
+@st.cache_resource(max_entries=2)
+def _compliance_state(snapshot_id: str) -> _ComplianceState:
+    return _ComplianceState()
+
+
+@st.cache_resource
+def get_tag_policy() -> TagPolicy:
+    """Get the policy compiled from AppConfig"""
+    return TagPolicy.from_config()
+
+
+def get_tag_compliance(snapshot_id: str, revision: int) -> ComplianceResult:
+    """
+    Get tag compliance for a snapshot revision, shared across sessions
+    
+    The first call scores the whole snapshot; later revisions re-score only
+    the resources the change feed reports as added, modified or deleted.
+    """
+    from inventory_service import get_inventory_store
+    from inventory_table import get_inventory_table
+    
+    store = get_inventory_store()
+    policy = get_tag_policy()
+    state = _compliance_state(snapshot_id)
+    
+    with state.lock:
+        if state.result is not None and state.revision == revision:
+            return state.result
+        
+        if state.result is None or state.revision is None or revision < state.revision:
+            change_id = store.latest_change_id()
+            state.result = policy.evaluate(get_inventory_table(snapshot_id, revision))
+            state.change_id = change_id
+        else:
+            upserted, deleted, change_id = store.changed_keys(snapshot_id, state.change_id)
+            changed = InventoryTable.from_records(store.load_resources(snapshot_id, resource_keys=sorted(upserted)))
+            state.result = state.result.apply(policy.evaluate(changed), deleted)
+            state.change_id = change_id
+        
+        state.revision = revision
+        return state.result
@@ -2,7 +2,7 @@
 Helper Utilities
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 import streamlit as st
 
@@ -141,18 +141,6 @@ class Helpers:
     def show_info(message: str):
         """Show info message"""
         st.info(f"ℹ️ {message}")
-    
-    @staticmethod
-    def create_download_link(data: Any, filename: str, label: str = "Download"):
-        """Create download button"""
-        import json
-        import base64
-        
-        if isinstance(data, dict) or isinstance(data, list):
-            json_str = json.dumps(data, indent=2)
-            b64 = base64.b64encode(json_str.encode()).decode()
-            href = f'<a href="data:application/json;base64,{b64}" download="{filename}">{label}</a>'
-            st.markdown(href, unsafe_allow_html=True)
 
 
 # ==================================================================================